@@ -22,8 +22,10 @@
 
 #define REG(r) ((unsigned)reg[r])
 #define LD(r, v) reg[r] = v
-#define PEEK(a) (mem ? mem[a] : self->mem128[(a) / 0x4000][(a) % 0x4000])
-#define POKE(a, v) if (mem) mem[a] = v; else self->mem128[(a) / 0x4000][(a) % 0x4000] = v
+#define WATCH(k, a) if (self->watch_kinds & (1 << (k))) watch(self, k, a)
+#define PEEK(a) ((self->watch_kinds & (1 << W_READ) ? watch(self, W_READ, a) : (void)0), mem ? mem[a] : self->mem128[(a) / 0x4000][(a) % 0x4000])
+#define MARK_DIRTY(a) if (self->dirty) { if (mem) self->dirty[(a) / 256] = 1; else self->dirty[((a) < 0x8000 ? 5 : (a) < 0xC000 ? 2 : self->out7ffd & 7) * 64 + ((a) % 0x4000) / 256] = 1; }
+#define POKE(a, v) WATCH(W_WRITE, a); if (mem) mem[a] = v; else self->mem128[(a) / 0x4000][(a) % 0x4000] = v; MARK_DIRTY(a)
 #define INC_R(i) LD(R, (REG(R) & 0x80) + ((REG(R) + (i)) & 0x7F))
 #define TIME reg[T]
 #ifdef CONTENTION
@@ -43,6 +45,17 @@ typedef void (*contend_f)(unsigned* t, unsigned* delay, int urc, int n, ...);
 
 typedef struct CSimulatorObject CSimulatorObject;
 
+typedef struct {
+    int kind;
+    unsigned a;
+    unsigned b;
+    int op;
+    unsigned long long value;
+    unsigned long long count;
+    unsigned long long hits;
+    int triggered;
+} watchpoint;
+
 typedef void (*opcode_exec)(CSimulatorObject* self, void* lookup, int args[]);
 
 typedef struct {
@@ -53,21 +66,36 @@ typedef struct {
 
 typedef struct CSimulatorObject {
     PyObject_HEAD
-    Py_buffer buffers[11];
+    Py_buffer buffers[12];
     unsigned long long* registers;
     byte* memory;
+    byte* dirty;
     byte* roms[2];
     byte* banks[8];
     byte* mem128[4];
     unsigned frame_duration;
     unsigned int_active;
+    int fast_idle;
+    unsigned stop;
+    unsigned long long max_time;
+    watchpoint* watchpoints;
+    int num_watchpoints;
+    unsigned watch_kinds;
+    int watch_hit;
 #ifdef CONTENTION
     unsigned t0;
     unsigned t1;
     contend_f contend;
+#else
+    unsigned poll_pc;
+    unsigned long long poll_time;
+    unsigned poll_period;
+    unsigned poll_r_inc;
+    unsigned long long poll_regs[24];
 #endif
     byte out7ffd;
     PyObject* memory_obj;
+    PyObject* dirty_obj;
     PyObject* registers_obj;
     PyObject* tracer;
     PyObject* in_a_n_tracer;
@@ -92,6 +120,35 @@ typedef struct {
     unsigned hits;
 } tsl_accelerator;
 
+/* Tape edge segment types (see TapeEdges in loadtracer.py) */
+enum { TONE, PULSES, DATA };
+
+/* Number of data bytes between timestamp checkpoints in a data segment */
+#define CHECKPOINT 256
+
+/* Maximum number of T-states (5 frames) that turbo mode waits for the CPU to
+   return to the same state before giving up on a loop (see
+   LoadTracer._turbo()) */
+#define TURBO_WINDOW 349440
+
+typedef struct {
+    Py_buffer table_buffer;
+    Py_buffer times_buffer;
+    Py_buffer data_buffer;
+    Py_buffer checkpoints_buffer;
+    unsigned long long* table;
+    unsigned long long num_segments;
+    unsigned long long* times;
+    byte* data;
+    unsigned long long* checkpoints;
+    unsigned long long max_index;
+    unsigned long long tape_length;
+    unsigned long long* segment;
+    unsigned long long* byte_segment;
+    unsigned long long byte_index;
+    unsigned long long byte_start;
+} tape_edges;
+
 static const int A = 0;
 static const int F = 1;
 static const int B = 2;
@@ -117,6 +174,8 @@ static const int IFF = 26;
 static const int IM = 27;
 static const int HALT = 28;
 
+enum { W_PC, W_READ, W_WRITE, W_IN, W_OUT, W_REG };
+
 typedef struct {
     const char* name;
     unsigned index;
@@ -725,12 +784,199 @@ static void init_lookup_tables() {
 #endif
 }
 
+static void watch(CSimulatorObject* self, int kind, unsigned addr) {
+    for (int i = 0; i < self->num_watchpoints; i++) {
+        watchpoint* w = &self->watchpoints[i];
+        if (w->kind == kind && w->a <= addr && addr <= w->b) {
+            w->triggered = 1;
+        }
+    }
+}
+
+static int check_watchpoints(CSimulatorObject* self) {
+    // Return the index of the first watchpoint that fires after the current
+    // instruction (or -1 if none fires)
+    unsigned long long* reg = self->registers;
+    int hit = -1;
+    for (int i = 0; i < self->num_watchpoints; i++) {
+        watchpoint* w = &self->watchpoints[i];
+        if (w->kind == W_PC) {
+            w->triggered = w->a <= REG(PC) && REG(PC) <= w->b;
+        } else if (w->kind == W_REG) {
+            unsigned long long v = w->b == 1 ? reg[w->a] : reg[w->a] * 256 + reg[w->a + 1];
+            switch (w->op) {
+                case 0:
+                    w->triggered = v == w->value;
+                    break;
+                case 1:
+                    w->triggered = v != w->value;
+                    break;
+                case 2:
+                    w->triggered = v < w->value;
+                    break;
+                case 3:
+                    w->triggered = v <= w->value;
+                    break;
+                case 4:
+                    w->triggered = v > w->value;
+                    break;
+                default:
+                    w->triggered = v >= w->value;
+                    break;
+            }
+        }
+        if (w->triggered) {
+            w->triggered = 0;
+            w->hits += 1;
+            if (hit < 0 && w->hits >= w->count) {
+                hit = i;
+            }
+        }
+    }
+    self->watch_hit = hit;
+    return hit;
+}
+
 static void out7ffd(CSimulatorObject* self, byte value) {
     self->mem128[0] = self->roms[(value & 0x10) / 0x10];
     self->mem128[3] = self->banks[value & 0x07];
     self->out7ffd = value;
 }
 
+#ifndef CONTENTION
+/*
+ * Return the number of iterations of an idle loop (each lasting 'period'
+ * T-states) that can be executed in one go without passing an interrupt, the
+ * T-state limit or the stop address (or 0 if the loop should be executed
+ * normally).
+ */
+static unsigned long long idle(CSimulatorObject* self, unsigned period, unsigned long long limit, int halt) {
+    unsigned long long* reg = self->registers;
+
+    if (REG(PC) == self->stop) {
+        return 0;
+    }
+    unsigned long long n = limit;
+    if (REG(IFF)) {
+        unsigned r = TIME % self->frame_duration;
+        unsigned long long m;
+        if (r + period < self->int_active) {
+            m = 1 - halt;
+        } else {
+            m = (self->frame_duration - r + period - 1) / period - halt;
+        }
+        if (m == 0) {
+            return 0;
+        }
+        if (n == 0 || m < n) {
+            n = m;
+        }
+    }
+    if (self->max_time) {
+        unsigned long long m = TIME < self->max_time ? (self->max_time - TIME + period - 1) / period : 1;
+        if (n == 0 || m < n) {
+            n = m;
+        }
+    }
+    return n;
+}
+#endif
+
+#ifndef CONTENTION
+/*
+ * Skip as many iterations as possible of a polling loop (from 'target' to the
+ * jump at PC, which takes 'timing' T-states) without passing an interrupt, the
+ * T-state limit or the stop address, provided that the loop body only reads
+ * registers and memory (e.g. 'LD A,(nn); AND A; JR Z,$-4') and the last
+ * iteration left the registers unchanged.
+ */
+static void poll(CSimulatorObject* self, unsigned target, unsigned timing) {
+    unsigned long long* reg = self->registers;
+    byte* mem = self->memory;
+    unsigned pc = REG(PC);
+    unsigned long long t0 = TIME;
+
+    if (self->poll_pc == pc && self->poll_time == t0) {
+        unsigned long long* regs = self->poll_regs;
+        if (memcmp(reg, regs, R * sizeof(*reg)) == 0 && memcmp(reg + R + 1, regs + R + 1, (23 - R) * sizeof(*reg)) == 0) {
+            unsigned period = self->poll_period;
+            long long n = -1;
+            if (REG(IFF)) {
+                unsigned r = t0 % self->frame_duration;
+                n = r >= self->int_active ? (self->frame_duration - 1 - r) / period : 0;
+            }
+            if (self->max_time) {
+                long long m = t0 < self->max_time ? (self->max_time - 1 - t0) / period : 0;
+                if (n < 0 || m < n) {
+                    n = m;
+                }
+            }
+            if (n > 0 && (target > self->stop || self->stop > pc)) {
+                INC_R(self->poll_r_inc * n);
+                INC_T(period * n);
+            }
+            self->poll_time = TIME + period;
+            return;
+        }
+    }
+
+    self->poll_pc = 0x10000;
+    unsigned addr = target;
+    unsigned period = timing;
+    unsigned r_inc = 1;
+    while (addr < pc) {
+        byte op = PEEK(addr);
+        unsigned size = 1;
+        if (op == 0x00) {
+            /* NOP */
+            period += 4;
+        } else if (op == 0x01 || op == 0x11 || op == 0x21 || op == 0x31) {
+            /* LD rr,nn */
+            size = 3;
+            period += 10;
+        } else if ((op & 0xC7) == 0x06 && op != 0x36) {
+            /* LD r,n */
+            size = 2;
+            period += 7;
+        } else if (op == 0x0A || op == 0x1A) {
+            /* LD A,(BC/DE) */
+            period += 7;
+        } else if (op == 0x2A) {
+            /* LD HL,(nn) */
+            size = 3;
+            period += 16;
+        } else if (op == 0x3A) {
+            /* LD A,(nn) */
+            size = 3;
+            period += 13;
+        } else if (op >= 0x40 && op < 0xC0 && (op < 0x70 || op > 0x77)) {
+            /* LD r,r/(HL), ADD A,r/(HL) etc. */
+            period += (op & 7) == 6 ? 7 : 4;
+        } else if ((op & 0xC7) == 0xC6) {
+            /* ADD A,n etc. */
+            size = 2;
+            period += 7;
+        } else if (op == 0xCB && (PEEK(addr + 1) & 0xC0) == 0x40) {
+            /* BIT b,r/(HL) */
+            size = 2;
+            period += (PEEK(addr + 1) & 7) == 6 ? 12 : 8;
+            r_inc++;
+        } else {
+            return;
+        }
+        addr += size;
+        r_inc++;
+    }
+    if (addr == pc) {
+        self->poll_pc = pc;
+        self->poll_time = t0 + period;
+        self->poll_period = period;
+        self->poll_r_inc = r_inc;
+        memcpy(self->poll_regs, reg, 24 * sizeof(*reg));
+    }
+}
+#endif
+
 static int accept_interrupt(CSimulatorObject* self, unsigned prev_pc) {
     unsigned long long* reg = self->registers;
     byte* mem = self->memory;
@@ -1481,6 +1727,21 @@ static void di_ei(CSimulatorObject* self, void* lookup, int args[]) {
 static void djnz(CSimulatorObject* self, void* lookup, int args[]) {
     unsigned long long* reg = self->registers;
 
+#ifndef CONTENTION
+    if (self->fast_idle && REG(B) != 1) {
+        byte* mem = self->memory;
+        if (PEEK((REG(PC) + 1) % 65536) == 0xFE) {
+            unsigned long long n = idle(self, 13, (REG(B) + 255) % 256, 0);
+            if (n) {
+                LD(B, (REG(B) + 256 - n) % 256);
+                INC_R(n);
+                INC_T(13 * n);
+                return;
+            }
+        }
+    }
+#endif
+
     unsigned b = (REG(B) - 1) % 256;
     LD(B, b);
     if (b) {
@@ -1628,6 +1889,18 @@ static void exx(CSimulatorObject* self, void* lookup, int args[]) {
 static void halt(CSimulatorObject* self, void* lookup, int args[]) {
     unsigned long long* reg = self->registers;
 
+#ifndef CONTENTION
+    if (self->fast_idle) {
+        unsigned long long n = idle(self, 4, 0, 1);
+        if (n) {
+            INC_R(n);
+            INC_T(4 * n);
+            LD(HALT, 1);
+            return;
+        }
+    }
+#endif
+
 #ifdef CONTENTION
     CONTEND {
         CPATTERN(2, (REG(PC) + REG(HALT)) % 65536, 4);
@@ -1676,6 +1949,10 @@ static void in_a(CSimulatorObject* self, void* lookup, int args[]) {
     }
 #endif
     unsigned value = 255;
+    if (self->watch_kinds & (1 << W_IN)) {
+        byte* mem = self->memory;
+        watch(self, W_IN, PEEK((REG(PC) + 1) % 65536) + 256 * REG(A));
+    }
     if (self->in_a_n_tracer) {
         byte* mem = self->memory;
         unsigned port = PEEK((REG(PC) + 1) % 65536) + 256 * REG(A);
@@ -1707,6 +1984,7 @@ static void in_c(CSimulatorObject* self, void* lookup, int args[]) {
     }
 #endif
     unsigned value = 255;
+    WATCH(W_IN, REG(C) + 256 * REG(B));
     if (self->in_r_c_tracer) {
         unsigned port = REG(C) + 256 * REG(B);
         PyObject* args = Py_BuildValue("(I)", port);
@@ -1772,6 +2050,7 @@ static void ini(CSimulatorObject* self, void* lookup, int args[]) {
     unsigned b = REG(B);
     unsigned c = REG(C);
     byte value = 191;
+    WATCH(W_IN, c + 256 * b);
     if (self->ini_tracer) {
         unsigned port = c + 256 * b;
         PyObject* args = Py_BuildValue("(I)", port);
@@ -1843,6 +2122,24 @@ static void jp(CSimulatorObject* self, void* lookup, int args[]) {
     unsigned c_val = args[1];
     unsigned long long* reg = self->registers;
 
+#ifndef CONTENTION
+    if (self->fast_idle && (REG(F) & c_and) == c_val) {
+        byte* mem = self->memory;
+        unsigned pc = REG(PC);
+        unsigned addr = PEEK((pc + 1) % 65536) + 256 * PEEK((pc + 2) % 65536);
+        if (addr == pc) {
+            unsigned long long n = idle(self, 10, 0, 0);
+            if (n) {
+                INC_R(n);
+                INC_T(10 * n);
+                return;
+            }
+        } else if (addr < pc && addr + 16 >= pc) {
+            poll(self, addr, 10);
+        }
+    }
+#endif
+
 #ifdef CONTENTION
     CONTEND {
         unsigned pc = REG(PC);
@@ -1890,6 +2187,24 @@ static void jr(CSimulatorObject* self, void* lookup, int args[]) {
     unsigned c_val = args[1];
     unsigned long long* reg = self->registers;
 
+#ifndef CONTENTION
+    if (self->fast_idle && (REG(F) & c_and) == c_val) {
+        byte* mem = self->memory;
+        unsigned pc = REG(PC);
+        byte offset = PEEK((pc + 1) % 65536);
+        if (offset == 0xFE) {
+            unsigned long long n = idle(self, 12, 0, 0);
+            if (n) {
+                INC_R(n);
+                INC_T(12 * n);
+                return;
+            }
+        } else if (offset >= 0xEE && offset < 0xFE && pc + offset >= 254) {
+            poll(self, pc + offset - 254, 12);
+        }
+    }
+#endif
+
     if ((REG(F) & c_and) == c_val) {
 #ifdef CONTENTION
         CONTEND {
@@ -2422,6 +2737,7 @@ static void out_a(CSimulatorObject* self, void* lookup, int args[]) {
 #endif
     byte value = REG(A);
     OUT(port, value);
+    WATCH(W_OUT, port);
     if (self->out_tracer) {
         PyObject* m_args = Py_BuildValue("(IB)", port, value);
         PyObject* rv = PyObject_Call(self->out_tracer, m_args, NULL);
@@ -2452,6 +2768,7 @@ static void out_c(CSimulatorObject* self, void* lookup, int args[]) {
 #endif
     byte value = r >= 0 ? REG(r) : 0;
     OUT(port, value);
+    WATCH(W_OUT, port);
     if (self->out_tracer) {
         PyObject* m_args = Py_BuildValue("(IB)", port, value);
         PyObject* rv = PyObject_Call(self->out_tracer, m_args, NULL);
@@ -2479,6 +2796,7 @@ static void outi(CSimulatorObject* self, void* lookup, int args[]) {
     unsigned port = REG(C) + 256 * b;
     byte value = PEEK(hl);
     OUT(port, value);
+    WATCH(W_OUT, port);
     if (self->out_tracer) {
         PyObject* m_args = Py_BuildValue("(IB)", port, value);
         PyObject* rv = PyObject_Call(self->out_tracer, m_args, NULL);
@@ -4759,6 +5077,7 @@ static OpcodeFunction after_FDCB[256] = {
 
 static int CSimulator_traverse(CSimulatorObject* self, visitproc visit, void *arg) {
     Py_VISIT(self->memory_obj);
+    Py_VISIT(self->dirty_obj);
     Py_VISIT(self->registers_obj);
     Py_VISIT(self->tracer);
     Py_VISIT(self->in_a_n_tracer);
@@ -4770,6 +5089,7 @@ static int CSimulator_traverse(CSimulatorObject* self, visitproc visit, void *ar
 
 static int CSimulator_clear(CSimulatorObject* self) {
     Py_CLEAR(self->memory_obj);
+    Py_CLEAR(self->dirty_obj);
     Py_CLEAR(self->registers_obj);
     Py_CLEAR(self->tracer);
     Py_CLEAR(self->in_a_n_tracer);
@@ -4780,9 +5100,10 @@ static int CSimulator_clear(CSimulatorObject* self) {
 }
 
 static void CSimulator_dealloc(CSimulatorObject* self) {
-    for (int i = 0; i < 11; i++) {
+    for (int i = 0; i < 12; i++) {
         PyBuffer_Release(&self->buffers[i]);
     }
+    if (self->watchpoints) free(self->watchpoints);
     PyObject_GC_UnTrack(self);
     CSimulator_clear(self);
     Py_TYPE(self)->tp_free((PyObject *) self);
@@ -4811,6 +5132,7 @@ static int set_memory(CSimulatorObject* self, PyObject* source) {
     PyObject* roms = NULL;
     PyObject* banks = NULL;
     PyObject* o7ffd = NULL;
+    PyObject* dirty = NULL;
 
     Py_XSETREF(self->memory_obj, source);
     Py_ssize_t mem_size = PyObject_Size(source);
@@ -4872,6 +5194,19 @@ static int set_memory(CSimulatorObject* self, PyObject* source) {
             goto done;
         }
 
+        /* The memory object's dirty map (if any): one flag per 256-byte block of each RAM bank */
+        dirty = PyObject_GetAttrString(source, "dirty");
+        if (dirty == NULL) {
+            PyErr_Clear();
+        } else if (dirty != Py_None) {
+            mem_ok = set_memory_buffer(dirty, 512, &self->buffers[11], &self->dirty, PyBUF_WRITABLE);
+            if (mem_ok == -1) {
+                goto done;
+            }
+            Py_INCREF(dirty);
+            Py_XSETREF(self->dirty_obj, dirty);
+        }
+
         self->mem128[1] = self->banks[5];
         self->mem128[2] = self->banks[2];
         out7ffd(self, PyLong_AsLong(o7ffd) & 0xFF);
@@ -4890,6 +5225,7 @@ done:
     Py_XDECREF(roms);
     Py_XDECREF(banks);
     Py_XDECREF(o7ffd);
+    Py_XDECREF(dirty);
     return mem_ok;
 }
 
@@ -4922,9 +5258,46 @@ done:
     return rv;
 }
 
+static int set_watchpoints(CSimulatorObject* self, PyObject* watchpoints) {
+    if (watchpoints == Py_None) {
+        return 0;
+    }
+    PyObject* seq = PySequence_Fast(watchpoints, "value of 'watchpoints' must be a sequence");
+    if (seq == NULL) {
+        return -1;
+    }
+    Py_ssize_t size = PySequence_Fast_GET_SIZE(seq);
+    if (size > 0) {
+        self->watchpoints = calloc(size, sizeof(watchpoint));
+        if (self->watchpoints == NULL) {
+            Py_DECREF(seq);
+            PyErr_SetString(PyExc_MemoryError, "Failed to allocate memory for watchpoints");
+            return -1;
+        }
+    }
+    for (Py_ssize_t i = 0; i < size; i++) {
+        watchpoint* w = &self->watchpoints[i];
+        if (!PyArg_ParseTuple(PySequence_Fast_GET_ITEM(seq, i), "iIIiKK", &w->kind, &w->a, &w->b, &w->op, &w->value, &w->count)) {
+            Py_DECREF(seq);
+            return -1;
+        }
+        self->watch_kinds |= 1 << w->kind;
+    }
+    self->num_watchpoints = size;
+    Py_DECREF(seq);
+    return 0;
+}
+
 static int configure(CSimulatorObject* self, PyObject* config) {
     self->frame_duration = 69888;
     self->int_active = 32;
+    self->fast_idle = 0;
+    self->stop = 0x10000;
+    self->max_time = 0;
+#ifndef CONTENTION
+    self->poll_pc = 0x10000;
+#endif
+    self->watch_hit = -1;
 
     PyObject *key, *value;
     Py_ssize_t pos;
@@ -4952,10 +5325,33 @@ static int configure(CSimulatorObject* self, PyObject* config) {
                     return -1;
                 }
                 self->int_active = PyLong_AsLong(value);
+            } else if (PyUnicode_CompareWithASCIIString(key, "fast_idle") == 0) {
+                self->fast_idle = PyObject_IsTrue(value);
+            } else if (PyUnicode_CompareWithASCIIString(key, "dirty") == 0) {
+                if (PyObject_IsTrue(value) && self->dirty == NULL) {
+                    /* One flag per 256-byte block of 48K memory or of each 128K RAM bank */
+                    Py_ssize_t size = self->memory ? 256 : 512;
+                    Py_XSETREF(self->dirty_obj, PyByteArray_FromStringAndSize(NULL, size));
+                    if (self->dirty_obj == NULL) {
+                        return -1;
+                    }
+                    self->dirty = (byte*)PyByteArray_AS_STRING(self->dirty_obj);
+                    memset(self->dirty, 0, size);
+                }
+            } else if (PyUnicode_CompareWithASCIIString(key, "watchpoints") == 0) {
+                if (set_watchpoints(self, value) == -1) {
+                    return -1;
+                }
             }
         }
     }
 
+    if (self->watch_kinds) {
+        // Watchpoints are checked after every instruction, so no idle loop
+        // iterations may be skipped
+        self->fast_idle = 0;
+    }
+
     return 0;
 }
 
@@ -5134,6 +5530,11 @@ static PyObject* CSimulator_run(CSimulatorObject* self, PyObject* args, PyObject
     if (start < 0x10000) {
         LD(PC, start);
     }
+    self->stop = stop > 0xFFFF ? REG(PC) : stop;
+    self->max_time = 0;
+#ifndef CONTENTION
+    self->poll_pc = 0x10000;
+#endif
 
     while (1) {
         unsigned pc = REG(PC);
@@ -5176,6 +5577,10 @@ static PyObject* CSimulator_run(CSimulatorObject* self, PyObject* args, PyObject
             accept_interrupt(self, pc);
         }
 
+        if (self->watch_kinds && check_watchpoints(self) >= 0) {
+            return PyLong_FromLong(self->watch_hit);
+        }
+
         if (stop > 0xFFFF || REG(PC) == stop) {
             break;
         }
@@ -5337,7 +5742,7 @@ static PyObject* CSimulator_exec_frame(CSimulatorObject* self, PyObject* args, P
         }
     }
 
-    return PyLong_FromLong(pc);
+    return Py_BuildValue("(Ii)", pc, fetch_count);
 }
 
 static PyObject* CSimulator_accept_interrupt(CSimulatorObject* self, PyObject* args, PyObject* kwds) {
@@ -5356,8 +5761,22 @@ static PyObject* CSimulator_accept_interrupt(CSimulatorObject* self, PyObject* a
     Py_RETURN_FALSE;
 }
 
+static PyObject* CSimulator_out7ffd(CSimulatorObject* self, PyObject* args, PyObject* kwds) {
+    static char* kwlist[] = {"", NULL};
+    unsigned value = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "I", kwlist, &value)) {
+        return NULL;
+    }
+
+    if (self->memory == NULL) {
+        out7ffd(self, value & 0xFF);
+    }
+    Py_RETURN_NONE;
+}
+
 static PyObject* CSimulator_trace(CSimulatorObject* self, PyObject* args, PyObject* kwds) {
-    static char* kwlist[] = {"", "", "", "", "", "", "", NULL};
+    static char* kwlist[] = {"", "", "", "", "", "", "", "", "", NULL};
     PyObject* start_obj;
     PyObject* stop_obj;
     unsigned long long max_operations;
@@ -5365,11 +5784,36 @@ static PyObject* CSimulator_trace(CSimulatorObject* self, PyObject* args, PyObje
     int interrupts;
     PyObject* disassemble;
     PyObject* trace;
+    PyObject* counts_obj = Py_None;
+    PyObject* times_obj = Py_None;
+    Py_buffer counts_buffer;
+    Py_buffer times_buffer;
+    unsigned long long* counts = NULL;
+    unsigned long long* times = NULL;
+    int profile = 0;
+    PyObject* rv = NULL;
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OOKKiOO", kwlist, &start_obj, &stop_obj, &max_operations, &max_time, &interrupts, &disassemble, &trace)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OOKKiOO|OO", kwlist, &start_obj, &stop_obj, &max_operations, &max_time, &interrupts, &disassemble, &trace, &counts_obj, &times_obj)) {
         return NULL;
     }
 
+    if (counts_obj != Py_None && times_obj != Py_None) {
+        if (PyObject_GetBuffer(counts_obj, &counts_buffer, PyBUF_WRITABLE | PyBUF_FORMAT) == -1) {
+            return NULL;
+        }
+        if (PyObject_GetBuffer(times_obj, &times_buffer, PyBUF_WRITABLE | PyBUF_FORMAT) == -1) {
+            PyBuffer_Release(&counts_buffer);
+            return NULL;
+        }
+        profile = 1;
+        if (counts_buffer.len != 65536 * 8 || times_buffer.len != 65536 * 8 || strcmp(counts_buffer.format, "Q") || strcmp(times_buffer.format, "Q")) {
+            PyErr_SetString(PyExc_ValueError, "Profile arrays must have 65536 elements of type 'Q'");
+            goto done;
+        }
+        counts = counts_buffer.buf;
+        times = times_buffer.buf;
+    }
+
     unsigned start = PyLong_Check(start_obj) ? PyLong_AsLong(start_obj) : 0x10000;
     unsigned stop = PyLong_Check(stop_obj) ? PyLong_AsLong(stop_obj) : 0x10000;
     unsigned long long* reg = self->registers;
@@ -5380,6 +5824,11 @@ static PyObject* CSimulator_trace(CSimulatorObject* self, PyObject* args, PyObje
     if (start < 0x10000) {
         LD(PC, start);
     }
+    self->stop = stop;
+    self->max_time = max_time;
+#ifndef CONTENTION
+    self->poll_pc = 0x10000;
+#endif
 
     while (1) {
         PyObject* i = NULL;
@@ -5420,25 +5869,30 @@ static PyObject* CSimulator_trace(CSimulatorObject* self, PyObject* args, PyObje
             i = PyObject_CallObject(disassemble, args);
             Py_XDECREF(args);
             if (i == NULL) {
-                return NULL;
+                goto done;
             }
         }
 
         opcode_func->func(self, opcode_func->lookup, opcode_func->args);
         if (PyErr_Occurred()) {
-            return NULL;
+            goto done;
+        }
+
+        if (counts) {
+            counts[pc] += 1;
+            times[pc] += TIME - t0;
         }
 
         if (trace == Py_None) {
             CHECK_SIGNALS;
         } else {
             PyObject* args = Py_BuildValue("(INK)", pc, i, t0);
-            PyObject* rv = PyObject_CallObject(trace, args);
+            PyObject* trv = PyObject_CallObject(trace, args);
             Py_XDECREF(args);
-            if (rv == NULL) {
-                return NULL;
+            if (trv == NULL) {
+                goto done;
             }
-            Py_DECREF(rv);
+            Py_DECREF(trv);
         }
 
         if (interrupts && REG(IFF) && (TIME % frame_duration) < int_active) {
@@ -5447,18 +5901,30 @@ static PyObject* CSimulator_trace(CSimulatorObject* self, PyObject* args, PyObje
 
         operations += 1;
 
+        if (self->watch_kinds && check_watchpoints(self) >= 0) {
+            rv = Py_BuildValue("(IL)", 4, operations);
+            break;
+        }
         if (max_operations > 0 && operations >= max_operations) {
-            return Py_BuildValue("(IL)", 1, operations);
+            rv = Py_BuildValue("(IL)", 1, operations);
+            break;
         }
         if (max_time > 0 && TIME >= max_time) {
-            return Py_BuildValue("(IL)", 2, operations);
+            rv = Py_BuildValue("(IL)", 2, operations);
+            break;
         }
         if (REG(PC) == stop) {
-            return Py_BuildValue("(IL)", 3, operations);
+            rv = Py_BuildValue("(IL)", 3, operations);
+            break;
         }
     }
 
-    Py_RETURN_NONE;
+done:
+    if (profile) {
+        PyBuffer_Release(&counts_buffer);
+        PyBuffer_Release(&times_buffer);
+    }
+    return rv;
 }
 
 static PyObject* CSimulator_press_keys(CSimulatorObject* self, PyObject* args, PyObject* kwds) {
@@ -5567,7 +6033,226 @@ static PyObject* CSimulator_press_keys(CSimulatorObject* self, PyObject* args, P
     Py_RETURN_NONE;
 }
 
-static int advance_tape(PyObject* tracer, unsigned long long* tracer_state, unsigned long long* edges, unsigned long long max_index, unsigned long long tstates, PyObject* print_progress, unsigned* progress) {
+static unsigned popcount(unsigned v) {
+    v = v - ((v >> 1) & 0x55);
+    v = (v & 0x33) + ((v >> 2) & 0x33);
+    return (v + (v >> 4)) & 0x0F;
+}
+
+static int get_tape_edges(PyObject* edges, tape_edges* te) {
+    Py_buffer* buffers[] = {&te->table_buffer, &te->times_buffer, &te->data_buffer, &te->checkpoints_buffer};
+    const char* names[] = {"table", "times", "data", "checkpoints"};
+    for (int i = 0; i < 4; i++) {
+        buffers[i]->buf = NULL;
+    }
+    for (int i = 0; i < 4; i++) {
+        PyObject* obj = PyObject_GetAttrString(edges, names[i]);
+        if (obj == NULL) {
+            return -1;
+        }
+        int rv = PyObject_GetBuffer(obj, buffers[i], PyBUF_SIMPLE);
+        Py_DECREF(obj);
+        if (rv == -1) {
+            buffers[i]->buf = NULL;
+            return -1;
+        }
+    }
+    te->table = te->table_buffer.buf;
+    te->num_segments = te->table_buffer.len / (8 * sizeof(unsigned long long));
+    te->times = te->times_buffer.buf;
+    te->data = te->data_buffer.buf;
+    te->checkpoints = te->checkpoints_buffer.buf;
+    te->max_index = te->table[(te->num_segments - 1) * 8 + 1];
+    te->segment = te->table;
+    te->byte_segment = NULL;
+    return 0;
+}
+
+static void release_tape_edges(tape_edges* te) {
+    Py_buffer* buffers[] = {&te->table_buffer, &te->times_buffer, &te->data_buffer, &te->checkpoints_buffer};
+    for (int i = 0; i < 4; i++) {
+        if (buffers[i]->buf) {
+            PyBuffer_Release(buffers[i]);
+        }
+    }
+}
+
+static unsigned long long* find_segment(tape_edges* te, unsigned long long index) {
+    unsigned long long* seg = te->segment;
+    if (index < seg[0] || index > seg[1]) {
+        unsigned long long lo = 0;
+        unsigned long long hi = te->num_segments;
+        while (hi - lo > 1) {
+            unsigned long long mid = (lo + hi) / 2;
+            if (te->table[mid * 8] <= index) {
+                lo = mid;
+            } else {
+                hi = mid;
+            }
+        }
+        seg = te->segment = te->table + lo * 8;
+    }
+    return seg;
+}
+
+static unsigned long long edge_time(tape_edges* te, unsigned long long index) {
+    unsigned long long* seg = find_segment(te, index);
+    unsigned long long n = index - seg[0];
+    unsigned long long t0 = seg[2];
+    if (seg[3] == TONE) {
+        return t0 + (n + 1) * seg[4];
+    }
+    if (seg[3] == PULSES) {
+        return te->times[seg[4] + n];
+    }
+
+    /* Data: find the timestamp of the edge before the first bit of byte 'm' */
+    unsigned long long bit = n / 2;
+    unsigned long long m = bit / 8;
+    unsigned k = bit % 8;
+    byte* data = te->data + seg[4];
+    unsigned long long zero = seg[6];
+    unsigned long long one = seg[7];
+    unsigned long long m0, tstates;
+    if (te->byte_segment == seg && te->byte_index <= m && m < te->byte_index + CHECKPOINT) {
+        m0 = te->byte_index;
+        tstates = te->byte_start;
+    } else {
+        m0 = m - m % CHECKPOINT;
+        tstates = te->checkpoints[seg[5] + m / CHECKPOINT];
+    }
+    for (; m0 < m; m0++) {
+        tstates += 2 * (8 * zero + popcount(data[m0]) * (one - zero));
+    }
+    te->byte_segment = seg;
+    te->byte_index = m;
+    te->byte_start = tstates;
+
+    unsigned value = data[m];
+    tstates += 2 * (k * zero + popcount(value >> (8 - k)) * (one - zero));
+    if (value & (0x80 >> k)) {
+        return tstates + (n % 2 + 1) * one;
+    }
+    return tstates + (n % 2 + 1) * zero;
+}
+
+static unsigned long long find_edge(tape_edges* te, unsigned long long tstates, unsigned long long index) {
+    if (index >= te->max_index || edge_time(te, index + 1) >= tstates) {
+        return index;
+    }
+    /* Usually only one or two edges have passed, so step through the next
+       few (which are cheap to find, being in the same segment and byte as the
+       last one) before resorting to a binary search */
+    for (int i = 0; i < 8; i++) {
+        index++;
+        if (index >= te->max_index || edge_time(te, index + 1) >= tstates) {
+            return index;
+        }
+    }
+    /* Binary search for the last edge before 'tstates' */
+    unsigned long long lo = index + 1;
+    unsigned long long hi = te->max_index + 1;
+    while (hi - lo > 1) {
+        unsigned long long mid = (lo + hi) / 2;
+        if (edge_time(te, mid) < tstates) {
+            lo = mid;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+typedef struct {
+    unsigned pc;
+    unsigned long long expires;
+    unsigned long long registers[29];
+    unsigned long long tstates;
+    unsigned long long r;
+    unsigned long long index;
+    byte* ram;
+    byte out7ffd;
+} turbo_snapshot;
+
+static void copy_ram(CSimulatorObject* self, byte* ram) {
+    if (self->memory) {
+        memcpy(ram, self->memory + 0x4000, 0xC000);
+    } else {
+        for (int i = 0; i < 8; i++) {
+            memcpy(ram + i * 0x4000, self->banks[i], 0x4000);
+        }
+    }
+}
+
+static int ram_changed(CSimulatorObject* self, turbo_snapshot* snapshot) {
+    if (self->memory) {
+        return memcmp(snapshot->ram, self->memory + 0x4000, 0xC000) != 0;
+    }
+    if (self->out7ffd != snapshot->out7ffd) {
+        return 1;
+    }
+    for (int i = 0; i < 8; i++) {
+        if (memcmp(snapshot->ram + i * 0x4000, self->banks[i], 0x4000)) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+static void take_turbo_snapshot(CSimulatorObject* self, turbo_snapshot* snapshot, unsigned long long* reg, unsigned long long* tracer_state) {
+    snapshot->pc = reg[PC];
+    snapshot->expires = reg[T] + TURBO_WINDOW;
+    memcpy(snapshot->registers, reg, sizeof(snapshot->registers));
+    snapshot->tstates = reg[T];
+    snapshot->r = reg[R];
+    snapshot->index = tracer_state[1];
+    snapshot->out7ffd = self->out7ffd;
+    copy_ram(self, snapshot->ram);
+}
+
+static int turbo(CSimulatorObject* self, turbo_snapshot* snapshot, unsigned long long* reg, unsigned long long* tracer_state, tape_edges* edges) {
+    for (int i = 0; i < 29; i++) {
+        if (i != R && i != T && reg[i] != snapshot->registers[i]) {
+            return 0;
+        }
+    }
+    if (ram_changed(self, snapshot)) {
+        /* The loop writes to memory, so its iterations cannot be skipped;
+           ignore it until the snapshot expires */
+        snapshot->pc = 0x10000;
+        return 0;
+    }
+    unsigned long long tstates = reg[T];
+    unsigned long long index = tracer_state[1];
+    unsigned long long period = tstates - snapshot->tstates;
+    unsigned long long num_edges = index - snapshot->index;
+    unsigned long long count = 0;
+    if (num_edges == 0) {
+        if (index < edges->max_index && tracer_state[0] >= tstates + 2 * period) {
+            count = (tracer_state[0] - tstates) / period - 1;
+        }
+    } else if (num_edges % 2 == 0) {
+        unsigned long long* seg = find_segment(edges, snapshot->index + 1);
+        if (seg[3] == TONE && period == num_edges * seg[4] && seg[1] >= index + 1 + 2 * num_edges) {
+            count = (seg[1] - index - 1) / num_edges - 1;
+        }
+    }
+    if (count == 0) {
+        return 0;
+    }
+    unsigned long long r = reg[R];
+    reg[R] = (r & 0x80) + ((r + count * (r - snapshot->r)) & 0x7F);
+    reg[T] = tstates + count * period;
+    tracer_state[14] += count * period;
+    if (num_edges) {
+        tracer_state[1] = index + count * num_edges;
+        tracer_state[0] = edge_time(edges, tracer_state[1] + 1);
+    }
+    take_turbo_snapshot(self, snapshot, reg, tracer_state);
+    return 1;
+}
+
+static int advance_tape(PyObject* tracer, unsigned long long* tracer_state, tape_edges* edges, unsigned long long tstates, PyObject* print_progress, unsigned* progress) {
     unsigned long long tape_running = tracer_state[4];
     if (!tape_running) {
         return 0;
@@ -5578,17 +6263,12 @@ static int advance_tape(PyObject* tracer, unsigned long long* tracer_state, unsi
         return 0;
     }
 
-    unsigned long long index = tracer_state[1];
-    while (index < max_index) {
-        if (edges[index + 1] >= tstates) {
-            break;
-        }
-        index += 1;
-    }
+    unsigned long long max_index = edges->max_index;
+    unsigned long long index = find_edge(edges, tstates, tracer_state[1]);
     tracer_state[1] = index;
 
     unsigned long long block_max_index = tracer_state[3];
-    unsigned long long edge = edges[index];
+    unsigned long long edge = edge_time(edges, index);
     if (index == max_index) {
         /* Allow 1ms for the final edge on the tape to be read */
         if (tstates - edge > 3500) {
@@ -5606,9 +6286,9 @@ static int advance_tape(PyObject* tracer, unsigned long long* tracer_state, unsi
         }
         Py_DECREF(rv);
     } else {
-        tracer_state[0] = edges[index + 1];
+        tracer_state[0] = edge_time(edges, index + 1);
         if (index < block_max_index) {
-            unsigned p = (unsigned)(edge / (edges[max_index] / 1000));
+            unsigned p = (unsigned)(edge / edges->tape_length);
             if (p > *progress) {
                 PyObject* args = Py_BuildValue("(I)", p);
                 PyObject* rv = PyObject_CallObject(print_progress, args);
@@ -5722,6 +6402,7 @@ static void dec_b(CSimulatorObject* self, void* lookup, int args[]) {
                 }
             }
             if (match) {
+                state[11]++;
                 if ((REG(C) & acc->ear_mask) == ((state[1] - acc->polarity) & 1) * acc->ear_mask) {
                     int delta = (int)(state[0] - TIME - acc->in_time);
                     if (delta > 0) {
@@ -5750,6 +6431,7 @@ static void dec_b(CSimulatorObject* self, void* lookup, int args[]) {
                 return;
             }
         }
+        state[12]++;
     }
 
     byte* values = DEC[REG(F) & 1][b];
@@ -5783,6 +6465,7 @@ static void inc_b(CSimulatorObject* self, void* lookup, int args[]) {
                 }
             }
             if (match) {
+                state[11]++;
                 if ((REG(C) & acc->ear_mask) == ((state[1] - acc->polarity) & 1) * acc->ear_mask) {
                     int delta = (int)(state[0] - TIME - acc->in_time);
                     if (delta > 0) {
@@ -5811,6 +6494,7 @@ static void inc_b(CSimulatorObject* self, void* lookup, int args[]) {
                 return;
             }
         }
+        state[12]++;
     }
 
     byte* values = INC[REG(F) & 1][b];
@@ -5859,6 +6543,7 @@ static void list_accelerators(CSimulatorObject* self, void* lookup, int args[])
                 return;
             }
         }
+        state[12]++;
     }
 
     /* Increment the miss count */
@@ -5872,6 +6557,19 @@ static void list_accelerators(CSimulatorObject* self, void* lookup, int args[])
     LD(PC, pc1);
 }
 
+/* Add a value to one of the tracer's accelerator statistics */
+static int add_to_tracer_stat(PyObject* tracer, const char* name, unsigned value) {
+    PyObject* prev = PyObject_GetAttrString(tracer, name);
+    if (prev == NULL) {
+        return -1;
+    }
+    PyObject* total = PyLong_FromUnsignedLong(PyLong_AsUnsignedLong(prev) + value);
+    Py_DECREF(prev);
+    int rv = total ? PyObject_SetAttrString(tracer, name, total) : -1;
+    Py_XDECREF(total);
+    return rv;
+}
+
 static int get_tsl_accelerators(PyObject* accelerators, tsl_accelerator* accs, unsigned long long* tracer_state) {
     PyObject* iter = PyObject_GetIter(accelerators);
     if (iter == NULL) {
@@ -5961,14 +6659,16 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
 
     int ok = 1;
 
-    Py_buffer edges_buffer;
+    tape_edges edges;
     PyObject* e = ok ? PyObject_GetAttrString(self->tracer, "edges") : NULL;
-    if (e == NULL || PyObject_GetBuffer(e, &edges_buffer, PyBUF_SIMPLE) == -1) {
+    if (e == NULL || get_tape_edges(e, &edges) == -1) {
         ok = 0;
     }
     Py_XDECREF(e);
-    unsigned long long* edges = edges_buffer.buf;
-    unsigned long long max_index = edges ? (edges_buffer.len / edges_buffer.itemsize) - 1 : 0;
+    unsigned long long max_index = ok ? edges.max_index : 0;
+    if (ok) {
+        edges.tape_length = edge_time(&edges, max_index) / 1000;
+    }
 
     Py_buffer ts_buffer;
     PyObject* ts = ok ? PyObject_GetAttrString(self->tracer, "state") : NULL;
@@ -6050,6 +6750,14 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
     unsigned pc = REG(PC);
     unsigned stop = stop_obj == Py_None ? 0x10000 : PyLong_AsLong(stop_obj);
     PyObject* rv = NULL;
+    turbo_snapshot snapshot = {0x10000, 0};
+    if (ok && tracer_state[13]) {
+        snapshot.ram = malloc(0x20000);
+        if (snapshot.ram == NULL) {
+            PyErr_NoMemory();
+            ok = 0;
+        }
+    }
 
     while (ok) {
         PyObject* i = NULL;
@@ -6097,6 +6805,9 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
         if (PyErr_Occurred()) {
             break;
         }
+        if (tracer_state[15]) {
+            tracer_state[10]++;
+        }
 
         if (trace != Py_None) {
             PyObject* args = Py_BuildValue("(INK)", pc, i, t0);
@@ -6113,11 +6824,22 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
         }
 
         unsigned long long tstates = TIME;
-        if (advance_tape(self->tracer, tracer_state, edges, max_index, tstates, print_progress, &progress) == -1) {
+        if (advance_tape(self->tracer, tracer_state, &edges, tstates, print_progress, &progress) == -1) {
             break;
         }
 
         pc = REG(PC);
+
+        if (tracer_state[13] && tracer_state[4] && !REG(IFF)) {
+            if (pc == snapshot.pc) {
+                if (turbo(self, &snapshot, reg, tracer_state, &edges)) {
+                    tstates = TIME;
+                }
+            } else if (tstates > snapshot.expires) {
+                take_turbo_snapshot(self, &snapshot, reg, tracer_state);
+            }
+        }
+
         unsigned long long end_of_tape = tracer_state[2];
         if (pc == stop && (end_of_tape || !finish_tape)) {
             rv = PyLong_FromLong(0);
@@ -6148,8 +6870,7 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
                     /* Otherwise continue to play the tape until this block's
                        'pause' period (if any) has elapsed */
                     tracer_state[4] = 1;
-                    tracer_state[0] = edges[block_max_index];
-                    TIME = edges[block_max_index];
+                    tracer_state[0] = TIME = edge_time(&edges, block_max_index);
                 }
             }
             pc = REG(PC);
@@ -6177,6 +6898,13 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
                 break;
             }
         }
+
+        if (tracer_state[9]) {
+            /* An accelerator was learned, so let the tracer resume the
+               simulation with it */
+            rv = PyLong_FromLong(5);
+            break;
+        }
     }
 
 #ifndef CONTENTION
@@ -6187,7 +6915,10 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
             for (int i = 0; i < num_accs; i++) {
                 tsl_accelerator* acc = &accs[i];
                 if (acc && acc->hits) {
-                    PyObject* hits = PyLong_FromLong(acc->hits);
+                    /* Add to any hits recorded by a previous call */
+                    PyObject* prev_hits = PyDict_GetItem(acc_usage, acc->name);
+                    unsigned long total = acc->hits + (prev_hits ? PyLong_AsUnsignedLong(prev_hits) : 0);
+                    PyObject* hits = PyLong_FromUnsignedLong(total);
                     ok = hits && PyDict_SetItem(acc_usage, acc->name, hits) == 0;
                     Py_XDECREF(hits);
                     if (!ok) {
@@ -6197,23 +6928,13 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
             }
             Py_DECREF(acc_usage);
         }
-        PyObject* dec_a_jr_hits = PyLong_FromLong(dec_a_accelerator.args[0]);
-        PyObject* dec_a_jp_hits = PyLong_FromLong(dec_a_accelerator.args[1]);
-        PyObject* dec_a_misses = PyLong_FromLong(dec_a_accelerator.args[2]);
-        PyObject* inc_b_misses = PyLong_FromLong(inc_b_accelerator.args[2]);
-        PyObject* dec_b_misses = PyLong_FromLong(dec_b_accelerator.args[2]);
-        if (PyObject_SetAttrString(self->tracer, "dec_a_jr_hits", dec_a_jr_hits) == -1 ||
-            PyObject_SetAttrString(self->tracer, "dec_a_jp_hits", dec_a_jp_hits) == -1 ||
-            PyObject_SetAttrString(self->tracer, "dec_a_misses", dec_a_misses) == -1 ||
-            PyObject_SetAttrString(self->tracer, "inc_b_misses", inc_b_misses) == -1 ||
-            PyObject_SetAttrString(self->tracer, "dec_b_misses", dec_b_misses) == -1) {
+        if (add_to_tracer_stat(self->tracer, "dec_a_jr_hits", dec_a_accelerator.args[0]) == -1 ||
+            add_to_tracer_stat(self->tracer, "dec_a_jp_hits", dec_a_accelerator.args[1]) == -1 ||
+            add_to_tracer_stat(self->tracer, "dec_a_misses", dec_a_accelerator.args[2]) == -1 ||
+            add_to_tracer_stat(self->tracer, "inc_b_misses", inc_b_accelerator.args[2]) == -1 ||
+            add_to_tracer_stat(self->tracer, "dec_b_misses", dec_b_accelerator.args[2]) == -1) {
             ok = 0;
         }
-        Py_XDECREF(dec_a_jr_hits);
-        Py_XDECREF(dec_a_jp_hits);
-        Py_XDECREF(dec_a_misses);
-        Py_XDECREF(inc_b_misses);
-        Py_XDECREF(dec_b_misses);
     }
     if (accs) {
         for (int i = 0; i < num_accs; i++) {
@@ -6229,7 +6950,8 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
     if (dec_b_accs) free(dec_b_accs);
     Py_XDECREF(accelerators);
 #endif
-    if (edges) PyBuffer_Release(&edges_buffer);
+    if (snapshot.ram) free(snapshot.ram);
+    if (e) release_tape_edges(&edges);
     if (tracer_state) PyBuffer_Release(&ts_buffer);
     Py_XDECREF(fast_load_method);
     if (!ok) {
@@ -6241,8 +6963,10 @@ static PyObject* CSimulator_load(CSimulatorObject* self, PyObject* args, PyObjec
 
 static PyMemberDef CSimulator_members[] = {
     {"memory", T_OBJECT_EX, offsetof(CSimulatorObject, memory_obj), 0, "memory"},
+    {"dirty", T_OBJECT, offsetof(CSimulatorObject, dirty_obj), READONLY, "dirty"},
     {"registers", T_OBJECT_EX, offsetof(CSimulatorObject, registers_obj), 0, "registers"},
     {"tracer", T_OBJECT_EX, offsetof(CSimulatorObject, tracer), 0, "tracer"},
+    {"watch_hit", T_INT, offsetof(CSimulatorObject, watch_hit), READONLY, "watch_hit"},
     {NULL}  /* Sentinel */
 };
 
@@ -6251,6 +6975,7 @@ static PyMethodDef CSimulator_methods[] = {
     {"exec_frame", (PyCFunction) CSimulator_exec_frame, METH_VARARGS | METH_KEYWORDS, "Execute an RZX frame"},
     {"exec_with_cb", (PyCFunction) CSimulator_exec_with_cb, METH_VARARGS | METH_KEYWORDS, "Execute one or more instructions with an 'RST $10' callback"},
     {"load", (PyCFunction) CSimulator_load, METH_VARARGS | METH_KEYWORDS, "Load a tape"},
+    {"out7ffd", (PyCFunction) CSimulator_out7ffd, METH_VARARGS | METH_KEYWORDS, "Page in a ROM and RAM bank"},
     {"press_keys", (PyCFunction) CSimulator_press_keys, METH_VARARGS | METH_KEYWORDS, "Simulate keypresses"},
     {"run", (PyCFunction) CSimulator_run, METH_VARARGS | METH_KEYWORDS, "Execute one or more instructions"},
     {"set_tracer", (PyCFunction) CSimulator_set_tracer, METH_VARARGS | METH_KEYWORDS, "Set the tracer"},
@@ -14,7 +14,14 @@
 # You should have received a copy of the GNU General Public License along with
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, repeat
 from math import ceil, floor
+from operator import mul
+import sys
+
+from skoolkit.ay import ay_samples
 
 CLOCK_SPEED = 'ClockSpeed'
 CONTENTION_BEGIN = 'ContentionBegin'
@@ -24,6 +31,14 @@ FRAME_DURATION = 'FrameDuration'
 INTERRUPT_DELAY = 'InterruptDelay'
 SAMPLE_RATE = 'SampleRate'
 
+# Sample values for a high and a low speaker level
+HIGH = array('H', (0x7FFF,))
+LOW = array('H', (0x8000,))
+
+# Number of speaker edges an AudioStream collects before converting them into
+# samples
+EDGE_BUFFER_SIZE = 65536
+
 class AudioWriter:
     def __init__(self, config=None):
         self.options = ({
@@ -60,6 +75,11 @@ class AudioWriter:
             samples = self._delays_to_samples(delays, options)
         self._write_wav(audio_file, samples, options)
 
+    def write_ay_audio(self, audio_file, ay_log, is128k=False):
+        options = self.options[is128k]
+        samples = ay_samples(ay_log, options[CLOCK_SPEED], options[SAMPLE_RATE])
+        self._write_wav(audio_file, samples, options)
+
     def formats(self):
         return ('.wav',)
 
@@ -69,7 +89,36 @@ class AudioWriter:
         i_delay = options[INTERRUPT_DELAY]
         f_duration = options[FRAME_DURATION]
 
-        for i in range(len(delays)):
+        # Prefix sums of the delays (and of the contended delays) are used to
+        # skip over runs of delays that lie wholly within one part of a frame
+        sums = list(accumulate(delays, initial=0))
+        if contention:
+            c_delays = list(map(int, map(mul, delays, repeat(c_factor))))
+            c_sums = list(accumulate(c_delays, initial=0))
+
+        i = 0
+        while i < len(delays):
+            if not (interrupts and cycle == 0):
+                if contention and c_begin <= cycle < c_end:
+                    j = bisect_left(c_sums, c_sums[i] + c_end - cycle, i) - 1
+                    if j > i:
+                        # Delays that end within the contended interval
+                        delays[i:j] = c_delays[i:j]
+                        cycle += c_sums[j] - c_sums[i]
+                        i = j
+                else:
+                    if contention and cycle < c_begin:
+                        limit = c_begin
+                    else:
+                        limit = f_duration
+                    j = bisect_left(sums, sums[i] + limit - cycle, i) - 1
+                    if j > i:
+                        # Delays that end before the next contended interval
+                        # or frame boundary
+                        cycle += sums[j] - sums[i]
+                        i = j
+                if i == len(delays):
+                    break
             d_offset = 0
             while 1:
                 if interrupts and cycle == 0:
@@ -109,61 +158,80 @@ class AudioWriter:
                     # Delay crosses frame boundary
                     d_offset += f_duration - cycle
                     cycle = 0
+            i += 1
+
+    def _sample_times(self, sample_delay, duration, t=0):
+        # Return the times (in T-states) of the samples from t up to and beyond
+        # the given duration, accumulated in the same way as 't += sample_delay'
+        count = max(int((duration - t) / sample_delay), 0) + 2
+        return array('d', accumulate(repeat(sample_delay, count), initial=t))
+
+    def _fill_samples(self, samples, times, ends, level):
+        # Append the samples at the given times that precede the ends of a
+        # sequence of delays, the first of which is at the given level (0 for
+        # high, 1 for low), and return the index of the first unused time
+        start = 0
+        for i, end in enumerate(map(bisect_left, repeat(times), ends), level):
+            # The samples from 'start' up to 'end' fall within delay 'i'
+            if end > start:
+                samples += (HIGH, LOW)[i % 2] * (end - start)
+                start = end
+        return start
 
     def _moving_average_filter(self, delays, options):
         sample_delay = options[CLOCK_SPEED] / options[SAMPLE_RATE]
-        s0, s1 = 0, sample_delay
-        t, t1 = 0, ceil(s1)
-        bit = bits = 0
-        samples = []
-        for d in delays:
-            while True:
-                if t + d < t1:
-                    if bit:
-                        bits += d
-                    t += d
-                    break
-                i = t1 - t
-                if bit:
-                    bits += i
-                d -= i
-                samples.append((floor(0xFFFF * bits / (t1 - s0)) - 0x8000) & 0xFFFF)
-                s0 = t = t1
-                s1 += sample_delay
-                t1 = ceil(s1)
-                bits = 0
-            bit = 1 - bit
+        edges = list(accumulate(delays, initial=0))
+        highs = list(delays)
+        highs[::2] = repeat(0, len(highs[::2]))
+        high_sums = list(accumulate(highs, initial=0))
+        duration = edges[-1]
+
+        def high_time(t):
+            # T-states spent at the high speaker level before time t
+            k = bisect_right(edges, t) - 1
+            return high_sums[k] + (k % 2) * (t - edges[k])
+
+        # Sample j is the average speaker level from bounds[j-1] up to (but
+        # not including) bounds[j]
+        times = self._sample_times(sample_delay, duration)
+        bounds = array('Q', map(ceil, times[:bisect_right(times, duration)]))
+        num_samples = len(bounds) - 1
+        samples = array('H')
+        prev = 0
+        # Only the samples that contain an edge need to be computed one by one;
+        # the samples between them are all at the same level
+        for j in sorted(set(map(bisect_right, repeat(bounds), edges[1:-1]))) + [num_samples + 1]:
+            if j > prev + 1:
+                level = (bisect_right(edges, bounds[prev]) - 1) % 2
+                samples += (LOW, HIGH)[level] * (j - 1 - prev)
+            if j > num_samples:
+                break
+            s0, t1 = bounds[j - 1], bounds[j]
+            bits = high_time(t1) - high_time(s0)
+            samples.append((floor(0xFFFF * bits / (t1 - s0)) - 0x8000) & 0xFFFF)
+            prev = j
         return samples
 
     def _delays_to_samples(self, delays, options):
         sample_delay = options[CLOCK_SPEED] / options[SAMPLE_RATE]
-        samples = []
-        direction = 1
-        i = 0
-        d = delays[0]
-        t = 0
-        while 1:
-            while t >= d:
-                i += 1
-                if i >= len(delays):
-                    break
-                d += delays[i]
-                direction *= -1
-            if i >= len(delays):
-                break
-            if direction > 0:
-                samples.append(32767)
-            else:
-                samples.append(32768)
-            t += sample_delay
+        samples = array('H')
+        ends = list(accumulate(delays))
+        if ends:
+            self._fill_samples(samples, self._sample_times(sample_delay, ends[-1]), ends, 0)
         return samples
 
     def _to_int32(self, num):
         return (num & 255, (num >> 8) & 255, (num >> 16) & 255, num >> 24)
 
-    def _write_wav(self, audio_file, samples, options):
+    def _to_bytes(self, samples):
+        data = array('H', samples)
+        if sys.byteorder == 'big': # pragma: no cover
+            data.byteswap()
+        return data.tobytes()
+
+    def _wav_header(self, num_samples, options):
         sample_rate = options[SAMPLE_RATE]
-        data_length = 2 * len(samples)
+        data_length = 2 * num_samples
         header = bytearray()
         header.extend(b'RIFF')
         header.extend(self._to_int32(36 + data_length))
@@ -177,6 +245,50 @@ class AudioWriter:
         header.extend((16, 0))                         # bits per sample
         header.extend(b'data')
         header.extend(self._to_int32(data_length))     # length of data chunk
-        audio_file.write(header)
-        for sample in samples:
-            audio_file.write(bytes((sample & 255, sample // 256)))
+        return header
+
+    def _write_wav(self, audio_file, samples, options):
+        audio_file.write(self._wav_header(len(samples), options) + self._to_bytes(samples))
+
+class AudioStream:
+    def __init__(self, audio_writer, audio_file, is128k=False):
+        self.audio_writer = audio_writer
+        self.audio_file = audio_file
+        self.options = audio_writer.options[is128k]
+        self.sample_delay = self.options[CLOCK_SPEED] / self.options[SAMPLE_RATE]
+        self.start = None
+        self.ends = array('Q')
+        self.delays = 0
+        self.t = 0
+        self.num_samples = 0
+        # Write a placeholder header, to be completed by close()
+        audio_file.write(audio_writer._wav_header(0, self.options))
+
+    def append(self, time):
+        # Record a speaker edge at the given time (in T-states)
+        if self.start is None:
+            self.start = time
+        else:
+            self.ends.append(time - self.start)
+            if len(self.ends) >= EDGE_BUFFER_SIZE:
+                self._flush()
+
+    def _flush(self):
+        # Convert the delays that end at the buffered edges into samples,
+        # carrying over the time of the next sample
+        if self.ends:
+            writer = self.audio_writer
+            samples = array('H')
+            times = writer._sample_times(self.sample_delay, self.ends[-1], self.t)
+            self.t = times[writer._fill_samples(samples, times, self.ends, self.delays % 2)]
+            self.delays += len(self.ends)
+            self.num_samples += len(samples)
+            self.audio_file.write(writer._to_bytes(samples))
+            self.ends = array('Q')
+
+    def close(self):
+        self._flush()
+        header = self.audio_writer._wav_header(self.num_samples, self.options)
+        self.audio_file.seek(0)
+        self.audio_file.write(header)
+        self.audio_file.seek(0, 2)
@@ -0,0 +1,193 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from itertools import accumulate, repeat
+from operator import add, and_, mod, mul
+
+PSG_SIGNATURE = b'PSG\x1a'
+
+# Output levels of the AY-3-8912 DAC, scaled so that the sum of all three
+# channels at full volume fits in a signed 16-bit sample
+VOLUMES = (0, 109, 158, 230, 335, 497, 704, 1173, 1383, 2239, 3192, 4072, 5379, 6939, 8799, 10922)
+
+# Length of the sequence produced by the 17-bit noise generator
+NOISE_PERIOD = 131071
+
+_noise = None
+
+class AYLog:
+    """A time-ordered record of the values written to the AY-3-8912 sound
+    chip's registers.
+
+    :param registers: The initial values of the 16 AY registers.
+    :param start: The time (in T-states) at which recording starts.
+    """
+    def __init__(self, registers, start=0):
+        self.registers = list(registers)
+        self.start = self.end = start
+        self.times = array('Q')
+        self.writes = array('H')
+
+    def write(self, time, reg, value):
+        """Record a value written to an AY register.
+
+        :param time: The time (in T-states).
+        :param reg: The register (0-15).
+        :param value: The value.
+        """
+        self.times.append(time)
+        self.writes.append(reg * 256 + value)
+
+def _noise_table():
+    global _noise
+    if _noise is None:
+        noise = bytearray(NOISE_PERIOD)
+        rng = 1
+        for i in range(NOISE_PERIOD):
+            rng = (rng >> 1) | (((rng ^ (rng >> 3)) & 1) << 16)
+            noise[i] = rng & 1
+        _noise = bytes(noise)
+    return _noise
+
+def _envelope(shape):
+    # Return the envelope levels for the given shape, and whether they repeat
+    # (otherwise the last level is held)
+    first = list(range(16)) if shape & 4 else list(range(15, -1, -1))
+    if shape & 8 == 0:
+        return first + [0], False
+    if shape & 1:
+        return first + [first[-1] ^ (15 if shape & 2 else 0)], False
+    if shape & 2:
+        return first + first[::-1], True
+    return first * 2, True
+
+def _steps(phase, inc, count):
+    # Return an array of phases (one per sample) that start at 'phase' and
+    # advance by 'inc' per sample, and the phase of the sample that follows
+    phases = array('d', accumulate(repeat(inc, count - 1), initial=phase))
+    return phases, phases[-1] + inc
+
+def _render(samples, regs, count, state, base, noise):
+    # Append 'count' samples produced by the AY registers 'regs'
+    tone_phases, noise_phase, env_phase = state
+    mixer = regs[7]
+    noise_bits = None
+    if any(mixer & (8 << c) == 0 for c in range(3)):
+        inc = base / (2 * ((regs[6] & 31) or 1))
+        phases, noise_phase = _steps(noise_phase, inc, count)
+        noise_bits = bytes(map(noise.__getitem__, map(mod, map(int, phases), repeat(NOISE_PERIOD))))
+        noise_phase %= NOISE_PERIOD
+    env_volumes = None
+    if any(regs[8 + c] & 16 for c in range(3)):
+        levels, cycle = _envelope(regs[13])
+        inc = base / (2 * ((regs[11] + 256 * regs[12]) or 1))
+        phases, env_phase = _steps(env_phase, inc, count)
+        if cycle:
+            indexes = map(mod, map(int, phases), repeat(32))
+            env_phase %= 32
+        else:
+            indexes = map(min, map(int, phases), repeat(16))
+            env_phase = min(env_phase, 16)
+        env_volumes = array('H', map(VOLUMES.__getitem__, map(levels.__getitem__, indexes)))
+    channels = []
+    for c in range(3):
+        gate = None
+        if mixer & (1 << c) == 0:
+            period = (regs[2 * c] + 256 * (regs[2 * c + 1] & 15)) or 1
+            inc = base / period
+            # A tone whose frequency is above the Nyquist frequency is treated
+            # as a constant high output
+            if inc < 1:
+                phases, phase = _steps(tone_phases[c], inc, count)
+                gate = bytes(map(and_, map(int, phases), repeat(1)))
+                tone_phases[c] = phase % 2
+        if noise_bits and mixer & (8 << c) == 0:
+            if gate:
+                gate = bytes(map(and_, gate, noise_bits))
+            else:
+                gate = noise_bits
+        if regs[8 + c] & 16:
+            volumes = env_volumes
+        else:
+            volumes = repeat(VOLUMES[regs[8 + c] & 15], count)
+        if gate:
+            channels.append(map(mul, gate, volumes))
+        else:
+            channels.append(volumes)
+    samples.extend(map(add, map(add, channels[0], channels[1]), channels[2]))
+    state[1:] = noise_phase, env_phase
+
+def ay_samples(ay_log, clock_speed, sample_rate):
+    """Synthesise the sound produced by the AY-3-8912 sound chip. The chip's
+    clock runs at half the speed of the Z80's.
+
+    :param ay_log: The :class:`AYLog` of values written to the AY registers.
+    :param clock_speed: The Z80 clock speed in cycles per second.
+    :param sample_rate: The sample rate in Hz.
+    :return: An array of 16-bit samples.
+    """
+    # Tone half-periods (at a period of 1) per sample
+    base = clock_speed / (16 * sample_rate)
+    noise = _noise_table()
+    regs = list(ay_log.registers)
+    state = [[0.0, 0.0, 0.0], 0.0, 0.0]
+    samples = array('H')
+    start = ay_log.start
+    num_samples = (ay_log.end - start) * sample_rate // clock_speed
+    n0 = 0
+    for time, write in zip(ay_log.times, ay_log.writes):
+        n1 = min((time - start) * sample_rate // clock_speed, num_samples)
+        if n1 > n0:
+            _render(samples, regs, n1 - n0, state, base, noise)
+            n0 = n1
+        reg = write // 256
+        regs[reg] = write % 256
+        if reg == 13:
+            # Writing to the envelope shape register restarts the envelope
+            state[2] = 0.0
+    if num_samples > n0:
+        _render(samples, regs, num_samples - n0, state, base, noise)
+    return samples
+
+def write_psg(psg_file, ay_log, frame_duration):
+    """Write the values written to the AY-3-8912 sound chip's registers as a
+    PSG file.
+
+    :param psg_file: The file (opened in binary mode).
+    :param ay_log: The :class:`AYLog` of values written to the AY registers.
+    :param frame_duration: The length of a frame in T-states.
+    """
+    data = bytearray(PSG_SIGNATURE + bytes(12))
+    for reg, value in enumerate(ay_log.registers[:14]):
+        data.extend((reg, value))
+    frame = ay_log.start // frame_duration
+    for time, write in zip(ay_log.times, ay_log.writes):
+        frame = _skip_frames(data, frame, time // frame_duration)
+        data.extend(divmod(write, 256))
+    _skip_frames(data, frame, ay_log.end // frame_duration)
+    psg_file.write(data)
+
+def _skip_frames(data, frame, next_frame):
+    # Append the end-of-frame markers that separate two frames, using the
+    # 0xFE (skip 4*N frames) marker where possible
+    count = next_frame - frame
+    while count >= 4:
+        skip = min(count // 4, 255)
+        data.extend((0xFE, skip))
+        count -= skip * 4
+    data.extend(b'\xff' * count)
+    return next_frame
@@ -0,0 +1,587 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+from skoolkit.simulator import JR_OFFSETS, OFFSETS, R2
+
+# Instructions that may appear anywhere in a block, mapped to their sizes
+# (None means that the size is given by the 'size' argument of the partial)
+BLOCK_OPS = {
+    'adc_hl': 2, 'add_rr': None, 'af_hl': 1, 'af_n': 2, 'af_r': None,
+    'af_xy': 3, 'afc_hl': 1, 'afc_n': 2, 'afc_r': None, 'afc_xy': 3,
+    'bit_hl': 2, 'bit_r': 2, 'bit_xy': 4, 'cf': 1, 'ex_af': 1, 'ex_de_hl': 1,
+    'ex_sp': None, 'exx': 1, 'f_hl': 2, 'f_r': 2, 'f_xy': 4, 'fc_hl': None,
+    'fc_r': None, 'fc_xy': None, 'im': 2, 'in_a': 2, 'in_c': 2,
+    'inc_dec_rr': None, 'ld_a_ir': 2, 'ld_a_m': 3, 'ld_hl_n': 2, 'ld_m_a': 3,
+    'ld_mm_rr': None, 'ld_r_n': None, 'ld_r_r': None, 'ld_r_rr': 1,
+    'ld_r_xy': 3, 'ld_rr_mm': None, 'ld_rr_nn': None, 'ld_rr_r': 1,
+    'ld_sp_rr': None, 'ld_xy_n': 4, 'ld_xy_r': 3, 'neg': 2, 'nop': None,
+    'out_a': 2, 'out_c': 2, 'pop': None, 'push': None, 'res_hl': 2,
+    'res_r': 2, 'res_xy': 4, 'rld': 2, 'rrd': 2, 'sbc_hl': 2, 'set_hl': 2,
+    'set_r': 2, 'set_xy': 4
+}
+
+# Instructions in BLOCK_OPS that may modify the code in a block (by writing to
+# memory or paging in a different RAM bank), mapped to the number of bytes
+# they write at 'addr' (when compiled)
+WRITE_OPS = {
+    'ex_sp': 2, 'f_hl': 1, 'f_xy': 1, 'fc_hl': 1, 'fc_xy': 1, 'ld_hl_n': 1,
+    'ld_m_a': 1, 'ld_mm_rr': 2, 'ld_rr_r': 1, 'ld_xy_n': 1, 'ld_xy_r': 1,
+    'out_a': 0, 'out_c': 0, 'push': 2, 'res_hl': 1, 'res_xy': 1, 'rld': 1,
+    'rrd': 1, 'set_hl': 1, 'set_xy': 1
+}
+
+# Instructions that may change the flow of control, and so may appear only at
+# the end of a block, mapped to their sizes
+FINAL_OPS = {
+    'call': 3, 'cpi': 2, 'di_ei': 1, 'djnz': 2, 'djnz_fast': 2,
+    'djnz_idle': 2, 'halt': 1, 'halt_idle': 1, 'ini': 2, 'jp': 3,
+    'jp_idle': 3, 'jp_rr': None, 'jr': 2, 'jr_idle': 2, 'ldi': 2, 'outi': 2,
+    'ret': 1, 'reti': 2, 'rst': 1
+}
+
+MAX_BLOCK_SIZE = 64
+
+# Used in place of BlockCache.pages by a compiled block whose memory writes
+# invalidate cached blocks by themselves
+NO_PAGES = (0,) * 256
+
+# Upper bound on the duration (in T-states) of the final instruction in a block
+MAX_FINAL_TSTATES = 23
+
+def _r_inc(r_inc):
+    return 1 + (r_inc is R2)
+
+def _word(memory, addr):
+    return memory[addr] + 256 * memory[addr + 1]
+
+def _index(m, pc, xyh, xyl):
+    return f'(registers[{xyl}] + 256 * registers[{xyh}] + {OFFSETS[m[pc + 2]]}) % 65536'
+
+def _write(value, addr='addr'):
+    return (
+        f'if {addr} > 0x3FFF:',
+        f'    poke({addr}, {value})',
+        f'    if pages[{addr} // 256]:',
+        f'        written({addr})'
+    )
+
+# Source code generators for instructions in BLOCK_OPS; each takes the partial
+# arguments, the memory, the instruction address and a function that names an
+# object for use in the source, and returns the instruction's duration in
+# T-states, its R register increment, and its source lines (which must set
+# 'addr' if the instruction is in WRITE_OPS)
+BLOCK_SOURCE = {
+    # registers, rh, rl
+    'adc_hl': lambda a, m, pc, o: (15, 2, (
+        f'rr = registers[{a[2]}] + 256 * registers[{a[1]}]',
+        'hl = registers[7] + 256 * registers[6]',
+        'rr_c = rr + registers[1] % 2',
+        'v = (hl + rr_c) % 65536',
+        'registers[1] = (hl + rr_c > 0xFFFF) + (v == 0) * 0x40 + ((hl % 4096) + (rr_c % 4096) > 0x0FFF) * 0x10 + (hl ^ rr < 0x8000 and hl ^ v > 0x7FFF) * 0x04 + ((v // 256) & 0xA8)',
+        'registers[7] = v % 256',
+        'registers[6] = v // 256'
+    )),
+    # registers, r_inc, timing, size, ah, al, rh, rl
+    'add_rr': lambda a, m, pc, o: (a[2], _r_inc(a[1]), (
+        f'v1 = registers[{a[5]}] + 256 * registers[{a[4]}]',
+        f'v2 = registers[{a[7]}] + 256 * registers[{a[6]}]',
+        'v = (v1 + v2) % 65536',
+        f'registers[1] = (registers[1] & 0xC4) + (v1 + v2 > 0xFFFF) + ((v1 % 4096) + (v2 % 4096) > 0x0FFF) * 0x10 + ((v // 256) & 0x28)',
+        f'registers[{a[5]}] = v % 256',
+        f'registers[{a[4]}] = v // 256'
+    )),
+    # registers, memory, af
+    'af_hl': lambda a, m, pc, o: (7, 1, (f'registers[:2] = {o(a[2])}[registers[0]][memory[registers[7] + 256 * registers[6]]]',)),
+    'af_n': lambda a, m, pc, o: (7, 1, (f'registers[:2] = {o(a[2])}[registers[0]][{m[pc + 1]}]',)),
+    # registers, r_inc, timing, size, af, r
+    'af_r': lambda a, m, pc, o: (a[2], _r_inc(a[1]), (f'registers[:2] = {o(a[4])}[registers[0]][registers[{a[5]}]]',)),
+    # registers, memory, af, xyh, xyl
+    'af_xy': lambda a, m, pc, o: (19, 2, (f'registers[:2] = {o(a[2])}[registers[0]][memory[{_index(m, pc, a[3], a[4])}]]',)),
+    # registers, memory, afc
+    'afc_hl': lambda a, m, pc, o: (7, 1, (f'registers[:2] = {o(a[2])}[registers[1] % 2][registers[0]][memory[registers[7] + 256 * registers[6]]]',)),
+    'afc_n': lambda a, m, pc, o: (7, 1, (f'registers[:2] = {o(a[2])}[registers[1] % 2][registers[0]][{m[pc + 1]}]',)),
+    # registers, r_inc, timing, size, afc, r
+    'afc_r': lambda a, m, pc, o: (a[2], _r_inc(a[1]), (f'registers[:2] = {o(a[4])}[registers[1] % 2][registers[0]][registers[{a[5]}]]',)),
+    # registers, memory, afc, xyh, xyl
+    'afc_xy': lambda a, m, pc, o: (19, 2, (f'registers[:2] = {o(a[2])}[registers[1] % 2][registers[0]][memory[{_index(m, pc, a[3], a[4])}]]',)),
+    # registers, memory, bit, b
+    'bit_hl': lambda a, m, pc, o: (12, 2, (f'registers[1] = {o(a[2])}[registers[1] % 2][{a[3]}][memory[registers[7] + 256 * registers[6]]]',)),
+    # registers, bit, b, reg
+    'bit_r': lambda a, m, pc, o: (8, 2, (f'registers[1] = {o(a[1])}[registers[1] % 2][{a[2]}][registers[{a[3]}]]',)),
+    # registers, memory, bit, b, xyh, xyl
+    'bit_xy': lambda a, m, pc, o: (20, 2, (
+        f'xy = {_index(m, pc, a[4], a[5])}',
+        f'registers[1] = ({o(a[2])}[registers[1] % 2][{a[3]}][memory[xy]] & 0xD7) + ((xy // 256) & 0x28)'
+    )),
+    # registers, cf
+    'cf': lambda a, m, pc, o: (4, 1, (f'registers[1] = {o(a[1])}[registers[1]][registers[0]]',)),
+    # registers
+    'ex_af': lambda a, m, pc, o: (4, 1, (
+        'registers[0], registers[16] = registers[16], registers[0]',
+        'registers[1], registers[17] = registers[17], registers[1]'
+    )),
+    'ex_de_hl': lambda a, m, pc, o: (4, 1, (
+        'registers[4], registers[6] = registers[6], registers[4]',
+        'registers[5], registers[7] = registers[7], registers[5]'
+    )),
+    'exx': lambda a, m, pc, o: (4, 1, ('registers[2:8], registers[18:24] = registers[18:24], registers[2:8]',)),
+    # registers, memory, f
+    'f_hl': lambda a, m, pc, o: (15, 2, (
+        'addr = registers[7] + 256 * registers[6]',
+        f'value, registers[1] = {o(a[2])}[memory[addr]]',
+        *_write('value')
+    )),
+    # registers, f, r
+    'f_r': lambda a, m, pc, o: (8, 2, (f'registers[{a[2]}], registers[1] = {o(a[1])}[registers[{a[2]}]]',)),
+    # registers, memory, r_inc, timing, size, fc
+    'fc_hl': lambda a, m, pc, o: (a[3], _r_inc(a[2]), (
+        'addr = registers[7] + 256 * registers[6]',
+        f'value, registers[1] = {o(a[5])}[registers[1] % 2][memory[addr]]',
+        *_write('value')
+    )),
+    # registers, r_inc, timing, size, fc, r
+    'fc_r': lambda a, m, pc, o: (a[2], _r_inc(a[1]), (f'registers[{a[5]}], registers[1] = {o(a[4])}[registers[1] % 2][registers[{a[5]}]]',)),
+    # registers, mode
+    'im': lambda a, m, pc, o: (8, 2, (f'registers[27] = {a[1]}',)),
+    # registers, r_inc, timing, size, inc, rh, rl
+    'inc_dec_rr': lambda a, m, pc, o: (a[2], _r_inc(a[1]), (
+        (f'registers[12] = (registers[12] + {a[4]}) % 65536',) if a[6] == 12 else (
+            f'v = (registers[{a[6]}] + 256 * registers[{a[5]}] + {a[4]}) % 65536',
+            f'registers[{a[5]}] = v // 256',
+            f'registers[{a[6]}] = v % 256'
+        )
+    )),
+    # registers, memory
+    'ld_a_m': lambda a, m, pc, o: (13, 1, (f'registers[0] = memory[{_word(m, pc + 1)}]',)),
+    'ld_hl_n': lambda a, m, pc, o: (10, 1, ('addr = registers[7] + 256 * registers[6]', *_write(m[pc + 1]))),
+    'ld_m_a': lambda a, m, pc, o: (13, 1, (f'addr = {_word(m, pc + 1)}', *_write('registers[0]'))),
+    # registers, memory, r_inc, timing, size, r
+    'ld_r_n': lambda a, m, pc, o: (a[3], _r_inc(a[2]), (f'registers[{a[5]}] = {m[pc + a[4] - 1]}',)),
+    # registers, r_inc, timing, size, r1, r2 (LD A,R and LD R,A excluded)
+    'ld_r_r': lambda a, m, pc, o: None if 15 in a[4:] else (a[2], _r_inc(a[1]), (f'registers[{a[4]}] = registers[{a[5]}]',)),
+    # registers, memory, r, rh, rl
+    'ld_r_rr': lambda a, m, pc, o: (7, 1, (f'registers[{a[2]}] = memory[registers[{a[4]}] + 256 * registers[{a[3]}]]',)),
+    # registers, memory, r, xyh, xyl
+    'ld_r_xy': lambda a, m, pc, o: (19, 2, (f'registers[{a[2]}] = memory[{_index(m, pc, a[3], a[4])}]',)),
+    # registers, memory, r_inc, timing, size, rh, rl
+    'ld_rr_nn': lambda a, m, pc, o: (a[3], _r_inc(a[2]), (
+        (f'registers[12] = {_word(m, pc + a[4] - 2)}',) if a[6] == 12 else (
+            f'registers[{a[6]}] = {m[pc + a[4] - 2]}',
+            f'registers[{a[5]}] = {m[pc + a[4] - 1]}'
+        )
+    )),
+    # registers, memory, rh, rl, r
+    'ld_rr_r': lambda a, m, pc, o: (7, 1, (f'addr = registers[{a[3]}] + 256 * registers[{a[2]}]', *_write(f'registers[{a[4]}]'))),
+    # registers, r_inc, timing, size, rh, rl
+    'ld_sp_rr': lambda a, m, pc, o: (a[2], _r_inc(a[1]), (f'registers[12] = registers[{a[5]}] + 256 * registers[{a[4]}]',)),
+    # registers, memory, xyh, xyl
+    'ld_xy_n': lambda a, m, pc, o: (19, 2, (f'addr = {_index(m, pc, a[2], a[3])}', *_write(m[pc + 3]))),
+    # registers, memory, xyh, xyl, r
+    'ld_xy_r': lambda a, m, pc, o: (19, 2, (f'addr = {_index(m, pc, a[2], a[3])}', *_write(f'registers[{a[4]}]'))),
+    # registers, neg
+    'neg': lambda a, m, pc, o: (8, 2, (f'registers[:2] = {o(a[1])}[registers[0]]',)),
+    # registers, r_inc, timing, size
+    'nop': lambda a, m, pc, o: (a[2], _r_inc(a[1]), ()),
+    # registers, memory, r_inc, timing, size, rh, rl
+    'pop': lambda a, m, pc, o: (a[3], _r_inc(a[2]), (
+        'sp = registers[12]',
+        'registers[12] = (sp + 2) % 65536',
+        f'registers[{a[6]}] = memory[sp]',
+        f'registers[{a[5]}] = memory[(sp + 1) % 65536]'
+    )),
+    'push': lambda a, m, pc, o: (a[3], _r_inc(a[2]), (
+        'addr = registers[12] = (registers[12] - 2) % 65536',
+        *_write(f'registers[{a[6]}]'),
+        'sp = (addr + 1) % 65536',
+        *_write(f'registers[{a[5]}]', 'sp')
+    )),
+    # registers, memory, bit
+    'res_hl': lambda a, m, pc, o: (15, 2, ('addr = registers[7] + 256 * registers[6]', *_write(f'memory[addr] & {a[2]}'))),
+    # registers, bit, reg
+    'res_r': lambda a, m, pc, o: (8, 2, (f'registers[{a[2]}] &= {a[1]}',)),
+    # registers, rh, rl
+    'sbc_hl': lambda a, m, pc, o: (15, 2, (
+        f'rr = registers[{a[2]}] + 256 * registers[{a[1]}]',
+        'hl = registers[7] + 256 * registers[6]',
+        'rr_c = rr + registers[1] % 2',
+        'v = (hl - rr_c) % 65536',
+        'registers[1] = 0x02 + (hl < rr_c) + (v == 0) * 0x40 + (hl % 4096 < rr_c % 4096) * 0x10 + (hl ^ rr > 0x7FFF and hl ^ v > 0x7FFF) * 0x04 + ((v // 256) & 0xA8)',
+        'registers[7] = v % 256',
+        'registers[6] = v // 256'
+    )),
+    # registers, memory, bit
+    'set_hl': lambda a, m, pc, o: (15, 2, ('addr = registers[7] + 256 * registers[6]', *_write(f'memory[addr] | {a[2]}'))),
+    # registers, bit, reg
+    'set_r': lambda a, m, pc, o: (8, 2, (f'registers[{a[2]}] |= {a[1]}',)),
+}
+
+def _target(name, memory, pc):
+    # Return the target address of a DJNZ, JP or JR instruction
+    if name.startswith('jp'):
+        return _word(memory, pc + 1)
+    return (pc + JR_OFFSETS[memory[pc + 1]]) % 65536
+
+def _side_exit(f, name):
+    # Return whether an instruction in FINAL_OPS is a conditional branch that
+    # can be compiled as an exit from the middle of a block
+    if name in FINAL_SOURCE and f.func.__qualname__ == f'Simulator.{name}':
+        return name.startswith('djnz') or f.args[2] > 0
+    return False
+
+def _r_add(r_inc):
+    return ('r = registers[15]', f'registers[15] = (r & 0x80) + ((r + {r_inc}) & 0x7F)')
+
+def _djnz(a, m, pc):
+    # registers, memory
+    return ('b = (registers[2] - 1) % 256', 'registers[2] = b'), 'b', 13, _target('djnz', m, pc), 8, (pc + 2) % 65536
+
+def _jp(a, m, pc):
+    # registers, memory, c_and, c_val
+    cond = f'registers[1] & {a[2]} == {a[3]}' if a[2] else None
+    return (), cond, 10, _word(m, pc + 1), 10, (pc + 3) % 65536
+
+def _jr(a, m, pc):
+    # registers, memory, c_and, c_val
+    cond = f'registers[1] & {a[2]} == {a[3]}' if a[2] else None
+    return (), cond, 12, _target('jr', m, pc), 7, (pc + 2) % 65536
+
+# Source code generators for instructions in FINAL_OPS; each takes the partial
+# arguments, the memory and the instruction address, and returns a tuple of the
+# form (lines, cond, t1, pc1, t2, pc2), where 'lines' are source lines to be
+# executed before the branch, 'cond' is the branch condition (or None if the
+# branch is always taken), and t1/pc1 and t2/pc2 are the duration and next PC
+# when the branch is and is not taken (the 'fast' and 'idle' variants of
+# DJNZ, JP and JR are compiled as the plain instruction, which is always
+# exact); a conditional branch need not end a block, and exits the block only
+# if taken
+FINAL_SOURCE = {
+    'djnz': _djnz,
+    'djnz_fast': _djnz,
+    'djnz_idle': _djnz,
+    'jp': _jp,
+    'jp_idle': _jp,
+    'jr': _jr,
+    'jr_idle': _jr
+}
+
+class CachedMemory:
+    # Mixin for a memory object whose writes invalidate cached blocks
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.block_cache.written(index)
+
+class CachedList(list):
+    # A copy of a 48K memory list whose writes invalidate cached blocks
+    def __init__(self, memory, block_cache):
+        super().__init__(memory)
+        self.block_cache = block_cache
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.block_cache.written(index)
+
+_CACHED_CLASSES = {}
+
+class BlockCache:
+    """Executes machine code by compiling straight-line runs of instructions
+    into Python functions that are cached by start address. A cached block is
+    discarded when the memory it occupies is written or (in 128K memory)
+    paged out, and execution leaves a block if a conditional branch in the
+    block is taken or an instruction writes to the code later in the same
+    block.
+
+    :param simulator: The simulator.
+    """
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.blocks = {}
+        self.ends = {}
+        self.pages = [set() for i in range(256)]
+        self.modified = set()
+        self.mirrors = {}
+        self.slots = None
+        self.stop = None
+
+    def watch(self, memory):
+        # Return a memory object whose writes invalidate cached blocks: a
+        # list (or other built-in sequence) is copied, so the simulator works
+        # on its own copy of 48K memory (as the C version does), and any
+        # other memory object is converted in place so that it is still the
+        # same object to everything that has a reference to it
+        if not hasattr(memory, '__dict__'):
+            return CachedList(memory, self)
+        if not isinstance(memory, CachedMemory):
+            cls = type(memory)
+            if cls not in _CACHED_CLASSES:
+                _CACHED_CLASSES[cls] = type(f'Cached{cls.__name__}', (CachedMemory, cls), {})
+            memory.__class__ = _CACHED_CLASSES[cls]
+        memory.block_cache = self
+        return memory
+
+    def clear(self):
+        self.blocks.clear()
+        self.ends.clear()
+        for starts in self.pages:
+            starts.clear()
+        self.modified.clear()
+
+    def invalidate(self, start, end, modified=True):
+        # Discard every cached block that overlaps addresses start-(end-1)
+        pages = self.pages
+        ends = self.ends
+        for page in range(start // 256, (end - 1) // 256 + 1):
+            for addr in [a for a in pages[page] if a < end and ends[a] > start]:
+                for p in range(addr // 256, (ends.pop(addr) - 1) // 256 + 1):
+                    pages[p].discard(addr)
+                del self.blocks[addr]
+                if modified:
+                    self.modified.add(addr)
+
+    def written(self, index):
+        if isinstance(index, int):
+            if self.pages[index // 256]:
+                self.invalidate(index, index + 1)
+            if self.mirrors:
+                for offset in self.mirrors.get(index // 0x4000, ()):
+                    self.invalidate(index + offset, index + offset + 1)
+        else:
+            start, stop = index.indices(0x10000)[:2]
+            if start < stop:
+                self.invalidate(start, stop)
+                for offset in set(o for s in range(start // 0x4000, (stop - 1) // 0x4000 + 1) for o in self.mirrors.get(s, ())):
+                    self.invalidate(start + offset, stop + offset)
+
+    def paged(self, slots):
+        # Discard the blocks in the ROM and the RAM bank at 49152 if either
+        # has been paged out, and note which slots (if any) contain the same
+        # RAM bank
+        if self.slots:
+            if slots[0] is not self.slots[0]:
+                self.invalidate(0x0000, 0x4000, False)
+            if slots[3] is not self.slots[3]:
+                self.invalidate(0xC000, 0x10000, False)
+        self.slots = tuple(slots)
+        mirrors = {}
+        for i in range(1, 4):
+            offsets = tuple((j - i) * 0x4000 for j in range(1, 4) if j != i and slots[j] is slots[i])
+            if offsets:
+                mirrors[i] = offsets
+        self.mirrors = mirrors
+
+    def run(self, stop, interrupts):
+        simulator = self.simulator
+        opcodes = simulator.opcodes
+        memory = simulator.memory
+        registers = simulator.registers
+        frame_duration = simulator.frame_duration
+        int_active = simulator.int_active
+        if stop != self.stop:
+            self.clear()
+            self.stop = stop
+        blocks = self.blocks
+        if len(memory) == 0x20000:
+            slots = memory.memory
+            self.paged(slots)
+            rom, bank = slots[0], slots[3]
+        else:
+            slots = None
+        pc = registers[24]
+
+        while True:
+            block = blocks.get(pc)
+            if block is None:
+                block = self.get_block(pc, stop, slots)
+            if block:
+                end, instructions, func, tstates = block
+                if func and (not interrupts or registers[26] == 0 or (tstates and int_active <= registers[25] % frame_duration < frame_duration - tstates)):
+                    func()
+                else:
+                    for prev_pc, f, write, next_pc in instructions:
+                        f()
+                        if interrupts and registers[26] and registers[25] % frame_duration < int_active:
+                            if simulator.accept_interrupt(registers, memory, prev_pc):
+                                break
+                        if registers[24] != next_pc or (write and blocks.get(pc) is not block):
+                            break
+            else:
+                opcodes[memory[pc]]()
+                if interrupts and registers[26] and registers[25] % frame_duration < int_active:
+                    simulator.accept_interrupt(registers, memory, pc)
+            if slots and (slots[0] is not rom or slots[3] is not bank):
+                rom, bank = slots[0], slots[3]
+                self.paged(slots)
+            pc = registers[24]
+            if pc == stop:
+                break
+
+    def get_block(self, start, stop, paged):
+        # Cache and return a tuple (end, instructions, func, tstates) for the
+        # block of instructions at 'start', or an empty tuple if fewer than
+        # two instructions there can be cached; in paged memory, a block ends
+        # with any instruction that may page in a different RAM bank
+        opcodes = self.simulator.opcodes
+        memory = self.simulator.memory
+        instructions = []
+        pc = start
+        while len(instructions) < MAX_BLOCK_SIZE:
+            f = opcodes[memory[pc]]
+            name = getattr(getattr(f, 'func', None), '__name__', None)
+            while name in ('lazy_prefix', 'prefix', 'prefix2'):
+                if name == 'lazy_prefix':
+                    f = self.simulator.resolve_prefix(*f.args)
+                elif name == 'prefix':
+                    f = f.args[0][memory[(pc + 1) % 65536]]
+                else:
+                    f = f.args[0][memory[(pc + 3) % 65536]]
+                name = getattr(getattr(f, 'func', None), '__name__', None)
+            if name in BLOCK_OPS:
+                size = BLOCK_OPS[name]
+            elif name in FINAL_OPS:
+                size = FINAL_OPS[name]
+            else:
+                break
+            if name == 'jp_rr':
+                size = _r_inc(f.args[1])
+            elif size is None:
+                code = f.func.__code__
+                size = f.args[code.co_varnames.index('size', 1, code.co_argcount) - 1]
+            if pc + size > 65535:
+                break
+            instructions.append((pc, f, name in WRITE_OPS, pc + size))
+            pc += size
+            if pc == stop or (paged and name in ('out_a', 'out_c')):
+                break
+            if name in FINAL_OPS and (not _side_exit(f, name) or _target(name, memory, pc - size) == start):
+                break
+        if len(instructions) > 1:
+            if start in self.modified:
+                # Self-modifying code is not worth compiling
+                func, tstates = None, None
+            else:
+                func, tstates = self.compile(instructions, pc)
+            block = (pc, tuple(instructions), func, tstates)
+        else:
+            # Cover the instruction that could not be cached, so that this
+            # address is reconsidered if that instruction is modified
+            block = ()
+            pc = min(pc + 4, 65536)
+        self.blocks[start] = block
+        self.ends[start] = pc
+        for page in range(start // 256, (pc - 1) // 256 + 1):
+            self.pages[page].add(start)
+        return block
+
+    def compile(self, instructions, end):
+        # Return a function that executes a block of instructions, and an upper
+        # bound on the block's duration in T-states (or None if that cannot be
+        # determined); a block that ends by branching back to its start is
+        # compiled as a loop that runs until the branch is not taken or an
+        # interrupt is due
+        simulator = self.simulator
+        memory = simulator.memory
+        namespace = {'registers': simulator.registers, 'memory': memory, 'blocks': self.blocks, 'written': self.written}
+        if isinstance(memory, CachedList):
+            # Write to the list directly, and check for cached blocks inline
+            namespace['poke'] = super(CachedList, memory).__setitem__
+            namespace['pages'] = self.pages
+        else:
+            namespace['poke'] = memory.__setitem__
+            namespace['pages'] = NO_PAGES
+        start = instructions[0][0]
+        pc, f = instructions[-1][:2]
+        name = f.func.__name__
+        loop = start != self.stop and _side_exit(f, name) and _target(name, memory, pc) == start
+        lines = []
+        tstates = MAX_FINAL_TSTATES
+        t_inc = r_inc = 0
+
+        def obj(value):
+            name = f'_{len(namespace)}'
+            namespace[name] = value
+            return name
+
+        def flush(indent=''):
+            if t_inc:
+                lines.append(f'{indent}registers[25] += {t_inc}')
+            if r_inc:
+                lines.extend(indent + line for line in _r_add(r_inc))
+
+        for i, (pc, f, write, pc_next) in enumerate(instructions):
+            name = f.func.__name__
+            base = f.func.__qualname__ == f'Simulator.{name}'
+            if name in FINAL_OPS:
+                if base and name in FINAL_SOURCE:
+                    code, cond, t1, pc1, t2, pc2 = FINAL_SOURCE[name](f.args, memory, pc)
+                    lines.extend(code)
+                    lines.extend(_r_add(r_inc + 1))
+                    if pc_next < end:
+                        # A conditional branch that exits the block if taken
+                        lines.extend((f'if {cond}:', f'    registers[25] += {t_inc + t1}', f'    registers[24] = {pc1}', '    return'))
+                        t_inc += t2
+                        r_inc = 0
+                        if tstates is not None:
+                            tstates += t1
+                        continue
+                    if cond:
+                        lines.extend((
+                            f'if {cond}:',
+                            f'    registers[25] += {t_inc + t1}',
+                            f'    registers[24] = {pc1}',
+                            'else:',
+                            f'    registers[25] += {t_inc + t2}',
+                            f'    registers[24] = {pc2}'
+                        ))
+                    else:
+                        lines.extend((f'registers[25] += {t_inc + t1}', f'registers[24] = {pc1}'))
+                else:
+                    flush()
+                    lines.extend((f'registers[24] = {pc}', f'{obj(f)}()'))
+                break
+            op = None
+            if base and name in BLOCK_SOURCE:
+                op = BLOCK_SOURCE[name](f.args, memory, pc, obj)
+            if op:
+                t, r, code = op
+                t_inc += t
+                r_inc += r
+                if tstates is not None:
+                    tstates += t
+                lines.extend(code)
+                if write and (loop or pc_next < end):
+                    lines.append(f'if {(start if loop else pc_next) - WRITE_OPS[name] + 1} <= addr < {end}:')
+                    flush('    ')
+                    lines.extend((f'    registers[24] = {pc_next}', '    return'))
+            else:
+                flush()
+                lines.extend((f'registers[24] = {pc}', f'{obj(f)}()'))
+                t_inc = r_inc = 0
+                tstates = None
+                if write and (loop or pc_next < end):
+                    lines.extend((f'if {start} not in blocks:', '    return'))
+        else:
+            flush()
+            lines.append(f'registers[24] = {end}')
+        if loop:
+            if tstates is None:
+                lines.append(f'if registers[24] != {start} or registers[26]:')
+            else:
+                frame_duration = simulator.frame_duration
+                lines.append(f'if registers[24] != {start} or (registers[26] and not {simulator.int_active} <= registers[25] % {frame_duration} < {frame_duration - tstates}):')
+            lines = ['while True:'] + ['    ' + line for line in lines] + ['        return']
+        args = ', '.join(f'{n}={n}' for n in namespace)
+        body = '\n    '.join(lines)
+        exec(f'def block({args}):\n    {body}', namespace)
+        return namespace['block'], tstates
@@ -32,7 +32,9 @@ class CMIOSimulator(Simulator):
     def __init__(self, memory, registers=None, state=None, config=None):
         if config is None:
             config = {}
+        config['block_cache'] = False
         config['fast_djnz'] = False
+        config['fast_idle'] = False
         config['fast_ldir'] = False
         super().__init__(memory, registers, state, config)
         if len(memory) == 0x20000:
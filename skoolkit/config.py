@@ -114,6 +114,8 @@ COMMANDS = {
         'Warnings': (1, 'warn')
     },
     'tap2sna': {
+        'CacheDir': ('', ''),
+        'CacheSize': (100, ''),
         'DefaultSnapshotFormat': ('z80', ''),
         'TraceLine': ('${pc:04X} {i}', ''),
         'TraceOperand': ('$,02X,04X', '')
@@ -1,4 +1,4 @@
-# Copyright 2022, 2023 Richard Dymond (rjdymond@gmail.com)
+# Copyright 2022-2024 Richard Dymond (rjdymond@gmail.com)
 #
 # This file is part of SkoolKit.
 #
@@ -14,6 +14,11 @@
 # You should have received a copy of the GNU General Public License along with
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import zlib
+
+from skoolkit import SkoolKitError, open_file
+
 class Accelerator:
     def __init__(self, name, code, offset, in_time, loop_time, loop_r_inc, ear_mask, polarity):
         self.name = name
@@ -31,6 +36,14 @@ class Accelerator:
         self.ear_mask = ear_mask
         self.polarity = polarity
 
+    def offset(self):
+        return max(self.c0 - 1, 0)
+
+    def full_code(self):
+        if self.c0:
+            return self.code
+        return [self.opcode] + self.code
+
 ACCELERATORS = {
     'alkatraz': Accelerator(
         'alkatraz',
@@ -988,3 +1001,195 @@ ACCELERATORS = {
         0     # Zero flag is reset upon edge detection by AND $40
     ),
 }
+
+# Instructions (other than INC B, DEC B, IN A,($FE) and conditional jumps on
+# the zero flag) that may appear in a tape-sampling loop, with their lengths, T-states, R register
+# increments and whether they affect the zero flag
+LOOP_OPS = {
+    0x00: (1, 4, 1, 0),  # NOP
+    0x07: (1, 4, 1, 0),  # RLCA
+    0x0F: (1, 4, 1, 0),  # RRCA
+    0x17: (1, 4, 1, 0),  # RLA
+    0x1F: (1, 4, 1, 0),  # RRA
+    0x2F: (1, 4, 1, 0),  # CPL
+    0x37: (1, 4, 1, 0),  # SCF
+    0x3A: (3, 13, 1, 0), # LD A,(nn)
+    0x3E: (2, 7, 1, 0),  # LD A,n
+    0x3F: (1, 4, 1, 0),  # CCF
+    0x7F: (1, 4, 1, 0),  # LD A,A
+    0xA7: (1, 4, 1, 1),  # AND A
+    0xA9: (1, 4, 1, 1),  # XOR C
+    0xAF: (1, 4, 1, 1),  # XOR A
+    0xB7: (1, 4, 1, 1),  # OR A
+    0xC6: (2, 7, 1, 1),  # ADD A,n
+    0xD6: (2, 7, 1, 1),  # SUB n
+    0xE6: (2, 7, 1, 1),  # AND n
+    0xEE: (2, 7, 1, 1),  # XOR n
+    0xF6: (2, 7, 1, 1),  # OR n
+    0xFE: (2, 7, 1, 1),  # CP n
+    0x30: (2, 7, 1, 0),  # JR NC,e (not taken)
+    0x38: (2, 7, 1, 0),  # JR C,e (not taken)
+}
+for _op in range(0xD0, 0x100, 8):
+    LOOP_OPS[_op + 2] = (3, 10, 1, 0) # JP cc,nn (not taken)
+for _op in range(0xC0, 0x100, 8):
+    LOOP_OPS[_op] = (1, 5, 1, 0) # RET cc (not taken)
+
+# CB-prefixed rotations and shifts of the A register
+CB_LOOP_OPS = {op: (2, 8, 2, 1) for op in range(0x07, 0x40, 8)}
+
+# Conditional jumps on the zero flag: (length, condition is NZ, T-states if
+# taken, T-states if not taken)
+JUMPS = {
+    0x20: (2, 1, 12, 7),  # JR NZ,e
+    0x28: (2, 0, 12, 7),  # JR Z,e
+    0xC2: (3, 1, 10, 10), # JP NZ,nn
+    0xCA: (3, 0, 10, 10)  # JP Z,nn
+}
+
+# Maximum length of a tape-sampling loop that can be fingerprinted
+MAX_LOOP_SIZE = 32
+
+def _jump_target(memory, addr, length):
+    if length == 2:
+        return (addr + 2 + (memory[addr + 1] ^ 128) - 128) % 65536
+    return memory[addr + 1] + 256 * memory[addr + 2]
+
+def _decode(memory, addr):
+    op = memory[addr]
+    if op == 0xCB:
+        return CB_LOOP_OPS.get(memory[addr + 1])
+    return LOOP_OPS.get(op)
+
+def fingerprint(memory, addr):
+    """Examine the code around an 'IN A,($FE)' instruction and build an
+    accelerator for the tape-sampling loop that contains it.
+
+    :param memory: The memory.
+    :param addr: The address of the 'IN A,($FE)' instruction.
+    :return: A 2-tuple containing the address of the INC B or DEC B
+             instruction in the loop and an `Accelerator`, or `None` if the
+             instruction is not part of a recognisable tape-sampling loop.
+    """
+    if not MAX_LOOP_SIZE <= addr <= 65536 - MAX_LOOP_SIZE or memory[addr] != 0xDB or memory[addr + 1] != 0xFE:
+        return None
+
+    # Follow the code from 'IN A,($FE)' to the jump back to the start of the
+    # loop, noting the T-states and the final zero flag-affecting instruction
+    a = addr + 2
+    post_time = post_r = 0
+    xor_c = False
+    ear_mask = 0
+    while a < addr + MAX_LOOP_SIZE:
+        op = memory[a]
+        if op in JUMPS:
+            length, polarity, t_taken = JUMPS[op][:3]
+            start = _jump_target(memory, a, length)
+            if not addr - MAX_LOOP_SIZE < start < addr:
+                return None
+            end = a + length
+            post_time += t_taken
+            post_r += 1
+            break
+        info = _decode(memory, a)
+        if info is None:
+            return None
+        length, tstates, r_inc, z_flag = info
+        if z_flag:
+            if op == 0xE6:
+                ear_mask = memory[a + 1] if xor_c else 0
+            else:
+                ear_mask = 0
+                xor_c = xor_c or op == 0xA9
+        post_time += tstates
+        post_r += r_inc
+        a += length
+    else:
+        return None
+    if ear_mask == 0:
+        return None
+
+    # Follow the code from the start of the loop to 'IN A,($FE)', locating the
+    # INC B or DEC B instruction on the way
+    a = start
+    pre_time = pre_r = 0
+    counter = counter_time = None
+    while a != addr:
+        if a > addr:
+            return None
+        op = memory[a]
+        if op in (0x04, 0x05):
+            if counter is not None:
+                return None
+            counter = a
+            counter_time = pre_time
+            length, tstates, r_inc = 1, 4, 1
+        elif op in JUMPS:
+            # A conditional jump immediately after INC B or DEC B is taken
+            # (JR NZ/JP NZ) or not taken (JR Z/JP Z) while B is non-zero
+            if counter is None or a != counter + 1:
+                return None
+            length, nz, t_taken, t_not_taken = JUMPS[op]
+            if nz:
+                pre_time += t_taken
+                pre_r += 1
+                a = _jump_target(memory, a, length)
+                if a < counter:
+                    return None
+                continue
+            tstates, r_inc = t_not_taken, 1
+        else:
+            info = _decode(memory, a)
+            if info is None:
+                return None
+            length, tstates, r_inc = info[:3]
+        pre_time += tstates
+        pre_r += r_inc
+        a += length
+    if counter is None:
+        return None
+
+    code = [memory[i] for i in range(start, end)]
+    name = 'learned-{:08x}'.format(zlib.crc32(bytes(code)))
+    return counter, Accelerator(name, code, counter - start, pre_time - counter_time,
+                                pre_time + 11 + post_time, pre_r + 1 + post_r, ear_mask, polarity)
+
+def read_accelerators(fname):
+    """Read accelerators from a file.
+
+    :param fname: The file name.
+    :return: A dictionary of `Accelerator` objects keyed by name.
+    """
+    accelerators = {}
+    with open_file(fname) as f:
+        try:
+            data = json.load(f)
+            for acc in data['accelerators']:
+                code = [None if b == '--' else int(b, 16) for b in acc['code'].split()]
+                accelerators[acc['name']] = Accelerator(acc['name'], code, acc['offset'],
+                    acc['in_time'], acc['loop_time'], acc['loop_r_inc'], acc['ear_mask'], acc['polarity'])
+        except (ValueError, KeyError, TypeError, IndexError):
+            raise SkoolKitError(f'{fname}: invalid accelerator file')
+    return accelerators
+
+def write_accelerators(fname, accelerators):
+    """Write accelerators to a file.
+
+    :param fname: The file name.
+    :param accelerators: An iterable of `Accelerator` objects.
+    """
+    data = {'accelerators': []}
+    for acc in sorted(accelerators, key=lambda a: a.name):
+        data['accelerators'].append({
+            'name': acc.name,
+            'code': ' '.join('--' if b is None else f'{b:02X}' for b in acc.full_code()),
+            'offset': acc.offset(),
+            'in_time': acc.in_time,
+            'loop_time': acc.loop_time,
+            'loop_r_inc': acc.loop_r_inc,
+            'ear_mask': acc.ear_mask,
+            'polarity': acc.polarity
+        })
+    with open(fname, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
@@ -15,12 +15,17 @@
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
 import array
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
+import csv
 from functools import partial
+import json
+import time
 
 from skoolkit import SkoolKitError, write, write_line
 from skoolkit.basic import TextReader
-from skoolkit.pagingtracer import PagingTracer
+from skoolkit.loadsample import fingerprint
+from skoolkit.pagingtracer import Memory, PagingTracer
 from skoolkit.simulator import R1
 from skoolkit.simutils import A, D, E, F, H, L, IXh, IXl, R, SP, PC, T, IFF
 from skoolkit.traceutils import Registers, disassemble
@@ -48,13 +53,202 @@ INC = tuple(tuple((
     ) for c in (0, 1)
 )
 
+# Tape edge segment types
+TONE = 0
+PULSES = 1
+DATA = 2
+
+# Number of data bytes between timestamp checkpoints in a data segment
+CHECKPOINT = 256
+
+# Maximum number of edge timestamps in a tone or pulse sequence that are
+# expanded into a flat list at a time
+CHUNK = 4096
+
+POPCOUNT = bytes(bin(b).count('1') for b in range(256))
+
+# Maximum number of T-states (5 frames) that turbo mode waits for the CPU to
+# return to the same state before giving up on a loop
+TURBO_WINDOW = 349440
+
+class TapeEdges:
+    """The timestamps of the edges on a tape, stored as a list of segments
+    (tones, pulse sequences and data runs) instead of one timestamp per edge.
+
+    Each segment is a tuple of the form `(first, last, t0, kind, a, b, c,
+    d)`, where `first` and `last` are the indexes of its first and last
+    edges, and `t0` is the timestamp of the edge before it. For a tone, `a` is
+    the pulse length; for a pulse sequence, `a` is the offset of its edge
+    timestamps in `times`; for a data run, `a` is the offset of its bytes in
+    `data`, `b` is the offset of its timestamps in `checkpoints`, and `c` and
+    `d` are the lengths of the pulses in a zero bit and a one bit.
+
+    :param first_edge: The timestamp of the first edge.
+    """
+    def __init__(self, first_edge):
+        self.segments = []
+        self.table = array.array('Q')
+        self.firsts = []
+        self.ends = []
+        self.times = array.array('Q')
+        self.data = bytearray()
+        self.checkpoints = array.array('Q')
+        self.length = 0
+        self.tstates = first_edge
+        self.add_pulses((0,))
+        self._chunk = (0, ())
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        c0, times = self._chunk
+        if not 0 <= index - c0 < len(times):
+            if not 0 <= index < self.length:
+                raise IndexError('edge index out of range')
+            c0, times = self._expand(index)
+        return times[index - c0]
+
+    def _expand(self, index):
+        # Expand the timestamps of the run of edges (up to CHUNK of them, or
+        # CHECKPOINT bytes of a data segment) that contains edge 'index' into
+        # a flat list, and return its first index and the list
+        first, last, t0, kind, a, b, zero, one = self.segment(index)
+        n = index - first
+        if kind == DATA:
+            m0 = n // 16 - n // 16 % CHECKPOINT
+            c0 = first + 16 * m0
+            tstates = self.checkpoints[b + m0 // CHECKPOINT]
+            times = []
+            for value in self.data[a + m0:a + min(m0 + CHECKPOINT, (last - first) // 16 + 1)]:
+                for k in range(8):
+                    p = one if value & (0x80 >> k) else zero
+                    times.append(tstates + p)
+                    tstates += 2 * p
+                    times.append(tstates)
+            del times[last + 1 - c0:]
+        else:
+            c0 = index - n % CHUNK
+            c1 = min(c0 + CHUNK, last + 1)
+            if kind == TONE:
+                times = [t0 + (i + 1) * a for i in range(c0 - first, c1 - first)]
+            else:
+                times = self.times[a + c0 - first:a + c1 - first]
+        self._chunk = (c0, times)
+        return c0, times
+
+    def _add(self, length, kind, a=0, b=0, c=0, d=0, tstates=0):
+        if length:
+            segment = (self.length, self.length + length - 1, self.tstates, kind, a, b, c, d)
+            self.segments.append(segment)
+            self.table.extend(segment)
+            self.firsts.append(self.length)
+            self.ends.append(tstates)
+            self.length += length
+            self.tstates = tstates
+
+    def segment(self, index):
+        """Return the segment that contains an edge.
+
+        :param index: The edge index.
+        """
+        return self.segments[bisect_right(self.firsts, index) - 1]
+
+    def add_tone(self, count, length):
+        """Add a tone.
+
+        :param count: The number of pulses.
+        :param length: The length of each pulse (in T-states).
+        """
+        self._add(count, TONE, length, tstates=self.tstates + count * length)
+
+    def add_pulses(self, pulses):
+        """Add a sequence of pulses.
+
+        :param pulses: The pulse lengths (in T-states).
+        """
+        offset = len(self.times)
+        tstates = self.tstates
+        for p in pulses:
+            tstates += p
+            self.times.append(tstates)
+        self._add(len(self.times) - offset, PULSES, offset, tstates=tstates)
+
+    def add_data(self, data, used_bits, zero, one):
+        """Add a run of data bits.
+
+        :param data: The data bytes.
+        :param used_bits: The number of bits used in the last byte.
+        :param zero: The length of each pulse in a zero bit (in T-states).
+        :param one: The length of each pulse in a one bit (in T-states).
+        :return: The number of edges added.
+        """
+        num_bits = 8 * (len(data) - 1) + used_bits
+        offset = len(self.data)
+        checkpoint = len(self.checkpoints)
+        tstates = self.tstates
+        for i in range(0, len(data), CHECKPOINT):
+            self.checkpoints.append(tstates)
+            chunk = bytes(data[i:i + CHECKPOINT])
+            ones = sum(chunk.translate(POPCOUNT))
+            tstates += 2 * (8 * len(chunk) * zero + ones * (one - zero))
+        if used_bits < 8:
+            # Discount the unused bits of the last byte
+            value = data[-1] & (0xFF >> used_bits)
+            unused = 8 - used_bits
+            tstates -= 2 * (unused * zero + POPCOUNT[value] * (one - zero))
+        self.data.extend(data)
+        self._add(2 * num_bits, DATA, offset, checkpoint, zero, one, tstates)
+        return 2 * num_bits
+
+    def add_pause(self, length):
+        """Add a pause (a period with no edges).
+
+        :param length: The length of the pause (in T-states).
+        """
+        self.tstates += length
+
+    def find(self, tstates, index):
+        """Return the index of the last edge that occurs before a given time,
+        or the given edge index if that is greater.
+
+        :param tstates: The time.
+        :param index: The edge index.
+        """
+        c0, times = self._chunk
+        i = index + 1 - c0
+        if not 0 <= i < len(times):
+            if index + 1 >= self.length:
+                return index
+            c0, times = self._expand(index + 1)
+            i = index + 1 - c0
+        if times[i] >= tstates:
+            return index
+        i = bisect_left(times, tstates, i)
+        if i < len(times):
+            return c0 + i - 1
+        i = bisect_left(self.ends, tstates)
+        if i == len(self.ends):
+            return self.length - 1
+        first, last, t0, kind, a, b = self.segments[i][:6]
+        if kind == TONE:
+            if a:
+                return max(index, first - 1, first + (tstates - t0 - 1) // a - 1)
+            return max(index, first - 1)
+        if kind == PULSES:
+            return max(index, first + bisect_left(self.times, tstates, a, a + last - first + 1) - a - 1)
+        k = bisect_left(self.checkpoints, tstates, b, b + (last - first) // (16 * CHECKPOINT) + 1) - b - 1
+        c0, times = self._expand(max(first, first + 16 * CHECKPOINT * k))
+        return max(index, c0 + bisect_left(times, tstates) - 1)
+
 def get_edges(blocks, first_edge, polarity, analyse=False):
-    edges = [first_edge]
+    edges = TapeEdges(first_edge)
     if polarity % 2:
-        edges.append(first_edge)
+        edges.add_pulses((0,))
     indexes = []
     data_blocks = []
-    tstates = first_edge
 
     if analyse:
         print('T-states    EAR  Description')
@@ -63,18 +257,19 @@ def get_edges(blocks, first_edge, polarity, analyse=False):
         # Pilot tone
         if analyse and timings.pilot_len:
             ear = (len(edges) - 1) % 2
-            print(f'{tstates:>10}  {ear:>3}  Tone ({timings.pilot_len} x {timings.pilot} T-states)')
-        for n in range(timings.pilot_len):
-            tstates += timings.pilot
-            edges.append(tstates)
+            print(f'{edges.tstates:>10}  {ear:>3}  Tone ({timings.pilot_len} x {timings.pilot} T-states)')
+        edges.add_tone(timings.pilot_len, timings.pilot)
 
         # Sync pulses / Pulse Sequence / Direct Recording
-        for s in timings.sync or timings.pulses:
-            if analyse:
-                ear = (len(edges) - 1) % 2
+        pulses = timings.sync or timings.pulses
+        if analyse:
+            tstates = edges.tstates
+            ear = (len(edges) - 1) % 2
+            for s in pulses:
                 print(f'{tstates:>10}  {ear:>3}  Pulse ({s} T-states)')
-            tstates += s
-            edges.append(tstates)
+                tstates += s
+                ear ^= 1
+        edges.add_pulses(pulses)
 
         # Data
         if data:
@@ -86,22 +281,9 @@ def get_edges(blocks, first_edge, polarity, analyse=False):
                     bits = ''
                     data_len = len(data)
                 ear = (len(edges) - 1) % 2
-                print(f'{tstates:>10}  {ear:>3}  Data ({data_len} bytes{bits}; {timings.zero}/{timings.one} T-states)')
+                print(f'{edges.tstates:>10}  {ear:>3}  Data ({data_len} bytes{bits}; {timings.zero}/{timings.one} T-states)')
             start = len(edges) - 1
-            for k, b in enumerate(data, 1):
-                if k < len(data):
-                    num_bits = 8
-                else:
-                    num_bits = timings.used_bits
-                for j in range(num_bits):
-                    if b & 0x80:
-                        duration = timings.one
-                    else:
-                        duration = timings.zero
-                    for k in range(2):
-                        tstates += duration
-                        edges.append(tstates)
-                    b *= 2
+            edges.add_data(data, timings.used_bits, timings.zero, timings.one)
             indexes.append((start, len(edges) - 1))
             data_blocks.append(data)
         elif i == len(blocks) - 1 or timings.pulses: # pragma: no cover
@@ -115,14 +297,91 @@ def get_edges(blocks, first_edge, polarity, analyse=False):
         if i + 1 < len(blocks) and timings.pause:
             if analyse:
                 ear = (len(edges) - 1) % 2
-                print(f'{tstates:>10}  {ear:>3}  Pause ({timings.pause} T-states)')
-            tstates += timings.pause
+                print(f'{edges.tstates:>10}  {ear:>3}  Pause ({timings.pause} T-states)')
+            edges.add_pause(timings.pause)
 
     return edges, indexes, data_blocks
 
+# Columns in a load timeline
+TIMELINE_FIELDS = ('block', 'length', 'start', 'end', 'tstates', 'seconds', 'instructions',
+                   'fast_load', 'acc_hits', 'acc_misses', 'rom_tstates', 'ram_tstates', 'complete')
+
+class LoadTimeline:
+    """Records how long each block on the tape takes to load.
+
+    :param blocks: The data blocks on the tape.
+    :param state: The load tracer's state array.
+    :param tstates: The current time (in T-states).
+    """
+    def __init__(self, blocks, state, tstates):
+        self.blocks = blocks
+        self.state = state
+        self.entries = []
+        self._start(0, tstates)
+
+    def _start(self, index, tstates):
+        state = self.state
+        self.index = index
+        self.t0 = self.last_read = tstates
+        self.time0 = time.perf_counter()
+        self.instructions = state[10]
+        self.acc_hits = state[11]
+        self.acc_misses = state[12]
+        self.fast_load = False
+        self.rom_tstates = self.ram_tstates = 0
+
+    def read(self, pc, tstates):
+        # Charge the time since the previous tape read to the loader (in ROM
+        # or RAM) that is reading the tape now
+        if pc < 0x4000:
+            self.rom_tstates += tstates - self.last_read
+        else:
+            self.ram_tstates += tstates - self.last_read
+        self.last_read = tstates
+
+    def end_block(self, index, tstates, complete=True):
+        if self.index < len(self.blocks):
+            state = self.state
+            self.entries.append({
+                'block': self.index + 1,
+                'length': len(self.blocks[self.index]),
+                'start': self.t0,
+                'end': tstates,
+                'tstates': tstates - self.t0,
+                'seconds': round(time.perf_counter() - self.time0, 6),
+                'instructions': state[10] - self.instructions,
+                'fast_load': self.fast_load,
+                'acc_hits': state[11] - self.acc_hits,
+                'acc_misses': state[12] - self.acc_misses,
+                'rom_tstates': self.rom_tstates,
+                'ram_tstates': self.ram_tstates,
+                'complete': complete
+            })
+            self._start(index, tstates)
+
+    def write(self, fname, tstates):
+        """Write the timeline to a file. If the current block has not
+        finished loading, it is included but marked as incomplete.
+
+        :param fname: The file name. If it ends with '.csv', the timeline is
+                      written in CSV format; otherwise it is written in JSON
+                      format.
+        :param tstates: The current time (in T-states).
+        """
+        self.end_block(len(self.blocks), tstates, False)
+        with open(fname, 'w', newline='') as f:
+            if fname.lower().endswith('.csv'):
+                writer = csv.DictWriter(f, TIMELINE_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.entries)
+            else:
+                json.dump({'blocks': self.entries}, f, indent=2)
+                f.write('\n')
+
 class LoadTracer(PagingTracer):
     def __init__(self, simulator, blocks, accelerators, pause, first_edge, polarity,
-                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe):
+                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe,
+                 learn=False, timeline=False, turbo=False):
         self.acc_usage = defaultdict(int)
         self.inc_b_misses = 0
         self.dec_b_misses = 0
@@ -135,6 +394,9 @@ class LoadTracer(PagingTracer):
         self.in_min_addr = in_min_addr
         self.announce_data = True
         self.accelerators = accelerators
+        self.learn = learn
+        self.learned = []
+        self.fingerprinted = set()
         if hasattr(simulator, 'opcodes'):
             opcodes = simulator.opcodes
             memory = simulator.memory
@@ -145,30 +407,14 @@ class LoadTracer(PagingTracer):
                 opcodes[0x3D] = partial(self.dec_a_jr, registers, memory)
             elif accel_dec_a == 2:
                 opcodes[0x3D] = partial(self.dec_a_jp, registers, memory)
-            if accelerators:
-                inc_b_acc = []
-                dec_b_acc = []
-                for accelerator in accelerators:
-                    if accelerator.opcode == 0x04:
-                        inc_b_acc.append(accelerator)
-                    else:
-                        dec_b_acc.append(accelerator)
-                if list_accelerators:
-                    opcodes[0x04] = partial(self.list_accelerators, registers, memory, inc_b_acc, self.inc_b_auto, 0x04)
-                    opcodes[0x05] = partial(self.list_accelerators, registers, memory, dec_b_acc, self.dec_b_auto, 0x05)
+            self.inc_b_acc = []
+            self.dec_b_acc = []
+            for accelerator in accelerators:
+                if accelerator.opcode == 0x04:
+                    self.inc_b_acc.append(accelerator)
                 else:
-                    if len(inc_b_acc) == 1:
-                        accelerator = inc_b_acc[0]
-                        if None in accelerator.code:
-                            opcodes[0x04] = partial(self.inc_b_none, registers, memory, accelerator)
-                        else:
-                            opcodes[0x04] = partial(self.inc_b, registers, memory, accelerator)
-                    elif inc_b_acc:
-                        opcodes[0x04] = partial(self.inc_b_auto, registers, memory, inc_b_acc)
-                    if len(dec_b_acc) == 1:
-                        opcodes[0x05] = partial(self.dec_b, registers, memory, dec_b_acc[0])
-                    elif dec_b_acc:
-                        opcodes[0x05] = partial(self.dec_b_auto, registers, memory, dec_b_acc)
+                    self.dec_b_acc.append(accelerator)
+            self._set_tsl_accelerators(list_accelerators)
         self.block_index = 0
         self.block_data_index = self.indexes[0][0]
         self.max_index = len(self.edges) - 1
@@ -191,12 +437,46 @@ class LoadTracer(PagingTracer):
             list_accelerators,  # state[6]
             0,                  # state[7]: custom loader detected
             0,                  # state[8]: tape end time
+            0,                  # state[9]: accelerator learned
+            0,                  # state[10]: instructions executed (if timeline is set)
+            0,                  # state[11]: accelerator hits
+            0,                  # state[12]: accelerator misses
+            int(turbo),         # state[13]: turbo mode
+            0,                  # state[14]: T-states skipped by turbo mode
+            int(timeline),      # state[15]: timeline recording
         ]
         if hasattr(simulator, 'load'): # pragma: no cover
-            self.edges = array.array('Q', self.edges)
             self.state = array.array('Q', self.state)
+        if timeline:
+            self.timeline = LoadTimeline(self.blocks, self.state, simulator.registers[T])
+        else:
+            self.timeline = None
         self.read_port = partial(self._read_port, self.state)
 
+    def _set_tsl_accelerators(self, list_accelerators):
+        opcodes = self.simulator.opcodes
+        memory = self.simulator.memory
+        registers = self.simulator.registers
+        inc_b_acc = self.inc_b_acc
+        dec_b_acc = self.dec_b_acc
+        if list_accelerators:
+            if inc_b_acc or dec_b_acc:
+                opcodes[0x04] = partial(self.list_accelerators, registers, memory, inc_b_acc, self.inc_b_auto, 0x04)
+                opcodes[0x05] = partial(self.list_accelerators, registers, memory, dec_b_acc, self.dec_b_auto, 0x05)
+        else:
+            if len(inc_b_acc) == 1:
+                accelerator = inc_b_acc[0]
+                if None in accelerator.code:
+                    opcodes[0x04] = partial(self.inc_b_none, registers, memory, accelerator)
+                else:
+                    opcodes[0x04] = partial(self.inc_b, registers, memory, accelerator)
+            elif inc_b_acc:
+                opcodes[0x04] = partial(self.inc_b_auto, registers, memory, inc_b_acc)
+            if len(dec_b_acc) == 1:
+                opcodes[0x05] = partial(self.dec_b, registers, memory, dec_b_acc[0])
+            elif dec_b_acc:
+                opcodes[0x05] = partial(self.dec_b_auto, registers, memory, dec_b_acc)
+
     def run(self, stop, fast_load, finish_tape, timeout, tracefile, trace_line, prefix, byte_fmt, word_fmt):
         simulator = self.simulator
         memory = simulator.memory
@@ -211,7 +491,12 @@ class LoadTracer(PagingTracer):
             else:
                 df = tf = None
             ppf = lambda p: write(f'[{p/10:5.1f}%]\x08\x08\x08\x08\x08\x08\x08\x08')
-            stop_cond = simulator.load(stop, fast_load, finish_tape, timeout, ppf, df, tf)
+            while True:
+                stop_cond = simulator.load(stop, fast_load, finish_tape, timeout, ppf, df, tf)
+                if stop_cond != 5:
+                    break
+                # An accelerator was learned, so resume the simulation with it
+                self.state[9] = 0
             pc = registers[24]
         else:
             opcodes = simulator.opcodes
@@ -224,6 +509,9 @@ class LoadTracer(PagingTracer):
             max_index = self.max_index
             tstates = registers[25]
             state = self.state
+            turbo = state[13]
+            timeline = state[15]
+            snapshot = [-1, 0]
             while True:
                 t0 = tstates
                 if tracefile:
@@ -233,16 +521,15 @@ class LoadTracer(PagingTracer):
                 else:
                     opcodes[memory[pc]]()
                 tstates = registers[25]
+                if timeline:
+                    state[10] += 1
 
                 if registers[26] and tstates % frame_duration < int_active:
                     simulator.accept_interrupt(registers, memory, pc)
                     tstates = registers[25]
 
                 if state[4] and tstates >= state[0]:
-                    index = state[1]
-                    while index < max_index and edges[index + 1] < tstates:
-                        index += 1
-                    state[1] = index
+                    index = state[1] = edges.find(tstates, state[1])
                     if index == max_index:
                         # Allow 1ms for the final edge on the tape to be read
                         if tstates - edges[index] > 3500:
@@ -260,6 +547,13 @@ class LoadTracer(PagingTracer):
 
                 pc = registers[24]
 
+                if turbo and state[4] and not registers[26]:
+                    if pc == snapshot[0]:
+                        if self._turbo(registers, snapshot):
+                            tstates = registers[25]
+                    elif tstates > snapshot[1]:
+                        snapshot = self._snapshot(registers)
+
                 if pc == stop and (state[2] or not finish_tape):
                     stop_cond = 0
                     break
@@ -369,14 +663,18 @@ class LoadTracer(PagingTracer):
         b = registers[2]
         loops = 0
         pcn = registers[24] + 1
-        if self.state[4] and registers[26] == 0 and memory[pcn - acc.c0:pcn + acc.c1] == acc.code:
-            if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
-                delta = self.state[0] - registers[25] - acc.in_time
-                if delta > 0:
-                    loops = min(delta // acc.loop_time + 1, (b - 1) % 256)
-                    if loops:
-                        # The carry flag is cleared on each loop iteration
-                        registers[1] &= 0xFE
+        if self.state[4] and registers[26] == 0:
+            if memory[pcn - acc.c0:pcn + acc.c1] == acc.code:
+                self.state[11] += 1
+                if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
+                    delta = self.state[0] - registers[25] - acc.in_time
+                    if delta > 0:
+                        loops = min(delta // acc.loop_time + 1, (b - 1) % 256)
+                        if loops:
+                            # The carry flag is cleared on each loop iteration
+                            registers[1] &= 0xFE
+            else:
+                self.state[12] += 1
         registers[2], registers[1] = DEC[registers[1] % 2][(b - loops) % 256]
         r = registers[15]
         registers[15] = (r & 0x80) + ((r + acc.loop_r_inc * loops + 1) % 0x80)
@@ -392,6 +690,7 @@ class LoadTracer(PagingTracer):
             loops = 0
             for i, acc in enumerate(accelerators):
                 if memory[pcn - acc.c0:pcn + acc.c1] == acc.code:
+                    self.state[11] += 1
                     if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
                         delta = self.state[0] - registers[25] - acc.in_time
                         if delta > 0:
@@ -410,6 +709,7 @@ class LoadTracer(PagingTracer):
                     registers[25] += acc.loop_time * loops + 4
                     registers[24] = pcn % 65536
                     return
+            self.state[12] += 1
         registers[2], registers[1] = DEC[registers[1] % 2][b]
         registers[15] = R1[registers[15]]
         registers[25] += 4
@@ -420,14 +720,18 @@ class LoadTracer(PagingTracer):
         b = registers[2]
         loops = 0
         pcn = registers[24] + 1
-        if self.state[4] and registers[26] == 0 and memory[pcn - acc.c0:pcn + acc.c1] == acc.code:
-            if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
-                delta = self.state[0] - registers[25] - acc.in_time
-                if delta > 0:
-                    loops = min(delta // acc.loop_time + 1, 255 - b)
-                    if loops:
-                        # The carry flag is cleared on each loop iteration
-                        registers[1] &= 0xFE
+        if self.state[4] and registers[26] == 0:
+            if memory[pcn - acc.c0:pcn + acc.c1] == acc.code:
+                self.state[11] += 1
+                if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
+                    delta = self.state[0] - registers[25] - acc.in_time
+                    if delta > 0:
+                        loops = min(delta // acc.loop_time + 1, 255 - b)
+                        if loops:
+                            # The carry flag is cleared on each loop iteration
+                            registers[1] &= 0xFE
+            else:
+                self.state[12] += 1
         registers[2], registers[1] = INC[registers[1] % 2][b + loops]
         r = registers[15]
         registers[15] = (r & 0x80) + ((r + acc.loop_r_inc * loops + 1) % 0x80)
@@ -439,14 +743,18 @@ class LoadTracer(PagingTracer):
         b = registers[2]
         loops = 0
         pcn = registers[24] + 1
-        if self.state[4] and registers[26] == 0 and all(x == y or y is None for x, y in zip(memory[pcn - acc.c0:pcn + acc.c1], acc.code)):
-            if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
-                delta = self.state[0] - registers[25] - acc.in_time
-                if delta > 0:
-                    loops = min(delta // acc.loop_time + 1, 255 - b)
-                    if loops:
-                        # The carry flag is cleared on each loop iteration
-                        registers[1] &= 0xFE
+        if self.state[4] and registers[26] == 0:
+            if all(x == y or y is None for x, y in zip(memory[pcn - acc.c0:pcn + acc.c1], acc.code)):
+                self.state[11] += 1
+                if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
+                    delta = self.state[0] - registers[25] - acc.in_time
+                    if delta > 0:
+                        loops = min(delta // acc.loop_time + 1, 255 - b)
+                        if loops:
+                            # The carry flag is cleared on each loop iteration
+                            registers[1] &= 0xFE
+            else:
+                self.state[12] += 1
         registers[2], registers[1] = INC[registers[1] % 2][b + loops]
         r = registers[15]
         registers[15] = (r & 0x80) + ((r + acc.loop_r_inc * loops + 1) % 0x80)
@@ -462,6 +770,7 @@ class LoadTracer(PagingTracer):
             loops = 0
             for i, acc in enumerate(accelerators):
                 if all(x == y or y is None for x, y in zip(memory[pcn - acc.c0:pcn + acc.c1], acc.code)):
+                    self.state[11] += 1
                     if registers[3] & acc.ear_mask == ((self.state[1] - acc.polarity) % 2) * acc.ear_mask:
                         delta = self.state[0] - registers[25] - acc.in_time
                         if delta > 0:
@@ -480,6 +789,7 @@ class LoadTracer(PagingTracer):
                     registers[25] += acc.loop_time * loops + 4
                     registers[24] = pcn % 65536
                     return
+            self.state[12] += 1
         registers[2], registers[1] = INC[registers[1] % 2][b]
         registers[15] = R1[registers[15]]
         registers[25] += 4
@@ -522,6 +832,11 @@ class LoadTracer(PagingTracer):
                 elif index == self.max_index:
                     # Final edge, so stop the tape
                     self.stop_tape(registers[T])
+                if self.timeline:
+                    self.timeline.read(pc, registers[T])
+                if self.learn and state[4] and pc not in self.fingerprinted:
+                    self.fingerprinted.add(pc)
+                    self.learn_accelerator(pc)
                 if index % 2 == 0:
                     return 191
         elif port == 0xFFFD: # pragma: no cover
@@ -536,7 +851,87 @@ class LoadTracer(PagingTracer):
             return self.ay[ay_reg]
         return 255
 
+    def learn_accelerator(self, pc):
+        # Build an accelerator for the tape-sampling loop containing the
+        # 'IN A,($FE)' instruction at pc, unless it is already accelerated
+        memory = self.simulator.memory
+        loop = fingerprint(memory, pc)
+        if loop:
+            addr, acc = loop
+            pcn = addr + 1
+            for a in self.accelerators:
+                if a.opcode == acc.opcode and all(x == y or y is None for x, y in zip(memory[pcn - a.c0:pcn + a.c1], a.code)):
+                    return
+            self.learned.append(acc)
+            self.accelerators.add(acc)
+            if hasattr(self.simulator, 'opcodes'):
+                if acc.opcode == 0x04:
+                    self.inc_b_acc.insert(0, acc)
+                else:
+                    self.dec_b_acc.insert(0, acc)
+                self._set_tsl_accelerators(self.state[6])
+            else: # pragma: no cover
+                self.state[9] = 1 # Signal: accelerator learned
+
+    def _ram(self):
+        memory = self.simulator.memory
+        if isinstance(memory, Memory):
+            return [bank[:] for bank in memory.banks] + [self.out7ffd]
+        return memory[0x4000:]
+
+    def _snapshot(self, registers):
+        regs = registers[:]
+        regs[R] = regs[T] = 0
+        return [registers[PC], registers[T] + TURBO_WINDOW, regs, registers[T], registers[R], self.state[1], self._ram()]
+
+    def _turbo(self, registers, snapshot):
+        # The CPU is back at the address where the snapshot was taken. If every
+        # register except R is the same as it was then, and interrupts are
+        # disabled, and memory is unchanged, the CPU is in a loop whose
+        # behaviour depends only on the tape. So if the tape is silent or
+        # playing a tone until well after the next iteration, skip as many
+        # iterations as possible, with the corresponding number of pulses, and
+        # adjust R accordingly.
+        regs = registers[:]
+        regs[R] = regs[T] = 0
+        if regs != snapshot[2]:
+            return False
+        if self._ram() != snapshot[6]:
+            # The loop writes to memory, so its iterations cannot be skipped;
+            # ignore it until the snapshot expires
+            snapshot[0] = -1
+            return False
+        state = self.state
+        tstates = registers[T]
+        index = state[1]
+        period = tstates - snapshot[3]
+        edges = index - snapshot[5]
+        count = 0
+        if edges == 0:
+            if index < self.max_index:
+                # No edges since the snapshot, so skip to the last iteration
+                # before the next edge
+                count = (state[0] - tstates) // period - 1
+        elif edges % 2 == 0:
+            first, last, t0, kind, length = self.edges.segment(snapshot[5] + 1)[:5]
+            if kind == TONE and period == edges * length:
+                # Skip to the last iteration that ends inside the tone
+                count = (last - index - 1) // edges - 1
+        if count < 1:
+            return False
+        r = registers[R]
+        registers[R] = (r & 0x80) + ((r + count * (r - snapshot[4])) & 0x7F)
+        registers[T] = tstates + count * period
+        state[14] += count * period
+        if edges:
+            state[1] = index + count * edges
+            state[0] = self.edges[state[1] + 1]
+        snapshot[:] = self._snapshot(registers)
+        return True
+
     def next_block(self, tstates):
+        if self.timeline:
+            self.timeline.end_block(self.block_index + 1, tstates)
         self.block_index += 1
         if self.block_index >= len(self.blocks):
             self.stop_tape(tstates) # pragma: no cover
@@ -548,6 +943,8 @@ class LoadTracer(PagingTracer):
             self.announce_data = True
 
     def stop_tape(self, tstates):
+        if self.timeline:
+            self.timeline.end_block(len(self.blocks), tstates)
         self.block_index = len(self.blocks)
         self.state[2] += 1 # Signal: end of tape reached
         if self.state[2] == 1:
@@ -645,4 +1042,6 @@ class LoadTracer(PagingTracer):
 
         registers[PC] = 0x05E2
         self.announce_data = False
+        if self.timeline:
+            self.timeline.fast_load = True
         return True
@@ -19,10 +19,17 @@ from skoolkit import ROM128, ROM_PLUS2, read_bin_file
 ROMS = {'128K': ROM128, '+2': ROM_PLUS2}
 
 class Memory:
-    def __init__(self, banks=None, out7ffd=0, machine='128K'):
+    def __init__(self, banks=None, out7ffd=0, machine='128K', dirty=False):
         self.banks = banks or tuple([0] * 16384 for b in range(8))
         self.roms = tuple(list(read_bin_file(r)) for r in ROMS.get(machine, ROM128))
         self.memory = [None, self.banks[5], self.banks[2], None]
+        if dirty:
+            # One flag per 256-byte block of each RAM bank, set when the block
+            # is written (by this object or by a CSimulator)
+            self.dirty = bytearray(512)
+            self.__class__ = DirtyMemory
+        else:
+            self.dirty = None
         self.out7ffd(out7ffd)
         self.machine = machine
 
@@ -42,6 +49,20 @@ class Memory:
         self.memory[3] = self.banks[value % 8]
         self.o7ffd = value
 
+    def dirty_banks(self):
+        if self.dirty:
+            return [b for b in range(8) if any(self.dirty[b * 64:b * 64 + 64])]
+        return list(range(8))
+
+    def dirty_blocks(self, bank):
+        if self.dirty:
+            return [a for a in range(0, 0x4000, 256) if self.dirty[bank * 64 + a // 256]]
+        return list(range(0, 0x4000, 256))
+
+    def clear_dirty(self):
+        if self.dirty:
+            self.dirty[:] = bytes(512)
+
     def convert(self): # pragma: no cover
         # Prepare for use by a CSimulator
         rom_id = (self.o7ffd % 32) // 16
@@ -50,7 +71,17 @@ class Memory:
         self.banks = [bytearray(bank) for bank in self.banks]
         self.memory = [self.roms[rom_id], self.banks[5], self.banks[2], self.banks[page]]
 
+class DirtyMemory(Memory):
+    # A Memory object that maintains its dirty map
+    def __setitem__(self, index, value):
+        self.memory[index // 0x4000][index % 0x4000] = value
+        if index > 0x3FFF:
+            self.dirty[(5 if index < 0x8000 else 2 if index < 0xC000 else self.o7ffd % 8) * 64 + (index % 0x4000) // 256] = 1
+
 class PagingTracer:
+    # An AYLog in which to record AY register writes (if any)
+    ay_log = None
+
     def write_port(self, registers, port, value):
         if port % 2 == 0:
             self.border = value % 8
@@ -64,3 +95,5 @@ class PagingTracer:
             self.outfffd = value
         elif port == 0xBFFD:
             self.ay[self.outfffd % 16] = value
+            if self.ay_log:
+                self.ay_log.write(registers[25], self.outfffd % 16, value)
@@ -0,0 +1,108 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from bisect import bisect_right
+import json
+
+from skoolkit import SkoolKitError, get_int_param, open_file
+from skoolkit.skoolutils import DIRECTIVES, read_skool
+
+# Maximum number of lines in each section of the hot spot report
+REPORT_SIZE = 20
+
+def _read_ctl(f):
+    entries = {}
+    for line in f:
+        if line[:1] in DIRECTIVES:
+            fields = line[1:].split(None, 1)
+            try:
+                address = get_int_param(fields[0])
+            except (IndexError, ValueError):
+                continue
+            entries[address] = fields[1].rstrip() if len(fields) > 1 else ''
+    return entries
+
+def _read_skool(f):
+    entries = {}
+    for non_entry, block in read_skool(f):
+        if not non_entry:
+            title = ''
+            for line in block:
+                if line.startswith(';'):
+                    title = title or line[1:].strip()
+                elif line[0] in DIRECTIVES:
+                    try:
+                        entries[get_int_param(line[1:6].strip())] = title
+                    except ValueError:
+                        pass
+                    break
+    return entries
+
+def get_entries(fname):
+    with open_file(fname) as f:
+        if fname.lower().endswith('.skool'):
+            entries = _read_skool(f)
+        else:
+            entries = _read_ctl(f)
+    if not entries:
+        raise SkoolKitError(f'{fname}: no entries found')
+    return sorted(entries.items())
+
+class Profile:
+    def __init__(self):
+        # Instruction counts and T-states per address
+        self.counts = array('Q', bytes(8 * 65536))
+        self.times = array('Q', bytes(8 * 65536))
+
+    def addresses(self):
+        counts, times = self.counts, self.times
+        return [(a, counts[a], times[a]) for a in range(65536) if counts[a]]
+
+    def routines(self, entries):
+        starts = [e[0] for e in entries]
+        totals = {}
+        for a, count, tstates in self.addresses():
+            index = bisect_right(starts, a) - 1
+            if index >= 0:
+                start = starts[index]
+                c, t = totals.get(start, (0, 0))
+                totals[start] = (c + count, t + tstates)
+        return [(a, title, *totals[a]) for a, title in entries if a in totals]
+
+    def write(self, fname, entries=None):
+        data = {
+            'tstates': sum(self.times),
+            'addresses': [{'address': a, 'count': c, 'tstates': t} for a, c, t in self.addresses()]
+        }
+        if entries:
+            data['routines'] = [{'address': a, 'title': title, 'count': c, 'tstates': t} for a, title, c, t in self.routines(entries)]
+        with open(fname, 'w') as f:
+            json.dump(data, f)
+            f.write('\n')
+
+    def report(self, entries=None, prefix='$', word_fmt='04X'):
+        total = sum(self.times) or 1
+        lines = ['Hot spots (by T-states):', 'Address  Instructions     T-states       %']
+        for a, c, t in sorted(self.addresses(), key=lambda e: (-e[2], e[0]))[:REPORT_SIZE]:
+            addr = f'{prefix}{a:{word_fmt}}'
+            lines.append(f'{addr:<7} {c:>13} {t:>12} {100 * t / total:>7.2f}')
+        if entries:
+            lines.extend(('', 'Routines (by T-states):', 'Address  Instructions     T-states       %  Title'))
+            for a, title, c, t in sorted(self.routines(entries), key=lambda e: (-e[3], e[0]))[:REPORT_SIZE]:
+                addr = f'{prefix}{a:{word_fmt}}'
+                lines.append(f'{addr:<7} {c:>13} {t:>12} {100 * t / total:>7.2f}  {title}'.rstrip())
+        return '\n'.join(lines)
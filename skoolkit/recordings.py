@@ -0,0 +1,190 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from itertools import accumulate, repeat
+from operator import floordiv, mul, sub
+import zlib
+
+from skoolkit import SkoolKitError, get_dword, get_word
+
+CPU_FREQ = 3500000
+
+CSW_SIGNATURE = b'Compressed Square Wave\x1a'
+
+# Number of bytes of a CSW file, or frames of a WAV file, processed at a time
+CHUNK_SIZE = 1 << 20
+
+# Tables for converting the most significant byte of a sample into a signal
+# level (0 or 1)
+UNSIGNED_LEVELS = bytes(b >= 0x80 for b in range(256))
+SIGNED_LEVELS = bytes(b < 0x80 for b in range(256))
+
+def _to_pulses(runs, rate, offset):
+    # Convert a sequence of run lengths (in samples) into pulse lengths (in
+    # T-states), given the number of samples that precede the first run
+    samples = array('Q', accumulate(runs, initial=offset))
+    times = array('Q', map(floordiv, map(mul, samples, repeat(CPU_FREQ)), repeat(rate)))
+    return array('Q', map(sub, times[1:], times)), samples[-1]
+
+def _rle_runs(chunks):
+    # Decode an RLE stream of pulse lengths (in samples) from a sequence of
+    # byte chunks
+    buf = b''
+    for chunk in chunks:
+        buf += chunk
+        runs = array('L')
+        i = 0
+        while True:
+            j = buf.find(b'\x00', i)
+            if j < 0:
+                runs.extend(buf[i:])
+                buf = b''
+                break
+            runs.extend(buf[i:j])
+            if j + 5 > len(buf):
+                # The 32-bit length of this long pulse is in the next chunk
+                buf = buf[j:]
+                break
+            runs.append(get_dword(buf, j + 1))
+            i = j + 5
+        yield runs
+    if buf:
+        raise SkoolKitError('Unexpected end of CSW data')
+
+def _zlib_chunks(data):
+    decompressor = zlib.decompressobj()
+    try:
+        for i in range(0, len(data), CHUNK_SIZE):
+            yield decompressor.decompress(data[i:i + CHUNK_SIZE])
+        yield decompressor.flush()
+    except zlib.error as e:
+        raise SkoolKitError(f'Invalid Z-RLE data: {e}')
+
+def csw_pulses(data):
+    """Read the pulses in a CSW file.
+
+    :param data: The contents of the CSW file (a `bytes` object or buffer).
+    :return: An array of pulse lengths (in T-states). If the recording starts
+             at a high signal level, the first pulse has length 0.
+    """
+    if bytes(data[:23]) != CSW_SIGNATURE or len(data) < 0x20:
+        raise SkoolKitError('Not a CSW file')
+    if data[23] == 1:
+        rate = get_word(data, 0x19)
+        compression = data[0x1B]
+        flags = data[0x1C]
+        start = 0x20
+    elif data[23] == 2:
+        if len(data) < 0x34:
+            raise SkoolKitError('Not a CSW file')
+        rate = get_dword(data, 0x19)
+        compression = data[0x21]
+        flags = data[0x22]
+        start = 0x34 + data[0x23]
+    else:
+        raise SkoolKitError(f'Unsupported CSW version: {data[23]}.{data[24]:02}')
+    if rate == 0:
+        raise SkoolKitError('Invalid CSW sample rate: 0')
+    view = memoryview(data)[start:]
+    if compression == 1:
+        chunks = (bytes(view[i:i + CHUNK_SIZE]) for i in range(0, len(view), CHUNK_SIZE))
+    elif compression == 2:
+        chunks = _zlib_chunks(view)
+    else:
+        raise SkoolKitError(f'Unsupported CSW compression type: {compression}')
+    pulses = array('Q')
+    if flags & 1:
+        pulses.append(0)
+    offset = 0
+    for runs in _rle_runs(chunks):
+        if runs:
+            chunk_pulses, offset = _to_pulses(runs, rate, offset)
+            pulses.extend(chunk_pulses)
+    return pulses
+
+def _wav_format(data):
+    if bytes(data[:4]) != b'RIFF' or bytes(data[8:12]) != b'WAVE':
+        raise SkoolKitError('Not a WAV file')
+    fmt = None
+    i = 12
+    while i + 8 <= len(data):
+        chunk_id = bytes(data[i:i + 4])
+        size = get_dword(data, i + 4)
+        if chunk_id == b'fmt ':
+            fmt = i + 8
+        elif chunk_id == b'data':
+            if fmt is None:
+                break
+            audio_format = get_word(data, fmt)
+            channels = get_word(data, fmt + 2)
+            rate = get_dword(data, fmt + 4)
+            block_align = get_word(data, fmt + 12)
+            bits = get_word(data, fmt + 14)
+            if audio_format not in (1, 3, 0xFFFE) or bits % 8 or not (channels and rate and block_align):
+                raise SkoolKitError('Unsupported WAV format')
+            return rate, block_align, bits // 8, i + 8, min(size, len(data) - i - 8)
+        i += 8 + size + size % 2
+    raise SkoolKitError('Invalid WAV file: no fmt/data chunk found')
+
+def wav_pulses(data):
+    """Read the pulses in a WAV file. Edges are detected wherever the signal
+    in the first channel crosses the midpoint of its range.
+
+    :param data: The contents of the WAV file (a `bytes` object or buffer,
+                 such as an `mmap` object).
+    :return: An array of pulse lengths (in T-states). If the recording starts
+             at a high signal level, the first pulse has length 0.
+    """
+    rate, block_align, sample_size, start, size = _wav_format(data)
+    if sample_size == 1:
+        levels_table = UNSIGNED_LEVELS
+    else:
+        levels_table = SIGNED_LEVELS
+    view = memoryview(data)
+    frames = size // block_align
+    pulses = array('Q')
+    offset = 0
+    level = None
+    run = 0
+    for frame in range(0, frames, CHUNK_SIZE):
+        # Extract the most significant byte of the first channel in each
+        # frame of this chunk, and convert it into a signal level
+        num_frames = min(CHUNK_SIZE, frames - frame)
+        i = start + frame * block_align + sample_size - 1
+        levels = bytes(view[i:i + (num_frames - 1) * block_align + 1:block_align]).translate(levels_table)
+        if level is None:
+            level = levels[0]
+            if level:
+                pulses.append(0)
+        runs = array('L')
+        pos = 0
+        while True:
+            edge = levels.find(b'\x01' if level == 0 else b'\x00', pos)
+            if edge < 0:
+                run += num_frames - pos
+                break
+            runs.append(run + edge - pos)
+            run = 0
+            pos = edge
+            level ^= 1
+        if runs:
+            chunk_pulses, offset = _to_pulses(runs, rate, offset)
+            pulses.extend(chunk_pulses)
+    view.release()
+    if run:
+        pulses.extend(_to_pulses((run,), rate, offset)[0])
+    return pulses
@@ -19,6 +19,7 @@ import os
 import zlib
 
 from skoolkit import VERSION, SkoolKitError, get_dword, get_word, read_bin_file
+from skoolkit.rzxutils import InputRecording
 from skoolkit.snapinfo import get_szx_machine_type, get_z80_machine_type
 from skoolkit.snapshot import Snapshot
 
@@ -96,34 +97,18 @@ def _show_blocks(data, options):
             encrypted = flags % 1
             print('  Encrypted: {}'.format('Yes' if encrypted else 'No'))
             if options.frames and not encrypted:
-                frames = data[i + 18:i + block_len]
-                if flags & 2:
-                    try:
-                        frames = zlib.decompress(frames)
-                    except zlib.error as e:
-                        raise SkoolKitError(f'Failed to decompress input recording block: {e.args[0]}')
-                j = 0
-                pr_str = ''
-                port_readings = ()
-                suffix = ''
-                for k in range(num_frames):
-                    fetch_counter = get_word(frames, j)
-                    in_counter = get_word(frames, j + 2)
+                input_rec = InputRecording(tstates, num_frames, memoryview(data)[i + 18:i + block_len], flags)
+                for k, (fetch_counter, in_counter, port_readings) in enumerate(input_rec.frames()):
                     print(f'  Frame {k}:')
                     print(f'    Fetch counter: {fetch_counter}')
                     if in_counter == 65535:
                         print(f'    IN counter: {in_counter} ({len(port_readings)})')
-                        if pr_str:
-                            print(f'    Port readings: {pr_str}{suffix}')
-                        j += 4
                     else:
                         print(f'    IN counter: {in_counter}')
-                        port_readings = list(frames[j + 4:j + 4 + in_counter])
+                    if port_readings:
                         pr_str = ', '.join(str(b) for b in port_readings[:10])
                         suffix = '...' if len(port_readings) > 10 else ''
-                        if port_readings:
-                            print(f'    Port readings: {pr_str}{suffix}')
-                        j += 4 + in_counter
+                        print(f'    Port readings: {pr_str}{suffix}')
         else:
             print(f'Unknown block ID: 0x{block_id:02X}')
         i += block_len
@@ -15,11 +15,17 @@
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import contextlib
 from functools import partial
+import hashlib
 import io
+from itertools import chain
+import json
 import os
+import queue
 import re
+import threading
 import zlib
 
 with contextlib.redirect_stdout(io.StringIO()) as pygame_io:
@@ -28,85 +34,86 @@ with contextlib.redirect_stdout(io.StringIO()) as pygame_io:
     except ImportError: # pragma: no cover
         pygame = None
 
-from skoolkit import (VERSION, SkoolKitError, CSimulator, get_dword, get_word,
+from skoolkit import (VERSION, SkoolKitError, CSimulator, get_dword,
                       parse_int, read_bin_file, warn, write)
+from skoolkit.components import get_image_writer
+from skoolkit.graphics import Frame, scr_udgs
+from skoolkit.image import PNG_ENABLE_ANIMATION
 from skoolkit.pagingtracer import PagingTracer
+from skoolkit.rzxutils import InputRecording
 from skoolkit.simulator import Simulator
 from skoolkit.simutils import from_snapshot, get_state
 from skoolkit.snapshot import Snapshot, write_snapshot
+from skoolkit.tracefile import RZX, TraceWriter, get_code
 from skoolkit.traceutils import disassemble
 
+PALETTE = (
+    (0x00, 0x00, 0x00), # Black
+    (0x00, 0x00, 0xc5), # Blue
+    (0xc5, 0x00, 0x00), # Red
+    (0xc5, 0x00, 0xc5), # Magenta
+    (0x00, 0xc6, 0x00), # Green
+    (0x00, 0xc6, 0xc5), # Cyan
+    (0xc5, 0xc6, 0x00), # Yellow
+    (0xcd, 0xc6, 0xcd), # White
+    (0x00, 0x00, 0x00), # Bright black
+    (0x00, 0x00, 0xff), # Bright blue
+    (0xff, 0x00, 0x00), # Bright red
+    (0xff, 0x00, 0xff), # Bright magenta
+    (0x00, 0xff, 0x00), # Bright green
+    (0x00, 0xff, 0xff), # Bright cyan
+    (0xff, 0xff, 0x00), # Bright yellow
+    (0xff, 0xff, 0xff), # Bright white
+)
+
 if pygame: # pragma: no cover
-    COLOURS = (
-        pygame.Color(0x00, 0x00, 0x00), # Black
-        pygame.Color(0x00, 0x00, 0xc5), # Blue
-        pygame.Color(0xc5, 0x00, 0x00), # Red
-        pygame.Color(0xc5, 0x00, 0xc5), # Magenta
-        pygame.Color(0x00, 0xc6, 0x00), # Green
-        pygame.Color(0x00, 0xc6, 0xc5), # Cyan
-        pygame.Color(0xc5, 0xc6, 0x00), # Yellow
-        pygame.Color(0xcd, 0xc6, 0xcd), # White
-        pygame.Color(0x00, 0x00, 0x00), # Bright black
-        pygame.Color(0x00, 0x00, 0xff), # Bright blue
-        pygame.Color(0xff, 0x00, 0x00), # Bright red
-        pygame.Color(0xff, 0x00, 0xff), # Bright magenta
-        pygame.Color(0x00, 0xff, 0x00), # Bright green
-        pygame.Color(0x00, 0xff, 0xff), # Bright cyan
-        pygame.Color(0xff, 0xff, 0x00), # Bright yellow
-        pygame.Color(0xff, 0xff, 0xff), # Bright white
-    )
+    COLOURS = tuple(pygame.Color(*c) for c in PALETTE)
 
 CELLS = tuple((x, y, 2048 * (y // 8) + 32 * (y % 8) + x, 6144 + 32 * y + x) for x in range(32) for y in range(24))
 
+# Maximum number of screens waiting to be rendered by the frame dumper
+DUMP_QUEUE_SIZE = 256
+
 class RZXBlock:
     def __init__(self, data, obj):
         self.data = data
         self.obj = obj
 
-class InputRecording:
-    def __init__(self, tstates, frames, data):
-        self.tstates = tstates
-        self.frames = frames
-        self.data = data
-
-class Frame:
-    def __init__(self, fetch_counter, start, end):
-        self.fetch_counter = fetch_counter
-        self.start = start
-        self.end = end
-
 class RZXTracer(PagingTracer):
-    def __init__(self, context, input_rec):
+    def __init__(self, context, input_rec, start=0):
         self.context = context
-        self.set_input_rec(input_rec)
+        self.set_input_rec(input_rec, start)
         self.simulator = context.simulator
-        self.simulator.registers[25] = input_rec.tstates
+        if start == 0:
+            self.simulator.registers[25] = input_rec.tstates
         self.border = context.snapshot.border
         self.out7ffd = context.snapshot.out7ffd
         self.outfffd = context.snapshot.outfffd
         self.ay = list(context.snapshot.ay)
         self.outfe = context.snapshot.outfe
 
-    def set_input_rec(self, input_rec):
-        self.frames = input_rec.frames
-        self.data = input_rec.data
-        self.frame_index = -1
+    def set_input_rec(self, input_rec, start=0):
+        self.frames = input_rec.frames(start)
+        self.frame = None
+        self.data = b''
+        self.started = False
         self.index = 0
         self.end = 0
 
     def next_frame(self):
         if self.end > self.index:
             raise SkoolKitError(f'{self.end - self.index} port reading(s) left for frame {self.context.frame_count}')
-        self.frame_index += 1
-        if self.frame_index > 0:
+        if self.started:
             self.context.frame_count += 1
-        while self.frame_index < len(self.frames):
-            frame = self.frames[self.frame_index]
-            if frame.fetch_counter > 0:
-                self.index = frame.start
-                self.end = frame.end
-                return frame.fetch_counter
-            self.frame_index += 1
+        self.started = True
+        self.frame = None
+        for frame in self.frames:
+            fetch_counter, in_counter, self.data = frame
+            if fetch_counter > 0:
+                self.frame = frame
+                self.index = 0
+                self.end = len(self.data)
+                return fetch_counter
             self.context.frame_count += 1
         return -1
 
@@ -128,8 +135,166 @@ class RZXContext:
         self.simulator = None
         self.total_frames = 0
         self.frame_count = 0
+        self.start = 0
+        self.block_start = 0
+        self.keyframes = None
+        self.frame_dumper = None
+        self.verify = False
         self.stop = False
 
+class Keyframes:
+    def __init__(self, rzxfile, options):
+        self.dirname = f'{rzxfile}.keyframes'
+        self.index_file = os.path.join(self.dirname, 'index.json')
+        self.interval = options.keyframes
+        self.key = {
+            'version': VERSION,
+            'rzx': hashlib.sha256(read_bin_file(rzxfile)).hexdigest(),
+            'snapshot': hashlib.sha256(read_bin_file(options.snapshot)).hexdigest() if options.snapshot else None,
+            'flags': parse_int(options.flags, 0)
+        }
+        self.frames = set()
+        if os.path.isfile(self.index_file):
+            with open(self.index_file) as f:
+                index = json.load(f)
+            if index.get('key') == self.key:
+                self.frames.update(index['frames'])
+            elif self.interval:
+                # The keyframes were saved for a different RZX file, external
+                # snapshot or set of playback flags, so discard them
+                for frame in index.get('frames', ()):
+                    with contextlib.suppress(OSError):
+                        os.remove(self._fname(frame))
+
+    def _fname(self, frame):
+        return os.path.join(self.dirname, f'{frame:08}.szx')
+
+    def nearest(self, frame):
+        # Ignore any keyframe whose snapshot file has gone missing
+        for f in sorted((f for f in self.frames if f <= frame), reverse=True):
+            if os.path.isfile(self._fname(f)):
+                return f
+        return 0
+
+    def load(self, frame):
+        return Snapshot.get(self._fname(frame))
+
+    def save(self, frame, simulator):
+        os.makedirs(self.dirname, exist_ok=True)
+        ram, registers, state, machine = get_state(simulator)
+        write_snapshot(self._fname(frame), ram, registers, state, machine)
+        self.frames.add(frame)
+        with open(self.index_file, 'w') as f:
+            json.dump({'key': self.key, 'frames': sorted(self.frames)}, f)
+
+class ScreenRenderer:
+    def __init__(self, colours):
+        # Each colour is the byte sequence for one pixel
+        self.colours = colours
+        self.bpp = len(colours[0])
+        self.pixels = bytearray(49152 * self.bpp)
+        self.rows = {}
+        self.prev_scr = None
+        self.prev_flash = 0
+
+    def _row_table(self, ink, paper):
+        # Return the byte sequences for the 256 possible rows of 8 pixels in
+        # a cell with the given INK and PAPER
+        if (ink, paper) not in self.rows:
+            colours = (self.colours[paper], self.colours[ink])
+            self.rows[(ink, paper)] = [b''.join(colours[(b >> k) & 1] for k in range(7, -1, -1)) for b in range(256)]
+        return self.rows[(ink, paper)]
+
+    def render(self, scr, flash_switch):
+        # Update only the cells whose contents (or flash state) have changed
+        # since the last screen was rendered
+        prev_scr = self.prev_scr
+        flash_change = flash_switch != self.prev_flash
+        if scr == prev_scr and not flash_change:
+            return self.pixels
+        pixels = self.pixels
+        bpp = self.bpp
+        row_len = 8 * bpp
+        for x, y, df_addr, af_addr in CELLS:
+            attr = scr[af_addr]
+            data = scr[df_addr:df_addr + 2048:256]
+            if prev_scr and attr == prev_scr[af_addr] and data == prev_scr[df_addr:df_addr + 2048:256] and not (flash_change and attr & 0x80):
+                continue
+            bright = (attr & 64) // 8
+            ink = bright + (attr % 8)
+            paper = bright + ((attr // 8) % 8)
+            if attr & 0x80 and flash_switch:
+                ink, paper = paper, ink
+            rows = self._row_table(ink, paper)
+            i = (2048 * y + 8 * x) * bpp
+            for b in data:
+                pixels[i:i + row_len] = rows[b]
+                i += 256 * bpp
+        self.prev_scr = scr
+        self.prev_flash = flash_switch
+        return pixels
+
+class FrameDumper:
+    def __init__(self, fname, interval, width):
+        self.root, sep, ext = fname.rpartition('.')
+        self.ext = ext.lower()
+        self.interval = interval
+        self.width = width
+        if self.ext == 'rgb':
+            self.renderer = ScreenRenderer([bytes(c) for c in PALETTE])
+        elif self.ext == 'idx':
+            self.renderer = ScreenRenderer([bytes((i,)) for i in range(16)])
+        elif self.ext == 'png':
+            self.image_writer = get_image_writer({PNG_ENABLE_ANIMATION: 0})
+        else:
+            raise SkoolKitError(f'Unknown file type: {ext}')
+        self.dumpfile = None if self.ext == 'png' else open(fname, 'wb')
+        self.error = None
+        self.queue = queue.Queue(DUMP_QUEUE_SIZE)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add(self, frame, memory):
+        if frame % self.interval == 0:
+            self.queue.put((frame, bytes(memory[16384:23296])))
+
+    def _write_png(self, frame, scr, flash_switch):
+        udgs = scr_udgs([0] * 16384 + list(scr), 0, 0, 32, 24)
+        for row in udgs:
+            for udg in row:
+                if udg.attr & 0x80:
+                    if flash_switch:
+                        udg.data = [b ^ 255 for b in udg.data]
+                    udg.attr &= 127
+        with open(f'{self.root}.{frame:0{self.width}}.png', 'wb') as f:
+            self.image_writer.write_image([Frame(udgs)], f)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is None:
+                frame, scr = item
+                flash_switch = (frame // 16) % 2
+                try:
+                    if self.dumpfile:
+                        self.dumpfile.write(self.renderer.render(scr, flash_switch))
+                    else:
+                        self._write_png(frame, scr, flash_switch)
+                except Exception as e:
+                    # Keep draining the queue so that the emulation thread
+                    # never blocks
+                    self.error = e
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.dumpfile:
+            self.dumpfile.close()
+        if self.error:
+            raise SkoolKitError(f'Failed to dump frame: {self.error}')
+
 def as_dword(num):
     return (num % 256, (num >> 8) % 256, (num >> 16) % 256, (num >> 24) % 256)
 
@@ -166,16 +331,19 @@ def write_rzx(fname, context, rzx_blocks):
     rzx_data.extend(snapshot_data_z)
 
     tracer = context.simulator.tracer
-    frames = tracer.frames[tracer.frame_index:]
-    nf = len(frames)
+    if tracer.frame:
+        frames = chain((tracer.frame,), tracer.frames)
+    else:
+        frames = ()
+    nf = 0
+    compressor = zlib.compressobj(9)
     io_frames = bytearray()
-    for frame in frames:
-        fc = frame.fetch_counter
-        port_readings = tracer.data[frame.start:frame.end]
+    for fc, ic, port_readings in frames:
         ic = len(port_readings)
-        io_frames.extend((fc % 256, fc // 256, ic % 256, ic // 256))
-        io_frames.extend(port_readings)
-    io_frames = zlib.compress(io_frames, 9)
+        io_frames.extend(compressor.compress(bytes((fc % 256, fc // 256, ic % 256, ic // 256))))
+        io_frames.extend(compressor.compress(port_readings))
+        nf += 1
+    io_frames.extend(compressor.flush())
     b_len = 18 + len(io_frames)
     rzx_data.extend((
         0x80,             # Block ID (Input recording)
@@ -194,7 +362,7 @@ def write_rzx(fname, context, rzx_blocks):
         f.write(rzx_data)
 
 def parse_rzx(rzxfile):
-    data = read_bin_file(rzxfile)
+    data = memoryview(read_bin_file(rzxfile))
     if data[:4] != b'RZX!' or len(data) < 10:
         raise SkoolKitError('Not an RZX file')
     i = 10
@@ -207,7 +375,7 @@ def parse_rzx(rzxfile):
             flags = data[i + 5]
             if flags & 1 == 0:
                 ext = ''.join(chr(b) for b in data[i + 9:i + 13] if b)
-                sdata = data[i + 17:i + block_len]
+                sdata = bytes(data[i + 17:i + block_len])
                 if flags & 2:
                     try:
                         sdata = zlib.decompress(sdata)
@@ -219,25 +387,11 @@ def parse_rzx(rzxfile):
             num_frames = get_dword(data, i + 5)
             tstates = get_dword(data, i + 10)
             flags = get_dword(data, i + 14)
-            frames = []
-            frames_data = data[i + 18:i + block_len]
-            if flags & 2:
-                try:
-                    frames_data = zlib.decompress(frames_data)
-                except zlib.error as e:
-                    raise SkoolKitError(f'Failed to decompress input recording block: {e.args[0]}')
-            contents.append(RZXBlock(data[i:i + block_len], InputRecording(tstates, frames, frames_data)))
-            j = 0
-            start = end = 0
-            for k in range(num_frames):
-                fetch_counter = get_word(frames_data, j)
-                in_counter = get_word(frames_data, j + 2)
-                if in_counter == 65535:
-                    j += 4
-                else:
-                    start = j + 4
-                    end = j = start + in_counter
-                frames.append(Frame(fetch_counter, start, end))
+            input_rec = InputRecording(tstates, num_frames, data[i + 18:i + block_len], flags)
+            # Parse the first frame now so that a corrupted block is detected
+            # before playback starts; the rest are parsed on demand
+            next(input_rec.frames(), None)
+            contents.append(RZXBlock(data[i:i + block_len], input_rec))
         i += block_len
     return contents
 
@@ -297,6 +451,11 @@ def trace_exec(tracefile, context, fetch_counter, pc):
     readings_left = context.simulator.tracer.end - context.simulator.tracer.index
     tracefile.write(f'F:{context.frame_count:0{context.fnwidth}} C:{fetch_counter:05} I:{readings_left:05} ${pc:04X} {i}\n')
 
+def trace_exec_binary(trace_writer, context, fetch_counter, pc):
+    tracer = context.simulator.tracer
+    code = get_code(context.simulator.memory, pc)
+    trace_writer.write_rzx(pc, code, context.frame_count, fetch_counter, tracer.end - tracer.index)
+
 def process_block(block, options, context):
     if block is None:
         raise SkoolKitError('Unsupported snapshot type')
@@ -321,7 +480,8 @@ def process_block(block, options, context):
             simulator_cls = CSimulator or Simulator
         simulator = from_snapshot(simulator_cls, context.snapshot, config=config)
         context.simulator = simulator
-        tracer = RZXTracer(context, block)
+        tracer = RZXTracer(context, block, context.block_start)
+        context.block_start = 0
         simulator.set_tracer(tracer)
     opcodes = simulator.opcodes if hasattr(simulator, 'opcodes') else None
     memory = simulator.memory
@@ -337,10 +497,15 @@ def process_block(block, options, context):
     flags_ei = flags & 2
     exec_map = context.exec_map
     tracefile = context.tracefile
-    if tracefile:
+    if isinstance(tracefile, TraceWriter):
+        trace = partial(trace_exec_binary, tracefile, context)
+    elif tracefile:
         trace = partial(trace_exec, tracefile, context)
     else:
         trace = None
+    start = context.start
+    keyframes = context.keyframes
+    frame_dumper = context.frame_dumper
     screen = context.screen
     if screen: # pragma: no cover
         p_rectangles = context.p_rectangles
@@ -352,23 +517,34 @@ def process_block(block, options, context):
     while run:
         if fetch_counter < 0:
             break
+        # Frames before the one specified by --seek are played without being
+        # traced, mapped or drawn
+        seeking = context.frame_count < start
+        if seeking:
+            f_trace, f_exec_map = None, None
+        else:
+            f_trace, f_exec_map = trace, exec_map
         if csimulator: # pragma: no cover
-            pc = simulator.exec_frame(fetch_counter, exec_map, trace)
+            pc, fetch_counter = simulator.exec_frame(fetch_counter, f_exec_map, f_trace)
         else:
             while fetch_counter > 0:
                 pc = registers[24]
                 r0 = registers[15]
                 ld_r_a = memory[pc] == 0xED and memory[(pc + 1) % 65536] == 0x4F
-                if tracefile:
-                    trace_exec(tracefile, context, fetch_counter, pc)
-                if exec_map is not None:
-                    exec_map.add(pc)
+                if f_trace:
+                    f_trace(fetch_counter, pc)
+                if f_exec_map is not None:
+                    f_exec_map.add(pc)
                 opcodes[memory[pc]]()
                 if ld_r_a:
                     fetch_counter -= 2
                 else:
                     fetch_counter -= 2 - ((registers[15] ^ r0) % 2)
-        if screen: # pragma: no cover
+        if context.verify and fetch_counter:
+            # The last instruction in the frame should have brought the fetch
+            # counter down to exactly 0
+            raise SkoolKitError(f'Fetch counter is {fetch_counter} at end of frame {context.frame_count}')
+        if screen and not seeking: # pragma: no cover
             draw(screen, memory, context.frame_count, p_rectangles, c_rectangles, prev_scr)
             pygame.display.update()
             for event in pygame.event.get():
@@ -377,6 +553,8 @@ def process_block(block, options, context):
             if fps > 0:
                 clock.tick(fps)
             prev_scr = memory[16384:23296]
+        if frame_dumper and not seeking:
+            frame_dumper.add(context.frame_count, memory)
         registers[25] = 0
         fetch_counter = tracer.next_frame()
         if registers[26]:
@@ -400,11 +578,83 @@ def process_block(block, options, context):
         if show_progress:
             p = (context.frame_count / total_frames) * 100
             write(f'[{p:5.1f}%]\x08\x08\x08\x08\x08\x08\x08\x08')
+        if keyframes and keyframes.interval and fetch_counter > 0:
+            frame = context.frame_count
+            if frame % keyframes.interval == 0 and frame not in keyframes.frames:
+                keyframes.save(frame, simulator)
         if context.frame_count >= stop:
             context.stop = True
             break
 
+def _get_blocks(infile, options):
+    rzx_blocks = parse_rzx(infile)
+    if options.snapshot:
+        rzx_blocks.insert(0, RZXBlock(None, Snapshot.get(options.snapshot)))
+    while rzx_blocks and isinstance(rzx_blocks[-1].obj, Snapshot):
+        rzx_blocks.pop()
+    if rzx_blocks and isinstance(rzx_blocks[0].obj, InputRecording):
+        raise SkoolKitError('Missing snapshot')
+    return rzx_blocks
+
+def _get_segments(rzx_blocks):
+    # Split the blocks into segments, each of which starts with a snapshot,
+    # and return a list of [first block, last block, first frame, frames]
+    segments = []
+    frame = 0
+    for i, block in enumerate(rzx_blocks):
+        if isinstance(block.obj, InputRecording):
+            segments[-1][1] = i
+            segments[-1][3] += block.obj.num_frames
+            frame += block.obj.num_frames
+        else:
+            segments.append([i, i, frame, 0])
+    return segments
+
+def _verify_segment(segment, infile, options):
+    start, end, first_frame, num_frames = segment
+    context = RZXContext()
+    context.frame_count = first_frame
+    context.total_frames = first_frame + num_frames
+    context.verify = True
+    options = argparse.Namespace(**vars(options))
+    options.quiet = True
+    options.stop = None
+    result = {'first': first_frame, 'frames': num_frames}
+    try:
+        for block in _get_blocks(infile, options)[start:end + 1]:
+            process_block(block.obj, options, context)
+    except Exception as e:
+        result['error'] = e.args[0] if e.args else str(e)
+        result['frame'] = context.frame_count
+    return result
+
+def _print_results(results):
+    failures = 0
+    for n, result in enumerate(results, 1):
+        first, num_frames = result['first'], result['frames']
+        desc = f'Segment {n} (frames {first}-{first + num_frames - 1})'
+        if 'error' in result:
+            failures += 1
+            print(f"{desc}: FAILED at frame {result['frame']}: {result['error']}")
+        else:
+            print(f'{desc}: OK')
+    return failures
+
+def verify(infile, options):
+    segments = _get_segments(_get_blocks(infile, options))
+    check = partial(_verify_segment, infile=infile, options=options)
+    if len(segments) > 1 and options.jobs != 1:
+        with ProcessPoolExecutor(options.jobs or None) as executor:
+            failures = _print_results(executor.map(check, segments))
+    else:
+        failures = _print_results(map(check, segments))
+    if failures:
+        raise SkoolKitError(f'{failures} of {len(segments)} segment(s) failed verification')
+
 def run(infile, options):
+    if options.verify:
+        verify(infile, options)
+        return
     if options.screen and pygame: # pragma: no cover
         print(pygame_io.getvalue())
         pygame.init()
@@ -427,22 +677,46 @@ def run(infile, options):
                         context.exec_map.add(int(line[1:5], 16))
     if options.trace:
         context.tracefile = open(options.trace, 'w')
-    rzx_blocks = parse_rzx(infile)
-    if options.snapshot:
-        rzx_blocks.insert(0, RZXBlock(None, Snapshot.get(options.snapshot)))
-    while rzx_blocks and isinstance(rzx_blocks[-1].obj, Snapshot):
-        rzx_blocks.pop()
-    if rzx_blocks and isinstance(rzx_blocks[0].obj, InputRecording):
-        raise SkoolKitError('Missing snapshot')
+    rzx_blocks = _get_blocks(infile, options)
     for block in rzx_blocks:
         if isinstance(block.obj, InputRecording):
-            context.total_frames += len(block.obj.frames)
+            context.total_frames += block.obj.num_frames
+    if (options.keyframes or options.seek) and infile != '-':
+        context.keyframes = Keyframes(infile, options)
+    if options.seek:
+        context.start = options.seek
+        frame = context.keyframes.nearest(options.seek) if context.keyframes else 0
+        if frame:
+            # Resume from the keyframe nearest to the specified frame, skipping
+            # every block before the input recording block containing it
+            n = 0
+            for i, block in enumerate(rzx_blocks):
+                if isinstance(block.obj, InputRecording):
+                    if n + block.obj.num_frames > frame:
+                        break
+                    n += block.obj.num_frames
+            else:
+                # The keyframe lies beyond the last frame of the recording
+                # (i.e. it is stale), so start from frame 0 instead
+                frame = 0
+        if frame:
+            rzx_blocks[:i] = [RZXBlock(None, context.keyframes.load(frame))]
+            context.frame_count = frame
+            context.block_start = frame - n
     if options.stop and options.stop > 0:
         context.total_frames = min(options.stop, context.total_frames)
-    while rzx_blocks:
-        process_block(rzx_blocks.pop(0).obj, options, context)
-        if context.stop:
-            break
+    if options.binary_trace:
+        context.tracefile = TraceWriter(options.binary_trace, RZX, len(str(context.total_frames)) - 1)
+    if options.dump_frames:
+        context.frame_dumper = FrameDumper(options.dump_frames, max(options.dump_interval, 1), len(str(context.total_frames)))
+    try:
+        while rzx_blocks:
+            process_block(rzx_blocks.pop(0).obj, options, context)
+            if context.stop:
+                break
+    finally:
+        if context.frame_dumper:
+            context.frame_dumper.close()
     if options.map:
         with open(options.map, 'w') as f:
             for addr in sorted(context.exec_map):
@@ -493,6 +767,12 @@ def main(args):
     parser.add_argument('infile', help=argparse.SUPPRESS, nargs='?')
     parser.add_argument('dump', help=argparse.SUPPRESS, nargs='?')
     group = parser.add_argument_group('Options')
+    group.add_argument('--binary-trace', metavar='FILE',
+                       help="Log executed instructions to a binary trace file.")
+    group.add_argument('--dump-frames', metavar='FILE',
+                       help="Write the screen contents of each frame to a file.")
+    group.add_argument('--dump-interval', metavar='N', type=int, default=1,
+                       help="Write the screen contents of every Nth frame only (default: 1).")
     group.add_argument('--flags', default='0',
                        help="Set playback flags. Do '--flags help' for more information.")
     group.add_argument('--force', action='store_true',
@@ -500,6 +780,10 @@ def main(args):
     group.add_argument('--fps', type=int, default=50,
                        help="Run at this many frames per second (default: 50). "
                             "0 means maximum speed.")
+    group.add_argument('-j', '--jobs', metavar='N', type=int, default=0,
+                       help="Use at most this many worker processes with --verify (default: the number of CPUs).")
+    group.add_argument('--keyframes', metavar='N', type=int, default=0,
+                       help="Save a keyframe snapshot every N frames (for use with --seek).")
     group.add_argument('--map', metavar='FILE',
                        help="Log addresses of executed instructions to a file.")
     group.add_argument('--no-screen', dest='screen', action='store_false',
@@ -510,12 +794,17 @@ def main(args):
                        help="Don't print progress percentage.")
     group.add_argument('--scale', metavar='SCALE', type=int, default=2, choices=(1, 2, 3, 4),
                        help="Scale display up by this factor (1-4; default: 2).")
+    group.add_argument('--seek', metavar='FRAME', type=int,
+                       help="Start playback at this frame.")
     group.add_argument('--snapshot', metavar='FILE',
                        help="Specify an external snapshot file to start with.")
     group.add_argument('--stop', metavar='FRAMES', type=int,
                        help="Stop after playing this many frames.")
     group.add_argument('--trace', metavar='FILE',
                        help="Log executed instructions to a file.")
+    group.add_argument('--verify', action='store_true',
+                       help="Play each segment of the RZX file (from an embedded snapshot to the next) "
+                            "in a separate process, and report whether it plays to the end.")
     group.add_argument('-V', '--version', action='version', version='SkoolKit {}'.format(VERSION),
                        help='Show SkoolKit version number and exit.')
     namespace, unknown_args = parser.parse_known_args(args)
@@ -524,4 +813,6 @@ def main(args):
         return
     if unknown_args or namespace.infile is None:
         parser.exit(2, parser.format_help())
+    if namespace.trace and namespace.binary_trace:
+        raise SkoolKitError('--trace and --binary-trace cannot be used together')
     run(namespace.infile, namespace)
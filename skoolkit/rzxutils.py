@@ -0,0 +1,95 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+import zlib
+
+from skoolkit import SkoolKitError, get_word
+
+# Number of bytes of compressed input recording data fed to the decompressor
+# at a time, and the maximum number of bytes it may produce from them at a time
+CHUNK_SIZE = 65536
+MAX_OUTPUT = 4 * CHUNK_SIZE
+
+class InputRecording:
+    """An RZX input recording block whose frames are decompressed and parsed
+    on demand.
+
+    :param tstates: The initial T-states counter.
+    :param num_frames: The number of frames in the block.
+    :param data: The frame data (a `bytes` object or buffer).
+    :param flags: The block flags (bit 1 set if the frame data is compressed).
+    """
+    def __init__(self, tstates, num_frames, data, flags=0):
+        self.tstates = tstates
+        self.num_frames = num_frames
+        self.data = data
+        self.compressed = flags & 2
+
+    def _read(self, offset, decompressor):
+        # Return the next piece of frame data and the offset of the data that
+        # follows it, or None if there is no more data
+        data = self.data
+        if decompressor is None:
+            if offset < len(data):
+                return bytes(data[offset:offset + CHUNK_SIZE]), offset + CHUNK_SIZE
+            return None, offset
+        try:
+            if decompressor.unconsumed_tail:
+                return decompressor.decompress(decompressor.unconsumed_tail, MAX_OUTPUT), offset
+            if offset < len(data):
+                return decompressor.decompress(data[offset:offset + CHUNK_SIZE], MAX_OUTPUT), offset + CHUNK_SIZE
+            if not decompressor.eof:
+                chunk = decompressor.flush()
+                if chunk:
+                    return chunk, offset
+        except zlib.error as e:
+            raise SkoolKitError(f'Failed to decompress input recording block: {e.args[0]}')
+        return None, offset
+
+    def frames(self, start=0):
+        """Generate the frames in the block, each as a tuple of the form
+        `(fetch_counter, in_counter, port_readings)`. For a frame whose IN
+        counter is 65535, `port_readings` is the port readings of the previous
+        frame.
+
+        :param start: The index of the first frame to generate.
+        :raises: `SkoolKitError` if the frame data is truncated or cannot be
+                 decompressed.
+        """
+        decompressor = zlib.decompressobj() if self.compressed else None
+        offset = pos = n = 0
+        buf = readings = b''
+        while n < self.num_frames:
+            while True:
+                size = len(buf) - pos
+                if size >= 4:
+                    in_counter = get_word(buf, pos + 2)
+                    if in_counter == 65535 or size >= 4 + in_counter:
+                        break
+                chunk, offset = self._read(offset, decompressor)
+                if chunk is None:
+                    raise SkoolKitError(f'Input recording block is truncated (frame {n} of {self.num_frames} is incomplete)')
+                buf = buf[pos:] + chunk
+                pos = 0
+            fetch_counter = get_word(buf, pos)
+            if in_counter == 65535:
+                pos += 4
+            else:
+                readings = buf[pos + 4:pos + 4 + in_counter]
+                pos += 4 + in_counter
+            if n >= start:
+                yield (fetch_counter, in_counter, readings)
+            n += 1
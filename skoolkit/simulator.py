@@ -19,6 +19,7 @@ from functools import partial
 from skoolkit import simutils
 from skoolkit.simutils import (FRAME_DURATIONS, INT_ACTIVE, A, F, B, C, D, E,
                                H, L, IXh, IXl, IYh, IYl, SP, SP2, I, R)
+from skoolkit.watchpoints import IN, OUT, READ, WRITE, Watchpoints, watch_memory
 
 JR_OFFSETS = tuple(j + 2 if j < 128 else j - 254 for j in range(256))
 
@@ -28,30 +29,102 @@ R1 = tuple((r & 0x80) + ((r + 1) % 128) for r in range(256))
 
 R2 = tuple((r & 0x80) + ((r + 2) % 128) for r in range(256))
 
+# Instructions that may appear in the body of a polling loop (they read only
+# registers and memory, and write only registers), mapped to their lengths and
+# timings
+POLL_OPS = {
+    0x00: (1, 4),   # NOP
+    0x01: (3, 10),  # LD BC,nn
+    0x06: (2, 7),   # LD B,n
+    0x0A: (1, 7),   # LD A,(BC)
+    0x0E: (2, 7),   # LD C,n
+    0x11: (3, 10),  # LD DE,nn
+    0x16: (2, 7),   # LD D,n
+    0x1A: (1, 7),   # LD A,(DE)
+    0x1E: (2, 7),   # LD E,n
+    0x21: (3, 10),  # LD HL,nn
+    0x26: (2, 7),   # LD H,n
+    0x2A: (3, 16),  # LD HL,(nn)
+    0x2E: (2, 7),   # LD L,n
+    0x31: (3, 10),  # LD SP,nn
+    0x3A: (3, 13),  # LD A,(nn)
+    0x3E: (2, 7),   # LD A,n
+    **{op: (1, 4 + 3 * (op % 8 == 6)) for op in range(0x40, 0xC0) if not 0x70 <= op < 0x78}, # LD r,r/(HL), ADD A,r/(HL) etc.
+    **{op: (2, 7) for op in range(0xC6, 0x100, 8)} # ADD A,n etc.
+}
+
+# Tables of prefixed opcodes (created on first use), mapped to the name of the
+# table that contains the prefix, and the prefix itself
+PREFIXES = {
+    'after_CB': ('opcodes', 0xCB),
+    'after_DD': ('opcodes', 0xDD),
+    'after_ED': ('opcodes', 0xED),
+    'after_FD': ('opcodes', 0xFD),
+    'after_DDCB': ('after_DD', 0xCB),
+    'after_FDCB': ('after_FD', 0xCB)
+}
+
 CONFIG = {
+    'block_cache': False,
     'fast_djnz': False,
+    'fast_idle': False,
     'fast_ldir': False,
     'frame_duration': FRAME_DURATIONS[0],
-    'int_active': INT_ACTIVE[0]
+    'int_active': INT_ACTIVE[0],
+    'watchpoints': None
 }
 
 class Simulator:
     def __init__(self, memory, registers=None, state=None, config=None):
-        self.memory = memory
         self.registers = simutils.get_registers(registers, state, False)
         cfg = CONFIG.copy()
         if config:
             cfg.update(config)
+        if cfg['watchpoints']:
+            # Watchpoints are checked after every instruction, so no
+            # instructions may be skipped or executed as a block
+            self.watchpoints = Watchpoints(cfg['watchpoints'])
+            if self.watchpoints.kinds & {READ, WRITE}:
+                memory = watch_memory(memory, self.watchpoints)
+            cfg.update(block_cache=False, fast_djnz=False, fast_idle=False, fast_ldir=False)
+        else:
+            self.watchpoints = None
+        self.watch_hit = -1
+        if cfg['block_cache']:
+            from skoolkit.blockcache import BlockCache
+            self.blocks = BlockCache(self)
+            memory = self.blocks.watch(memory)
+        else:
+            self.blocks = None
+        self.memory = memory
         self.create_opcodes()
         if cfg['fast_djnz']:
             self.opcodes[0x10] = partial(self.djnz_fast, self.registers, self.memory)
-        if cfg['fast_ldir']:
-            self.after_ED[0xB0] = partial(self.ldir_fast, self.registers, self.memory, 1)
-            self.after_ED[0xB8] = partial(self.ldir_fast, self.registers, self.memory, -1)
+        self.fast_ldir = cfg['fast_ldir']
+        if cfg['fast_idle']:
+            self.opcodes[0x10] = partial(self.djnz_idle, self.registers, self.memory)
+            self.opcodes[0x76] = partial(self.halt_idle, self.registers)
+            for opcode in (0x18, 0x20, 0x28, 0x30, 0x38, 0xC2, 0xC3, 0xCA, 0xD2, 0xDA, 0xE2, 0xEA, 0xF2, 0xFA):
+                f = self.opcodes[opcode]
+                idle_f = self.jr_idle if f.func == self.jr else self.jp_idle
+                self.opcodes[opcode] = partial(idle_f, *f.args)
+        self.stop = None
+        self.max_time = 0
+        self.poll_loop = None
         self.frame_duration = cfg['frame_duration']
         self.int_active = cfg['int_active']
         self.set_tracer(None)
 
+    def __getattr__(self, name):
+        if name in PREFIXES:
+            table = getattr(self, f'create_{name}')()
+            if name == 'after_ED' and self.fast_ldir:
+                table[0xB0] = partial(self.ldir_fast, self.registers, self.memory, 1)
+                table[0xB8] = partial(self.ldir_fast, self.registers, self.memory, -1)
+            setattr(self, name, table)
+            return table
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     def set_tracer(self, tracer, in_r_c=True, ini=True):
         self.tracer = tracer
         self.in_a_n_tracer = None
@@ -66,6 +139,24 @@ class Simulator:
                 self.ini_tracer = partial(tracer.read_port, self.registers)
         if hasattr(tracer, 'write_port'):
             self.out_tracer = partial(tracer.write_port, self.registers)
+        if self.watchpoints:
+            if IN in self.watchpoints.kinds:
+                self.in_a_n_tracer = partial(self.watch_in, self.in_a_n_tracer, 255)
+                self.in_r_c_tracer = partial(self.watch_in, self.in_r_c_tracer, 255)
+                self.ini_tracer = partial(self.watch_in, self.ini_tracer, 191)
+            if OUT in self.watchpoints.kinds:
+                self.out_tracer = partial(self.watch_out, self.out_tracer)
+
+    def watch_in(self, tracer, value, port):
+        self.watchpoints.access(IN, port)
+        if tracer:
+            return tracer(port)
+        return value
+
+    def watch_out(self, tracer, port, value):
+        self.watchpoints.access(OUT, port)
+        if tracer:
+            tracer(port, value)
 
     def run(self, start=None, stop=None, interrupts=False):
         opcodes = self.opcodes
@@ -74,9 +165,28 @@ class Simulator:
         if start is not None:
             registers[24] = start # PC
         pc = registers[24]
-
-        if stop is None:
+        # Idle loops are never skipped past the stop address (or the current
+        # address when executing a single instruction)
+        self.stop = pc if stop is None else stop
+        self.poll_loop = None
+
+        if self.watchpoints:
+            watchpoints = self.watchpoints
+            watchpoints.clear()
+            while True:
+                opcodes[memory[pc]]()
+                if interrupts and registers[26] and registers[25] % self.frame_duration < self.int_active:
+                    self.accept_interrupt(registers, memory, pc)
+                pc = registers[24]
+                self.watch_hit = watchpoints.check(registers)
+                if self.watch_hit >= 0:
+                    return self.watch_hit
+                if stop is None or pc == stop:
+                    break
+        elif stop is None:
             opcodes[memory[pc]]()
+        elif self.blocks:
+            self.blocks.run(stop, interrupts)
         elif interrupts:
             frame_duration = self.frame_duration
             int_active = self.int_active
@@ -119,6 +229,92 @@ class Simulator:
         registers[28] = 0 # HALT state
         return True
 
+    def idle(self, registers, period, limit=0, halt=0):
+        # Return the number of iterations of an idle loop (each lasting
+        # 'period' T-states) that can be executed in one go without passing an
+        # interrupt, the T-state limit or the stop address (or 0 if the loop
+        # should be executed normally)
+        if registers[24] == self.stop:
+            return 0
+        t0 = registers[25]
+        n = limit
+        if registers[26]:
+            r = t0 % self.frame_duration
+            if r + period < self.int_active:
+                m = 1 - halt
+            else:
+                m = (self.frame_duration - r + period - 1) // period - halt
+            if m == 0:
+                return 0
+            if n == 0 or m < n:
+                n = m
+        if self.max_time:
+            m = max(1, (self.max_time - t0 + period - 1) // period)
+            if n == 0 or m < n:
+                n = m
+        return n
+
+    def poll(self, registers, memory, pc, target, timing):
+        # Skip as many iterations as possible of a polling loop (from 'target'
+        # to the jump at 'pc') without passing an interrupt, the T-state limit
+        # or the stop address, provided that the loop body only reads
+        # registers and memory (e.g. 'LD A,(nn); AND A; JR Z,$-4') and the
+        # last iteration left the registers unchanged
+        t0 = registers[25]
+        loop = self.poll_loop
+        if loop and loop[0] == pc and loop[1] == t0:
+            regs = registers[:24]
+            regs[15] = 0 # R
+            if regs == loop[4]:
+                period, r_inc = loop[2:4]
+                n = -1
+                if registers[26]:
+                    r = t0 % self.frame_duration
+                    n = (self.frame_duration - 1 - r) // period if r >= self.int_active else 0
+                if self.max_time:
+                    m = (self.max_time - 1 - t0) // period
+                    if n < 0 or m < n:
+                        n = m
+                if n > 0 and (self.stop is None or not target <= self.stop <= pc):
+                    r = registers[15]
+                    registers[15] = (r & 0x80) + ((r + r_inc * n) % 128) # R
+                    registers[25] += period * n # T-states
+                self.poll_loop = (pc, registers[25] + period, period, r_inc, regs)
+                return
+        self.poll_loop = None
+        addr = target
+        period = timing
+        r_inc = 1
+        while addr < pc:
+            op = memory[addr]
+            if op in POLL_OPS:
+                size, tstates = POLL_OPS[op]
+                r_inc += 1
+            elif op == 0xCB and 0x40 <= memory[addr + 1] < 0x80:
+                # BIT b,r/(HL)
+                size, tstates = 2, 8 + 4 * (memory[addr + 1] % 8 == 6)
+                r_inc += 2
+            else:
+                return
+            addr += size
+            period += tstates
+        if addr == pc:
+            regs = registers[:24]
+            regs[15] = 0 # R
+            self.poll_loop = (pc, t0 + period, period, r_inc, regs)
+
+    def resolve_prefix(self, name):
+        # Replace the placeholder for a prefix in its table with a function
+        # that executes the prefixed instruction (creating the table of
+        # prefixed opcodes if necessary), and return that function
+        parent, opcode = PREFIXES[name]
+        prefix = self.prefix2 if len(name) > 8 else self.prefix
+        f = getattr(self, parent)[opcode] = partial(prefix, getattr(self, name), self.registers, self.memory)
+        return f
+
+    def lazy_prefix(self, name):
+        self.resolve_prefix(name)()
+
     def prefix(self, opcodes, registers, memory):
         opcodes[memory[(registers[24] + 1) % 65536]]()
 
@@ -403,6 +599,18 @@ class Simulator:
         else:
             self.djnz(registers, memory)
 
+    def djnz_idle(self, registers, memory):
+        b = registers[2]
+        if b != 1 and memory[(registers[24] + 1) % 65536] == 0xFE:
+            n = self.idle(registers, 13, (b - 1) % 256)
+            if n:
+                registers[2] = (b - n) % 256
+                r = registers[15]
+                registers[15] = (r & 0x80) + ((r + n) % 128) # R
+                registers[25] += 13 * n # T-states
+                return
+        self.djnz(registers, memory)
+
     def ex_af(self, registers):
         # EX AF,AF'
         registers[0], registers[16] = registers[16], registers[0]
@@ -452,6 +660,16 @@ class Simulator:
             registers[28] = 1 # HALT state
         registers[15] = R1[registers[15]] # R
 
+    def halt_idle(self, registers):
+        n = self.idle(registers, 4, halt=1)
+        if n:
+            r = registers[15]
+            registers[15] = (r & 0x80) + ((r + n) % 128) # R
+            registers[25] += 4 * n # T-states
+            registers[28] = 1 # HALT state
+        else:
+            self.halt(registers)
+
     def im(self, registers, mode):
         # IM 0/1/2
         registers[27] = mode
@@ -544,6 +762,21 @@ class Simulator:
         registers[15] = R1[registers[15]] # R
         registers[25] += 10 # T-states
 
+    def jp_idle(self, registers, memory, c_and, c_val):
+        if registers[1] & c_and == c_val:
+            pc = registers[24]
+            addr = memory[(pc + 1) % 65536] + 256 * memory[(pc + 2) % 65536]
+            if addr == pc:
+                n = self.idle(registers, 10)
+                if n:
+                    r = registers[15]
+                    registers[15] = (r & 0x80) + ((r + n) % 128) # R
+                    registers[25] += 10 * n # T-states
+                    return
+            elif pc - 16 <= addr < pc:
+                self.poll(registers, memory, pc, addr, 10)
+        self.jp(registers, memory, c_and, c_val)
+
     def jp_rr(self, registers, r_inc, timing, rh, rl):
         # JP (HL/IX/IY)
         registers[15] = r_inc[registers[15]] # R
@@ -561,6 +794,21 @@ class Simulator:
             registers[24] = (registers[24] + 2) % 65536 # PC
         registers[15] = R1[registers[15]] # R
 
+    def jr_idle(self, registers, memory, c_and, c_val):
+        if registers[1] & c_and == c_val:
+            pc = registers[24]
+            offset = memory[(pc + 1) % 65536]
+            if offset == 0xFE:
+                n = self.idle(registers, 12)
+                if n:
+                    r = registers[15]
+                    registers[15] = (r & 0x80) + ((r + n) % 128) # R
+                    registers[25] += 12 * n # T-states
+                    return
+            elif 0xEE <= offset < 0xFE and pc >= 254 - offset:
+                self.poll(registers, memory, pc, pc + offset - 254, 12)
+        self.jr(registers, memory, c_and, c_val)
+
     def ld_a_ir(self, registers, r):
         # LD A,I/R
         registers[15] = R2[registers[15]] # R
@@ -1021,532 +1269,279 @@ class Simulator:
 
     def create_opcodes(self):
         from skoolkit.simtables import (
-            ADC, ADC_A_A, ADD, AND, BIT, CCF, CP, CPL, DAA, DEC, INC, NEG, OR,
-            PARITY, RL, RLC, RR, RRC, RLA, RLCA, RRA, RRCA, SBC, SBC_A_A, SCF,
-            SLA, SLL, SRA, SRL, SUB, SZ53P, XOR
+            ADC, ADC_A_A, ADD, AND, CCF, CP, CPL, DAA, DEC, INC, OR, RLA, RLCA,
+            RRA, RRCA, SBC, SBC_A_A, SCF, SUB, XOR
         )
         r = self.registers
         m = self.memory
 
-        self.after_DDCB = [
-            partial(self.f_xy, r, m, RLC, IXh, IXl, B),             # DDCB..00 RLC (IX+d),B
-            partial(self.f_xy, r, m, RLC, IXh, IXl, C),             # DDCB..01 RLC (IX+d),C
-            partial(self.f_xy, r, m, RLC, IXh, IXl, D),             # DDCB..02 RLC (IX+d),D
-            partial(self.f_xy, r, m, RLC, IXh, IXl, E),             # DDCB..03 RLC (IX+d),E
-            partial(self.f_xy, r, m, RLC, IXh, IXl, H),             # DDCB..04 RLC (IX+d),H
-            partial(self.f_xy, r, m, RLC, IXh, IXl, L),             # DDCB..05 RLC (IX+d),L
-            partial(self.f_xy, r, m, RLC, IXh, IXl),                # DDCB..06 RLC (IX+d)
-            partial(self.f_xy, r, m, RLC, IXh, IXl, A),             # DDCB..07 RLC (IX+d),A
-            partial(self.f_xy, r, m, RRC, IXh, IXl, B),             # DDCB..08 RRC (IX+d),B
-            partial(self.f_xy, r, m, RRC, IXh, IXl, C),             # DDCB..09 RRC (IX+d),C
-            partial(self.f_xy, r, m, RRC, IXh, IXl, D),             # DDCB..0A RRC (IX+d),D
-            partial(self.f_xy, r, m, RRC, IXh, IXl, E),             # DDCB..0B RRC (IX+d),E
-            partial(self.f_xy, r, m, RRC, IXh, IXl, H),             # DDCB..0C RRC (IX+d),H
-            partial(self.f_xy, r, m, RRC, IXh, IXl, L),             # DDCB..0D RRC (IX+d),L
-            partial(self.f_xy, r, m, RRC, IXh, IXl),                # DDCB..0E RRC (IX+d)
-            partial(self.f_xy, r, m, RRC, IXh, IXl, A),             # DDCB..0F RRC (IX+d),A
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, B),          # DDCB..10 RL (IX+d),B
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, C),          # DDCB..11 RL (IX+d),C
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, D),          # DDCB..12 RL (IX+d),D
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, E),          # DDCB..13 RL (IX+d),E
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, H),          # DDCB..14 RL (IX+d),H
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, L),          # DDCB..15 RL (IX+d),L
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl),             # DDCB..16 RL (IX+d)
-            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, A),          # DDCB..17 RL (IX+d),A
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, B),          # DDCB..18 RR (IX+d),B
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, C),          # DDCB..19 RR (IX+d),C
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, D),          # DDCB..1A RR (IX+d),D
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, E),          # DDCB..1B RR (IX+d),E
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, H),          # DDCB..1C RR (IX+d),H
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, L),          # DDCB..1D RR (IX+d),L
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl),             # DDCB..1E RR (IX+d)
-            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, A),          # DDCB..1F RR (IX+d),A
-            partial(self.f_xy, r, m, SLA, IXh, IXl, B),             # DDCB..20 SLA (IX+d),B
-            partial(self.f_xy, r, m, SLA, IXh, IXl, C),             # DDCB..21 SLA (IX+d),C
-            partial(self.f_xy, r, m, SLA, IXh, IXl, D),             # DDCB..22 SLA (IX+d),D
-            partial(self.f_xy, r, m, SLA, IXh, IXl, E),             # DDCB..23 SLA (IX+d),E
-            partial(self.f_xy, r, m, SLA, IXh, IXl, H),             # DDCB..24 SLA (IX+d),H
-            partial(self.f_xy, r, m, SLA, IXh, IXl, L),             # DDCB..25 SLA (IX+d),L
-            partial(self.f_xy, r, m, SLA, IXh, IXl),                # DDCB..26 SLA (IX+d)
-            partial(self.f_xy, r, m, SLA, IXh, IXl, A),             # DDCB..27 SLA (IX+d),A
-            partial(self.f_xy, r, m, SRA, IXh, IXl, B),             # DDCB..28 SRA (IX+d),B
-            partial(self.f_xy, r, m, SRA, IXh, IXl, C),             # DDCB..29 SRA (IX+d),C
-            partial(self.f_xy, r, m, SRA, IXh, IXl, D),             # DDCB..2A SRA (IX+d),D
-            partial(self.f_xy, r, m, SRA, IXh, IXl, E),             # DDCB..2B SRA (IX+d),E
-            partial(self.f_xy, r, m, SRA, IXh, IXl, H),             # DDCB..2C SRA (IX+d),H
-            partial(self.f_xy, r, m, SRA, IXh, IXl, L),             # DDCB..2D SRA (IX+d),L
-            partial(self.f_xy, r, m, SRA, IXh, IXl),                # DDCB..2E SRA (IX+d)
-            partial(self.f_xy, r, m, SRA, IXh, IXl, A),             # DDCB..2F SRA (IX+d),A
-            partial(self.f_xy, r, m, SLL, IXh, IXl, B),             # DDCB..30 SLL (IX+d),B
-            partial(self.f_xy, r, m, SLL, IXh, IXl, C),             # DDCB..31 SLL (IX+d),C
-            partial(self.f_xy, r, m, SLL, IXh, IXl, D),             # DDCB..32 SLL (IX+d),D
-            partial(self.f_xy, r, m, SLL, IXh, IXl, E),             # DDCB..33 SLL (IX+d),E
-            partial(self.f_xy, r, m, SLL, IXh, IXl, H),             # DDCB..34 SLL (IX+d),H
-            partial(self.f_xy, r, m, SLL, IXh, IXl, L),             # DDCB..35 SLL (IX+d),L
-            partial(self.f_xy, r, m, SLL, IXh, IXl),                # DDCB..36 SLL (IX+d)
-            partial(self.f_xy, r, m, SLL, IXh, IXl, A),             # DDCB..37 SLL (IX+d),A
-            partial(self.f_xy, r, m, SRL, IXh, IXl, B),             # DDCB..38 SRL (IX+d),B
-            partial(self.f_xy, r, m, SRL, IXh, IXl, C),             # DDCB..39 SRL (IX+d),C
-            partial(self.f_xy, r, m, SRL, IXh, IXl, D),             # DDCB..3A SRL (IX+d),D
-            partial(self.f_xy, r, m, SRL, IXh, IXl, E),             # DDCB..3B SRL (IX+d),E
-            partial(self.f_xy, r, m, SRL, IXh, IXl, H),             # DDCB..3C SRL (IX+d),H
-            partial(self.f_xy, r, m, SRL, IXh, IXl, L),             # DDCB..3D SRL (IX+d),L
-            partial(self.f_xy, r, m, SRL, IXh, IXl),                # DDCB..3E SRL (IX+d)
-            partial(self.f_xy, r, m, SRL, IXh, IXl, A),             # DDCB..3F SRL (IX+d),A
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..40 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..41 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..42 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..43 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..44 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..45 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..46 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..47 BIT 0,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..48 BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..49 BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4A BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4B BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4C BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4D BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4E BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4F BIT 1,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..50 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..51 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..52 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..53 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..54 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..55 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..56 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..57 BIT 2,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..58 BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..59 BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5A BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5B BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5C BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5D BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5E BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5F BIT 3,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..60 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..61 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..62 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..63 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..64 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..65 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..66 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..67 BIT 4,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..68 BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..69 BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6A BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6B BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6C BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6D BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6E BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6F BIT 5,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..70 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..71 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..72 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..73 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..74 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..75 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..76 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..77 BIT 6,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..78 BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..79 BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7A BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7B BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7C BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7D BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7E BIT 7,(IX+d)
-            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7F BIT 7,(IX+d)
-            partial(self.res_xy, r, m, 254, IXh, IXl, B),           # DDCB..80 RES 0,(IX+d),B
-            partial(self.res_xy, r, m, 254, IXh, IXl, C),           # DDCB..81 RES 0,(IX+d),C
-            partial(self.res_xy, r, m, 254, IXh, IXl, D),           # DDCB..82 RES 0,(IX+d),D
-            partial(self.res_xy, r, m, 254, IXh, IXl, E),           # DDCB..83 RES 0,(IX+d),E
-            partial(self.res_xy, r, m, 254, IXh, IXl, H),           # DDCB..84 RES 0,(IX+d),H
-            partial(self.res_xy, r, m, 254, IXh, IXl, L),           # DDCB..85 RES 0,(IX+d),L
-            partial(self.res_xy, r, m, 254, IXh, IXl),              # DDCB..86 RES 0,(IX+d)
-            partial(self.res_xy, r, m, 254, IXh, IXl, A),           # DDCB..87 RES 0,(IX+d),A
-            partial(self.res_xy, r, m, 253, IXh, IXl, B),           # DDCB..88 RES 1,(IX+d),B
-            partial(self.res_xy, r, m, 253, IXh, IXl, C),           # DDCB..89 RES 1,(IX+d),C
-            partial(self.res_xy, r, m, 253, IXh, IXl, D),           # DDCB..8A RES 1,(IX+d),D
-            partial(self.res_xy, r, m, 253, IXh, IXl, E),           # DDCB..8B RES 1,(IX+d),E
-            partial(self.res_xy, r, m, 253, IXh, IXl, H),           # DDCB..8C RES 1,(IX+d),H
-            partial(self.res_xy, r, m, 253, IXh, IXl, L),           # DDCB..8D RES 1,(IX+d),L
-            partial(self.res_xy, r, m, 253, IXh, IXl),              # DDCB..8E RES 1,(IX+d)
-            partial(self.res_xy, r, m, 253, IXh, IXl, A),           # DDCB..8F RES 1,(IX+d),A
-            partial(self.res_xy, r, m, 251, IXh, IXl, B),           # DDCB..90 RES 2,(IX+d),B
-            partial(self.res_xy, r, m, 251, IXh, IXl, C),           # DDCB..91 RES 2,(IX+d),C
-            partial(self.res_xy, r, m, 251, IXh, IXl, D),           # DDCB..92 RES 2,(IX+d),D
-            partial(self.res_xy, r, m, 251, IXh, IXl, E),           # DDCB..93 RES 2,(IX+d),E
-            partial(self.res_xy, r, m, 251, IXh, IXl, H),           # DDCB..94 RES 2,(IX+d),H
-            partial(self.res_xy, r, m, 251, IXh, IXl, L),           # DDCB..95 RES 2,(IX+d),L
-            partial(self.res_xy, r, m, 251, IXh, IXl),              # DDCB..96 RES 2,(IX+d)
-            partial(self.res_xy, r, m, 251, IXh, IXl, A),           # DDCB..97 RES 2,(IX+d),A
-            partial(self.res_xy, r, m, 247, IXh, IXl, B),           # DDCB..98 RES 3,(IX+d),B
-            partial(self.res_xy, r, m, 247, IXh, IXl, C),           # DDCB..99 RES 3,(IX+d),C
-            partial(self.res_xy, r, m, 247, IXh, IXl, D),           # DDCB..9A RES 3,(IX+d),D
-            partial(self.res_xy, r, m, 247, IXh, IXl, E),           # DDCB..9B RES 3,(IX+d),E
-            partial(self.res_xy, r, m, 247, IXh, IXl, H),           # DDCB..9C RES 3,(IX+d),H
-            partial(self.res_xy, r, m, 247, IXh, IXl, L),           # DDCB..9D RES 3,(IX+d),L
-            partial(self.res_xy, r, m, 247, IXh, IXl),              # DDCB..9E RES 3,(IX+d)
-            partial(self.res_xy, r, m, 247, IXh, IXl, A),           # DDCB..9F RES 3,(IX+d),A
-            partial(self.res_xy, r, m, 239, IXh, IXl, B),           # DDCB..A0 RES 4,(IX+d),B
-            partial(self.res_xy, r, m, 239, IXh, IXl, C),           # DDCB..A1 RES 4,(IX+d),C
-            partial(self.res_xy, r, m, 239, IXh, IXl, D),           # DDCB..A2 RES 4,(IX+d),D
-            partial(self.res_xy, r, m, 239, IXh, IXl, E),           # DDCB..A3 RES 4,(IX+d),E
-            partial(self.res_xy, r, m, 239, IXh, IXl, H),           # DDCB..A4 RES 4,(IX+d),H
-            partial(self.res_xy, r, m, 239, IXh, IXl, L),           # DDCB..A5 RES 4,(IX+d),L
-            partial(self.res_xy, r, m, 239, IXh, IXl),              # DDCB..A6 RES 4,(IX+d)
-            partial(self.res_xy, r, m, 239, IXh, IXl, A),           # DDCB..A7 RES 4,(IX+d),A
-            partial(self.res_xy, r, m, 223, IXh, IXl, B),           # DDCB..A8 RES 5,(IX+d),B
-            partial(self.res_xy, r, m, 223, IXh, IXl, C),           # DDCB..A9 RES 5,(IX+d),C
-            partial(self.res_xy, r, m, 223, IXh, IXl, D),           # DDCB..AA RES 5,(IX+d),D
-            partial(self.res_xy, r, m, 223, IXh, IXl, E),           # DDCB..AB RES 5,(IX+d),E
-            partial(self.res_xy, r, m, 223, IXh, IXl, H),           # DDCB..AC RES 5,(IX+d),H
-            partial(self.res_xy, r, m, 223, IXh, IXl, L),           # DDCB..AD RES 5,(IX+d),L
-            partial(self.res_xy, r, m, 223, IXh, IXl),              # DDCB..AE RES 5,(IX+d)
-            partial(self.res_xy, r, m, 223, IXh, IXl, A),           # DDCB..AF RES 5,(IX+d),A
-            partial(self.res_xy, r, m, 191, IXh, IXl, B),           # DDCB..B0 RES 6,(IX+d),B
-            partial(self.res_xy, r, m, 191, IXh, IXl, C),           # DDCB..B1 RES 6,(IX+d),C
-            partial(self.res_xy, r, m, 191, IXh, IXl, D),           # DDCB..B2 RES 6,(IX+d),D
-            partial(self.res_xy, r, m, 191, IXh, IXl, E),           # DDCB..B3 RES 6,(IX+d),E
-            partial(self.res_xy, r, m, 191, IXh, IXl, H),           # DDCB..B4 RES 6,(IX+d),H
-            partial(self.res_xy, r, m, 191, IXh, IXl, L),           # DDCB..B5 RES 6,(IX+d),L
-            partial(self.res_xy, r, m, 191, IXh, IXl),              # DDCB..B6 RES 6,(IX+d)
-            partial(self.res_xy, r, m, 191, IXh, IXl, A),           # DDCB..B7 RES 6,(IX+d),A
-            partial(self.res_xy, r, m, 127, IXh, IXl, B),           # DDCB..B8 RES 7,(IX+d),B
-            partial(self.res_xy, r, m, 127, IXh, IXl, C),           # DDCB..B9 RES 7,(IX+d),C
-            partial(self.res_xy, r, m, 127, IXh, IXl, D),           # DDCB..BA RES 7,(IX+d),D
-            partial(self.res_xy, r, m, 127, IXh, IXl, E),           # DDCB..BB RES 7,(IX+d),E
-            partial(self.res_xy, r, m, 127, IXh, IXl, H),           # DDCB..BC RES 7,(IX+d),H
-            partial(self.res_xy, r, m, 127, IXh, IXl, L),           # DDCB..BD RES 7,(IX+d),L
-            partial(self.res_xy, r, m, 127, IXh, IXl),              # DDCB..BE RES 7,(IX+d)
-            partial(self.res_xy, r, m, 127, IXh, IXl, A),           # DDCB..BF RES 7,(IX+d),A
-            partial(self.set_xy, r, m, 1, IXh, IXl, B),             # DDCB..C0 SET 0,(IX+d),B
-            partial(self.set_xy, r, m, 1, IXh, IXl, C),             # DDCB..C1 SET 0,(IX+d),C
-            partial(self.set_xy, r, m, 1, IXh, IXl, D),             # DDCB..C2 SET 0,(IX+d),D
-            partial(self.set_xy, r, m, 1, IXh, IXl, E),             # DDCB..C3 SET 0,(IX+d),E
-            partial(self.set_xy, r, m, 1, IXh, IXl, H),             # DDCB..C4 SET 0,(IX+d),H
-            partial(self.set_xy, r, m, 1, IXh, IXl, L),             # DDCB..C5 SET 0,(IX+d),L
-            partial(self.set_xy, r, m, 1, IXh, IXl),                # DDCB..C6 SET 0,(IX+d)
-            partial(self.set_xy, r, m, 1, IXh, IXl, A),             # DDCB..C7 SET 0,(IX+d),A
-            partial(self.set_xy, r, m, 2, IXh, IXl, B),             # DDCB..C8 SET 1,(IX+d),B
-            partial(self.set_xy, r, m, 2, IXh, IXl, C),             # DDCB..C9 SET 1,(IX+d),C
-            partial(self.set_xy, r, m, 2, IXh, IXl, D),             # DDCB..CA SET 1,(IX+d),D
-            partial(self.set_xy, r, m, 2, IXh, IXl, E),             # DDCB..CB SET 1,(IX+d),E
-            partial(self.set_xy, r, m, 2, IXh, IXl, H),             # DDCB..CC SET 1,(IX+d),H
-            partial(self.set_xy, r, m, 2, IXh, IXl, L),             # DDCB..CD SET 1,(IX+d),L
-            partial(self.set_xy, r, m, 2, IXh, IXl),                # DDCB..CE SET 1,(IX+d)
-            partial(self.set_xy, r, m, 2, IXh, IXl, A),             # DDCB..CF SET 1,(IX+d),A
-            partial(self.set_xy, r, m, 4, IXh, IXl, B),             # DDCB..D0 SET 2,(IX+d),B
-            partial(self.set_xy, r, m, 4, IXh, IXl, C),             # DDCB..D1 SET 2,(IX+d),C
-            partial(self.set_xy, r, m, 4, IXh, IXl, D),             # DDCB..D2 SET 2,(IX+d),D
-            partial(self.set_xy, r, m, 4, IXh, IXl, E),             # DDCB..D3 SET 2,(IX+d),E
-            partial(self.set_xy, r, m, 4, IXh, IXl, H),             # DDCB..D4 SET 2,(IX+d),H
-            partial(self.set_xy, r, m, 4, IXh, IXl, L),             # DDCB..D5 SET 2,(IX+d),L
-            partial(self.set_xy, r, m, 4, IXh, IXl),                # DDCB..D6 SET 2,(IX+d)
-            partial(self.set_xy, r, m, 4, IXh, IXl, A),             # DDCB..D7 SET 2,(IX+d),A
-            partial(self.set_xy, r, m, 8, IXh, IXl, B),             # DDCB..D8 SET 3,(IX+d),B
-            partial(self.set_xy, r, m, 8, IXh, IXl, C),             # DDCB..D9 SET 3,(IX+d),C
-            partial(self.set_xy, r, m, 8, IXh, IXl, D),             # DDCB..DA SET 3,(IX+d),D
-            partial(self.set_xy, r, m, 8, IXh, IXl, E),             # DDCB..DB SET 3,(IX+d),E
-            partial(self.set_xy, r, m, 8, IXh, IXl, H),             # DDCB..DC SET 3,(IX+d),H
-            partial(self.set_xy, r, m, 8, IXh, IXl, L),             # DDCB..DD SET 3,(IX+d),L
-            partial(self.set_xy, r, m, 8, IXh, IXl),                # DDCB..DE SET 3,(IX+d)
-            partial(self.set_xy, r, m, 8, IXh, IXl, A),             # DDCB..DF SET 3,(IX+d),A
-            partial(self.set_xy, r, m, 16, IXh, IXl, B),            # DDCB..E0 SET 4,(IX+d),B
-            partial(self.set_xy, r, m, 16, IXh, IXl, C),            # DDCB..E1 SET 4,(IX+d),C
-            partial(self.set_xy, r, m, 16, IXh, IXl, D),            # DDCB..E2 SET 4,(IX+d),D
-            partial(self.set_xy, r, m, 16, IXh, IXl, E),            # DDCB..E3 SET 4,(IX+d),E
-            partial(self.set_xy, r, m, 16, IXh, IXl, H),            # DDCB..E4 SET 4,(IX+d),H
-            partial(self.set_xy, r, m, 16, IXh, IXl, L),            # DDCB..E5 SET 4,(IX+d),L
-            partial(self.set_xy, r, m, 16, IXh, IXl),               # DDCB..E6 SET 4,(IX+d)
-            partial(self.set_xy, r, m, 16, IXh, IXl, A),            # DDCB..E7 SET 4,(IX+d),A
-            partial(self.set_xy, r, m, 32, IXh, IXl, B),            # DDCB..E8 SET 5,(IX+d),B
-            partial(self.set_xy, r, m, 32, IXh, IXl, C),            # DDCB..E9 SET 5,(IX+d),C
-            partial(self.set_xy, r, m, 32, IXh, IXl, D),            # DDCB..EA SET 5,(IX+d),D
-            partial(self.set_xy, r, m, 32, IXh, IXl, E),            # DDCB..EB SET 5,(IX+d),E
-            partial(self.set_xy, r, m, 32, IXh, IXl, H),            # DDCB..EC SET 5,(IX+d),H
-            partial(self.set_xy, r, m, 32, IXh, IXl, L),            # DDCB..ED SET 5,(IX+d),L
-            partial(self.set_xy, r, m, 32, IXh, IXl),               # DDCB..EE SET 5,(IX+d)
-            partial(self.set_xy, r, m, 32, IXh, IXl, A),            # DDCB..EF SET 5,(IX+d),A
-            partial(self.set_xy, r, m, 64, IXh, IXl, B),            # DDCB..F0 SET 6,(IX+d),B
-            partial(self.set_xy, r, m, 64, IXh, IXl, C),            # DDCB..F1 SET 6,(IX+d),C
-            partial(self.set_xy, r, m, 64, IXh, IXl, D),            # DDCB..F2 SET 6,(IX+d),D
-            partial(self.set_xy, r, m, 64, IXh, IXl, E),            # DDCB..F3 SET 6,(IX+d),E
-            partial(self.set_xy, r, m, 64, IXh, IXl, H),            # DDCB..F4 SET 6,(IX+d),H
-            partial(self.set_xy, r, m, 64, IXh, IXl, L),            # DDCB..F5 SET 6,(IX+d),L
-            partial(self.set_xy, r, m, 64, IXh, IXl),               # DDCB..F6 SET 6,(IX+d)
-            partial(self.set_xy, r, m, 64, IXh, IXl, A),            # DDCB..F7 SET 6,(IX+d),A
-            partial(self.set_xy, r, m, 128, IXh, IXl, B),           # DDCB..F8 SET 7,(IX+d),B
-            partial(self.set_xy, r, m, 128, IXh, IXl, C),           # DDCB..F9 SET 7,(IX+d),C
-            partial(self.set_xy, r, m, 128, IXh, IXl, D),           # DDCB..FA SET 7,(IX+d),D
-            partial(self.set_xy, r, m, 128, IXh, IXl, E),           # DDCB..FB SET 7,(IX+d),E
-            partial(self.set_xy, r, m, 128, IXh, IXl, H),           # DDCB..FC SET 7,(IX+d),H
-            partial(self.set_xy, r, m, 128, IXh, IXl, L),           # DDCB..FD SET 7,(IX+d),L
-            partial(self.set_xy, r, m, 128, IXh, IXl),              # DDCB..FE SET 7,(IX+d)
-            partial(self.set_xy, r, m, 128, IXh, IXl, A),           # DDCB..FF SET 7,(IX+d),A
-        ]
-
-        self.after_FDCB = [
-            partial(self.f_xy, r, m, RLC, IYh, IYl, B),             # FDCB..00 RLC (IY+d),B
-            partial(self.f_xy, r, m, RLC, IYh, IYl, C),             # FDCB..01 RLC (IY+d),C
-            partial(self.f_xy, r, m, RLC, IYh, IYl, D),             # FDCB..02 RLC (IY+d),D
-            partial(self.f_xy, r, m, RLC, IYh, IYl, E),             # FDCB..03 RLC (IY+d),E
-            partial(self.f_xy, r, m, RLC, IYh, IYl, H),             # FDCB..04 RLC (IY+d),H
-            partial(self.f_xy, r, m, RLC, IYh, IYl, L),             # FDCB..05 RLC (IY+d),L
-            partial(self.f_xy, r, m, RLC, IYh, IYl),                # FDCB..06 RLC (IY+d)
-            partial(self.f_xy, r, m, RLC, IYh, IYl, A),             # FDCB..07 RLC (IY+d),A
-            partial(self.f_xy, r, m, RRC, IYh, IYl, B),             # FDCB..08 RRC (IY+d),B
-            partial(self.f_xy, r, m, RRC, IYh, IYl, C),             # FDCB..09 RRC (IY+d),C
-            partial(self.f_xy, r, m, RRC, IYh, IYl, D),             # FDCB..0A RRC (IY+d),D
-            partial(self.f_xy, r, m, RRC, IYh, IYl, E),             # FDCB..0B RRC (IY+d),E
-            partial(self.f_xy, r, m, RRC, IYh, IYl, H),             # FDCB..0C RRC (IY+d),H
-            partial(self.f_xy, r, m, RRC, IYh, IYl, L),             # FDCB..0D RRC (IY+d),L
-            partial(self.f_xy, r, m, RRC, IYh, IYl),                # FDCB..0E RRC (IY+d)
-            partial(self.f_xy, r, m, RRC, IYh, IYl, A),             # FDCB..0F RRC (IY+d),A
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, B),          # FDCB..10 RL (IY+d),B
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, C),          # FDCB..11 RL (IY+d),C
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, D),          # FDCB..12 RL (IY+d),D
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, E),          # FDCB..13 RL (IY+d),E
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, H),          # FDCB..14 RL (IY+d),H
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, L),          # FDCB..15 RL (IY+d),L
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl),             # FDCB..16 RL (IY+d)
-            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, A),          # FDCB..17 RL (IY+d),A
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, B),          # FDCB..18 RR (IY+d),B
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, C),          # FDCB..19 RR (IY+d),C
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, D),          # FDCB..1A RR (IY+d),D
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, E),          # FDCB..1B RR (IY+d),E
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, H),          # FDCB..1C RR (IY+d),H
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, L),          # FDCB..1D RR (IY+d),L
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl),             # FDCB..1E RR (IY+d)
-            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, A),          # FDCB..1F RR (IY+d),A
-            partial(self.f_xy, r, m, SLA, IYh, IYl, B),             # FDCB..20 SLA (IY+d),B
-            partial(self.f_xy, r, m, SLA, IYh, IYl, C),             # FDCB..21 SLA (IY+d),C
-            partial(self.f_xy, r, m, SLA, IYh, IYl, D),             # FDCB..22 SLA (IY+d),D
-            partial(self.f_xy, r, m, SLA, IYh, IYl, E),             # FDCB..23 SLA (IY+d),E
-            partial(self.f_xy, r, m, SLA, IYh, IYl, H),             # FDCB..24 SLA (IY+d),H
-            partial(self.f_xy, r, m, SLA, IYh, IYl, L),             # FDCB..25 SLA (IY+d),L
-            partial(self.f_xy, r, m, SLA, IYh, IYl),                # FDCB..26 SLA (IY+d)
-            partial(self.f_xy, r, m, SLA, IYh, IYl, A),             # FDCB..27 SLA (IY+d),A
-            partial(self.f_xy, r, m, SRA, IYh, IYl, B),             # FDCB..28 SRA (IY+d),B
-            partial(self.f_xy, r, m, SRA, IYh, IYl, C),             # FDCB..29 SRA (IY+d),C
-            partial(self.f_xy, r, m, SRA, IYh, IYl, D),             # FDCB..2A SRA (IY+d),D
-            partial(self.f_xy, r, m, SRA, IYh, IYl, E),             # FDCB..2B SRA (IY+d),E
-            partial(self.f_xy, r, m, SRA, IYh, IYl, H),             # FDCB..2C SRA (IY+d),H
-            partial(self.f_xy, r, m, SRA, IYh, IYl, L),             # FDCB..2D SRA (IY+d),L
-            partial(self.f_xy, r, m, SRA, IYh, IYl),                # FDCB..2E SRA (IY+d)
-            partial(self.f_xy, r, m, SRA, IYh, IYl, A),             # FDCB..2F SRA (IY+d),A
-            partial(self.f_xy, r, m, SLL, IYh, IYl, B),             # FDCB..30 SLL (IY+d),B
-            partial(self.f_xy, r, m, SLL, IYh, IYl, C),             # FDCB..31 SLL (IY+d),C
-            partial(self.f_xy, r, m, SLL, IYh, IYl, D),             # FDCB..32 SLL (IY+d),D
-            partial(self.f_xy, r, m, SLL, IYh, IYl, E),             # FDCB..33 SLL (IY+d),E
-            partial(self.f_xy, r, m, SLL, IYh, IYl, H),             # FDCB..34 SLL (IY+d),H
-            partial(self.f_xy, r, m, SLL, IYh, IYl, L),             # FDCB..35 SLL (IY+d),L
-            partial(self.f_xy, r, m, SLL, IYh, IYl),                # FDCB..36 SLL (IY+d)
-            partial(self.f_xy, r, m, SLL, IYh, IYl, A),             # FDCB..37 SLL (IY+d),A
-            partial(self.f_xy, r, m, SRL, IYh, IYl, B),             # FDCB..38 SRL (IY+d),B
-            partial(self.f_xy, r, m, SRL, IYh, IYl, C),             # FDCB..39 SRL (IY+d),C
-            partial(self.f_xy, r, m, SRL, IYh, IYl, D),             # FDCB..3A SRL (IY+d),D
-            partial(self.f_xy, r, m, SRL, IYh, IYl, E),             # FDCB..3B SRL (IY+d),E
-            partial(self.f_xy, r, m, SRL, IYh, IYl, H),             # FDCB..3C SRL (IY+d),H
-            partial(self.f_xy, r, m, SRL, IYh, IYl, L),             # FDCB..3D SRL (IY+d),L
-            partial(self.f_xy, r, m, SRL, IYh, IYl),                # FDCB..3E SRL (IY+d)
-            partial(self.f_xy, r, m, SRL, IYh, IYl, A),             # FDCB..3F SRL (IY+d),A
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..40 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..41 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..42 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..43 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..44 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..45 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..46 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..47 BIT 0,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..48 BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..49 BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4A BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4B BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4C BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4D BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4E BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4F BIT 1,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..50 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..51 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..52 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..53 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..54 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..55 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..56 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..57 BIT 2,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..58 BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..59 BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5A BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5B BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5C BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5D BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5E BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5F BIT 3,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..60 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..61 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..62 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..63 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..64 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..65 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..66 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..67 BIT 4,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..68 BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..69 BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6A BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6B BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6C BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6D BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6E BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6F BIT 5,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..70 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..71 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..72 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..73 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..74 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..75 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..76 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..77 BIT 6,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..78 BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..79 BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7A BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7B BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7C BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7D BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7E BIT 7,(IY+d)
-            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7F BIT 7,(IY+d)
-            partial(self.res_xy, r, m, 254, IYh, IYl, B),           # FDCB..80 RES 0,(IY+d),B
-            partial(self.res_xy, r, m, 254, IYh, IYl, C),           # FDCB..81 RES 0,(IY+d),C
-            partial(self.res_xy, r, m, 254, IYh, IYl, D),           # FDCB..82 RES 0,(IY+d),D
-            partial(self.res_xy, r, m, 254, IYh, IYl, E),           # FDCB..83 RES 0,(IY+d),E
-            partial(self.res_xy, r, m, 254, IYh, IYl, H),           # FDCB..84 RES 0,(IY+d),H
-            partial(self.res_xy, r, m, 254, IYh, IYl, L),           # FDCB..85 RES 0,(IY+d),L
-            partial(self.res_xy, r, m, 254, IYh, IYl),              # FDCB..86 RES 0,(IY+d)
-            partial(self.res_xy, r, m, 254, IYh, IYl, A),           # FDCB..87 RES 0,(IY+d),A
-            partial(self.res_xy, r, m, 253, IYh, IYl, B),           # FDCB..88 RES 1,(IY+d),B
-            partial(self.res_xy, r, m, 253, IYh, IYl, C),           # FDCB..89 RES 1,(IY+d),C
-            partial(self.res_xy, r, m, 253, IYh, IYl, D),           # FDCB..8A RES 1,(IY+d),D
-            partial(self.res_xy, r, m, 253, IYh, IYl, E),           # FDCB..8B RES 1,(IY+d),E
-            partial(self.res_xy, r, m, 253, IYh, IYl, H),           # FDCB..8C RES 1,(IY+d),H
-            partial(self.res_xy, r, m, 253, IYh, IYl, L),           # FDCB..8D RES 1,(IY+d),L
-            partial(self.res_xy, r, m, 253, IYh, IYl),              # FDCB..8E RES 1,(IY+d)
-            partial(self.res_xy, r, m, 253, IYh, IYl, A),           # FDCB..8F RES 1,(IY+d),A
-            partial(self.res_xy, r, m, 251, IYh, IYl, B),           # FDCB..90 RES 2,(IY+d),B
-            partial(self.res_xy, r, m, 251, IYh, IYl, C),           # FDCB..91 RES 2,(IY+d),C
-            partial(self.res_xy, r, m, 251, IYh, IYl, D),           # FDCB..92 RES 2,(IY+d),D
-            partial(self.res_xy, r, m, 251, IYh, IYl, E),           # FDCB..93 RES 2,(IY+d),E
-            partial(self.res_xy, r, m, 251, IYh, IYl, H),           # FDCB..94 RES 2,(IY+d),H
-            partial(self.res_xy, r, m, 251, IYh, IYl, L),           # FDCB..95 RES 2,(IY+d),L
-            partial(self.res_xy, r, m, 251, IYh, IYl),              # FDCB..96 RES 2,(IY+d)
-            partial(self.res_xy, r, m, 251, IYh, IYl, A),           # FDCB..97 RES 2,(IY+d),A
-            partial(self.res_xy, r, m, 247, IYh, IYl, B),           # FDCB..98 RES 3,(IY+d),B
-            partial(self.res_xy, r, m, 247, IYh, IYl, C),           # FDCB..99 RES 3,(IY+d),C
-            partial(self.res_xy, r, m, 247, IYh, IYl, D),           # FDCB..9A RES 3,(IY+d),D
-            partial(self.res_xy, r, m, 247, IYh, IYl, E),           # FDCB..9B RES 3,(IY+d),E
-            partial(self.res_xy, r, m, 247, IYh, IYl, H),           # FDCB..9C RES 3,(IY+d),H
-            partial(self.res_xy, r, m, 247, IYh, IYl, L),           # FDCB..9D RES 3,(IY+d),L
-            partial(self.res_xy, r, m, 247, IYh, IYl),              # FDCB..9E RES 3,(IY+d)
-            partial(self.res_xy, r, m, 247, IYh, IYl, A),           # FDCB..9F RES 3,(IY+d),A
-            partial(self.res_xy, r, m, 239, IYh, IYl, B),           # FDCB..A0 RES 4,(IY+d),B
-            partial(self.res_xy, r, m, 239, IYh, IYl, C),           # FDCB..A1 RES 4,(IY+d),C
-            partial(self.res_xy, r, m, 239, IYh, IYl, D),           # FDCB..A2 RES 4,(IY+d),D
-            partial(self.res_xy, r, m, 239, IYh, IYl, E),           # FDCB..A3 RES 4,(IY+d),E
-            partial(self.res_xy, r, m, 239, IYh, IYl, H),           # FDCB..A4 RES 4,(IY+d),H
-            partial(self.res_xy, r, m, 239, IYh, IYl, L),           # FDCB..A5 RES 4,(IY+d),L
-            partial(self.res_xy, r, m, 239, IYh, IYl),              # FDCB..A6 RES 4,(IY+d)
-            partial(self.res_xy, r, m, 239, IYh, IYl, A),           # FDCB..A7 RES 4,(IY+d),A
-            partial(self.res_xy, r, m, 223, IYh, IYl, B),           # FDCB..A8 RES 5,(IY+d),B
-            partial(self.res_xy, r, m, 223, IYh, IYl, C),           # FDCB..A9 RES 5,(IY+d),C
-            partial(self.res_xy, r, m, 223, IYh, IYl, D),           # FDCB..AA RES 5,(IY+d),D
-            partial(self.res_xy, r, m, 223, IYh, IYl, E),           # FDCB..AB RES 5,(IY+d),E
-            partial(self.res_xy, r, m, 223, IYh, IYl, H),           # FDCB..AC RES 5,(IY+d),H
-            partial(self.res_xy, r, m, 223, IYh, IYl, L),           # FDCB..AD RES 5,(IY+d),L
-            partial(self.res_xy, r, m, 223, IYh, IYl),              # FDCB..AE RES 5,(IY+d)
-            partial(self.res_xy, r, m, 223, IYh, IYl, A),           # FDCB..AF RES 5,(IY+d),A
-            partial(self.res_xy, r, m, 191, IYh, IYl, B),           # FDCB..B0 RES 6,(IY+d),B
-            partial(self.res_xy, r, m, 191, IYh, IYl, C),           # FDCB..B1 RES 6,(IY+d),C
-            partial(self.res_xy, r, m, 191, IYh, IYl, D),           # FDCB..B2 RES 6,(IY+d),D
-            partial(self.res_xy, r, m, 191, IYh, IYl, E),           # FDCB..B3 RES 6,(IY+d),E
-            partial(self.res_xy, r, m, 191, IYh, IYl, H),           # FDCB..B4 RES 6,(IY+d),H
-            partial(self.res_xy, r, m, 191, IYh, IYl, L),           # FDCB..B5 RES 6,(IY+d),L
-            partial(self.res_xy, r, m, 191, IYh, IYl),              # FDCB..B6 RES 6,(IY+d)
-            partial(self.res_xy, r, m, 191, IYh, IYl, A),           # FDCB..B7 RES 6,(IY+d),A
-            partial(self.res_xy, r, m, 127, IYh, IYl, B),           # FDCB..B8 RES 7,(IY+d),B
-            partial(self.res_xy, r, m, 127, IYh, IYl, C),           # FDCB..B9 RES 7,(IY+d),C
-            partial(self.res_xy, r, m, 127, IYh, IYl, D),           # FDCB..BA RES 7,(IY+d),D
-            partial(self.res_xy, r, m, 127, IYh, IYl, E),           # FDCB..BB RES 7,(IY+d),E
-            partial(self.res_xy, r, m, 127, IYh, IYl, H),           # FDCB..BC RES 7,(IY+d),H
-            partial(self.res_xy, r, m, 127, IYh, IYl, L),           # FDCB..BD RES 7,(IY+d),L
-            partial(self.res_xy, r, m, 127, IYh, IYl),              # FDCB..BE RES 7,(IY+d)
-            partial(self.res_xy, r, m, 127, IYh, IYl, A),           # FDCB..BF RES 7,(IY+d),A
-            partial(self.set_xy, r, m, 1, IYh, IYl, B),             # FDCB..C0 SET 0,(IY+d),B
-            partial(self.set_xy, r, m, 1, IYh, IYl, C),             # FDCB..C1 SET 0,(IY+d),C
-            partial(self.set_xy, r, m, 1, IYh, IYl, D),             # FDCB..C2 SET 0,(IY+d),D
-            partial(self.set_xy, r, m, 1, IYh, IYl, E),             # FDCB..C3 SET 0,(IY+d),E
-            partial(self.set_xy, r, m, 1, IYh, IYl, H),             # FDCB..C4 SET 0,(IY+d),H
-            partial(self.set_xy, r, m, 1, IYh, IYl, L),             # FDCB..C5 SET 0,(IY+d),L
-            partial(self.set_xy, r, m, 1, IYh, IYl),                # FDCB..C6 SET 0,(IY+d)
-            partial(self.set_xy, r, m, 1, IYh, IYl, A),             # FDCB..C7 SET 0,(IY+d),A
-            partial(self.set_xy, r, m, 2, IYh, IYl, B),             # FDCB..C8 SET 1,(IY+d),B
-            partial(self.set_xy, r, m, 2, IYh, IYl, C),             # FDCB..C9 SET 1,(IY+d),C
-            partial(self.set_xy, r, m, 2, IYh, IYl, D),             # FDCB..CA SET 1,(IY+d),D
-            partial(self.set_xy, r, m, 2, IYh, IYl, E),             # FDCB..CB SET 1,(IY+d),E
-            partial(self.set_xy, r, m, 2, IYh, IYl, H),             # FDCB..CC SET 1,(IY+d),H
-            partial(self.set_xy, r, m, 2, IYh, IYl, L),             # FDCB..CD SET 1,(IY+d),L
-            partial(self.set_xy, r, m, 2, IYh, IYl),                # FDCB..CE SET 1,(IY+d)
-            partial(self.set_xy, r, m, 2, IYh, IYl, A),             # FDCB..CF SET 1,(IY+d),A
-            partial(self.set_xy, r, m, 4, IYh, IYl, B),             # FDCB..D0 SET 2,(IY+d),B
-            partial(self.set_xy, r, m, 4, IYh, IYl, C),             # FDCB..D1 SET 2,(IY+d),C
-            partial(self.set_xy, r, m, 4, IYh, IYl, D),             # FDCB..D2 SET 2,(IY+d),D
-            partial(self.set_xy, r, m, 4, IYh, IYl, E),             # FDCB..D3 SET 2,(IY+d),E
-            partial(self.set_xy, r, m, 4, IYh, IYl, H),             # FDCB..D4 SET 2,(IY+d),H
-            partial(self.set_xy, r, m, 4, IYh, IYl, L),             # FDCB..D5 SET 2,(IY+d),L
-            partial(self.set_xy, r, m, 4, IYh, IYl),                # FDCB..D6 SET 2,(IY+d)
-            partial(self.set_xy, r, m, 4, IYh, IYl, A),             # FDCB..D7 SET 2,(IY+d),A
-            partial(self.set_xy, r, m, 8, IYh, IYl, B),             # FDCB..D8 SET 3,(IY+d),B
-            partial(self.set_xy, r, m, 8, IYh, IYl, C),             # FDCB..D9 SET 3,(IY+d),C
-            partial(self.set_xy, r, m, 8, IYh, IYl, D),             # FDCB..DA SET 3,(IY+d),D
-            partial(self.set_xy, r, m, 8, IYh, IYl, E),             # FDCB..DB SET 3,(IY+d),E
-            partial(self.set_xy, r, m, 8, IYh, IYl, H),             # FDCB..DC SET 3,(IY+d),H
-            partial(self.set_xy, r, m, 8, IYh, IYl, L),             # FDCB..DD SET 3,(IY+d),L
-            partial(self.set_xy, r, m, 8, IYh, IYl),                # FDCB..DE SET 3,(IY+d)
-            partial(self.set_xy, r, m, 8, IYh, IYl, A),             # FDCB..DF SET 3,(IY+d),A
-            partial(self.set_xy, r, m, 16, IYh, IYl, B),            # FDCB..E0 SET 4,(IY+d),B
-            partial(self.set_xy, r, m, 16, IYh, IYl, C),            # FDCB..E1 SET 4,(IY+d),C
-            partial(self.set_xy, r, m, 16, IYh, IYl, D),            # FDCB..E2 SET 4,(IY+d),D
-            partial(self.set_xy, r, m, 16, IYh, IYl, E),            # FDCB..E3 SET 4,(IY+d),E
-            partial(self.set_xy, r, m, 16, IYh, IYl, H),            # FDCB..E4 SET 4,(IY+d),H
-            partial(self.set_xy, r, m, 16, IYh, IYl, L),            # FDCB..E5 SET 4,(IY+d),L
-            partial(self.set_xy, r, m, 16, IYh, IYl),               # FDCB..E6 SET 4,(IY+d)
-            partial(self.set_xy, r, m, 16, IYh, IYl, A),            # FDCB..E7 SET 4,(IY+d),A
-            partial(self.set_xy, r, m, 32, IYh, IYl, B),            # FDCB..E8 SET 5,(IY+d),B
-            partial(self.set_xy, r, m, 32, IYh, IYl, C),            # FDCB..E9 SET 5,(IY+d),C
-            partial(self.set_xy, r, m, 32, IYh, IYl, D),            # FDCB..EA SET 5,(IY+d),D
-            partial(self.set_xy, r, m, 32, IYh, IYl, E),            # FDCB..EB SET 5,(IY+d),E
-            partial(self.set_xy, r, m, 32, IYh, IYl, H),            # FDCB..EC SET 5,(IY+d),H
-            partial(self.set_xy, r, m, 32, IYh, IYl, L),            # FDCB..ED SET 5,(IY+d),L
-            partial(self.set_xy, r, m, 32, IYh, IYl),               # FDCB..EE SET 5,(IY+d)
-            partial(self.set_xy, r, m, 32, IYh, IYl, A),            # FDCB..EF SET 5,(IY+d),A
-            partial(self.set_xy, r, m, 64, IYh, IYl, B),            # FDCB..F0 SET 6,(IY+d),B
-            partial(self.set_xy, r, m, 64, IYh, IYl, C),            # FDCB..F1 SET 6,(IY+d),C
-            partial(self.set_xy, r, m, 64, IYh, IYl, D),            # FDCB..F2 SET 6,(IY+d),D
-            partial(self.set_xy, r, m, 64, IYh, IYl, E),            # FDCB..F3 SET 6,(IY+d),E
-            partial(self.set_xy, r, m, 64, IYh, IYl, H),            # FDCB..F4 SET 6,(IY+d),H
-            partial(self.set_xy, r, m, 64, IYh, IYl, L),            # FDCB..F5 SET 6,(IY+d),L
-            partial(self.set_xy, r, m, 64, IYh, IYl),               # FDCB..F6 SET 6,(IY+d)
-            partial(self.set_xy, r, m, 64, IYh, IYl, A),            # FDCB..F7 SET 6,(IY+d),A
-            partial(self.set_xy, r, m, 128, IYh, IYl, B),           # FDCB..F8 SET 7,(IY+d),B
-            partial(self.set_xy, r, m, 128, IYh, IYl, C),           # FDCB..F9 SET 7,(IY+d),C
-            partial(self.set_xy, r, m, 128, IYh, IYl, D),           # FDCB..FA SET 7,(IY+d),D
-            partial(self.set_xy, r, m, 128, IYh, IYl, E),           # FDCB..FB SET 7,(IY+d),E
-            partial(self.set_xy, r, m, 128, IYh, IYl, H),           # FDCB..FC SET 7,(IY+d),H
-            partial(self.set_xy, r, m, 128, IYh, IYl, L),           # FDCB..FD SET 7,(IY+d),L
-            partial(self.set_xy, r, m, 128, IYh, IYl),              # FDCB..FE SET 7,(IY+d)
-            partial(self.set_xy, r, m, 128, IYh, IYl, A),           # FDCB..FF SET 7,(IY+d),A
+        self.opcodes = [
+            partial(self.nop, r, R1, 4, 1),                         # 00 NOP
+            partial(self.ld_rr_nn, r, m, R1, 10, 3, B, C),          # 01 LD BC,nn
+            partial(self.ld_rr_r, r, m, B, C, A),                   # 02 LD (BC),A
+            partial(self.inc_dec_rr, r, R1, 6, 1, 1, B, C),         # 03 INC BC
+            partial(self.fc_r, r, R1, 4, 1, INC, B),                # 04 INC B
+            partial(self.fc_r, r, R1, 4, 1, DEC, B),                # 05 DEC B
+            partial(self.ld_r_n, r, m, R1, 7, 2, B),                # 06 LD B,n
+            partial(self.af_r, r, R1, 4, 1, RLCA, F),               # 07 RLCA
+            partial(self.ex_af, r),                                 # 08 EX AF,AF'
+            partial(self.add_rr, r, R1, 11, 1, H, L, B, C),         # 09 ADD HL,BC
+            partial(self.ld_r_rr, r, m, A, B, C),                   # 0A LD A,(BC)
+            partial(self.inc_dec_rr, r, R1, 6, 1, -1, B, C),        # 0B DEC BC
+            partial(self.fc_r, r, R1, 4, 1, INC, C),                # 0C INC C
+            partial(self.fc_r, r, R1, 4, 1, DEC, C),                # 0D DEC C
+            partial(self.ld_r_n, r, m, R1, 7, 2, C),                # 0E LD C,n
+            partial(self.af_r, r, R1, 4, 1, RRCA, F),               # 0F RRCA
+            partial(self.djnz, r, m),                               # 10 DJNZ nn
+            partial(self.ld_rr_nn, r, m, R1, 10, 3, D, E),          # 11 LD DE,nn
+            partial(self.ld_rr_r, r, m, D, E, A),                   # 12 LD (DE),A
+            partial(self.inc_dec_rr, r, R1, 6, 1, 1, D, E),         # 13 INC DE
+            partial(self.fc_r, r, R1, 4, 1, INC, D),                # 14 INC D
+            partial(self.fc_r, r, R1, 4, 1, DEC, D),                # 15 DEC D
+            partial(self.ld_r_n, r, m, R1, 7, 2, D),                # 16 LD D,n
+            partial(self.af_r, r, R1, 4, 1, RLA, F),                # 17 RLA
+            partial(self.jr, r, m, 0, 0),                           # 18 JR nn
+            partial(self.add_rr, r, R1, 11, 1, H, L, D, E),         # 19 ADD HL,DE
+            partial(self.ld_r_rr, r, m, A, D, E),                   # 1A LD A,(DE)
+            partial(self.inc_dec_rr, r, R1, 6, 1, -1, D, E),        # 1B DEC DE
+            partial(self.fc_r, r, R1, 4, 1, INC, E),                # 1C INC E
+            partial(self.fc_r, r, R1, 4, 1, DEC, E),                # 1D DEC E
+            partial(self.ld_r_n, r, m, R1, 7, 2, E),                # 1E LD E,n
+            partial(self.af_r, r, R1, 4, 1, RRA, F),                # 1F RRA
+            partial(self.jr, r, m, 64, 0),                          # 20 JR NZ,nn
+            partial(self.ld_rr_nn, r, m, R1, 10, 3, H, L),          # 21 LD HL,nn
+            partial(self.ld_mm_rr, r, m, R1, 16, 3, H, L),          # 22 LD (nn),HL
+            partial(self.inc_dec_rr, r, R1, 6, 1, 1, H, L),         # 23 INC HL
+            partial(self.fc_r, r, R1, 4, 1, INC, H),                # 24 INC H
+            partial(self.fc_r, r, R1, 4, 1, DEC, H),                # 25 DEC H
+            partial(self.ld_r_n, r, m, R1, 7, 2, H),                # 26 LD H,n
+            partial(self.af_r, r, R1, 4, 1, DAA, F),                # 27 DAA
+            partial(self.jr, r, m, 64, 64),                         # 28 JR Z,nn
+            partial(self.add_rr, r, R1, 11, 1, H, L, H, L),         # 29 ADD HL,HL
+            partial(self.ld_rr_mm, r, m, R1, 16, 3, H, L),          # 2A LD HL,(nn)
+            partial(self.inc_dec_rr, r, R1, 6, 1, -1, H, L),        # 2B DEC HL
+            partial(self.fc_r, r, R1, 4, 1, INC, L),                # 2C INC L
+            partial(self.fc_r, r, R1, 4, 1, DEC, L),                # 2D DEC L
+            partial(self.ld_r_n, r, m, R1, 7, 2, L),                # 2E LD L,n
+            partial(self.af_r, r, R1, 4, 1, CPL, F),                # 2F CPL
+            partial(self.jr, r, m, 1, 0),                           # 30 JR NC,nn
+            partial(self.ld_rr_nn, r, m, R1, 10, 3, SP2, SP),       # 31 LD SP,nn
+            partial(self.ld_m_a, r, m),                             # 32 LD (nn),A
+            partial(self.inc_dec_rr, r, R1, 6, 1, 1, SP2, SP),      # 33 INC SP
+            partial(self.fc_hl, r, m, R1, 11, 1, INC),              # 34 INC (HL)
+            partial(self.fc_hl, r, m, R1, 11, 1, DEC),              # 35 DEC (HL)
+            partial(self.ld_hl_n, r, m),                            # 36 LD (HL),n
+            partial(self.cf, r, SCF),                               # 37 SCF
+            partial(self.jr, r, m, 1, 1),                           # 38 JR C,nn
+            partial(self.add_rr, r, R1, 11, 1, H, L, SP2, SP),      # 39 ADD HL,SP
+            partial(self.ld_a_m, r, m),                             # 3A LD A,(nn)
+            partial(self.inc_dec_rr, r, R1, 6, 1, -1, SP2, SP),     # 3B DEC SP
+            partial(self.fc_r, r, R1, 4, 1, INC, A),                # 3C INC A
+            partial(self.fc_r, r, R1, 4, 1, DEC, A),                # 3D DEC A
+            partial(self.ld_r_n, r, m, R1, 7, 2, A),                # 3E LD A,n
+            partial(self.cf, r, CCF),                               # 3F CCF
+            partial(self.nop, r, R1, 4, 1),                         # 40 LD B,B
+            partial(self.ld_r_r, r, R1, 4, 1, B, C),                # 41 LD B,C
+            partial(self.ld_r_r, r, R1, 4, 1, B, D),                # 42 LD B,D
+            partial(self.ld_r_r, r, R1, 4, 1, B, E),                # 43 LD B,E
+            partial(self.ld_r_r, r, R1, 4, 1, B, H),                # 44 LD B,H
+            partial(self.ld_r_r, r, R1, 4, 1, B, L),                # 45 LD B,L
+            partial(self.ld_r_rr, r, m, B, H, L),                   # 46 LD B,(HL)
+            partial(self.ld_r_r, r, R1, 4, 1, B, A),                # 47 LD B,A
+            partial(self.ld_r_r, r, R1, 4, 1, C, B),                # 48 LD C,B
+            partial(self.nop, r, R1, 4, 1),                         # 49 LD C,C
+            partial(self.ld_r_r, r, R1, 4, 1, C, D),                # 4A LD C,D
+            partial(self.ld_r_r, r, R1, 4, 1, C, E),                # 4B LD C,E
+            partial(self.ld_r_r, r, R1, 4, 1, C, H),                # 4C LD C,H
+            partial(self.ld_r_r, r, R1, 4, 1, C, L),                # 4D LD C,L
+            partial(self.ld_r_rr, r, m, C, H, L),                   # 4E LD C,(HL)
+            partial(self.ld_r_r, r, R1, 4, 1, C, A),                # 4F LD C,A
+            partial(self.ld_r_r, r, R1, 4, 1, D, B),                # 50 LD D,B
+            partial(self.ld_r_r, r, R1, 4, 1, D, C),                # 51 LD D,C
+            partial(self.nop, r, R1, 4, 1),                         # 52 LD D,D
+            partial(self.ld_r_r, r, R1, 4, 1, D, E),                # 53 LD D,E
+            partial(self.ld_r_r, r, R1, 4, 1, D, H),                # 54 LD D,H
+            partial(self.ld_r_r, r, R1, 4, 1, D, L),                # 55 LD D,L
+            partial(self.ld_r_rr, r, m, D, H, L),                   # 56 LD D,(HL)
+            partial(self.ld_r_r, r, R1, 4, 1, D, A),                # 57 LD D,A
+            partial(self.ld_r_r, r, R1, 4, 1, E, B),                # 58 LD E,B
+            partial(self.ld_r_r, r, R1, 4, 1, E, C),                # 59 LD E,C
+            partial(self.ld_r_r, r, R1, 4, 1, E, D),                # 5A LD E,D
+            partial(self.nop, r, R1, 4, 1),                         # 5B LD E,E
+            partial(self.ld_r_r, r, R1, 4, 1, E, H),                # 5C LD E,H
+            partial(self.ld_r_r, r, R1, 4, 1, E, L),                # 5D LD E,L
+            partial(self.ld_r_rr, r, m, E, H, L),                   # 5E LD E,(HL)
+            partial(self.ld_r_r, r, R1, 4, 1, E, A),                # 5F LD E,A
+            partial(self.ld_r_r, r, R1, 4, 1, H, B),                # 60 LD H,B
+            partial(self.ld_r_r, r, R1, 4, 1, H, C),                # 61 LD H,C
+            partial(self.ld_r_r, r, R1, 4, 1, H, D),                # 62 LD H,D
+            partial(self.ld_r_r, r, R1, 4, 1, H, E),                # 63 LD H,E
+            partial(self.nop, r, R1, 4, 1),                         # 64 LD H,H
+            partial(self.ld_r_r, r, R1, 4, 1, H, L),                # 65 LD H,L
+            partial(self.ld_r_rr, r, m, H, H, L),                   # 66 LD H,(HL)
+            partial(self.ld_r_r, r, R1, 4, 1, H, A),                # 67 LD H,A
+            partial(self.ld_r_r, r, R1, 4, 1, L, B),                # 68 LD L,B
+            partial(self.ld_r_r, r, R1, 4, 1, L, C),                # 69 LD L,C
+            partial(self.ld_r_r, r, R1, 4, 1, L, D),                # 6A LD L,D
+            partial(self.ld_r_r, r, R1, 4, 1, L, E),                # 6B LD L,E
+            partial(self.ld_r_r, r, R1, 4, 1, L, H),                # 6C LD L,H
+            partial(self.nop, r, R1, 4, 1),                         # 6D LD L,L
+            partial(self.ld_r_rr, r, m, L, H, L),                   # 6E LD L,(HL)
+            partial(self.ld_r_r, r, R1, 4, 1, L, A),                # 6F LD L,A
+            partial(self.ld_rr_r, r, m, H, L, B),                   # 70 LD (HL),B
+            partial(self.ld_rr_r, r, m, H, L, C),                   # 71 LD (HL),C
+            partial(self.ld_rr_r, r, m, H, L, D),                   # 72 LD (HL),D
+            partial(self.ld_rr_r, r, m, H, L, E),                   # 73 LD (HL),E
+            partial(self.ld_rr_r, r, m, H, L, H),                   # 74 LD (HL),H
+            partial(self.ld_rr_r, r, m, H, L, L),                   # 75 LD (HL),L
+            partial(self.halt, r),                                  # 76 HALT
+            partial(self.ld_rr_r, r, m, H, L, A),                   # 77 LD (HL),A
+            partial(self.ld_r_r, r, R1, 4, 1, A, B),                # 78 LD A,B
+            partial(self.ld_r_r, r, R1, 4, 1, A, C),                # 79 LD A,C
+            partial(self.ld_r_r, r, R1, 4, 1, A, D),                # 7A LD A,D
+            partial(self.ld_r_r, r, R1, 4, 1, A, E),                # 7B LD A,E
+            partial(self.ld_r_r, r, R1, 4, 1, A, H),                # 7C LD A,H
+            partial(self.ld_r_r, r, R1, 4, 1, A, L),                # 7D LD A,L
+            partial(self.ld_r_rr, r, m, A, H, L),                   # 7E LD A,(HL)
+            partial(self.nop, r, R1, 4, 1),                         # 7F LD A,A
+            partial(self.af_r, r, R1, 4, 1, ADD, B),                # 80 ADD A,B
+            partial(self.af_r, r, R1, 4, 1, ADD, C),                # 81 ADD A,C
+            partial(self.af_r, r, R1, 4, 1, ADD, D),                # 82 ADD A,D
+            partial(self.af_r, r, R1, 4, 1, ADD, E),                # 83 ADD A,E
+            partial(self.af_r, r, R1, 4, 1, ADD, H),                # 84 ADD A,H
+            partial(self.af_r, r, R1, 4, 1, ADD, L),                # 85 ADD A,L
+            partial(self.af_hl, r, m, ADD),                         # 86 ADD A,(HL)
+            partial(self.af_r, r, R1, 4, 1, ADD, A),                # 87 ADD A,A
+            partial(self.afc_r, r, R1, 4, 1, ADC, B),               # 88 ADC A,B
+            partial(self.afc_r, r, R1, 4, 1, ADC, C),               # 89 ADC A,C
+            partial(self.afc_r, r, R1, 4, 1, ADC, D),               # 8A ADC A,D
+            partial(self.afc_r, r, R1, 4, 1, ADC, E),               # 8B ADC A,E
+            partial(self.afc_r, r, R1, 4, 1, ADC, H),               # 8C ADC A,H
+            partial(self.afc_r, r, R1, 4, 1, ADC, L),               # 8D ADC A,L
+            partial(self.afc_hl, r, m, ADC),                        # 8E ADC A,(HL)
+            partial(self.fc_r, r, R1, 4, 1, ADC_A_A, A),            # 8F ADC A,A
+            partial(self.af_r, r, R1, 4, 1, SUB, B),                # 90 SUB B
+            partial(self.af_r, r, R1, 4, 1, SUB, C),                # 91 SUB C
+            partial(self.af_r, r, R1, 4, 1, SUB, D),                # 92 SUB D
+            partial(self.af_r, r, R1, 4, 1, SUB, E),                # 93 SUB E
+            partial(self.af_r, r, R1, 4, 1, SUB, H),                # 94 SUB H
+            partial(self.af_r, r, R1, 4, 1, SUB, L),                # 95 SUB L
+            partial(self.af_hl, r, m, SUB),                         # 96 SUB (HL)
+            partial(self.af_r, r, R1, 4, 1, SUB, A),                # 97 SUB A
+            partial(self.afc_r, r, R1, 4, 1, SBC, B),               # 98 SBC A,B
+            partial(self.afc_r, r, R1, 4, 1, SBC, C),               # 99 SBC A,C
+            partial(self.afc_r, r, R1, 4, 1, SBC, D),               # 9A SBC A,D
+            partial(self.afc_r, r, R1, 4, 1, SBC, E),               # 9B SBC A,E
+            partial(self.afc_r, r, R1, 4, 1, SBC, H),               # 9C SBC A,H
+            partial(self.afc_r, r, R1, 4, 1, SBC, L),               # 9D SBC A,L
+            partial(self.afc_hl, r, m, SBC),                        # 9E SBC A,(HL)
+            partial(self.fc_r, r, R1, 4, 1, SBC_A_A, A),            # 9F SBC A,A
+            partial(self.af_r, r, R1, 4, 1, AND, B),                # A0 AND B
+            partial(self.af_r, r, R1, 4, 1, AND, C),                # A1 AND C
+            partial(self.af_r, r, R1, 4, 1, AND, D),                # A2 AND D
+            partial(self.af_r, r, R1, 4, 1, AND, E),                # A3 AND E
+            partial(self.af_r, r, R1, 4, 1, AND, H),                # A4 AND H
+            partial(self.af_r, r, R1, 4, 1, AND, L),                # A5 AND L
+            partial(self.af_hl, r, m, AND),                         # A6 AND (HL)
+            partial(self.af_r, r, R1, 4, 1, AND, A),                # A7 AND A
+            partial(self.af_r, r, R1, 4, 1, XOR, B),                # A8 XOR B
+            partial(self.af_r, r, R1, 4, 1, XOR, C),                # A9 XOR C
+            partial(self.af_r, r, R1, 4, 1, XOR, D),                # AA XOR D
+            partial(self.af_r, r, R1, 4, 1, XOR, E),                # AB XOR E
+            partial(self.af_r, r, R1, 4, 1, XOR, H),                # AC XOR H
+            partial(self.af_r, r, R1, 4, 1, XOR, L),                # AD XOR L
+            partial(self.af_hl, r, m, XOR),                         # AE XOR (HL)
+            partial(self.af_r, r, R1, 4, 1, XOR, A),                # AF XOR A
+            partial(self.af_r, r, R1, 4, 1, OR, B),                 # B0 OR B
+            partial(self.af_r, r, R1, 4, 1, OR, C),                 # B1 OR C
+            partial(self.af_r, r, R1, 4, 1, OR, D),                 # B2 OR D
+            partial(self.af_r, r, R1, 4, 1, OR, E),                 # B3 OR E
+            partial(self.af_r, r, R1, 4, 1, OR, H),                 # B4 OR H
+            partial(self.af_r, r, R1, 4, 1, OR, L),                 # B5 OR L
+            partial(self.af_hl, r, m, OR),                          # B6 OR (HL)
+            partial(self.af_r, r, R1, 4, 1, OR, A),                 # B7 OR A
+            partial(self.af_r, r, R1, 4, 1, CP, B),                 # B8 CP B
+            partial(self.af_r, r, R1, 4, 1, CP, C),                 # B9 CP C
+            partial(self.af_r, r, R1, 4, 1, CP, D),                 # BA CP D
+            partial(self.af_r, r, R1, 4, 1, CP, E),                 # BB CP E
+            partial(self.af_r, r, R1, 4, 1, CP, H),                 # BC CP H
+            partial(self.af_r, r, R1, 4, 1, CP, L),                 # BD CP L
+            partial(self.af_hl, r, m, CP),                          # BE CP (HL)
+            partial(self.af_r, r, R1, 4, 1, CP, A),                 # BF CP A
+            partial(self.ret, r, m, 64, 64),                        # C0 RET NZ
+            partial(self.pop, r, m, R1, 10, 1, B, C),               # C1 POP BC
+            partial(self.jp, r, m, 64, 0),                          # C2 JP NZ,nn
+            partial(self.jp, r, m, 0, 0),                           # C3 JP nn
+            partial(self.call, r, m, 64, 64),                       # C4 CALL NZ,nn
+            partial(self.push, r, m, R1, 11, 1, B, C),              # C5 PUSH BC
+            partial(self.af_n, r, m, ADD),                          # C6 ADD A,n
+            partial(self.rst, r, m, 0),                             # C7 RST $00
+            partial(self.ret, r, m, 64, 0),                         # C8 RET Z
+            partial(self.ret, r, m, 0, 0),                          # C9 RET
+            partial(self.jp, r, m, 64, 64),                         # CA JP Z,nn
+            partial(self.lazy_prefix, 'after_CB'),                  # CB prefix
+            partial(self.call, r, m, 64, 0),                        # CC CALL Z,nn
+            partial(self.call, r, m, 0, 0),                         # CD CALL nn
+            partial(self.afc_n, r, m, ADC),                         # CE ADC A,n
+            partial(self.rst, r, m, 8),                             # CF RST $08
+            partial(self.ret, r, m, 1, 1),                          # D0 RET NC
+            partial(self.pop, r, m, R1, 10, 1, D, E),               # D1 POP DE
+            partial(self.jp, r, m, 1, 0),                           # D2 JP NC,nn
+            partial(self.out_a, r, m),                              # D3 OUT (n),A
+            partial(self.call, r, m, 1, 1),                         # D4 CALL NC,nn
+            partial(self.push, r, m, R1, 11, 1, D, E),              # D5 PUSH DE
+            partial(self.af_n, r, m, SUB),                          # D6 SUB n
+            partial(self.rst, r, m, 16),                            # D7 RST $10
+            partial(self.ret, r, m, 1, 0),                          # D8 RET C
+            partial(self.exx, r),                                   # D9 EXX
+            partial(self.jp, r, m, 1, 1),                           # DA JP C,nn
+            partial(self.in_a, r, m),                               # DB IN A,(n)
+            partial(self.call, r, m, 1, 0),                         # DC CALL C,nn
+            partial(self.lazy_prefix, 'after_DD'),                  # DD prefix
+            partial(self.afc_n, r, m, SBC),                         # DE SBC A,n
+            partial(self.rst, r, m, 24),                            # DF RST $18
+            partial(self.ret, r, m, 4, 4),                          # E0 RET PO
+            partial(self.pop, r, m, R1, 10, 1, H, L),               # E1 POP HL
+            partial(self.jp, r, m, 4, 0),                           # E2 JP PO,nn
+            partial(self.ex_sp, r, m, R1, 19, 1, H, L),             # E3 EX (SP),HL
+            partial(self.call, r, m, 4, 4),                         # E4 CALL PO,nn
+            partial(self.push, r, m, R1, 11, 1, H, L),              # E5 PUSH HL
+            partial(self.af_n, r, m, AND),                          # E6 AND n
+            partial(self.rst, r, m, 32),                            # E7 RST $20
+            partial(self.ret, r, m, 4, 0),                          # E8 RET PE
+            partial(self.jp_rr, r, R1, 4, H, L),                    # E9 JP (HL)
+            partial(self.jp, r, m, 4, 4),                           # EA JP PE,nn
+            partial(self.ex_de_hl, r),                              # EB EX DE,HL
+            partial(self.call, r, m, 4, 0),                         # EC CALL PE,nn
+            partial(self.lazy_prefix, 'after_ED'),                  # ED prefix
+            partial(self.af_n, r, m, XOR),                          # EE XOR n
+            partial(self.rst, r, m, 40),                            # EF RST $28
+            partial(self.ret, r, m, 128, 128),                      # F0 RET P
+            partial(self.pop, r, m, R1, 10, 1, A, F),               # F1 POP AF
+            partial(self.jp, r, m, 128, 0),                         # F2 JP P,nn
+            partial(self.di_ei, r, 0),                              # F3 DI
+            partial(self.call, r, m, 128, 128),                     # F4 CALL P,nn
+            partial(self.push, r, m, R1, 11, 1, A, F),              # F5 PUSH AF
+            partial(self.af_n, r, m, OR),                           # F6 OR n
+            partial(self.rst, r, m, 48),                            # F7 RST $30
+            partial(self.ret, r, m, 128, 0),                        # F8 RET M
+            partial(self.ld_sp_rr, r, R1, 6, 1, H, L),              # F9 LD SP,HL
+            partial(self.jp, r, m, 128, 128),                       # FA JP M,nn
+            partial(self.di_ei, r, 1),                              # FB EI
+            partial(self.call, r, m, 128, 0),                       # FC CALL M,nn
+            partial(self.lazy_prefix, 'after_FD'),                  # FD prefix
+            partial(self.af_n, r, m, CP),                           # FE CP n
+            partial(self.rst, r, m, 56),                            # FF RST $38
         ]
 
-        self.after_CB = [
+    def create_after_CB(self):
+        from skoolkit.simtables import (
+            BIT, RL, RLC, RR, RRC, SLA, SLL, SRA, SRL
+        )
+        r = self.registers
+        m = self.memory
+
+        return [
             partial(self.f_r, r, RLC, B),                           # CB00 RLC B
             partial(self.f_r, r, RLC, C),                           # CB01 RLC C
             partial(self.f_r, r, RLC, D),                           # CB02 RLC D
@@ -1805,7 +1800,14 @@ class Simulator:
             partial(self.set_r, r, 128, A),                         # CBFF SET 7,A
         ]
 
-        self.after_DD = [
+    def create_after_DD(self):
+        from skoolkit.simtables import (
+            ADC, ADD, AND, CP, DEC, INC, OR, SBC, SUB, XOR
+        )
+        r = self.registers
+        m = self.memory
+
+        return [
             partial(self.nop, r, R1, 4, 1),                         # DD00
             partial(self.nop, r, R1, 4, 1),                         # DD01
             partial(self.nop, r, R1, 4, 1),                         # DD02
@@ -2009,7 +2011,7 @@ class Simulator:
             partial(self.nop, r, R1, 4, 1),                         # DDC8
             partial(self.nop, r, R1, 4, 1),                         # DDC9
             partial(self.nop, r, R1, 4, 1),                         # DDCA
-            partial(self.prefix2, self.after_DDCB, r, m),           # DDCB prefix
+            partial(self.lazy_prefix, 'after_DDCB'),                # DDCB prefix
             partial(self.nop, r, R1, 4, 1),                         # DDCC
             partial(self.nop, r, R1, 4, 1),                         # DDCD
             partial(self.nop, r, R1, 4, 1),                         # DDCE
@@ -2064,7 +2066,12 @@ class Simulator:
             partial(self.nop, r, R1, 4, 1),                         # DDFF
         ]
 
-        self.after_ED = [
+    def create_after_ED(self):
+        from skoolkit.simtables import ADC, NEG, PARITY, SBC, SZ53P
+        r = self.registers
+        m = self.memory
+
+        return [
             partial(self.nop, r, R2, 8, 2),                         # ED00
             partial(self.nop, r, R2, 8, 2),                         # ED01
             partial(self.nop, r, R2, 8, 2),                         # ED02
@@ -2323,7 +2330,14 @@ class Simulator:
             partial(self.nop, r, R2, 8, 2),                         # EDFF
         ]
 
-        self.after_FD = [
+    def create_after_FD(self):
+        from skoolkit.simtables import (
+            ADC, ADD, AND, CP, DEC, INC, OR, SBC, SUB, XOR
+        )
+        r = self.registers
+        m = self.memory
+
+        return [
             partial(self.nop, r, R1, 4, 1),                         # FD00
             partial(self.nop, r, R1, 4, 1),                         # FD01
             partial(self.nop, r, R1, 4, 1),                         # FD02
@@ -2527,7 +2541,7 @@ class Simulator:
             partial(self.nop, r, R1, 4, 1),                         # FDC8
             partial(self.nop, r, R1, 4, 1),                         # FDC9
             partial(self.nop, r, R1, 4, 1),                         # FDCA
-            partial(self.prefix2, self.after_FDCB, r, m),           # FDCB prefix
+            partial(self.lazy_prefix, 'after_FDCB'),                # FDCB prefix
             partial(self.nop, r, R1, 4, 1),                         # FDCC
             partial(self.nop, r, R1, 4, 1),                         # FDCD
             partial(self.nop, r, R1, 4, 1),                         # FDCE
@@ -2582,261 +2596,534 @@ class Simulator:
             partial(self.nop, r, R1, 4, 1),                         # FDFF
         ]
 
-        self.opcodes = [
-            partial(self.nop, r, R1, 4, 1),                         # 00 NOP
-            partial(self.ld_rr_nn, r, m, R1, 10, 3, B, C),          # 01 LD BC,nn
-            partial(self.ld_rr_r, r, m, B, C, A),                   # 02 LD (BC),A
-            partial(self.inc_dec_rr, r, R1, 6, 1, 1, B, C),         # 03 INC BC
-            partial(self.fc_r, r, R1, 4, 1, INC, B),                # 04 INC B
-            partial(self.fc_r, r, R1, 4, 1, DEC, B),                # 05 DEC B
-            partial(self.ld_r_n, r, m, R1, 7, 2, B),                # 06 LD B,n
-            partial(self.af_r, r, R1, 4, 1, RLCA, F),               # 07 RLCA
-            partial(self.ex_af, r),                                 # 08 EX AF,AF'
-            partial(self.add_rr, r, R1, 11, 1, H, L, B, C),         # 09 ADD HL,BC
-            partial(self.ld_r_rr, r, m, A, B, C),                   # 0A LD A,(BC)
-            partial(self.inc_dec_rr, r, R1, 6, 1, -1, B, C),        # 0B DEC BC
-            partial(self.fc_r, r, R1, 4, 1, INC, C),                # 0C INC C
-            partial(self.fc_r, r, R1, 4, 1, DEC, C),                # 0D DEC C
-            partial(self.ld_r_n, r, m, R1, 7, 2, C),                # 0E LD C,n
-            partial(self.af_r, r, R1, 4, 1, RRCA, F),               # 0F RRCA
-            partial(self.djnz, r, m),                               # 10 DJNZ nn
-            partial(self.ld_rr_nn, r, m, R1, 10, 3, D, E),          # 11 LD DE,nn
-            partial(self.ld_rr_r, r, m, D, E, A),                   # 12 LD (DE),A
-            partial(self.inc_dec_rr, r, R1, 6, 1, 1, D, E),         # 13 INC DE
-            partial(self.fc_r, r, R1, 4, 1, INC, D),                # 14 INC D
-            partial(self.fc_r, r, R1, 4, 1, DEC, D),                # 15 DEC D
-            partial(self.ld_r_n, r, m, R1, 7, 2, D),                # 16 LD D,n
-            partial(self.af_r, r, R1, 4, 1, RLA, F),                # 17 RLA
-            partial(self.jr, r, m, 0, 0),                           # 18 JR nn
-            partial(self.add_rr, r, R1, 11, 1, H, L, D, E),         # 19 ADD HL,DE
-            partial(self.ld_r_rr, r, m, A, D, E),                   # 1A LD A,(DE)
-            partial(self.inc_dec_rr, r, R1, 6, 1, -1, D, E),        # 1B DEC DE
-            partial(self.fc_r, r, R1, 4, 1, INC, E),                # 1C INC E
-            partial(self.fc_r, r, R1, 4, 1, DEC, E),                # 1D DEC E
-            partial(self.ld_r_n, r, m, R1, 7, 2, E),                # 1E LD E,n
-            partial(self.af_r, r, R1, 4, 1, RRA, F),                # 1F RRA
-            partial(self.jr, r, m, 64, 0),                          # 20 JR NZ,nn
-            partial(self.ld_rr_nn, r, m, R1, 10, 3, H, L),          # 21 LD HL,nn
-            partial(self.ld_mm_rr, r, m, R1, 16, 3, H, L),          # 22 LD (nn),HL
-            partial(self.inc_dec_rr, r, R1, 6, 1, 1, H, L),         # 23 INC HL
-            partial(self.fc_r, r, R1, 4, 1, INC, H),                # 24 INC H
-            partial(self.fc_r, r, R1, 4, 1, DEC, H),                # 25 DEC H
-            partial(self.ld_r_n, r, m, R1, 7, 2, H),                # 26 LD H,n
-            partial(self.af_r, r, R1, 4, 1, DAA, F),                # 27 DAA
-            partial(self.jr, r, m, 64, 64),                         # 28 JR Z,nn
-            partial(self.add_rr, r, R1, 11, 1, H, L, H, L),         # 29 ADD HL,HL
-            partial(self.ld_rr_mm, r, m, R1, 16, 3, H, L),          # 2A LD HL,(nn)
-            partial(self.inc_dec_rr, r, R1, 6, 1, -1, H, L),        # 2B DEC HL
-            partial(self.fc_r, r, R1, 4, 1, INC, L),                # 2C INC L
-            partial(self.fc_r, r, R1, 4, 1, DEC, L),                # 2D DEC L
-            partial(self.ld_r_n, r, m, R1, 7, 2, L),                # 2E LD L,n
-            partial(self.af_r, r, R1, 4, 1, CPL, F),                # 2F CPL
-            partial(self.jr, r, m, 1, 0),                           # 30 JR NC,nn
-            partial(self.ld_rr_nn, r, m, R1, 10, 3, SP2, SP),       # 31 LD SP,nn
-            partial(self.ld_m_a, r, m),                             # 32 LD (nn),A
-            partial(self.inc_dec_rr, r, R1, 6, 1, 1, SP2, SP),      # 33 INC SP
-            partial(self.fc_hl, r, m, R1, 11, 1, INC),              # 34 INC (HL)
-            partial(self.fc_hl, r, m, R1, 11, 1, DEC),              # 35 DEC (HL)
-            partial(self.ld_hl_n, r, m),                            # 36 LD (HL),n
-            partial(self.cf, r, SCF),                               # 37 SCF
-            partial(self.jr, r, m, 1, 1),                           # 38 JR C,nn
-            partial(self.add_rr, r, R1, 11, 1, H, L, SP2, SP),      # 39 ADD HL,SP
-            partial(self.ld_a_m, r, m),                             # 3A LD A,(nn)
-            partial(self.inc_dec_rr, r, R1, 6, 1, -1, SP2, SP),     # 3B DEC SP
-            partial(self.fc_r, r, R1, 4, 1, INC, A),                # 3C INC A
-            partial(self.fc_r, r, R1, 4, 1, DEC, A),                # 3D DEC A
-            partial(self.ld_r_n, r, m, R1, 7, 2, A),                # 3E LD A,n
-            partial(self.cf, r, CCF),                               # 3F CCF
-            partial(self.nop, r, R1, 4, 1),                         # 40 LD B,B
-            partial(self.ld_r_r, r, R1, 4, 1, B, C),                # 41 LD B,C
-            partial(self.ld_r_r, r, R1, 4, 1, B, D),                # 42 LD B,D
-            partial(self.ld_r_r, r, R1, 4, 1, B, E),                # 43 LD B,E
-            partial(self.ld_r_r, r, R1, 4, 1, B, H),                # 44 LD B,H
-            partial(self.ld_r_r, r, R1, 4, 1, B, L),                # 45 LD B,L
-            partial(self.ld_r_rr, r, m, B, H, L),                   # 46 LD B,(HL)
-            partial(self.ld_r_r, r, R1, 4, 1, B, A),                # 47 LD B,A
-            partial(self.ld_r_r, r, R1, 4, 1, C, B),                # 48 LD C,B
-            partial(self.nop, r, R1, 4, 1),                         # 49 LD C,C
-            partial(self.ld_r_r, r, R1, 4, 1, C, D),                # 4A LD C,D
-            partial(self.ld_r_r, r, R1, 4, 1, C, E),                # 4B LD C,E
-            partial(self.ld_r_r, r, R1, 4, 1, C, H),                # 4C LD C,H
-            partial(self.ld_r_r, r, R1, 4, 1, C, L),                # 4D LD C,L
-            partial(self.ld_r_rr, r, m, C, H, L),                   # 4E LD C,(HL)
-            partial(self.ld_r_r, r, R1, 4, 1, C, A),                # 4F LD C,A
-            partial(self.ld_r_r, r, R1, 4, 1, D, B),                # 50 LD D,B
-            partial(self.ld_r_r, r, R1, 4, 1, D, C),                # 51 LD D,C
-            partial(self.nop, r, R1, 4, 1),                         # 52 LD D,D
-            partial(self.ld_r_r, r, R1, 4, 1, D, E),                # 53 LD D,E
-            partial(self.ld_r_r, r, R1, 4, 1, D, H),                # 54 LD D,H
-            partial(self.ld_r_r, r, R1, 4, 1, D, L),                # 55 LD D,L
-            partial(self.ld_r_rr, r, m, D, H, L),                   # 56 LD D,(HL)
-            partial(self.ld_r_r, r, R1, 4, 1, D, A),                # 57 LD D,A
-            partial(self.ld_r_r, r, R1, 4, 1, E, B),                # 58 LD E,B
-            partial(self.ld_r_r, r, R1, 4, 1, E, C),                # 59 LD E,C
-            partial(self.ld_r_r, r, R1, 4, 1, E, D),                # 5A LD E,D
-            partial(self.nop, r, R1, 4, 1),                         # 5B LD E,E
-            partial(self.ld_r_r, r, R1, 4, 1, E, H),                # 5C LD E,H
-            partial(self.ld_r_r, r, R1, 4, 1, E, L),                # 5D LD E,L
-            partial(self.ld_r_rr, r, m, E, H, L),                   # 5E LD E,(HL)
-            partial(self.ld_r_r, r, R1, 4, 1, E, A),                # 5F LD E,A
-            partial(self.ld_r_r, r, R1, 4, 1, H, B),                # 60 LD H,B
-            partial(self.ld_r_r, r, R1, 4, 1, H, C),                # 61 LD H,C
-            partial(self.ld_r_r, r, R1, 4, 1, H, D),                # 62 LD H,D
-            partial(self.ld_r_r, r, R1, 4, 1, H, E),                # 63 LD H,E
-            partial(self.nop, r, R1, 4, 1),                         # 64 LD H,H
-            partial(self.ld_r_r, r, R1, 4, 1, H, L),                # 65 LD H,L
-            partial(self.ld_r_rr, r, m, H, H, L),                   # 66 LD H,(HL)
-            partial(self.ld_r_r, r, R1, 4, 1, H, A),                # 67 LD H,A
-            partial(self.ld_r_r, r, R1, 4, 1, L, B),                # 68 LD L,B
-            partial(self.ld_r_r, r, R1, 4, 1, L, C),                # 69 LD L,C
-            partial(self.ld_r_r, r, R1, 4, 1, L, D),                # 6A LD L,D
-            partial(self.ld_r_r, r, R1, 4, 1, L, E),                # 6B LD L,E
-            partial(self.ld_r_r, r, R1, 4, 1, L, H),                # 6C LD L,H
-            partial(self.nop, r, R1, 4, 1),                         # 6D LD L,L
-            partial(self.ld_r_rr, r, m, L, H, L),                   # 6E LD L,(HL)
-            partial(self.ld_r_r, r, R1, 4, 1, L, A),                # 6F LD L,A
-            partial(self.ld_rr_r, r, m, H, L, B),                   # 70 LD (HL),B
-            partial(self.ld_rr_r, r, m, H, L, C),                   # 71 LD (HL),C
-            partial(self.ld_rr_r, r, m, H, L, D),                   # 72 LD (HL),D
-            partial(self.ld_rr_r, r, m, H, L, E),                   # 73 LD (HL),E
-            partial(self.ld_rr_r, r, m, H, L, H),                   # 74 LD (HL),H
-            partial(self.ld_rr_r, r, m, H, L, L),                   # 75 LD (HL),L
-            partial(self.halt, r),                                  # 76 HALT
-            partial(self.ld_rr_r, r, m, H, L, A),                   # 77 LD (HL),A
-            partial(self.ld_r_r, r, R1, 4, 1, A, B),                # 78 LD A,B
-            partial(self.ld_r_r, r, R1, 4, 1, A, C),                # 79 LD A,C
-            partial(self.ld_r_r, r, R1, 4, 1, A, D),                # 7A LD A,D
-            partial(self.ld_r_r, r, R1, 4, 1, A, E),                # 7B LD A,E
-            partial(self.ld_r_r, r, R1, 4, 1, A, H),                # 7C LD A,H
-            partial(self.ld_r_r, r, R1, 4, 1, A, L),                # 7D LD A,L
-            partial(self.ld_r_rr, r, m, A, H, L),                   # 7E LD A,(HL)
-            partial(self.nop, r, R1, 4, 1),                         # 7F LD A,A
-            partial(self.af_r, r, R1, 4, 1, ADD, B),                # 80 ADD A,B
-            partial(self.af_r, r, R1, 4, 1, ADD, C),                # 81 ADD A,C
-            partial(self.af_r, r, R1, 4, 1, ADD, D),                # 82 ADD A,D
-            partial(self.af_r, r, R1, 4, 1, ADD, E),                # 83 ADD A,E
-            partial(self.af_r, r, R1, 4, 1, ADD, H),                # 84 ADD A,H
-            partial(self.af_r, r, R1, 4, 1, ADD, L),                # 85 ADD A,L
-            partial(self.af_hl, r, m, ADD),                         # 86 ADD A,(HL)
-            partial(self.af_r, r, R1, 4, 1, ADD, A),                # 87 ADD A,A
-            partial(self.afc_r, r, R1, 4, 1, ADC, B),               # 88 ADC A,B
-            partial(self.afc_r, r, R1, 4, 1, ADC, C),               # 89 ADC A,C
-            partial(self.afc_r, r, R1, 4, 1, ADC, D),               # 8A ADC A,D
-            partial(self.afc_r, r, R1, 4, 1, ADC, E),               # 8B ADC A,E
-            partial(self.afc_r, r, R1, 4, 1, ADC, H),               # 8C ADC A,H
-            partial(self.afc_r, r, R1, 4, 1, ADC, L),               # 8D ADC A,L
-            partial(self.afc_hl, r, m, ADC),                        # 8E ADC A,(HL)
-            partial(self.fc_r, r, R1, 4, 1, ADC_A_A, A),            # 8F ADC A,A
-            partial(self.af_r, r, R1, 4, 1, SUB, B),                # 90 SUB B
-            partial(self.af_r, r, R1, 4, 1, SUB, C),                # 91 SUB C
-            partial(self.af_r, r, R1, 4, 1, SUB, D),                # 92 SUB D
-            partial(self.af_r, r, R1, 4, 1, SUB, E),                # 93 SUB E
-            partial(self.af_r, r, R1, 4, 1, SUB, H),                # 94 SUB H
-            partial(self.af_r, r, R1, 4, 1, SUB, L),                # 95 SUB L
-            partial(self.af_hl, r, m, SUB),                         # 96 SUB (HL)
-            partial(self.af_r, r, R1, 4, 1, SUB, A),                # 97 SUB A
-            partial(self.afc_r, r, R1, 4, 1, SBC, B),               # 98 SBC A,B
-            partial(self.afc_r, r, R1, 4, 1, SBC, C),               # 99 SBC A,C
-            partial(self.afc_r, r, R1, 4, 1, SBC, D),               # 9A SBC A,D
-            partial(self.afc_r, r, R1, 4, 1, SBC, E),               # 9B SBC A,E
-            partial(self.afc_r, r, R1, 4, 1, SBC, H),               # 9C SBC A,H
-            partial(self.afc_r, r, R1, 4, 1, SBC, L),               # 9D SBC A,L
-            partial(self.afc_hl, r, m, SBC),                        # 9E SBC A,(HL)
-            partial(self.fc_r, r, R1, 4, 1, SBC_A_A, A),            # 9F SBC A,A
-            partial(self.af_r, r, R1, 4, 1, AND, B),                # A0 AND B
-            partial(self.af_r, r, R1, 4, 1, AND, C),                # A1 AND C
-            partial(self.af_r, r, R1, 4, 1, AND, D),                # A2 AND D
-            partial(self.af_r, r, R1, 4, 1, AND, E),                # A3 AND E
-            partial(self.af_r, r, R1, 4, 1, AND, H),                # A4 AND H
-            partial(self.af_r, r, R1, 4, 1, AND, L),                # A5 AND L
-            partial(self.af_hl, r, m, AND),                         # A6 AND (HL)
-            partial(self.af_r, r, R1, 4, 1, AND, A),                # A7 AND A
-            partial(self.af_r, r, R1, 4, 1, XOR, B),                # A8 XOR B
-            partial(self.af_r, r, R1, 4, 1, XOR, C),                # A9 XOR C
-            partial(self.af_r, r, R1, 4, 1, XOR, D),                # AA XOR D
-            partial(self.af_r, r, R1, 4, 1, XOR, E),                # AB XOR E
-            partial(self.af_r, r, R1, 4, 1, XOR, H),                # AC XOR H
-            partial(self.af_r, r, R1, 4, 1, XOR, L),                # AD XOR L
-            partial(self.af_hl, r, m, XOR),                         # AE XOR (HL)
-            partial(self.af_r, r, R1, 4, 1, XOR, A),                # AF XOR A
-            partial(self.af_r, r, R1, 4, 1, OR, B),                 # B0 OR B
-            partial(self.af_r, r, R1, 4, 1, OR, C),                 # B1 OR C
-            partial(self.af_r, r, R1, 4, 1, OR, D),                 # B2 OR D
-            partial(self.af_r, r, R1, 4, 1, OR, E),                 # B3 OR E
-            partial(self.af_r, r, R1, 4, 1, OR, H),                 # B4 OR H
-            partial(self.af_r, r, R1, 4, 1, OR, L),                 # B5 OR L
-            partial(self.af_hl, r, m, OR),                          # B6 OR (HL)
-            partial(self.af_r, r, R1, 4, 1, OR, A),                 # B7 OR A
-            partial(self.af_r, r, R1, 4, 1, CP, B),                 # B8 CP B
-            partial(self.af_r, r, R1, 4, 1, CP, C),                 # B9 CP C
-            partial(self.af_r, r, R1, 4, 1, CP, D),                 # BA CP D
-            partial(self.af_r, r, R1, 4, 1, CP, E),                 # BB CP E
-            partial(self.af_r, r, R1, 4, 1, CP, H),                 # BC CP H
-            partial(self.af_r, r, R1, 4, 1, CP, L),                 # BD CP L
-            partial(self.af_hl, r, m, CP),                          # BE CP (HL)
-            partial(self.af_r, r, R1, 4, 1, CP, A),                 # BF CP A
-            partial(self.ret, r, m, 64, 64),                        # C0 RET NZ
-            partial(self.pop, r, m, R1, 10, 1, B, C),               # C1 POP BC
-            partial(self.jp, r, m, 64, 0),                          # C2 JP NZ,nn
-            partial(self.jp, r, m, 0, 0),                           # C3 JP nn
-            partial(self.call, r, m, 64, 64),                       # C4 CALL NZ,nn
-            partial(self.push, r, m, R1, 11, 1, B, C),              # C5 PUSH BC
-            partial(self.af_n, r, m, ADD),                          # C6 ADD A,n
-            partial(self.rst, r, m, 0),                             # C7 RST $00
-            partial(self.ret, r, m, 64, 0),                         # C8 RET Z
-            partial(self.ret, r, m, 0, 0),                          # C9 RET
-            partial(self.jp, r, m, 64, 64),                         # CA JP Z,nn
-            partial(self.prefix, self.after_CB, r, m),              # CB prefix
-            partial(self.call, r, m, 64, 0),                        # CC CALL Z,nn
-            partial(self.call, r, m, 0, 0),                         # CD CALL nn
-            partial(self.afc_n, r, m, ADC),                         # CE ADC A,n
-            partial(self.rst, r, m, 8),                             # CF RST $08
-            partial(self.ret, r, m, 1, 1),                          # D0 RET NC
-            partial(self.pop, r, m, R1, 10, 1, D, E),               # D1 POP DE
-            partial(self.jp, r, m, 1, 0),                           # D2 JP NC,nn
-            partial(self.out_a, r, m),                              # D3 OUT (n),A
-            partial(self.call, r, m, 1, 1),                         # D4 CALL NC,nn
-            partial(self.push, r, m, R1, 11, 1, D, E),              # D5 PUSH DE
-            partial(self.af_n, r, m, SUB),                          # D6 SUB n
-            partial(self.rst, r, m, 16),                            # D7 RST $10
-            partial(self.ret, r, m, 1, 0),                          # D8 RET C
-            partial(self.exx, r),                                   # D9 EXX
-            partial(self.jp, r, m, 1, 1),                           # DA JP C,nn
-            partial(self.in_a, r, m),                               # DB IN A,(n)
-            partial(self.call, r, m, 1, 0),                         # DC CALL C,nn
-            partial(self.prefix, self.after_DD, r, m),              # DD prefix
-            partial(self.afc_n, r, m, SBC),                         # DE SBC A,n
-            partial(self.rst, r, m, 24),                            # DF RST $18
-            partial(self.ret, r, m, 4, 4),                          # E0 RET PO
-            partial(self.pop, r, m, R1, 10, 1, H, L),               # E1 POP HL
-            partial(self.jp, r, m, 4, 0),                           # E2 JP PO,nn
-            partial(self.ex_sp, r, m, R1, 19, 1, H, L),             # E3 EX (SP),HL
-            partial(self.call, r, m, 4, 4),                         # E4 CALL PO,nn
-            partial(self.push, r, m, R1, 11, 1, H, L),              # E5 PUSH HL
-            partial(self.af_n, r, m, AND),                          # E6 AND n
-            partial(self.rst, r, m, 32),                            # E7 RST $20
-            partial(self.ret, r, m, 4, 0),                          # E8 RET PE
-            partial(self.jp_rr, r, R1, 4, H, L),                    # E9 JP (HL)
-            partial(self.jp, r, m, 4, 4),                           # EA JP PE,nn
-            partial(self.ex_de_hl, r),                              # EB EX DE,HL
-            partial(self.call, r, m, 4, 0),                         # EC CALL PE,nn
-            partial(self.prefix, self.after_ED, r, m),              # ED prefix
-            partial(self.af_n, r, m, XOR),                          # EE XOR n
-            partial(self.rst, r, m, 40),                            # EF RST $28
-            partial(self.ret, r, m, 128, 128),                      # F0 RET P
-            partial(self.pop, r, m, R1, 10, 1, A, F),               # F1 POP AF
-            partial(self.jp, r, m, 128, 0),                         # F2 JP P,nn
-            partial(self.di_ei, r, 0),                              # F3 DI
-            partial(self.call, r, m, 128, 128),                     # F4 CALL P,nn
-            partial(self.push, r, m, R1, 11, 1, A, F),              # F5 PUSH AF
-            partial(self.af_n, r, m, OR),                           # F6 OR n
-            partial(self.rst, r, m, 48),                            # F7 RST $30
-            partial(self.ret, r, m, 128, 0),                        # F8 RET M
-            partial(self.ld_sp_rr, r, R1, 6, 1, H, L),              # F9 LD SP,HL
-            partial(self.jp, r, m, 128, 128),                       # FA JP M,nn
-            partial(self.di_ei, r, 1),                              # FB EI
-            partial(self.call, r, m, 128, 0),                       # FC CALL M,nn
-            partial(self.prefix, self.after_FD, r, m),              # FD prefix
-            partial(self.af_n, r, m, CP),                           # FE CP n
-            partial(self.rst, r, m, 56),                            # FF RST $38
+    def create_after_DDCB(self):
+        from skoolkit.simtables import (
+            BIT, RL, RLC, RR, RRC, SLA, SLL, SRA, SRL
+        )
+        r = self.registers
+        m = self.memory
+
+        return [
+            partial(self.f_xy, r, m, RLC, IXh, IXl, B),             # DDCB..00 RLC (IX+d),B
+            partial(self.f_xy, r, m, RLC, IXh, IXl, C),             # DDCB..01 RLC (IX+d),C
+            partial(self.f_xy, r, m, RLC, IXh, IXl, D),             # DDCB..02 RLC (IX+d),D
+            partial(self.f_xy, r, m, RLC, IXh, IXl, E),             # DDCB..03 RLC (IX+d),E
+            partial(self.f_xy, r, m, RLC, IXh, IXl, H),             # DDCB..04 RLC (IX+d),H
+            partial(self.f_xy, r, m, RLC, IXh, IXl, L),             # DDCB..05 RLC (IX+d),L
+            partial(self.f_xy, r, m, RLC, IXh, IXl),                # DDCB..06 RLC (IX+d)
+            partial(self.f_xy, r, m, RLC, IXh, IXl, A),             # DDCB..07 RLC (IX+d),A
+            partial(self.f_xy, r, m, RRC, IXh, IXl, B),             # DDCB..08 RRC (IX+d),B
+            partial(self.f_xy, r, m, RRC, IXh, IXl, C),             # DDCB..09 RRC (IX+d),C
+            partial(self.f_xy, r, m, RRC, IXh, IXl, D),             # DDCB..0A RRC (IX+d),D
+            partial(self.f_xy, r, m, RRC, IXh, IXl, E),             # DDCB..0B RRC (IX+d),E
+            partial(self.f_xy, r, m, RRC, IXh, IXl, H),             # DDCB..0C RRC (IX+d),H
+            partial(self.f_xy, r, m, RRC, IXh, IXl, L),             # DDCB..0D RRC (IX+d),L
+            partial(self.f_xy, r, m, RRC, IXh, IXl),                # DDCB..0E RRC (IX+d)
+            partial(self.f_xy, r, m, RRC, IXh, IXl, A),             # DDCB..0F RRC (IX+d),A
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, B),          # DDCB..10 RL (IX+d),B
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, C),          # DDCB..11 RL (IX+d),C
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, D),          # DDCB..12 RL (IX+d),D
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, E),          # DDCB..13 RL (IX+d),E
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, H),          # DDCB..14 RL (IX+d),H
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, L),          # DDCB..15 RL (IX+d),L
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl),             # DDCB..16 RL (IX+d)
+            partial(self.fc_xy, r, m, 4, RL, IXh, IXl, A),          # DDCB..17 RL (IX+d),A
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, B),          # DDCB..18 RR (IX+d),B
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, C),          # DDCB..19 RR (IX+d),C
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, D),          # DDCB..1A RR (IX+d),D
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, E),          # DDCB..1B RR (IX+d),E
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, H),          # DDCB..1C RR (IX+d),H
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, L),          # DDCB..1D RR (IX+d),L
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl),             # DDCB..1E RR (IX+d)
+            partial(self.fc_xy, r, m, 4, RR, IXh, IXl, A),          # DDCB..1F RR (IX+d),A
+            partial(self.f_xy, r, m, SLA, IXh, IXl, B),             # DDCB..20 SLA (IX+d),B
+            partial(self.f_xy, r, m, SLA, IXh, IXl, C),             # DDCB..21 SLA (IX+d),C
+            partial(self.f_xy, r, m, SLA, IXh, IXl, D),             # DDCB..22 SLA (IX+d),D
+            partial(self.f_xy, r, m, SLA, IXh, IXl, E),             # DDCB..23 SLA (IX+d),E
+            partial(self.f_xy, r, m, SLA, IXh, IXl, H),             # DDCB..24 SLA (IX+d),H
+            partial(self.f_xy, r, m, SLA, IXh, IXl, L),             # DDCB..25 SLA (IX+d),L
+            partial(self.f_xy, r, m, SLA, IXh, IXl),                # DDCB..26 SLA (IX+d)
+            partial(self.f_xy, r, m, SLA, IXh, IXl, A),             # DDCB..27 SLA (IX+d),A
+            partial(self.f_xy, r, m, SRA, IXh, IXl, B),             # DDCB..28 SRA (IX+d),B
+            partial(self.f_xy, r, m, SRA, IXh, IXl, C),             # DDCB..29 SRA (IX+d),C
+            partial(self.f_xy, r, m, SRA, IXh, IXl, D),             # DDCB..2A SRA (IX+d),D
+            partial(self.f_xy, r, m, SRA, IXh, IXl, E),             # DDCB..2B SRA (IX+d),E
+            partial(self.f_xy, r, m, SRA, IXh, IXl, H),             # DDCB..2C SRA (IX+d),H
+            partial(self.f_xy, r, m, SRA, IXh, IXl, L),             # DDCB..2D SRA (IX+d),L
+            partial(self.f_xy, r, m, SRA, IXh, IXl),                # DDCB..2E SRA (IX+d)
+            partial(self.f_xy, r, m, SRA, IXh, IXl, A),             # DDCB..2F SRA (IX+d),A
+            partial(self.f_xy, r, m, SLL, IXh, IXl, B),             # DDCB..30 SLL (IX+d),B
+            partial(self.f_xy, r, m, SLL, IXh, IXl, C),             # DDCB..31 SLL (IX+d),C
+            partial(self.f_xy, r, m, SLL, IXh, IXl, D),             # DDCB..32 SLL (IX+d),D
+            partial(self.f_xy, r, m, SLL, IXh, IXl, E),             # DDCB..33 SLL (IX+d),E
+            partial(self.f_xy, r, m, SLL, IXh, IXl, H),             # DDCB..34 SLL (IX+d),H
+            partial(self.f_xy, r, m, SLL, IXh, IXl, L),             # DDCB..35 SLL (IX+d),L
+            partial(self.f_xy, r, m, SLL, IXh, IXl),                # DDCB..36 SLL (IX+d)
+            partial(self.f_xy, r, m, SLL, IXh, IXl, A),             # DDCB..37 SLL (IX+d),A
+            partial(self.f_xy, r, m, SRL, IXh, IXl, B),             # DDCB..38 SRL (IX+d),B
+            partial(self.f_xy, r, m, SRL, IXh, IXl, C),             # DDCB..39 SRL (IX+d),C
+            partial(self.f_xy, r, m, SRL, IXh, IXl, D),             # DDCB..3A SRL (IX+d),D
+            partial(self.f_xy, r, m, SRL, IXh, IXl, E),             # DDCB..3B SRL (IX+d),E
+            partial(self.f_xy, r, m, SRL, IXh, IXl, H),             # DDCB..3C SRL (IX+d),H
+            partial(self.f_xy, r, m, SRL, IXh, IXl, L),             # DDCB..3D SRL (IX+d),L
+            partial(self.f_xy, r, m, SRL, IXh, IXl),                # DDCB..3E SRL (IX+d)
+            partial(self.f_xy, r, m, SRL, IXh, IXl, A),             # DDCB..3F SRL (IX+d),A
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..40 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..41 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..42 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..43 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..44 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..45 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..46 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 0, IXh, IXl),           # DDCB..47 BIT 0,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..48 BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..49 BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4A BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4B BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4C BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4D BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4E BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 1, IXh, IXl),           # DDCB..4F BIT 1,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..50 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..51 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..52 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..53 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..54 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..55 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..56 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 2, IXh, IXl),           # DDCB..57 BIT 2,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..58 BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..59 BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5A BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5B BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5C BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5D BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5E BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 3, IXh, IXl),           # DDCB..5F BIT 3,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..60 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..61 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..62 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..63 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..64 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..65 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..66 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 4, IXh, IXl),           # DDCB..67 BIT 4,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..68 BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..69 BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6A BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6B BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6C BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6D BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6E BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 5, IXh, IXl),           # DDCB..6F BIT 5,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..70 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..71 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..72 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..73 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..74 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..75 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..76 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 6, IXh, IXl),           # DDCB..77 BIT 6,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..78 BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..79 BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7A BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7B BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7C BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7D BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7E BIT 7,(IX+d)
+            partial(self.bit_xy, r, m, BIT, 7, IXh, IXl),           # DDCB..7F BIT 7,(IX+d)
+            partial(self.res_xy, r, m, 254, IXh, IXl, B),           # DDCB..80 RES 0,(IX+d),B
+            partial(self.res_xy, r, m, 254, IXh, IXl, C),           # DDCB..81 RES 0,(IX+d),C
+            partial(self.res_xy, r, m, 254, IXh, IXl, D),           # DDCB..82 RES 0,(IX+d),D
+            partial(self.res_xy, r, m, 254, IXh, IXl, E),           # DDCB..83 RES 0,(IX+d),E
+            partial(self.res_xy, r, m, 254, IXh, IXl, H),           # DDCB..84 RES 0,(IX+d),H
+            partial(self.res_xy, r, m, 254, IXh, IXl, L),           # DDCB..85 RES 0,(IX+d),L
+            partial(self.res_xy, r, m, 254, IXh, IXl),              # DDCB..86 RES 0,(IX+d)
+            partial(self.res_xy, r, m, 254, IXh, IXl, A),           # DDCB..87 RES 0,(IX+d),A
+            partial(self.res_xy, r, m, 253, IXh, IXl, B),           # DDCB..88 RES 1,(IX+d),B
+            partial(self.res_xy, r, m, 253, IXh, IXl, C),           # DDCB..89 RES 1,(IX+d),C
+            partial(self.res_xy, r, m, 253, IXh, IXl, D),           # DDCB..8A RES 1,(IX+d),D
+            partial(self.res_xy, r, m, 253, IXh, IXl, E),           # DDCB..8B RES 1,(IX+d),E
+            partial(self.res_xy, r, m, 253, IXh, IXl, H),           # DDCB..8C RES 1,(IX+d),H
+            partial(self.res_xy, r, m, 253, IXh, IXl, L),           # DDCB..8D RES 1,(IX+d),L
+            partial(self.res_xy, r, m, 253, IXh, IXl),              # DDCB..8E RES 1,(IX+d)
+            partial(self.res_xy, r, m, 253, IXh, IXl, A),           # DDCB..8F RES 1,(IX+d),A
+            partial(self.res_xy, r, m, 251, IXh, IXl, B),           # DDCB..90 RES 2,(IX+d),B
+            partial(self.res_xy, r, m, 251, IXh, IXl, C),           # DDCB..91 RES 2,(IX+d),C
+            partial(self.res_xy, r, m, 251, IXh, IXl, D),           # DDCB..92 RES 2,(IX+d),D
+            partial(self.res_xy, r, m, 251, IXh, IXl, E),           # DDCB..93 RES 2,(IX+d),E
+            partial(self.res_xy, r, m, 251, IXh, IXl, H),           # DDCB..94 RES 2,(IX+d),H
+            partial(self.res_xy, r, m, 251, IXh, IXl, L),           # DDCB..95 RES 2,(IX+d),L
+            partial(self.res_xy, r, m, 251, IXh, IXl),              # DDCB..96 RES 2,(IX+d)
+            partial(self.res_xy, r, m, 251, IXh, IXl, A),           # DDCB..97 RES 2,(IX+d),A
+            partial(self.res_xy, r, m, 247, IXh, IXl, B),           # DDCB..98 RES 3,(IX+d),B
+            partial(self.res_xy, r, m, 247, IXh, IXl, C),           # DDCB..99 RES 3,(IX+d),C
+            partial(self.res_xy, r, m, 247, IXh, IXl, D),           # DDCB..9A RES 3,(IX+d),D
+            partial(self.res_xy, r, m, 247, IXh, IXl, E),           # DDCB..9B RES 3,(IX+d),E
+            partial(self.res_xy, r, m, 247, IXh, IXl, H),           # DDCB..9C RES 3,(IX+d),H
+            partial(self.res_xy, r, m, 247, IXh, IXl, L),           # DDCB..9D RES 3,(IX+d),L
+            partial(self.res_xy, r, m, 247, IXh, IXl),              # DDCB..9E RES 3,(IX+d)
+            partial(self.res_xy, r, m, 247, IXh, IXl, A),           # DDCB..9F RES 3,(IX+d),A
+            partial(self.res_xy, r, m, 239, IXh, IXl, B),           # DDCB..A0 RES 4,(IX+d),B
+            partial(self.res_xy, r, m, 239, IXh, IXl, C),           # DDCB..A1 RES 4,(IX+d),C
+            partial(self.res_xy, r, m, 239, IXh, IXl, D),           # DDCB..A2 RES 4,(IX+d),D
+            partial(self.res_xy, r, m, 239, IXh, IXl, E),           # DDCB..A3 RES 4,(IX+d),E
+            partial(self.res_xy, r, m, 239, IXh, IXl, H),           # DDCB..A4 RES 4,(IX+d),H
+            partial(self.res_xy, r, m, 239, IXh, IXl, L),           # DDCB..A5 RES 4,(IX+d),L
+            partial(self.res_xy, r, m, 239, IXh, IXl),              # DDCB..A6 RES 4,(IX+d)
+            partial(self.res_xy, r, m, 239, IXh, IXl, A),           # DDCB..A7 RES 4,(IX+d),A
+            partial(self.res_xy, r, m, 223, IXh, IXl, B),           # DDCB..A8 RES 5,(IX+d),B
+            partial(self.res_xy, r, m, 223, IXh, IXl, C),           # DDCB..A9 RES 5,(IX+d),C
+            partial(self.res_xy, r, m, 223, IXh, IXl, D),           # DDCB..AA RES 5,(IX+d),D
+            partial(self.res_xy, r, m, 223, IXh, IXl, E),           # DDCB..AB RES 5,(IX+d),E
+            partial(self.res_xy, r, m, 223, IXh, IXl, H),           # DDCB..AC RES 5,(IX+d),H
+            partial(self.res_xy, r, m, 223, IXh, IXl, L),           # DDCB..AD RES 5,(IX+d),L
+            partial(self.res_xy, r, m, 223, IXh, IXl),              # DDCB..AE RES 5,(IX+d)
+            partial(self.res_xy, r, m, 223, IXh, IXl, A),           # DDCB..AF RES 5,(IX+d),A
+            partial(self.res_xy, r, m, 191, IXh, IXl, B),           # DDCB..B0 RES 6,(IX+d),B
+            partial(self.res_xy, r, m, 191, IXh, IXl, C),           # DDCB..B1 RES 6,(IX+d),C
+            partial(self.res_xy, r, m, 191, IXh, IXl, D),           # DDCB..B2 RES 6,(IX+d),D
+            partial(self.res_xy, r, m, 191, IXh, IXl, E),           # DDCB..B3 RES 6,(IX+d),E
+            partial(self.res_xy, r, m, 191, IXh, IXl, H),           # DDCB..B4 RES 6,(IX+d),H
+            partial(self.res_xy, r, m, 191, IXh, IXl, L),           # DDCB..B5 RES 6,(IX+d),L
+            partial(self.res_xy, r, m, 191, IXh, IXl),              # DDCB..B6 RES 6,(IX+d)
+            partial(self.res_xy, r, m, 191, IXh, IXl, A),           # DDCB..B7 RES 6,(IX+d),A
+            partial(self.res_xy, r, m, 127, IXh, IXl, B),           # DDCB..B8 RES 7,(IX+d),B
+            partial(self.res_xy, r, m, 127, IXh, IXl, C),           # DDCB..B9 RES 7,(IX+d),C
+            partial(self.res_xy, r, m, 127, IXh, IXl, D),           # DDCB..BA RES 7,(IX+d),D
+            partial(self.res_xy, r, m, 127, IXh, IXl, E),           # DDCB..BB RES 7,(IX+d),E
+            partial(self.res_xy, r, m, 127, IXh, IXl, H),           # DDCB..BC RES 7,(IX+d),H
+            partial(self.res_xy, r, m, 127, IXh, IXl, L),           # DDCB..BD RES 7,(IX+d),L
+            partial(self.res_xy, r, m, 127, IXh, IXl),              # DDCB..BE RES 7,(IX+d)
+            partial(self.res_xy, r, m, 127, IXh, IXl, A),           # DDCB..BF RES 7,(IX+d),A
+            partial(self.set_xy, r, m, 1, IXh, IXl, B),             # DDCB..C0 SET 0,(IX+d),B
+            partial(self.set_xy, r, m, 1, IXh, IXl, C),             # DDCB..C1 SET 0,(IX+d),C
+            partial(self.set_xy, r, m, 1, IXh, IXl, D),             # DDCB..C2 SET 0,(IX+d),D
+            partial(self.set_xy, r, m, 1, IXh, IXl, E),             # DDCB..C3 SET 0,(IX+d),E
+            partial(self.set_xy, r, m, 1, IXh, IXl, H),             # DDCB..C4 SET 0,(IX+d),H
+            partial(self.set_xy, r, m, 1, IXh, IXl, L),             # DDCB..C5 SET 0,(IX+d),L
+            partial(self.set_xy, r, m, 1, IXh, IXl),                # DDCB..C6 SET 0,(IX+d)
+            partial(self.set_xy, r, m, 1, IXh, IXl, A),             # DDCB..C7 SET 0,(IX+d),A
+            partial(self.set_xy, r, m, 2, IXh, IXl, B),             # DDCB..C8 SET 1,(IX+d),B
+            partial(self.set_xy, r, m, 2, IXh, IXl, C),             # DDCB..C9 SET 1,(IX+d),C
+            partial(self.set_xy, r, m, 2, IXh, IXl, D),             # DDCB..CA SET 1,(IX+d),D
+            partial(self.set_xy, r, m, 2, IXh, IXl, E),             # DDCB..CB SET 1,(IX+d),E
+            partial(self.set_xy, r, m, 2, IXh, IXl, H),             # DDCB..CC SET 1,(IX+d),H
+            partial(self.set_xy, r, m, 2, IXh, IXl, L),             # DDCB..CD SET 1,(IX+d),L
+            partial(self.set_xy, r, m, 2, IXh, IXl),                # DDCB..CE SET 1,(IX+d)
+            partial(self.set_xy, r, m, 2, IXh, IXl, A),             # DDCB..CF SET 1,(IX+d),A
+            partial(self.set_xy, r, m, 4, IXh, IXl, B),             # DDCB..D0 SET 2,(IX+d),B
+            partial(self.set_xy, r, m, 4, IXh, IXl, C),             # DDCB..D1 SET 2,(IX+d),C
+            partial(self.set_xy, r, m, 4, IXh, IXl, D),             # DDCB..D2 SET 2,(IX+d),D
+            partial(self.set_xy, r, m, 4, IXh, IXl, E),             # DDCB..D3 SET 2,(IX+d),E
+            partial(self.set_xy, r, m, 4, IXh, IXl, H),             # DDCB..D4 SET 2,(IX+d),H
+            partial(self.set_xy, r, m, 4, IXh, IXl, L),             # DDCB..D5 SET 2,(IX+d),L
+            partial(self.set_xy, r, m, 4, IXh, IXl),                # DDCB..D6 SET 2,(IX+d)
+            partial(self.set_xy, r, m, 4, IXh, IXl, A),             # DDCB..D7 SET 2,(IX+d),A
+            partial(self.set_xy, r, m, 8, IXh, IXl, B),             # DDCB..D8 SET 3,(IX+d),B
+            partial(self.set_xy, r, m, 8, IXh, IXl, C),             # DDCB..D9 SET 3,(IX+d),C
+            partial(self.set_xy, r, m, 8, IXh, IXl, D),             # DDCB..DA SET 3,(IX+d),D
+            partial(self.set_xy, r, m, 8, IXh, IXl, E),             # DDCB..DB SET 3,(IX+d),E
+            partial(self.set_xy, r, m, 8, IXh, IXl, H),             # DDCB..DC SET 3,(IX+d),H
+            partial(self.set_xy, r, m, 8, IXh, IXl, L),             # DDCB..DD SET 3,(IX+d),L
+            partial(self.set_xy, r, m, 8, IXh, IXl),                # DDCB..DE SET 3,(IX+d)
+            partial(self.set_xy, r, m, 8, IXh, IXl, A),             # DDCB..DF SET 3,(IX+d),A
+            partial(self.set_xy, r, m, 16, IXh, IXl, B),            # DDCB..E0 SET 4,(IX+d),B
+            partial(self.set_xy, r, m, 16, IXh, IXl, C),            # DDCB..E1 SET 4,(IX+d),C
+            partial(self.set_xy, r, m, 16, IXh, IXl, D),            # DDCB..E2 SET 4,(IX+d),D
+            partial(self.set_xy, r, m, 16, IXh, IXl, E),            # DDCB..E3 SET 4,(IX+d),E
+            partial(self.set_xy, r, m, 16, IXh, IXl, H),            # DDCB..E4 SET 4,(IX+d),H
+            partial(self.set_xy, r, m, 16, IXh, IXl, L),            # DDCB..E5 SET 4,(IX+d),L
+            partial(self.set_xy, r, m, 16, IXh, IXl),               # DDCB..E6 SET 4,(IX+d)
+            partial(self.set_xy, r, m, 16, IXh, IXl, A),            # DDCB..E7 SET 4,(IX+d),A
+            partial(self.set_xy, r, m, 32, IXh, IXl, B),            # DDCB..E8 SET 5,(IX+d),B
+            partial(self.set_xy, r, m, 32, IXh, IXl, C),            # DDCB..E9 SET 5,(IX+d),C
+            partial(self.set_xy, r, m, 32, IXh, IXl, D),            # DDCB..EA SET 5,(IX+d),D
+            partial(self.set_xy, r, m, 32, IXh, IXl, E),            # DDCB..EB SET 5,(IX+d),E
+            partial(self.set_xy, r, m, 32, IXh, IXl, H),            # DDCB..EC SET 5,(IX+d),H
+            partial(self.set_xy, r, m, 32, IXh, IXl, L),            # DDCB..ED SET 5,(IX+d),L
+            partial(self.set_xy, r, m, 32, IXh, IXl),               # DDCB..EE SET 5,(IX+d)
+            partial(self.set_xy, r, m, 32, IXh, IXl, A),            # DDCB..EF SET 5,(IX+d),A
+            partial(self.set_xy, r, m, 64, IXh, IXl, B),            # DDCB..F0 SET 6,(IX+d),B
+            partial(self.set_xy, r, m, 64, IXh, IXl, C),            # DDCB..F1 SET 6,(IX+d),C
+            partial(self.set_xy, r, m, 64, IXh, IXl, D),            # DDCB..F2 SET 6,(IX+d),D
+            partial(self.set_xy, r, m, 64, IXh, IXl, E),            # DDCB..F3 SET 6,(IX+d),E
+            partial(self.set_xy, r, m, 64, IXh, IXl, H),            # DDCB..F4 SET 6,(IX+d),H
+            partial(self.set_xy, r, m, 64, IXh, IXl, L),            # DDCB..F5 SET 6,(IX+d),L
+            partial(self.set_xy, r, m, 64, IXh, IXl),               # DDCB..F6 SET 6,(IX+d)
+            partial(self.set_xy, r, m, 64, IXh, IXl, A),            # DDCB..F7 SET 6,(IX+d),A
+            partial(self.set_xy, r, m, 128, IXh, IXl, B),           # DDCB..F8 SET 7,(IX+d),B
+            partial(self.set_xy, r, m, 128, IXh, IXl, C),           # DDCB..F9 SET 7,(IX+d),C
+            partial(self.set_xy, r, m, 128, IXh, IXl, D),           # DDCB..FA SET 7,(IX+d),D
+            partial(self.set_xy, r, m, 128, IXh, IXl, E),           # DDCB..FB SET 7,(IX+d),E
+            partial(self.set_xy, r, m, 128, IXh, IXl, H),           # DDCB..FC SET 7,(IX+d),H
+            partial(self.set_xy, r, m, 128, IXh, IXl, L),           # DDCB..FD SET 7,(IX+d),L
+            partial(self.set_xy, r, m, 128, IXh, IXl),              # DDCB..FE SET 7,(IX+d)
+            partial(self.set_xy, r, m, 128, IXh, IXl, A),           # DDCB..FF SET 7,(IX+d),A
+        ]
+
+    def create_after_FDCB(self):
+        from skoolkit.simtables import (
+            BIT, RL, RLC, RR, RRC, SLA, SLL, SRA, SRL
+        )
+        r = self.registers
+        m = self.memory
+
+        return [
+            partial(self.f_xy, r, m, RLC, IYh, IYl, B),             # FDCB..00 RLC (IY+d),B
+            partial(self.f_xy, r, m, RLC, IYh, IYl, C),             # FDCB..01 RLC (IY+d),C
+            partial(self.f_xy, r, m, RLC, IYh, IYl, D),             # FDCB..02 RLC (IY+d),D
+            partial(self.f_xy, r, m, RLC, IYh, IYl, E),             # FDCB..03 RLC (IY+d),E
+            partial(self.f_xy, r, m, RLC, IYh, IYl, H),             # FDCB..04 RLC (IY+d),H
+            partial(self.f_xy, r, m, RLC, IYh, IYl, L),             # FDCB..05 RLC (IY+d),L
+            partial(self.f_xy, r, m, RLC, IYh, IYl),                # FDCB..06 RLC (IY+d)
+            partial(self.f_xy, r, m, RLC, IYh, IYl, A),             # FDCB..07 RLC (IY+d),A
+            partial(self.f_xy, r, m, RRC, IYh, IYl, B),             # FDCB..08 RRC (IY+d),B
+            partial(self.f_xy, r, m, RRC, IYh, IYl, C),             # FDCB..09 RRC (IY+d),C
+            partial(self.f_xy, r, m, RRC, IYh, IYl, D),             # FDCB..0A RRC (IY+d),D
+            partial(self.f_xy, r, m, RRC, IYh, IYl, E),             # FDCB..0B RRC (IY+d),E
+            partial(self.f_xy, r, m, RRC, IYh, IYl, H),             # FDCB..0C RRC (IY+d),H
+            partial(self.f_xy, r, m, RRC, IYh, IYl, L),             # FDCB..0D RRC (IY+d),L
+            partial(self.f_xy, r, m, RRC, IYh, IYl),                # FDCB..0E RRC (IY+d)
+            partial(self.f_xy, r, m, RRC, IYh, IYl, A),             # FDCB..0F RRC (IY+d),A
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, B),          # FDCB..10 RL (IY+d),B
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, C),          # FDCB..11 RL (IY+d),C
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, D),          # FDCB..12 RL (IY+d),D
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, E),          # FDCB..13 RL (IY+d),E
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, H),          # FDCB..14 RL (IY+d),H
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, L),          # FDCB..15 RL (IY+d),L
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl),             # FDCB..16 RL (IY+d)
+            partial(self.fc_xy, r, m, 4, RL, IYh, IYl, A),          # FDCB..17 RL (IY+d),A
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, B),          # FDCB..18 RR (IY+d),B
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, C),          # FDCB..19 RR (IY+d),C
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, D),          # FDCB..1A RR (IY+d),D
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, E),          # FDCB..1B RR (IY+d),E
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, H),          # FDCB..1C RR (IY+d),H
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, L),          # FDCB..1D RR (IY+d),L
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl),             # FDCB..1E RR (IY+d)
+            partial(self.fc_xy, r, m, 4, RR, IYh, IYl, A),          # FDCB..1F RR (IY+d),A
+            partial(self.f_xy, r, m, SLA, IYh, IYl, B),             # FDCB..20 SLA (IY+d),B
+            partial(self.f_xy, r, m, SLA, IYh, IYl, C),             # FDCB..21 SLA (IY+d),C
+            partial(self.f_xy, r, m, SLA, IYh, IYl, D),             # FDCB..22 SLA (IY+d),D
+            partial(self.f_xy, r, m, SLA, IYh, IYl, E),             # FDCB..23 SLA (IY+d),E
+            partial(self.f_xy, r, m, SLA, IYh, IYl, H),             # FDCB..24 SLA (IY+d),H
+            partial(self.f_xy, r, m, SLA, IYh, IYl, L),             # FDCB..25 SLA (IY+d),L
+            partial(self.f_xy, r, m, SLA, IYh, IYl),                # FDCB..26 SLA (IY+d)
+            partial(self.f_xy, r, m, SLA, IYh, IYl, A),             # FDCB..27 SLA (IY+d),A
+            partial(self.f_xy, r, m, SRA, IYh, IYl, B),             # FDCB..28 SRA (IY+d),B
+            partial(self.f_xy, r, m, SRA, IYh, IYl, C),             # FDCB..29 SRA (IY+d),C
+            partial(self.f_xy, r, m, SRA, IYh, IYl, D),             # FDCB..2A SRA (IY+d),D
+            partial(self.f_xy, r, m, SRA, IYh, IYl, E),             # FDCB..2B SRA (IY+d),E
+            partial(self.f_xy, r, m, SRA, IYh, IYl, H),             # FDCB..2C SRA (IY+d),H
+            partial(self.f_xy, r, m, SRA, IYh, IYl, L),             # FDCB..2D SRA (IY+d),L
+            partial(self.f_xy, r, m, SRA, IYh, IYl),                # FDCB..2E SRA (IY+d)
+            partial(self.f_xy, r, m, SRA, IYh, IYl, A),             # FDCB..2F SRA (IY+d),A
+            partial(self.f_xy, r, m, SLL, IYh, IYl, B),             # FDCB..30 SLL (IY+d),B
+            partial(self.f_xy, r, m, SLL, IYh, IYl, C),             # FDCB..31 SLL (IY+d),C
+            partial(self.f_xy, r, m, SLL, IYh, IYl, D),             # FDCB..32 SLL (IY+d),D
+            partial(self.f_xy, r, m, SLL, IYh, IYl, E),             # FDCB..33 SLL (IY+d),E
+            partial(self.f_xy, r, m, SLL, IYh, IYl, H),             # FDCB..34 SLL (IY+d),H
+            partial(self.f_xy, r, m, SLL, IYh, IYl, L),             # FDCB..35 SLL (IY+d),L
+            partial(self.f_xy, r, m, SLL, IYh, IYl),                # FDCB..36 SLL (IY+d)
+            partial(self.f_xy, r, m, SLL, IYh, IYl, A),             # FDCB..37 SLL (IY+d),A
+            partial(self.f_xy, r, m, SRL, IYh, IYl, B),             # FDCB..38 SRL (IY+d),B
+            partial(self.f_xy, r, m, SRL, IYh, IYl, C),             # FDCB..39 SRL (IY+d),C
+            partial(self.f_xy, r, m, SRL, IYh, IYl, D),             # FDCB..3A SRL (IY+d),D
+            partial(self.f_xy, r, m, SRL, IYh, IYl, E),             # FDCB..3B SRL (IY+d),E
+            partial(self.f_xy, r, m, SRL, IYh, IYl, H),             # FDCB..3C SRL (IY+d),H
+            partial(self.f_xy, r, m, SRL, IYh, IYl, L),             # FDCB..3D SRL (IY+d),L
+            partial(self.f_xy, r, m, SRL, IYh, IYl),                # FDCB..3E SRL (IY+d)
+            partial(self.f_xy, r, m, SRL, IYh, IYl, A),             # FDCB..3F SRL (IY+d),A
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..40 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..41 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..42 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..43 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..44 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..45 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..46 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 0, IYh, IYl),           # FDCB..47 BIT 0,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..48 BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..49 BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4A BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4B BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4C BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4D BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4E BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 1, IYh, IYl),           # FDCB..4F BIT 1,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..50 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..51 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..52 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..53 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..54 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..55 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..56 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 2, IYh, IYl),           # FDCB..57 BIT 2,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..58 BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..59 BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5A BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5B BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5C BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5D BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5E BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 3, IYh, IYl),           # FDCB..5F BIT 3,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..60 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..61 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..62 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..63 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..64 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..65 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..66 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 4, IYh, IYl),           # FDCB..67 BIT 4,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..68 BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..69 BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6A BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6B BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6C BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6D BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6E BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 5, IYh, IYl),           # FDCB..6F BIT 5,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..70 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..71 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..72 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..73 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..74 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..75 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..76 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 6, IYh, IYl),           # FDCB..77 BIT 6,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..78 BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..79 BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7A BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7B BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7C BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7D BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7E BIT 7,(IY+d)
+            partial(self.bit_xy, r, m, BIT, 7, IYh, IYl),           # FDCB..7F BIT 7,(IY+d)
+            partial(self.res_xy, r, m, 254, IYh, IYl, B),           # FDCB..80 RES 0,(IY+d),B
+            partial(self.res_xy, r, m, 254, IYh, IYl, C),           # FDCB..81 RES 0,(IY+d),C
+            partial(self.res_xy, r, m, 254, IYh, IYl, D),           # FDCB..82 RES 0,(IY+d),D
+            partial(self.res_xy, r, m, 254, IYh, IYl, E),           # FDCB..83 RES 0,(IY+d),E
+            partial(self.res_xy, r, m, 254, IYh, IYl, H),           # FDCB..84 RES 0,(IY+d),H
+            partial(self.res_xy, r, m, 254, IYh, IYl, L),           # FDCB..85 RES 0,(IY+d),L
+            partial(self.res_xy, r, m, 254, IYh, IYl),              # FDCB..86 RES 0,(IY+d)
+            partial(self.res_xy, r, m, 254, IYh, IYl, A),           # FDCB..87 RES 0,(IY+d),A
+            partial(self.res_xy, r, m, 253, IYh, IYl, B),           # FDCB..88 RES 1,(IY+d),B
+            partial(self.res_xy, r, m, 253, IYh, IYl, C),           # FDCB..89 RES 1,(IY+d),C
+            partial(self.res_xy, r, m, 253, IYh, IYl, D),           # FDCB..8A RES 1,(IY+d),D
+            partial(self.res_xy, r, m, 253, IYh, IYl, E),           # FDCB..8B RES 1,(IY+d),E
+            partial(self.res_xy, r, m, 253, IYh, IYl, H),           # FDCB..8C RES 1,(IY+d),H
+            partial(self.res_xy, r, m, 253, IYh, IYl, L),           # FDCB..8D RES 1,(IY+d),L
+            partial(self.res_xy, r, m, 253, IYh, IYl),              # FDCB..8E RES 1,(IY+d)
+            partial(self.res_xy, r, m, 253, IYh, IYl, A),           # FDCB..8F RES 1,(IY+d),A
+            partial(self.res_xy, r, m, 251, IYh, IYl, B),           # FDCB..90 RES 2,(IY+d),B
+            partial(self.res_xy, r, m, 251, IYh, IYl, C),           # FDCB..91 RES 2,(IY+d),C
+            partial(self.res_xy, r, m, 251, IYh, IYl, D),           # FDCB..92 RES 2,(IY+d),D
+            partial(self.res_xy, r, m, 251, IYh, IYl, E),           # FDCB..93 RES 2,(IY+d),E
+            partial(self.res_xy, r, m, 251, IYh, IYl, H),           # FDCB..94 RES 2,(IY+d),H
+            partial(self.res_xy, r, m, 251, IYh, IYl, L),           # FDCB..95 RES 2,(IY+d),L
+            partial(self.res_xy, r, m, 251, IYh, IYl),              # FDCB..96 RES 2,(IY+d)
+            partial(self.res_xy, r, m, 251, IYh, IYl, A),           # FDCB..97 RES 2,(IY+d),A
+            partial(self.res_xy, r, m, 247, IYh, IYl, B),           # FDCB..98 RES 3,(IY+d),B
+            partial(self.res_xy, r, m, 247, IYh, IYl, C),           # FDCB..99 RES 3,(IY+d),C
+            partial(self.res_xy, r, m, 247, IYh, IYl, D),           # FDCB..9A RES 3,(IY+d),D
+            partial(self.res_xy, r, m, 247, IYh, IYl, E),           # FDCB..9B RES 3,(IY+d),E
+            partial(self.res_xy, r, m, 247, IYh, IYl, H),           # FDCB..9C RES 3,(IY+d),H
+            partial(self.res_xy, r, m, 247, IYh, IYl, L),           # FDCB..9D RES 3,(IY+d),L
+            partial(self.res_xy, r, m, 247, IYh, IYl),              # FDCB..9E RES 3,(IY+d)
+            partial(self.res_xy, r, m, 247, IYh, IYl, A),           # FDCB..9F RES 3,(IY+d),A
+            partial(self.res_xy, r, m, 239, IYh, IYl, B),           # FDCB..A0 RES 4,(IY+d),B
+            partial(self.res_xy, r, m, 239, IYh, IYl, C),           # FDCB..A1 RES 4,(IY+d),C
+            partial(self.res_xy, r, m, 239, IYh, IYl, D),           # FDCB..A2 RES 4,(IY+d),D
+            partial(self.res_xy, r, m, 239, IYh, IYl, E),           # FDCB..A3 RES 4,(IY+d),E
+            partial(self.res_xy, r, m, 239, IYh, IYl, H),           # FDCB..A4 RES 4,(IY+d),H
+            partial(self.res_xy, r, m, 239, IYh, IYl, L),           # FDCB..A5 RES 4,(IY+d),L
+            partial(self.res_xy, r, m, 239, IYh, IYl),              # FDCB..A6 RES 4,(IY+d)
+            partial(self.res_xy, r, m, 239, IYh, IYl, A),           # FDCB..A7 RES 4,(IY+d),A
+            partial(self.res_xy, r, m, 223, IYh, IYl, B),           # FDCB..A8 RES 5,(IY+d),B
+            partial(self.res_xy, r, m, 223, IYh, IYl, C),           # FDCB..A9 RES 5,(IY+d),C
+            partial(self.res_xy, r, m, 223, IYh, IYl, D),           # FDCB..AA RES 5,(IY+d),D
+            partial(self.res_xy, r, m, 223, IYh, IYl, E),           # FDCB..AB RES 5,(IY+d),E
+            partial(self.res_xy, r, m, 223, IYh, IYl, H),           # FDCB..AC RES 5,(IY+d),H
+            partial(self.res_xy, r, m, 223, IYh, IYl, L),           # FDCB..AD RES 5,(IY+d),L
+            partial(self.res_xy, r, m, 223, IYh, IYl),              # FDCB..AE RES 5,(IY+d)
+            partial(self.res_xy, r, m, 223, IYh, IYl, A),           # FDCB..AF RES 5,(IY+d),A
+            partial(self.res_xy, r, m, 191, IYh, IYl, B),           # FDCB..B0 RES 6,(IY+d),B
+            partial(self.res_xy, r, m, 191, IYh, IYl, C),           # FDCB..B1 RES 6,(IY+d),C
+            partial(self.res_xy, r, m, 191, IYh, IYl, D),           # FDCB..B2 RES 6,(IY+d),D
+            partial(self.res_xy, r, m, 191, IYh, IYl, E),           # FDCB..B3 RES 6,(IY+d),E
+            partial(self.res_xy, r, m, 191, IYh, IYl, H),           # FDCB..B4 RES 6,(IY+d),H
+            partial(self.res_xy, r, m, 191, IYh, IYl, L),           # FDCB..B5 RES 6,(IY+d),L
+            partial(self.res_xy, r, m, 191, IYh, IYl),              # FDCB..B6 RES 6,(IY+d)
+            partial(self.res_xy, r, m, 191, IYh, IYl, A),           # FDCB..B7 RES 6,(IY+d),A
+            partial(self.res_xy, r, m, 127, IYh, IYl, B),           # FDCB..B8 RES 7,(IY+d),B
+            partial(self.res_xy, r, m, 127, IYh, IYl, C),           # FDCB..B9 RES 7,(IY+d),C
+            partial(self.res_xy, r, m, 127, IYh, IYl, D),           # FDCB..BA RES 7,(IY+d),D
+            partial(self.res_xy, r, m, 127, IYh, IYl, E),           # FDCB..BB RES 7,(IY+d),E
+            partial(self.res_xy, r, m, 127, IYh, IYl, H),           # FDCB..BC RES 7,(IY+d),H
+            partial(self.res_xy, r, m, 127, IYh, IYl, L),           # FDCB..BD RES 7,(IY+d),L
+            partial(self.res_xy, r, m, 127, IYh, IYl),              # FDCB..BE RES 7,(IY+d)
+            partial(self.res_xy, r, m, 127, IYh, IYl, A),           # FDCB..BF RES 7,(IY+d),A
+            partial(self.set_xy, r, m, 1, IYh, IYl, B),             # FDCB..C0 SET 0,(IY+d),B
+            partial(self.set_xy, r, m, 1, IYh, IYl, C),             # FDCB..C1 SET 0,(IY+d),C
+            partial(self.set_xy, r, m, 1, IYh, IYl, D),             # FDCB..C2 SET 0,(IY+d),D
+            partial(self.set_xy, r, m, 1, IYh, IYl, E),             # FDCB..C3 SET 0,(IY+d),E
+            partial(self.set_xy, r, m, 1, IYh, IYl, H),             # FDCB..C4 SET 0,(IY+d),H
+            partial(self.set_xy, r, m, 1, IYh, IYl, L),             # FDCB..C5 SET 0,(IY+d),L
+            partial(self.set_xy, r, m, 1, IYh, IYl),                # FDCB..C6 SET 0,(IY+d)
+            partial(self.set_xy, r, m, 1, IYh, IYl, A),             # FDCB..C7 SET 0,(IY+d),A
+            partial(self.set_xy, r, m, 2, IYh, IYl, B),             # FDCB..C8 SET 1,(IY+d),B
+            partial(self.set_xy, r, m, 2, IYh, IYl, C),             # FDCB..C9 SET 1,(IY+d),C
+            partial(self.set_xy, r, m, 2, IYh, IYl, D),             # FDCB..CA SET 1,(IY+d),D
+            partial(self.set_xy, r, m, 2, IYh, IYl, E),             # FDCB..CB SET 1,(IY+d),E
+            partial(self.set_xy, r, m, 2, IYh, IYl, H),             # FDCB..CC SET 1,(IY+d),H
+            partial(self.set_xy, r, m, 2, IYh, IYl, L),             # FDCB..CD SET 1,(IY+d),L
+            partial(self.set_xy, r, m, 2, IYh, IYl),                # FDCB..CE SET 1,(IY+d)
+            partial(self.set_xy, r, m, 2, IYh, IYl, A),             # FDCB..CF SET 1,(IY+d),A
+            partial(self.set_xy, r, m, 4, IYh, IYl, B),             # FDCB..D0 SET 2,(IY+d),B
+            partial(self.set_xy, r, m, 4, IYh, IYl, C),             # FDCB..D1 SET 2,(IY+d),C
+            partial(self.set_xy, r, m, 4, IYh, IYl, D),             # FDCB..D2 SET 2,(IY+d),D
+            partial(self.set_xy, r, m, 4, IYh, IYl, E),             # FDCB..D3 SET 2,(IY+d),E
+            partial(self.set_xy, r, m, 4, IYh, IYl, H),             # FDCB..D4 SET 2,(IY+d),H
+            partial(self.set_xy, r, m, 4, IYh, IYl, L),             # FDCB..D5 SET 2,(IY+d),L
+            partial(self.set_xy, r, m, 4, IYh, IYl),                # FDCB..D6 SET 2,(IY+d)
+            partial(self.set_xy, r, m, 4, IYh, IYl, A),             # FDCB..D7 SET 2,(IY+d),A
+            partial(self.set_xy, r, m, 8, IYh, IYl, B),             # FDCB..D8 SET 3,(IY+d),B
+            partial(self.set_xy, r, m, 8, IYh, IYl, C),             # FDCB..D9 SET 3,(IY+d),C
+            partial(self.set_xy, r, m, 8, IYh, IYl, D),             # FDCB..DA SET 3,(IY+d),D
+            partial(self.set_xy, r, m, 8, IYh, IYl, E),             # FDCB..DB SET 3,(IY+d),E
+            partial(self.set_xy, r, m, 8, IYh, IYl, H),             # FDCB..DC SET 3,(IY+d),H
+            partial(self.set_xy, r, m, 8, IYh, IYl, L),             # FDCB..DD SET 3,(IY+d),L
+            partial(self.set_xy, r, m, 8, IYh, IYl),                # FDCB..DE SET 3,(IY+d)
+            partial(self.set_xy, r, m, 8, IYh, IYl, A),             # FDCB..DF SET 3,(IY+d),A
+            partial(self.set_xy, r, m, 16, IYh, IYl, B),            # FDCB..E0 SET 4,(IY+d),B
+            partial(self.set_xy, r, m, 16, IYh, IYl, C),            # FDCB..E1 SET 4,(IY+d),C
+            partial(self.set_xy, r, m, 16, IYh, IYl, D),            # FDCB..E2 SET 4,(IY+d),D
+            partial(self.set_xy, r, m, 16, IYh, IYl, E),            # FDCB..E3 SET 4,(IY+d),E
+            partial(self.set_xy, r, m, 16, IYh, IYl, H),            # FDCB..E4 SET 4,(IY+d),H
+            partial(self.set_xy, r, m, 16, IYh, IYl, L),            # FDCB..E5 SET 4,(IY+d),L
+            partial(self.set_xy, r, m, 16, IYh, IYl),               # FDCB..E6 SET 4,(IY+d)
+            partial(self.set_xy, r, m, 16, IYh, IYl, A),            # FDCB..E7 SET 4,(IY+d),A
+            partial(self.set_xy, r, m, 32, IYh, IYl, B),            # FDCB..E8 SET 5,(IY+d),B
+            partial(self.set_xy, r, m, 32, IYh, IYl, C),            # FDCB..E9 SET 5,(IY+d),C
+            partial(self.set_xy, r, m, 32, IYh, IYl, D),            # FDCB..EA SET 5,(IY+d),D
+            partial(self.set_xy, r, m, 32, IYh, IYl, E),            # FDCB..EB SET 5,(IY+d),E
+            partial(self.set_xy, r, m, 32, IYh, IYl, H),            # FDCB..EC SET 5,(IY+d),H
+            partial(self.set_xy, r, m, 32, IYh, IYl, L),            # FDCB..ED SET 5,(IY+d),L
+            partial(self.set_xy, r, m, 32, IYh, IYl),               # FDCB..EE SET 5,(IY+d)
+            partial(self.set_xy, r, m, 32, IYh, IYl, A),            # FDCB..EF SET 5,(IY+d),A
+            partial(self.set_xy, r, m, 64, IYh, IYl, B),            # FDCB..F0 SET 6,(IY+d),B
+            partial(self.set_xy, r, m, 64, IYh, IYl, C),            # FDCB..F1 SET 6,(IY+d),C
+            partial(self.set_xy, r, m, 64, IYh, IYl, D),            # FDCB..F2 SET 6,(IY+d),D
+            partial(self.set_xy, r, m, 64, IYh, IYl, E),            # FDCB..F3 SET 6,(IY+d),E
+            partial(self.set_xy, r, m, 64, IYh, IYl, H),            # FDCB..F4 SET 6,(IY+d),H
+            partial(self.set_xy, r, m, 64, IYh, IYl, L),            # FDCB..F5 SET 6,(IY+d),L
+            partial(self.set_xy, r, m, 64, IYh, IYl),               # FDCB..F6 SET 6,(IY+d)
+            partial(self.set_xy, r, m, 64, IYh, IYl, A),            # FDCB..F7 SET 6,(IY+d),A
+            partial(self.set_xy, r, m, 128, IYh, IYl, B),           # FDCB..F8 SET 7,(IY+d),B
+            partial(self.set_xy, r, m, 128, IYh, IYl, C),           # FDCB..F9 SET 7,(IY+d),C
+            partial(self.set_xy, r, m, 128, IYh, IYl, D),           # FDCB..FA SET 7,(IY+d),D
+            partial(self.set_xy, r, m, 128, IYh, IYl, E),           # FDCB..FB SET 7,(IY+d),E
+            partial(self.set_xy, r, m, 128, IYh, IYl, H),           # FDCB..FC SET 7,(IY+d),H
+            partial(self.set_xy, r, m, 128, IYh, IYl, L),           # FDCB..FD SET 7,(IY+d),L
+            partial(self.set_xy, r, m, 128, IYh, IYl),              # FDCB..FE SET 7,(IY+d)
+            partial(self.set_xy, r, m, 128, IYh, IYl, A),           # FDCB..FF SET 7,(IY+d),A
         ]
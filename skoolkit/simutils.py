@@ -15,6 +15,7 @@
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
 import array
+from collections import namedtuple
 
 from skoolkit import ROM48, read_bin_file
 from skoolkit.pagingtracer import Memory
@@ -160,6 +161,67 @@ def get_state(simulator, tstates=True):
         machine = '48K'
     return ram, registers, state, machine
 
+SimulatorState = namedtuple('SimulatorState', 'registers pages o7ffd tracer')
+
+def save_state(simulator, prev=None):
+    memory = simulator.memory
+    if isinstance(memory, Memory):
+        # With a dirty map, the pages of the checkpoint that the memory was
+        # last saved to or restored from are shared except where written
+        if prev and getattr(memory, 'checkpoint', None) is prev:
+            dirty = memory.dirty_banks()
+            pages = [bytes(bank) if b in dirty else page for b, (bank, page) in enumerate(zip(memory.banks, prev.pages))]
+        else:
+            pages = [bytes(bank) for bank in memory.banks]
+        o7ffd = memory.o7ffd
+    else:
+        pages = [bytes(memory[a:a + 0x4000]) for a in range(0x4000, 0x10000, 0x4000)]
+        if prev:
+            pages = [p if p != q else q for p, q in zip(pages, prev.pages)]
+        o7ffd = None
+    tracer = getattr(simulator, 'tracer', None)
+    tracer_state = {}
+    if tracer:
+        tracer_state = {k: v for k, v in vars(tracer).items() if type(v) in (int, bool)}
+        if hasattr(tracer, 'ay'):
+            tracer_state['ay'] = tracer.ay[:]
+    state = SimulatorState(simulator.registers[:], tuple(pages), o7ffd, tracer_state)
+    if isinstance(memory, Memory) and memory.dirty is not None:
+        memory.clear_dirty()
+        memory.checkpoint = state
+    return state
+
+def restore_state(simulator, state):
+    simulator.registers[:] = state.registers
+    memory = simulator.memory
+    if isinstance(memory, Memory):
+        base = getattr(memory, 'checkpoint', None)
+        if base:
+            dirty = memory.dirty_banks()
+            pages = [(b, p) for b, (p, q) in enumerate(zip(state.pages, base.pages)) if b in dirty or p is not q]
+        else:
+            pages = enumerate(state.pages)
+        for b, page in pages:
+            memory.banks[b][:] = page
+        memory.out7ffd(state.o7ffd)
+        if hasattr(simulator, 'out7ffd'):
+            simulator.out7ffd(state.o7ffd)
+        if memory.dirty is not None:
+            memory.clear_dirty()
+            memory.checkpoint = state
+    else:
+        for a, page in zip(range(0x4000, 0x10000, 0x4000), state.pages):
+            memory[a:a + 0x4000] = page
+    if getattr(simulator, 'blocks', None):
+        simulator.blocks.clear()
+    tracer = getattr(simulator, 'tracer', None)
+    if tracer:
+        for k, v in state.tracer.items():
+            if k == 'ay':
+                tracer.ay[:] = v
+            else:
+                setattr(tracer, k, v)
+
 def get_registers(config, state, as_array=True):
     registers = [0] * 29
     if as_array: # pragma: no cover
@@ -1028,7 +1028,10 @@ class HtmlWriter:
     def _write_audio(self, audio_path, delays, flags, offset):
         contention, interrupts, ma_filter, is128k = flags & 1, flags & 2, flags & 8, len(self.snapshot) == 0x20000
         with self.file_info.open_file(audio_path, mode='wb') as f:
-            self.audio_writer.write_audio(f, delays, contention, interrupts, offset, ma_filter, is128k)
+            if flags & 16:
+                self.audio_writer.write_ay_audio(f, delays, is128k)
+            else:
+                self.audio_writer.write_audio(f, delays, contention, interrupts, offset, ma_filter, is128k)
         self.file_info.add_audio(audio_path)
 
     def _need_audio(self, fname):
@@ -24,6 +24,7 @@ from string import Template
 from skoolkit import (BASE_10, BASE_16, CASE_LOWER, CASE_UPPER, VERSION,
                       SkoolKitError, SkoolParsingError, CSimulator,
                       CCMIOSimulator, eval_variable, evaluate)
+from skoolkit.ay import AYLog
 from skoolkit.cmiosimulator import CMIOSimulator
 from skoolkit.graphics import Udg
 from skoolkit.simulator import Simulator
@@ -107,6 +108,7 @@ class PagingTracer:
         self.out7ffd = out7ffd
         self.outfffd = outfffd
         self.ay = ay
+        self.ay_log = None
 
     def read_port(self, registers, port):
         if port == 0xFFFD:
@@ -121,6 +123,8 @@ class PagingTracer:
             self.outfffd = value
         elif port == 0xBFFD:
             self.ay[self.outfffd % 16] = value
+            if self.ay_log:
+                self.ay_log.write(registers[T], self.outfffd % 16, value)
 
 class AudioTracer:
     def __init__(self):
@@ -571,12 +575,21 @@ def _read_sim_state(writer, execint, reg=None, clear=0):
             if v >= 0:
                 registers[r] = v
     state = {a: registers.pop(a) for a in ('iff', 'im', 'halted', 'tstates', 'fffd', 'ay')}
-    config = {'fast_djnz': True, 'fast_ldir': True}
+    config = {'block_cache': True, 'dirty': True, 'fast_djnz': True, 'fast_idle': True, 'fast_ldir': True}
     if len(writer.snapshot) == 0x20000:
         config['frame_duration'] = FRAME_DURATIONS[1]
         config['int_active'] = INT_ACTIVE[1]
     return registers, state, config
 
+def _copy_dirty_blocks(memory, simulator): # pragma: no cover
+    # Copy back the 256-byte blocks written by a C simulator, which works on
+    # its own copy of a 48K memory snapshot (and tracks the blocks written
+    # when configured with 'dirty')
+    sim_memory = simulator.memory
+    for a, dirty in zip(range(0, 0x10000, 256), simulator.dirty):
+        if dirty:
+            memory[a:a + 256] = sim_memory[a:a + 256]
+
 def _write_sim_state(writer, simulator, tracer=None):
     registers = simulator.registers
     if isinstance(tracer, PagingTracer):
@@ -640,6 +653,8 @@ def parse_audio(writer, text, index, need_audio=None):
     end, fname = parse_brackets(text, end)
     if not fname:
         raise MacroParsingError('Missing filename: #AUDIO{}'.format(text[index:end]))
+    if flags & 20 == 16:
+        raise MacroParsingError('AY sound requires bit 2 of flags to be set')
     delays, eval_delays = None, False
     if need_audio:
         fname, eval_delays = need_audio(fname)
@@ -657,14 +672,22 @@ def parse_audio(writer, text, index, need_audio=None):
             memory = writer.snapshot
             if len(memory) == 0x20000:
                 tracer = AudioTracer128(memory, memory.o7ffd, state['fffd'], state['ay'])
+                if flags & 16:
+                    tracer.ay_log = AYLog(state['ay'], simulator.registers[T])
+            elif flags & 16:
+                raise MacroParsingError('AY sound requires a 128K memory snapshot')
             else:
                 tracer = AudioTracer()
             simulator.set_tracer(tracer)
             simulator.run(start, stop, execint)
             if memory != simulator.memory: # pragma: no cover
-                memory[:] = simulator.memory[:]
+                _copy_dirty_blocks(memory, simulator)
             _write_sim_state(writer, simulator, tracer)
-            delays = [t - tracer.out_times[i] for i, t in enumerate(tracer.out_times[1:])]
+            if flags & 16:
+                tracer.ay_log.end = simulator.registers[T]
+                delays = tracer.ay_log
+            else:
+                delays = [t - tracer.out_times[i] for i, t in enumerate(tracer.out_times[1:])]
     else:
         if len(text) > end and text[end] == '(':
             end, spec = parse_brackets(text, end)
@@ -1246,7 +1269,7 @@ def parse_sim(writer, text, index, *cwd):
         simulator.set_tracer(tracer)
         simulator.run(start, stop, execint > 0)
         if memory != simulator.memory: # pragma: no cover
-            memory[:] = simulator.memory[:]
+            _copy_dirty_blocks(memory, simulator)
     _write_sim_state(writer, simulator, tracer)
     return end, ''
 
@@ -86,7 +86,14 @@ SZX_REGISTERS = {
 }
 
 class Memory:
-    def __init__(self, snapshot=None, banks=None, page=None):
+    def __init__(self, snapshot=None, banks=None, page=None, dirty=False):
+        if dirty:
+            # One flag per 256-byte block of the address space, set when the
+            # block is written
+            self.dirty = bytearray(256)
+            self.__class__ = DirtyMemory
+        else:
+            self.dirty = None
         if banks:
             if isinstance(banks, dict):
                 self.banks = [banks.get(i) for i in range(max(8, max(banks)))]
@@ -116,6 +123,15 @@ class Memory:
             for a, b in zip(range(index.start, index.stop), value):
                 self.memory[a // 0x4000][a % 0x4000] = b
 
+    def dirty_blocks(self):
+        if self.dirty:
+            return [a for a in range(0x4000, 0x10000, 256) if self.dirty[a // 256]]
+        return list(range(0x4000, 0x10000, 256))
+
+    def clear_dirty(self):
+        if self.dirty:
+            self.dirty[:] = bytes(256)
+
     def contents(self):
         if all(self.banks):
             return self.banks
@@ -130,6 +146,16 @@ class Memory:
             return self.banks[5] + self.banks[2] + self.banks[page]
         return self.banks[0] + self.banks[1] + self.banks[2] + self.banks[3] + self.banks[4] + self.banks[5] + self.banks[6] + self.banks[7]
 
+class DirtyMemory(Memory):
+    # A Memory object that maintains its dirty map
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        if isinstance(index, int):
+            self.dirty[index // 256] = 1
+        else:
+            for i in range(index.start // 256, (min(index.stop, index.start + len(value)) + 255) // 256):
+                self.dirty[i] = 1
+
 class Snapshot:
     def __init__(self):
         self.type = None
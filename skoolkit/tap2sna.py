@@ -17,7 +17,12 @@
 import sys
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from functools import partial
 import hashlib
+import json
+import mmap
 import tempfile
 import zipfile
 from urllib.request import Request, urlopen
@@ -30,9 +35,10 @@ from skoolkit import (SkoolKitError, CSimulator, CCMIOSimulator, get_dword,
 from skoolkit.cmiosimulator import CMIOSimulator
 from skoolkit.config import get_config, show_config, update_options
 from skoolkit.kbtracer import KeyboardTracer
-from skoolkit.loadsample import ACCELERATORS
+from skoolkit.loadsample import ACCELERATORS, read_accelerators, write_accelerators
 from skoolkit.loadtracer import LoadTracer, get_edges
 from skoolkit.pagingtracer import Memory
+from skoolkit.recordings import csw_pulses, wav_pulses
 from skoolkit.simulator import Simulator
 from skoolkit.simutils import FRAME_DURATIONS, INT_ACTIVE, PC, T, get_state
 from skoolkit.snapshot import move, poke, print_reg_help, print_state_help, write_snapshot
@@ -236,6 +242,8 @@ class SkoolKitArgumentParser(argparse.ArgumentParser):
             args.append(arg)
         return args
 
+TAPE_EXTS = ('.tap', '.tzx', '.pzx', '.csw', '.wav')
+
 class TapeError(Exception):
     pass
 
@@ -286,18 +294,22 @@ def _ram_operations(snapshot, ram_ops, blocks=None):
 def _set_sim_load_config(options):
     options.accelerate_dec_a = 1
     options.accelerator = 'auto'
+    options.accelerator_file = None
     options.cmio = False
     options.fast_load = True
     options.finish_tape = False
     options.first_edge = 0
     options.in_flags = 0
+    options.learn = 0
     options.load = None
     options.machine = '48'
     options.pause = True
     options.polarity = 0
     options.python = 0
+    options.timeline = None
     options.timeout = 900
     options.trace = None
+    options.turbo = 0
     for spec in options.sim_load_config:
         name, sep, value = spec.partition('=')
         if sep:
@@ -305,6 +317,8 @@ def _set_sim_load_config(options):
                 options.accelerate_dec_a = parse_int(value, options.accelerate_dec_a)
             elif name == 'accelerator':
                 options.accelerator = value
+            elif name == 'accelerator-file':
+                options.accelerator_file = value
             elif name == 'cmio':
                 options.cmio = parse_int(value, options.cmio)
             elif name == 'fast-load':
@@ -315,6 +329,8 @@ def _set_sim_load_config(options):
                 options.first_edge = parse_int(value, options.first_edge)
             elif name == 'in-flags':
                 options.in_flags = parse_int(value, options.in_flags)
+            elif name == 'learn':
+                options.learn = parse_int(value, options.learn)
             elif name == 'load':
                 options.load = value
             elif name == 'machine':
@@ -325,26 +341,43 @@ def _set_sim_load_config(options):
                 options.polarity = parse_int(value, options.polarity)
             elif name == 'python':
                 options.python = parse_int(value, options.python)
+            elif name == 'timeline':
+                options.timeline = value
             elif name == 'timeout':
                 options.timeout = parse_int(value, options.timeout)
             elif name == 'trace':
                 options.trace = value
+            elif name == 'turbo':
+                options.turbo = parse_int(value, options.turbo)
             else:
                 raise SkoolKitError(f'Invalid sim-load configuration parameter: {name}')
 
+# ROM images already read by this process (shared by every tape converted in
+# batch mode)
+_ROMS = {}
+
+def _read_rom(fname):
+    if fname not in _ROMS:
+        _ROMS[fname] = read_bin_file(fname, 16384)
+    return _ROMS[fname]
+
 def sim_load(blocks, options, config):
     if options.tape_analysis:
         get_edges(blocks, options.first_edge, options.polarity, True)
         sys.exit(0)
 
+    user_accelerators = {}
+    if options.accelerator_file and (not options.learn or os.path.isfile(options.accelerator_file)):
+        user_accelerators = read_accelerators(options.accelerator_file)
+    all_accelerators = {**ACCELERATORS, **user_accelerators}
     list_accelerators = int(options.accelerator == 'list')
     accelerators = set()
     if options.accelerator == 'auto' or list_accelerators:
-        accelerators.update(ACCELERATORS.values())
+        accelerators.update(all_accelerators.values())
     elif options.accelerator and options.accelerator != 'none':
         for name in options.accelerator.split(','):
-            if name in ACCELERATORS:
-                accelerators.add(ACCELERATORS[name])
+            if name in all_accelerators:
+                accelerators.add(all_accelerators[name])
             else:
                 raise SkoolKitError(f'Unrecognised accelerator: {name}')
 
@@ -365,7 +398,7 @@ def sim_load(blocks, options, config):
         registers = {'PC': 0x1200, 'HL': 0xFFFF, 'R': 0x22}
         state = {'tstates': 5701854}
         memory = [0] * 65536
-        memory[:0x4000] = read_bin_file(ROM48, 16384)
+        memory[:0x4000] = _read_rom(ROM48)
         stop = 0x0605 # SAVE-ETC
         kb_delay = 4
 
@@ -386,6 +419,7 @@ def sim_load(blocks, options, config):
             simulator_cls = CCMIOSimulator or CMIOSimulator
         accelerators.clear()
         options.accelerate_dec_a = 0
+        options.learn = 0
     elif options.python:
         simulator_cls = Simulator
     else:
@@ -454,18 +488,25 @@ def sim_load(blocks, options, config):
             in_min_addr = 0x8000
         tracer = LoadTracer(simulator, blocks, accelerators, options.pause, options.first_edge,
                             options.polarity, in_min_addr, options.accelerate_dec_a,
-                            list_accelerators, border, out7ffd, outfffd, ay, outfe)
+                            list_accelerators, border, out7ffd, outfffd, ay, outfe, options.learn,
+                            bool(options.timeline), options.turbo and not options.trace)
         simulator.set_tracer(tracer, options.in_flags & 4, False)
         try:
             tracer.run(options.start, options.fast_load, options.finish_tape, timeout, tracefile, trace_line, prefix, byte_fmt, word_fmt)
             _ram_operations(simulator.memory, options.ram_ops)
         except KeyboardInterrupt:
             write_line(f'Simulation stopped (interrupted): PC={simulator.registers[PC]}')
+        if options.timeline:
+            tracer.timeline.write(options.timeline, simulator.registers[T])
         if list_accelerators:
             accelerators = '; '.join(f'{k}: {v}' for k, v in sorted(tracer.acc_usage.items())) or 'none'
             tsl_misses = f'{tracer.inc_b_misses}/{tracer.dec_b_misses}'
             dec_a_stats = f'{tracer.dec_a_jr_hits}/{tracer.dec_a_jp_hits}/{tracer.dec_a_misses}'
             write_line(f'Accelerators: {accelerators}; misses: {tsl_misses}; dec-a: {dec_a_stats}')
+        if options.learn and tracer.learned:
+            write_line('Learned accelerators: ' + ', '.join(acc.name for acc in tracer.learned))
+            if options.accelerator_file:
+                write_accelerators(options.accelerator_file, list(user_accelerators.values()) + tracer.learned)
 
     if tracefile:
         tracefile.close()
@@ -749,9 +790,124 @@ def get_tap_blocks(tap, start=1, stop=0):
         block_num += 1
     return blocks
 
+def _get_pzx_pulses(data, i, end):
+    # Expand the pulses in a PZX PULS block
+    pulses = []
+    while i < end:
+        count = 1
+        duration = get_word(data, i)
+        i += 2
+        if duration > 0x8000:
+            count = duration & 0x7FFF
+            duration = get_word(data, i)
+            i += 2
+        if duration >= 0x8000:
+            duration = ((duration & 0x7FFF) << 16) + get_word(data, i)
+            i += 2
+        pulses.append((count, duration))
+    return pulses
+
+def _get_pzx_blocks(data, sim, start, stop, is48):
+    # https://github.com/raxoft/pzxtools/blob/master/docs/pzx_format.txt
+    if data[:4] != b'PZXT':
+        raise TapeError("Not a PZX file")
+    blocks = []
+    block_num = 1
+    level = 0
+    i = 0
+    while i + 8 <= len(data):
+        if block_num >= stop > 0:
+            break
+        tag = data[i:i + 4]
+        body = i + 8
+        i = body + get_dword(data, i + 4)
+        if i > len(data):
+            raise TapeError('Unexpected end of PZX file')
+        if tag == b'PZXT':
+            # Header (not counted as a block)
+            continue
+        if block_num >= start:
+            if tag == b'PULS':
+                # Pulse sequence (starting at a low level)
+                pulses = _get_pzx_pulses(data, body, i)
+                if pulses and pulses[0][0] > 1:
+                    pilot_len, pilot = pulses.pop(0)
+                else:
+                    pilot_len = pilot = 0
+                sync = []
+                for count, duration in pulses:
+                    sync.extend((duration,) * count)
+                if sim:
+                    if level:
+                        blocks.append((0x13, TapeBlockTimings(sync=(0,)), []))
+                    blocks.append((0x13, TapeBlockTimings(pilot_len, pilot, sync), []))
+                level = (pilot_len + len(sync)) % 2
+            elif tag == b'DATA':
+                # Data block
+                count = get_dword(data, body)
+                num_bits = count & 0x7FFFFFFF
+                tail = get_word(data, body + 4)
+                p0, p1 = data[body + 6], data[body + 7]
+                s0 = [get_word(data, j) for j in range(body + 8, body + 8 + 2 * p0, 2)]
+                s1 = [get_word(data, j) for j in range(body + 8 + 2 * p0, body + 8 + 2 * (p0 + p1), 2)]
+                j = body + 8 + 2 * (p0 + p1)
+                tape_data = data[j:j + (num_bits + 7) // 8]
+                timings = None
+                if sim:
+                    sync = [0] if count >> 31 != level else []
+                    level = count >> 31
+                    if p0 == p1 == 2 and s0[0] == s0[1] and s1[0] == s1[1]:
+                        timings = TapeBlockTimings(sync=sync, zero=s0[0], one=s1[0], used_bits=num_bits % 8 or 8)
+                    else:
+                        # Non-standard bit encoding, so expand the data into
+                        # pulses
+                        pulses = []
+                        for k in range(num_bits):
+                            if tape_data[k // 8] & (0x80 >> (k % 8)):
+                                pulses.extend(s1)
+                            else:
+                                pulses.extend(s0)
+                        level ^= len(pulses) % 2
+                        timings = TapeBlockTimings(pulses=sync + pulses)
+                        tape_data = []
+                blocks.append((0x14, timings, tape_data))
+                if sim and tail:
+                    blocks.append((0x13, TapeBlockTimings(sync=(tail,)), []))
+                    level ^= 1
+            elif tag == b'PAUS':
+                # Pause
+                duration = get_dword(data, body)
+                if sim:
+                    sync = (0,) if duration >> 31 != level else ()
+                    level = duration >> 31
+                    if blocks and not sync:
+                        blocks[-1][1].pause += duration & 0x7FFFFFFF
+                    else:
+                        blocks.append((0x20, TapeBlockTimings(sync=sync, pause=duration & 0x7FFFFFFF), []))
+            elif tag == b'STOP':
+                # Stop the tape (if in 48K mode)
+                if sim and stop == 0 and (get_word(data, body) == 0 or is48):
+                    break
+        block_num += 1
+    return blocks
+
+def _get_recording_blocks(pulses):
+    if not pulses:
+        raise TapeError('Tape is empty')
+    return [(0x15, TapeBlockTimings(pulses=pulses), [])]
+
 def _get_tape_blocks(tape_type, tape, sim, start, stop, is48):
-    if tape_type.lower() == 'tzx':
+    tape_type = tape_type.lower()
+    if tape_type == 'tzx':
         return _get_tzx_blocks(tape, sim, start, stop, is48)
+    if tape_type == 'pzx':
+        return _get_pzx_blocks(tape, sim, start, stop, is48)
+    if tape_type in ('csw', 'wav'):
+        if not sim:
+            raise TapeError(f'Cannot read data blocks from a {tape_type.upper()} file (a simulated LOAD is required)')
+        if tape_type == 'csw':
+            return _get_recording_blocks(csw_pulses(tape))
+        return _get_recording_blocks(wav_pulses(tape))
     return get_tap_blocks(tape, start, stop)
 
 def _get_tape(urlstring, user_agent, member):
@@ -774,7 +930,7 @@ def _get_tape(urlstring, user_agent, member):
         z = zipfile.ZipFile(f)
         if member is None:
             for name in z.namelist():
-                if name.lower().endswith(('.tap', '.tzx')):
+                if name.lower().endswith(TAPE_EXTS):
                     member = name
                     break
             else:
@@ -788,7 +944,14 @@ def _get_tape(urlstring, user_agent, member):
         data = tape.read()
     else:
         member = os.path.basename(urlstring)
-        data = f.read()
+        if urlstring.lower().endswith('.wav') and not url.scheme:
+            # Map a WAV file into memory instead of reading it all in
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                data = b''
+        else:
+            data = f.read()
 
     f.close()
     tape_type = member[-3:]
@@ -896,18 +1059,22 @@ def _print_sim_load_config_help():
     print(f"""
 Usage: --sim-load-config accelerate-dec-a=0/1/2
        --sim-load-config accelerator=NAME
+       --sim-load-config accelerator-file=FILE
        --sim-load-config cmio=0/1
        --sim-load-config fast-load=0/1
        --sim-load-config finish-tape=0/1
        --sim-load-config first-edge=N
        --sim-load-config in-flags=FLAGS
+       --sim-load-config learn=0/1
        --sim-load-config load=KEYS
        --sim-load-config machine=48/128
        --sim-load-config pause=0/1
        --sim-load-config polarity=0/1
        --sim-load-config python=0/1
+       --sim-load-config timeline=FILE
        --sim-load-config timeout=N
        --sim-load-config trace=FILE
+       --sim-load-config turbo=0/1
 
 Configure various properties of a simulated LOAD.
 
@@ -926,6 +1093,11 @@ Configure various properties of a simulated LOAD.
 
   {accelerators}
 
+--sim-load-config accelerator-file=FILE
+
+  Read additional accelerators from FILE (a JSON file), and write any
+  accelerators learned during the simulated LOAD (see 'learn' below) to it.
+
 --sim-load-config cmio=0/1
 
   By default, memory contention and I/O contention delays are not simulated.
@@ -964,6 +1136,12 @@ Configure various properties of a simulated LOAD.
     4 - yield a simulated port reading when executing an 'IN r,(C)' instruction
         (by default such an instruction always yields the value $FF)
 
+--sim-load-config learn=0/1
+
+  Set learn=1 to examine the tape-sampling loop containing each 'IN A,($FE)'
+  instruction executed by a custom loader, and build an accelerator for it on
+  the fly if it is not recognised by any of the accelerators in use.
+
 --sim-load-config load=KEYS
 
   By default, the simulated LOAD begins by executing either 'LOAD ""' or
@@ -1020,6 +1198,15 @@ Configure various properties of a simulated LOAD.
   By default, tap2sna.py will use the C version of the Z80 simulator if it's
   available. Set python=1 to force usage of the pure Python Z80 simulator.
 
+--sim-load-config timeline=FILE
+
+  Write to FILE a timeline of the simulated LOAD, showing for each block on the
+  tape when it started and finished loading (in T-states), the time taken, the
+  number of instructions executed, whether it was fast loaded, the number of
+  accelerator hits and misses, and the time spent in ROM and RAM loaders. If
+  FILE ends with '.csv', the timeline is written in CSV format; otherwise it is
+  written in JSON format.
+
 --sim-load-config timeout=N
 
   Set the timeout to N seconds (default: 900). A simulated LOAD still in
@@ -1028,17 +1215,114 @@ Configure various properties of a simulated LOAD.
 --sim-load-config trace=FILE
 
   Log to FILE all instructions executed during the simulated LOAD.
+
+--sim-load-config turbo=0/1
+
+  Set turbo=1 to skip iterations of a loop that changes no registers (except
+  R) and no memory while waiting, with interrupts disabled, for the next edge
+  on the tape. Tape-sampling loops that are accelerated (such as LD-EDGE in
+  the ROM) already skip to the next edge, so turbo mode typically saves only a
+  few per cent of the time taken. Turbo mode is disabled when tracing.
 """.strip())
 
+def _file_digest(fname):
+    # The contents of a file (if it exists) are part of the cache key, so that
+    # editing it invalidates any cached snapshots that depend on it
+    if fname and os.path.isfile(fname):
+        with open(fname, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+def _get_cache_file(tape, outfile, options, config):
+    cache_dir = config['CacheDir']
+    if not (options.cache and cache_dir and config['CacheSize'] > 0) or options.trace or options.timeline or options.tape_analysis:
+        return None
+    if any(op.startswith('call=') for op in options.ram_ops):
+        # The result of a 'call' operation depends on code outside the tape
+        return None
+    key = {
+        'version': VERSION,
+        'tape': hashlib.sha256(tape).hexdigest(),
+        'accelerator-file': _file_digest(options.accelerator_file),
+        'tape-start': options.tape_start,
+        'tape-stop': options.tape_stop,
+        'sim-load-config': options.sim_load_config,
+        'start': options.start,
+        'ram': options.ram_ops,
+        'reg': options.reg,
+        'state': options.state
+    }
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    suffix = os.path.splitext(outfile)[1].lower()
+    return os.path.join(os.path.expanduser(cache_dir), digest + suffix)
+
+def _read_cache(cache_file, outfile):
+    try:
+        with open(cache_file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return False
+    write_line('Using cached snapshot')
+    parent_dir = os.path.dirname(outfile)
+    if parent_dir and not os.path.isdir(parent_dir):
+        os.makedirs(parent_dir)
+    write_line('Writing {0}'.format(outfile))
+    with open(outfile, 'wb') as f:
+        f.write(data)
+    # Mark the cached snapshot as recently used (unless another process has
+    # evicted it in the meantime)
+    with suppress(FileNotFoundError):
+        os.utime(cache_file)
+    return True
+
+def _write_cache(cache_file, outfile, max_size):
+    if not os.path.isfile(outfile):
+        return
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(outfile, 'rb') as f:
+        data = f.read()
+    fd, tmpfile = tempfile.mkstemp(dir=cache_dir, prefix='.tap2sna-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmpfile, cache_file)
+
+    # Evict the least recently used snapshots until the cache fits (ignoring
+    # any that another process evicts first)
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(('.szx', '.z80')):
+            path = os.path.join(cache_dir, name)
+            with suppress(FileNotFoundError):
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+    total = sum(e[1] for e in entries)
+    for mtime, size, path in sorted(entries):
+        if total <= max_size * 1048576 or path == cache_file:
+            break
+        with suppress(FileNotFoundError):
+            os.remove(path)
+        total -= size
+
 def make_snapshot(url, options, outfile, config):
     tape_name, tape_type, tape = _get_tape(url, options.user_agent, options.tape_name)
     if options.tape_sum:
         md5sum = hashlib.md5(tape).hexdigest()
         if md5sum != options.tape_sum:
             raise TapeError(f'Checksum mismatch: Expected {options.tape_sum}, actually {md5sum}')
+    if outfile is None:
+        if tape_name.lower().endswith(TAPE_EXTS):
+            tape_name = tape_name[:-4]
+        fmt = config['DefaultSnapshotFormat']
+        outfile = f'{tape_name}.{fmt}'
+    if options.output_dir:
+        outfile = os.path.join(options.output_dir, outfile)
+    cache_file = None
     if options.sim_load:
         _set_sim_load_config(options)
         is48 = options.machine == '48'
+        cache_file = _get_cache_file(tape, outfile, options, config)
+        if cache_file and not options.refresh_cache and _read_cache(cache_file, outfile):
+            return
     else:
         is48 = True
     tape_blocks = _get_tape_blocks(tape_type, tape, options.sim_load, options.tape_start, options.tape_stop, is48)
@@ -1050,21 +1334,82 @@ def make_snapshot(url, options, outfile, config):
     else:
         blocks = [b[2] for b in tape_blocks]
         ram = _get_ram(blocks, options)
-    if outfile is None:
-        if tape_name.lower().endswith(('.tap', '.tzx')):
-            tape_name = tape_name[:-4]
-        fmt = config['DefaultSnapshotFormat']
-        outfile = f'{tape_name}.{fmt}'
-    if options.output_dir:
-        outfile = os.path.join(options.output_dir, outfile)
     _write_snapshot(ram, options, outfile)
+    if cache_file:
+        _write_cache(cache_file, outfile, config['CacheSize'])
+
+def _get_batch_jobs(source):
+    if os.path.isdir(source):
+        jobs = []
+        for root, subdirs, files in os.walk(source):
+            subdirs.sort()
+            jobs.extend((os.path.join(root, f), None) for f in sorted(files) if f.lower().endswith(TAPE_EXTS))
+        return jobs
+    if source.lower().endswith('.zip'):
+        with open_file(source, 'rb') as f, zipfile.ZipFile(f) as z:
+            return [(source, m) for m in z.namelist() if m.lower().endswith(TAPE_EXTS)]
+    with open_file(source) as f:
+        return [(s, None) for s in (line.strip() for line in f) if s and not s.startswith('#')]
+
+def _batch_output(job, options, config):
+    # The snapshot and log file are written alongside the tape, and the
+    # directory structure of a zip archive is preserved, so that tapes with
+    # the same name in different directories don't overwrite each other's output
+    tape, member = job
+    output_dir = options.output_dir or os.path.dirname(tape)
+    if member:
+        parts = [p for p in member.split('/')[:-1] if p not in ('', '.', '..')]
+        output_dir = os.path.join(output_dir, *parts)
+    name = os.path.splitext(os.path.basename(member or tape))[0]
+    return output_dir, name, f"{name}.{config['DefaultSnapshotFormat']}"
+
+def _convert_tape(job, options, config):
+    tape, member = job
+    # Each job gets its own copy of the options, because they are modified
+    # while the simulated LOAD is configured
+    options = argparse.Namespace(**vars(options))
+    options.tape_name = member
+    options.output_dir, name, outfile = _batch_output(job, options, config)
+    result = {'tape': tape}
+    if member:
+        result['member'] = member
+    result['snapshot'] = os.path.join(options.output_dir, outfile)
+    result['log'] = logfile = os.path.join(options.output_dir, name + '.log')
+    if options.output_dir:
+        os.makedirs(options.output_dir, exist_ok=True)
+    with open(logfile, 'w') as f, redirect_stdout(f), redirect_stderr(f):
+        try:
+            make_snapshot(tape, options, outfile, config)
+        except Exception as e:
+            result['error'] = e.args[0] if e.args else str(e)
+        except SystemExit as e:
+            # Tape analysis (for example) exits without writing a snapshot
+            result['error'] = f'Exited with status {e.code} before writing a snapshot'
+        if 'error' in result:
+            write_line(f"ERROR: {result['error']}")
+    return json.dumps(result)
+
+def _run_batch(source, options, config):
+    jobs = _get_batch_jobs(source)
+    snapshots = {}
+    for job in jobs:
+        output_dir, name, outfile = _batch_output(job, options, config)
+        snapshot = os.path.normcase(os.path.normpath(os.path.join(output_dir, name)))
+        if snapshot in snapshots:
+            tapes = [': '.join(j for j in t if j) for t in (snapshots[snapshot], job)]
+            raise SkoolKitError(f'{tapes[0]} and {tapes[1]} would both be converted to {os.path.join(output_dir, outfile)}')
+        snapshots[snapshot] = job
+    convert = partial(_convert_tape, options=options, config=config)
+    with ProcessPoolExecutor(options.jobs or None) as executor:
+        for result in executor.map(convert, jobs, chunksize=4):
+            print(result)
 
 def main(args):
     config = get_config('tap2sna')
     parser = SkoolKitArgumentParser(
         usage='\n  tap2sna.py [options] INPUT [OUTFILE]\n  tap2sna.py @FILE [args]',
-        description="Convert a TAP or TZX file (which may be inside a zip archive) into an SZX or Z80 snapshot. "
-                    "INPUT may be the full URL to a remote zip archive or TAP/TZX file, or the path to a local file. "
+        description="Convert a TAP, TZX, PZX, CSW or WAV file (which may be inside a zip archive) into an SZX or Z80 snapshot. "
+                    "INPUT may be the full URL to a remote zip archive or tape file, or the path to a local file. "
                     "Arguments may be read from FILE instead of (or as well as) being given on the command line.",
         fromfile_prefix_chars='@',
         add_help=False
@@ -1072,6 +1417,9 @@ def main(args):
     parser.add_argument('url', help=argparse.SUPPRESS, nargs='?')
     parser.add_argument('outfile', help=argparse.SUPPRESS, nargs='?')
     group = parser.add_argument_group('Options')
+    group.add_argument('--batch', action='store_true',
+                       help="Convert every tape file in INPUT, which may be a directory, a zip archive, "
+                            "or a file containing a list of tapes (one per line).")
     group.add_argument('-c', '--sim-load-config', metavar='name=value', action='append', default=[],
                        help="Set the value of a simulated LOAD configuration parameter. "
                             "Do '-c help' for more information. This option may be used multiple times.")
@@ -1079,11 +1427,17 @@ def main(args):
                        help="Write the snapshot file in this directory.")
     group.add_argument('-I', '--ini', dest='params', metavar='p=v', action='append', default=[],
                        help="Set the value of the configuration parameter 'p' to 'v'. This option may be used multiple times.")
+    group.add_argument('-j', '--jobs', metavar='N', type=int, default=0,
+                       help="Use at most this many worker processes in batch mode (default: the number of CPUs).")
+    group.add_argument('--no-cache', dest='cache', action='store_false',
+                       help="Don't read or write the simulated LOAD result cache.")
     group.add_argument('-p', '--stack', dest='stack', metavar='STACK', type=integer,
                        help="Set the stack pointer.")
     group.add_argument('--ram', dest='ram_ops', metavar='OPERATION', action='append', default=[],
                        help="Perform a load operation or otherwise modify the memory snapshot being built. "
                             "Do '--ram help' for more information. This option may be used multiple times.")
+    group.add_argument('--refresh-cache', action='store_true',
+                       help="Perform a simulated LOAD even if the result is cached, and update the cache.")
     group.add_argument('--reg', dest='reg', metavar='name=value', action='append', default=[],
                        help="Set the value of a register. Do '--reg help' for more information. "
                             "This option may be used multiple times.")
@@ -1097,13 +1451,13 @@ def main(args):
     group.add_argument('--tape-analysis', action='store_true',
                        help="Show an analysis of the tape's tones, pulse sequences and data blocks.")
     group.add_argument('--tape-name', metavar='NAME',
-                       help="Specify the name of a TAP/TZX file in a zip archive.")
+                       help="Specify the name of a tape file in a zip archive.")
     group.add_argument('--tape-start', metavar='BLOCK', type=int, default=1,
                        help="Start the tape at this block number.")
     group.add_argument('--tape-stop', metavar='BLOCK', type=int, default=0,
                        help="Stop the tape at this block number.")
     group.add_argument('--tape-sum', metavar='MD5SUM',
-                       help="Specify the MD5 checksum of the TAP/TZX file.")
+                       help="Specify the MD5 checksum of the tape file.")
     group.add_argument('-u', '--user-agent', dest='user_agent', metavar='AGENT', default='',
                        help="Set the User-Agent header.")
     group.add_argument('-V', '--version', action='version', version='SkoolKit {}'.format(VERSION),
@@ -1123,7 +1477,7 @@ def main(args):
     if 'help' in namespace.state:
         print_state_help()
         return
-    if unknown_args or namespace.url is None:
+    if unknown_args or namespace.url is None or (namespace.batch and namespace.outfile):
         parser.exit(2, parser.format_help())
     if namespace.stack is not None:
         namespace.reg.append('sp={}'.format(namespace.stack))
@@ -1131,6 +1485,12 @@ def main(args):
     if not namespace.sim_load and namespace.start is not None:
         namespace.reg.append('pc={}'.format(namespace.start))
     update_options('tap2sna', namespace, namespace.params, config)
+    if namespace.batch:
+        try:
+            _run_batch(namespace.url, namespace, config)
+        except zipfile.BadZipFile as e:
+            raise SkoolKitError(f'{namespace.url}: {e}')
+        return
     if namespace.outfile is None:
         for arg in args:
             if arg.startswith('@') and arg.lower().endswith('.t2s') and os.path.isfile(arg[1:]):
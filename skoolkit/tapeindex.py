@@ -0,0 +1,209 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+import mmap
+from contextlib import contextmanager
+
+from skoolkit import SkoolKitError, get_word, get_word3, get_dword
+
+TZX_SIGNATURE = b'ZXTape!\x1a'
+
+# TZX block IDs mapped to block descriptions, and functions that return the
+# length of the block body (excluding the ID byte) and the offset of the tape
+# data (if any) from the start of the body
+# https://worldofspectrum.net/features/TZXformat.html
+TZX_BLOCKS = {
+    0x10: ('Standard speed data', lambda d, i: 4 + get_word(d, i + 2), 4),
+    0x11: ('Turbo speed data', lambda d, i: 18 + get_word3(d, i + 15), 18),
+    0x12: ('Pure tone', lambda d, i: 4, None),
+    0x13: ('Pulse sequence', lambda d, i: 1 + d[i] * 2, None),
+    0x14: ('Pure data', lambda d, i: 10 + get_word3(d, i + 7), 10),
+    0x15: ('Direct recording', lambda d, i: 8 + get_word3(d, i + 5), None),
+    0x18: ('CSW recording', lambda d, i: 4 + get_dword(d, i), None),
+    0x19: ('Generalized data', lambda d, i: 4 + get_dword(d, i), None),
+    0x20: ('Pause (silence)', lambda d, i: 2, None),
+    0x21: ('Group start', lambda d, i: 1 + d[i], None),
+    0x22: ('Group end', lambda d, i: 0, None),
+    0x23: ('Jump to block', lambda d, i: 2, None),
+    0x24: ('Loop start', lambda d, i: 2, None),
+    0x25: ('Loop end', lambda d, i: 0, None),
+    0x26: ('Call sequence', lambda d, i: 2 + get_word(d, i) * 2, None),
+    0x27: ('Return from sequence', lambda d, i: 0, None),
+    0x28: ('Select block', lambda d, i: 2 + get_word(d, i), None),
+    0x2A: ('Stop the tape if in 48K mode', lambda d, i: 4, None),
+    0x2B: ('Set signal level', lambda d, i: 5, None),
+    0x30: ('Text description', lambda d, i: 1 + d[i], None),
+    0x31: ('Message', lambda d, i: 2 + d[i + 1], None),
+    0x32: ('Archive info', lambda d, i: 2 + get_word(d, i), None),
+    0x33: ('Hardware type', lambda d, i: 1 + d[i] * 3, None),
+    0x35: ('Custom info', lambda d, i: 20 + get_dword(d, i + 16), None),
+    0x5A: ('"Glue" block', lambda d, i: 9, None)
+}
+
+HEADER_TYPES = ('Program', 'Number array', 'Character array', 'Bytes')
+
+class TapeBlock:
+    def __init__(self, number, block_id, offset, length, data_offset=None, data_length=0):
+        self.number = number
+        self.block_id = block_id
+        self.offset = offset
+        self.length = length
+        self.data_offset = data_offset
+        self.data_length = data_length
+
+    def data(self, tape):
+        """Return a zero-copy view of the block's tape data (if any).
+
+        :param tape: The tape (a `memoryview`).
+        """
+        if self.data_offset is None:
+            return tape[0:0]
+        return tape[self.data_offset:self.data_offset + self.data_length]
+
+def index_tap(tape):
+    """Build an index of the blocks in a TAP file without copying any data.
+
+    :param tape: The contents of the TAP file (a `bytes` object or buffer).
+    :return: A list of `TapeBlock` objects.
+    """
+    blocks = []
+    i = 0
+    while i + 1 < len(tape):
+        length = get_word(tape, i)
+        if i + 2 + length > len(tape):
+            raise SkoolKitError(f'Missing {i + 2 + length - len(tape)} data byte(s) at end of file')
+        blocks.append(TapeBlock(len(blocks) + 1, None, i, length + 2, i + 2, length))
+        i += length + 2
+    if i < len(tape):
+        raise SkoolKitError('Extraneous byte at end of file')
+    return blocks
+
+def index_tzx(tape):
+    """Build an index of the blocks in a TZX file without copying any data.
+
+    :param tape: The contents of the TZX file (a `bytes` object or buffer).
+    :return: A list of `TapeBlock` objects.
+    """
+    if bytes(tape[:8]) != TZX_SIGNATURE:
+        raise SkoolKitError('Not a TZX file')
+    if len(tape) < 10:
+        raise SkoolKitError('TZX version number not found')
+    blocks = []
+    i = 10
+    while i < len(tape):
+        block_id = tape[i]
+        if block_id not in TZX_BLOCKS:
+            raise SkoolKitError(f'Unknown block ID: 0x{block_id:02X}')
+        body_length, data_offset = TZX_BLOCKS[block_id][1:]
+        try:
+            length = body_length(tape, i + 1) + 1
+        except IndexError:
+            raise SkoolKitError('Unexpected end of file')
+        if i + length > len(tape):
+            raise SkoolKitError('Unexpected end of file')
+        if data_offset is None:
+            blocks.append(TapeBlock(len(blocks) + 1, block_id, i, length))
+        else:
+            data_offset += 1
+            blocks.append(TapeBlock(len(blocks) + 1, block_id, i, length, i + data_offset, length - data_offset))
+        i += length
+    return blocks
+
+def checksum(data):
+    """Compute the XOR checksum of a block of tape data. This is 0 for a block
+    whose final byte is a valid parity byte.
+
+    :param data: The tape data (a `bytes` object or buffer).
+    """
+    # XOR the two halves of the data together (as big integers) until only
+    # one byte is left, which avoids iterating over the data in Python
+    size = len(data)
+    value = int.from_bytes(data, 'little')
+    while size > 1:
+        half = (size + 1) // 2
+        value = (value & ((1 << (8 * half)) - 1)) ^ (value >> (8 * half))
+        size = half
+    return value
+
+@contextmanager
+def open_tape(fname):
+    """Open a tape file and map it into memory.
+
+    :param fname: The file name.
+    :return: A `memoryview` of the contents of the file.
+    """
+    with open(fname, 'rb') as f:
+        try:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            m = None
+        view = memoryview(m if m else b'')
+        try:
+            yield view
+        finally:
+            view.release()
+            if m:
+                m.close()
+
+def _header_info(data):
+    if len(data) == 19 and data[0] == 0 and data[1] < 4:
+        info = {
+            'type': HEADER_TYPES[data[1]],
+            'name': ''.join(chr(b) if 32 <= b < 127 else '?' for b in data[2:12]),
+            'length': get_word(data, 12)
+        }
+        if data[1] == 0:
+            info['line'] = get_word(data, 14)
+        elif data[1] == 3:
+            info['start'] = get_word(data, 14)
+        return info
+
+def tape_summary(fname):
+    """Build a summary of the blocks in a TAP or TZX file.
+
+    :param fname: The file name.
+    :return: A dictionary suitable for serialisation as JSON.
+    """
+    tape_type = fname[-4:].lower()
+    if tape_type not in ('.tap', '.tzx'):
+        raise SkoolKitError('Unrecognised tape type')
+    summary = {'file': fname, 'format': tape_type[1:]}
+    with open_tape(fname) as tape:
+        summary['size'] = len(tape)
+        if tape_type == '.tap':
+            blocks = index_tap(tape)
+        else:
+            blocks = index_tzx(tape)
+            summary['version'] = f'{tape[8]}.{tape[9]}'
+        summary['blocks'] = block_list = []
+        for block in blocks:
+            b_info = {'number': block.number, 'offset': block.offset, 'length': block.length}
+            if block.block_id is not None:
+                b_info['id'] = block.block_id
+                b_info['description'] = TZX_BLOCKS[block.block_id][0]
+            if block.data_offset is not None:
+                data = block.data(tape)
+                b_info['data_length'] = len(data)
+                if data:
+                    b_info['flag'] = data[0]
+                    b_info['checksum_ok'] = checksum(data) == 0
+                    header = _header_info(data)
+                    if header:
+                        b_info['header'] = header
+                data.release()
+            block_list.append(b_info)
+    return summary
@@ -16,9 +16,12 @@
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
 
-from skoolkit import SkoolKitError, get_word, get_word3, get_dword, get_int_param, warn, VERSION
+from skoolkit import SkoolKitError, get_word, get_word3, get_dword, get_int_param, open_file, warn, VERSION
 from skoolkit.basic import BasicLister, TextReader, get_char
+from skoolkit.tapeindex import tape_summary
 
 ARCHIVE_INFO = {
     0: "Full title",
@@ -519,6 +522,22 @@ def _analyse_tap(tap, basic_block, text_reader, show_data):
     elif i > len(tap):
         warn(f'Missing {i - len(tap)} data byte(s) at end of file')
 
+def _summarise(fname):
+    try:
+        summary = tape_summary(fname)
+    except FileNotFoundError:
+        summary = {'file': fname, 'error': f'{fname}: file not found'}
+    except (SkoolKitError, OSError) as e:
+        summary = {'file': fname, 'error': str(e)}
+    return json.dumps(summary)
+
+def _run_batch(manifest, jobs):
+    with open_file(manifest) as f:
+        tapes = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    with ProcessPoolExecutor(jobs or None) as executor:
+        for summary in executor.map(_summarise, tapes, chunksize=16):
+            print(summary)
+
 def main(args):
     parser = argparse.ArgumentParser(
         usage="tapinfo.py FILE",
@@ -529,14 +548,21 @@ def main(args):
     group = parser.add_argument_group('Options')
     group.add_argument('-b', '--basic', metavar='N[,A]',
                        help='List the BASIC program in block N loaded at address A (default 23755).')
+    group.add_argument('--batch', action='store_true',
+                       help='Summarise the tape files listed in FILE in parallel and print the summaries as JSON.')
     group.add_argument('-d', '--data', action='store_true',
                        help='Show the entire contents of header and data blocks.')
+    group.add_argument('-j', '--jobs', metavar='N', type=int, default=0,
+                       help='Use at most this many worker processes in batch mode (default: the number of CPUs).')
     group.add_argument('-V', '--version', action='version', version='SkoolKit {}'.format(VERSION),
                        help='Show SkoolKit version number and exit.')
     namespace, unknown_args = parser.parse_known_args(args)
     if unknown_args or namespace.infile is None:
         parser.exit(2, parser.format_help())
     infile = namespace.infile
+    if namespace.batch:
+        _run_batch(infile, namespace.jobs)
+        return
     tape_type = infile[-4:].lower()
     if tape_type not in ('.tap', '.tzx'):
         raise SkoolKitError('Unrecognised tape type')
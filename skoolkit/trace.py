@@ -15,18 +15,29 @@
 # SkoolKit. If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+from functools import partial
+import io
+import json
+import shlex
 import textwrap
 import time
 
 from skoolkit import (ROM48, VERSION, SkoolKitError, CSimulator,
-                      CCMIOSimulator, get_int_param, integer, read_bin_file)
+                      CCMIOSimulator, get_int_param, integer, open_file, read_bin_file)
+from skoolkit.audio import AudioStream, AudioWriter
+from skoolkit.ay import AYLog, write_psg
 from skoolkit.cmiosimulator import CMIOSimulator
 from skoolkit.config import get_config, show_config, update_options
 from skoolkit.pagingtracer import Memory, PagingTracer
+from skoolkit.profiler import Profile, get_entries
 from skoolkit.simulator import Simulator
-from skoolkit.simutils import PC, T, from_snapshot, get_state
+from skoolkit.simutils import FRAME_DURATIONS, PC, T, from_snapshot, get_state
 from skoolkit.snapshot import Snapshot, make_snapshot, poke, print_reg_help, write_snapshot
+from skoolkit.tracefile import REGISTERS, TraceReader, TraceWriter, decode, get_code
 from skoolkit.traceutils import Registers, disassemble
+from skoolkit.watchpoints import parse_watchpoint, print_watch_help
 
 class Tracer(PagingTracer):
     def __init__(self, simulator, border, out7ffd, outfffd, ay, outfe):
@@ -37,10 +48,12 @@ class Tracer(PagingTracer):
         self.ay = ay
         self.outfe = outfe
         self.operations = 0
+        self.stop_cond = 0
         self.spkr = None
         self.out_times = []
+        self.audio_stream = None
 
-    def run(self, start, stop, max_operations, max_tstates, interrupts, trace_line, prefix, byte_fmt, word_fmt):
+    def run(self, start, stop, max_operations, max_tstates, interrupts, trace_line, prefix, byte_fmt, word_fmt, trace_writer=None, profile=None, watch=()):
         simulator = self.simulator
         memory = simulator.memory
         registers = simulator.registers
@@ -50,30 +63,57 @@ class Tracer(PagingTracer):
         else:
             max_time = 0
         r = Registers(registers)
+        if trace_writer:
+            if trace_writer.registers:
+                twrite = lambda pc, code, t0: trace_writer.write_registers(pc, code, t0, registers)
+            else:
+                twrite = trace_writer.write
 
         if hasattr(simulator, 'trace'): # pragma: no cover
             if trace_line:
                 df = lambda pc: disassemble(memory, pc, prefix, byte_fmt, word_fmt)[0]
                 tf = lambda pc, i, t0: print(trace_line.format(pc=pc, i=i, r=r, t=t0))
+            elif trace_writer:
+                df = partial(get_code, memory)
+                tf = twrite
             else:
                 df = tf = None
-            stop_cond, operations = simulator.trace(start, stop, max_operations, max_time, interrupts, df, tf)
+            if profile:
+                stop_cond, operations = simulator.trace(start, stop, max_operations, max_time, interrupts, df, tf, profile.counts, profile.times)
+            else:
+                stop_cond, operations = simulator.trace(start, stop, max_operations, max_time, interrupts, df, tf)
         else:
             opcodes = simulator.opcodes
             frame_duration = simulator.frame_duration
             int_active = simulator.int_active
             pc = registers[PC] = start
+            simulator.stop = stop
+            simulator.max_time = max_time
             operations = 0
             tstates = registers[25]
+            if profile:
+                counts, times = profile.counts, profile.times
+            watchpoints = simulator.watchpoints
             while True:
                 t0 = tstates
                 if trace_line:
                     i = disassemble(memory, pc, prefix, byte_fmt, word_fmt)[0]
+                    if watchpoints:
+                        watchpoints.clear()
                     opcodes[memory[pc]]()
                     print(trace_line.format(pc=pc, i=i, r=r, t=t0))
+                elif trace_writer:
+                    code = get_code(memory, pc)
+                    if watchpoints:
+                        watchpoints.clear()
+                    opcodes[memory[pc]]()
+                    twrite(pc, code, t0)
                 else:
                     opcodes[memory[pc]]()
                 tstates = registers[25]
+                if profile:
+                    counts[pc] += 1
+                    times[pc] += tstates - t0
 
                 if interrupts and registers[26] and tstates % frame_duration < int_active:
                     simulator.accept_interrupt(registers, memory, pc)
@@ -82,6 +122,11 @@ class Tracer(PagingTracer):
                 pc = registers[24]
                 operations += 1
 
+                if watchpoints:
+                    simulator.watch_hit = watchpoints.check(registers)
+                    if simulator.watch_hit >= 0:
+                        stop_cond = 4
+                        break
                 if operations >= max_operations > 0:
                     stop_cond = 1
                     break
@@ -98,7 +143,10 @@ class Tracer(PagingTracer):
             print(f'Stopped at {prefix}{registers[PC]:{word_fmt}}: {registers[T] - start_time} T-states')
         elif stop_cond == 3:
             print(f'Stopped at {prefix}{registers[PC]:{word_fmt}}')
+        elif stop_cond == 4:
+            print(f'Stopped at {prefix}{registers[PC]:{word_fmt}}: {watch[simulator.watch_hit]}')
         self.operations = operations
+        self.stop_cond = stop_cond
 
     def read_port(self, registers, port):
         if port == 0xFFFD:
@@ -110,7 +158,14 @@ class Tracer(PagingTracer):
         if port % 2 == 0:
             if self.spkr != value & 0x10:
                 self.spkr = value & 0x10
-                self.out_times.append(registers[T])
+                if self.out_times is not None:
+                    self.out_times.append(registers[T])
+                if self.audio_stream:
+                    self.audio_stream.append(registers[T])
+
+DECODE_CHUNK_SIZE = 65536
+
+STOP_CONDITIONS = {1: 'max-operations', 2: 'max-tstates', 3: 'stop', 4: 'watchpoint'}
 
 def rle(s, length):
     s2 = []
@@ -145,7 +200,39 @@ def simplify(delays, depth):
             length += 1
     return ', '.join(s0)
 
+def _get_trace_line(config, decimal, verbose):
+    if verbose:
+        s = (('', '2'), ('Decimal', 'Decimal2'))[decimal][min(verbose - 1, 1)]
+        return config['TraceLine' + s].replace(r'\n', '\n')
+
+def _get_trace_operand(config, decimal):
+    trace_operand = config['TraceOperand' + ('', 'Decimal')[decimal]]
+    return (trace_operand + ',' * (2 - trace_operand.count(','))).split(',')[:3]
+
+def decode_trace(tracefile, options, config):
+    reader = TraceReader(tracefile)
+    trace_line = _get_trace_line(config, options.decimal, 1 + reader.registers)
+    operand = _get_trace_operand(config, options.decimal)
+    chunks = [(tracefile, i, i + DECODE_CHUNK_SIZE, trace_line, *operand) for i in range(0, reader.count, DECODE_CHUNK_SIZE)]
+    if len(chunks) > 1 and options.jobs != 1:
+        with ProcessPoolExecutor(options.jobs or None) as executor:
+            results = executor.map(_decode_chunk, chunks)
+            for lines in results:
+                _print_lines(lines)
+    else:
+        for chunk in chunks:
+            _print_lines(_decode_chunk(chunk))
+
+def _decode_chunk(chunk):
+    return decode(*chunk)
+
+def _print_lines(lines):
+    for line in lines:
+        print(line)
+
 def run(snafile, options, config):
+    if options.ay and options.ay[-4:].lower() not in ('.psg', '.wav'):
+        raise SkoolKitError(f'Unknown AY file type: {options.ay}')
     snapshot = None
     org = 0
     if snafile == '48':
@@ -180,8 +267,11 @@ def run(snafile, options, config):
                 registers[reg] = get_int_param(val, True)
             except ValueError:
                 raise SkoolKitError("Cannot parse register value: {}".format(spec))
-    fast = options.verbose == 0 and options.max_operations == 0 and options.max_tstates == 0
-    sim_config = {'fast_djnz': fast, 'fast_ldir': fast}
+    fast_idle = options.verbose == 0 and options.max_operations == 0 and not (options.binary_trace or options.profile or options.watch)
+    fast = fast_idle and options.max_tstates == 0
+    sim_config = {'fast_djnz': fast, 'fast_idle': fast_idle, 'fast_ldir': fast}
+    if options.watch:
+        sim_config['watchpoints'] = [parse_watchpoint(spec) for spec in options.watch]
     if snapshot:
         border = snapshot.border
         out7ffd = snapshot.out7ffd
@@ -216,18 +306,42 @@ def run(snafile, options, config):
     for spec in options.pokes:
         poke(simulator.memory, spec)
     tracer = Tracer(simulator, border, out7ffd, outfffd, ay, outfe)
+    if not options.audio:
+        # Speaker edges are needed only to show audio delays
+        tracer.out_times = None
     simulator.set_tracer(tracer)
-    if options.verbose:
-        s = (('', '2'), ('Decimal', 'Decimal2'))[options.decimal][min(options.verbose - 1, 1)]
-        trace_line = config['TraceLine' + s].replace(r'\n', '\n')
-    else:
+    if options.ay:
+        tracer.ay_log = AYLog(ay, simulator.registers[T])
+    if options.wav:
+        wav_file = open(options.wav, 'wb')
+        tracer.audio_stream = AudioStream(AudioWriter(), wav_file, len(simulator.memory) != 65536)
+    if options.binary_trace:
+        trace_writer = TraceWriter(options.binary_trace, REGISTERS if options.verbose > 1 else 0)
         trace_line = None
-    trace_operand = config['TraceOperand' + ('', 'Decimal')[options.decimal]]
-    prefix, byte_fmt, word_fmt = (trace_operand + ',' * (2 - trace_operand.count(','))).split(',')[:3]
+    else:
+        trace_writer = None
+        trace_line = _get_trace_line(config, options.decimal, options.verbose)
+    prefix, byte_fmt, word_fmt = _get_trace_operand(config, options.decimal)
+    if options.profile:
+        profile = Profile()
+        entries = get_entries(options.entries) if options.entries else None
+    else:
+        profile = None
     begin = time.time()
-    tracer.run(start, options.stop, options.max_operations, options.max_tstates,
-               options.interrupts, trace_line, prefix, byte_fmt, word_fmt)
+    try:
+        tracer.run(start, options.stop, options.max_operations, options.max_tstates,
+                   options.interrupts, trace_line, prefix, byte_fmt, word_fmt, trace_writer, profile, options.watch)
+    finally:
+        if trace_writer:
+            trace_writer.close()
+        if tracer.audio_stream:
+            tracer.audio_stream.close()
+            wav_file.close()
     rt = time.time() - begin
+    if profile:
+        print(profile.report(entries, prefix, word_fmt))
+        profile.write(options.profile, entries)
+        print(f'Wrote {options.profile}')
     if len(simulator.memory) == 65536:
         cpu_freq = 3500000
     else:
@@ -248,10 +362,81 @@ def run(snafile, options, config):
         print(f'Sound duration: {z80t} T-states ({z80s:.3f}s)')
         lines = textwrap.wrap(simplify(delays, options.depth), 78)
         print('Delays:\n {}'.format('\n '.join(lines)))
+    if options.wav:
+        print(f'Wrote {options.wav}')
+    if options.ay:
+        tracer.ay_log.end = simulator.registers[T]
+        with open(options.ay, 'wb') as f:
+            if options.ay.lower().endswith('.psg'):
+                write_psg(f, tracer.ay_log, FRAME_DURATIONS[len(simulator.memory) != 65536])
+            else:
+                AudioWriter().write_ay_audio(f, tracer.ay_log, len(simulator.memory) != 65536)
+        print(f'Wrote {options.ay}')
     if options.dump:
         ram, registers, state, machine = get_state(simulator)
         write_snapshot(options.dump, ram, registers, state, machine)
         print(f'Wrote {options.dump}')
+    return tracer
+
+def _to_dict(specs):
+    return {k: int(v) for k, v in (s.split('=', 1) for s in specs)}
+
+def run_job(job):
+    num, snafile, options, config, error = job
+    result = {'job': num, 'file': snafile}
+    if error:
+        result['error'] = error
+        return json.dumps(result)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            tracer = run(snafile, options, config)
+    except Exception as e:
+        result['error'] = str(e)
+        return json.dumps(result)
+    simulator = tracer.simulator
+    registers, state = get_state(simulator)[1:3]
+    result.update({
+        'stop': STOP_CONDITIONS.get(tracer.stop_cond),
+        'pc': simulator.registers[PC],
+        'operations': tracer.operations,
+        'tstates': simulator.registers[T],
+        'registers': _to_dict(registers),
+        'state': _to_dict(state),
+        'output': output.getvalue()
+    })
+    return json.dumps(result)
+
+def _parse_job(parser, args):
+    # Return the options for a job, or None if they are invalid, along with
+    # any error message produced by the parser
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            job_options, unknown_args = parser.parse_known_args(args)
+    except SystemExit:
+        return None, stderr.getvalue().strip().rpartition(' error: ')[2]
+    if unknown_args or job_options.snafile is None or job_options.batch:
+        return None, None
+    return job_options, None
+
+def run_batch(manifest, parser, options, config):
+    jobs = []
+    with open_file(manifest) as f:
+        for num, line in enumerate(f, 1):
+            args = shlex.split(line, True)
+            if args:
+                job_options, error = _parse_job(parser, args)
+                if job_options:
+                    job_config = config.copy()
+                    update_options('trace', job_options, job_options.params, job_config)
+                    jobs.append((num, job_options.snafile, job_options, job_config, None))
+                else:
+                    error = f'Invalid job: {line.strip()}' + (f' ({error})' if error else '')
+                    jobs.append((num, None, None, None, error))
+    with ProcessPoolExecutor(options.jobs or None) as executor:
+        for result in executor.map(run_job, jobs):
+            print(result)
 
 def main(args):
     config = get_config('trace')
@@ -267,14 +452,27 @@ def main(args):
     group = parser.add_argument_group('Options')
     group.add_argument('--audio', action='store_true',
                        help="Show audio delays.")
+    group.add_argument('--ay', metavar='FILE',
+                       help="Write the AY register writes made during execution to a PSG file, "
+                            "or the sound they produce to a WAV file.")
+    group.add_argument('--batch', action='store_true',
+                       help="Run the jobs listed in FILE in parallel and print the results as JSON.")
+    group.add_argument('--binary-trace', metavar='FILE',
+                       help="Write executed instructions to a binary trace file instead of printing them.")
     group.add_argument('-c', '--cmio', action='store_true',
                        help="Simulate memory and I/O contention.")
     group.add_argument('-D', '--decimal', action='store_true',
                        help="Show decimal values in verbose mode.")
+    group.add_argument('--decode', action='store_true',
+                       help="Treat FILE as a binary trace file and print its contents.")
     group.add_argument('--depth', type=int, default=2,
                        help='Simplify audio delays to this depth (default: 2).')
+    group.add_argument('--entries', metavar='FILE',
+                       help="Use the entry addresses in this control file or skool file to show profile data by routine.")
     group.add_argument('-I', '--ini', dest='params', metavar='p=v', action='append', default=[],
                        help="Set the value of the configuration parameter 'p' to 'v'. This option may be used multiple times.")
+    group.add_argument('-j', '--jobs', metavar='N', type=int, default=0,
+                       help='Use at most this many worker processes in batch or decode mode (default: the number of CPUs).')
     group.add_argument('-m', '--max-operations', metavar='MAX', type=int, default=0,
                        help='Maximum number of instructions to execute.')
     group.add_argument('-M', '--max-tstates', metavar='MAX', type=int, default=0,
@@ -287,6 +485,8 @@ def main(args):
                        help="POKE N,v in RAM bank p for N in {a, a+c, a+2c..., b}. "
                             "Prefix 'v' with '^' to perform an XOR operation, or '+' to perform an ADD operation. "
                             "This option may be used multiple times.")
+    group.add_argument('--profile', metavar='FILE',
+                       help="Profile execution, show a hot spot report, and write the profile data to this file as JSON.")
     group.add_argument('--python', action='store_true',
                        help="Use the pure Python Z80 simulator.")
     group.add_argument('-r', '--reg', metavar='name=value', action='append', default=[],
@@ -306,13 +506,26 @@ def main(args):
                        help="Show executed instructions. Repeat this option to show register values too.")
     group.add_argument('-V', '--version', action='version', version='SkoolKit {}'.format(VERSION),
                        help='Show SkoolKit version number and exit.')
+    group.add_argument('--wav', metavar='FILE',
+                       help="Write the audio produced during execution to a WAV file.")
+    group.add_argument('-w', '--watch', metavar='SPEC', action='append', default=[],
+                       help="Stop execution when this watchpoint fires. Do '--watch help' for more information. "
+                            "This option may be used multiple times.")
     namespace, unknown_args = parser.parse_known_args(args)
     if namespace.show_config:
         show_config('trace', config)
     if 'help' in namespace.reg:
         print_reg_help()
         return
+    if 'help' in namespace.watch:
+        print_watch_help()
+        return
     if unknown_args or namespace.snafile is None:
         parser.exit(2, parser.format_help())
     update_options('trace', namespace, namespace.params, config)
-    run(namespace.snafile, namespace, config)
+    if namespace.decode:
+        decode_trace(namespace.snafile, namespace, config)
+    elif namespace.batch:
+        run_batch(namespace.snafile, parser, namespace, config)
+    else:
+        run(namespace.snafile, namespace, config)
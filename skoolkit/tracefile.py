@@ -0,0 +1,122 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import struct
+
+from skoolkit import SkoolKitError
+from skoolkit.traceutils import Registers, disassemble
+
+MAGIC = b'SKTR'
+
+FORMAT_VERSION = 1
+
+# Header flags
+REGISTERS = 1
+RZX = 2
+
+BUFFER_SIZE = 1 << 20
+
+# Magic, format version, flags, frame number width (RZX traces only)
+HEADER = struct.Struct('<4sBBH')
+
+# PC, instruction bytes, T-states
+RECORD = struct.Struct('<H4sQ')
+
+# PC, instruction bytes, frame number, fetch counter, input readings left
+RZX_RECORD = struct.Struct('<H4sIHH')
+
+# A, F, B, C, D, E, H, L, IXh, IXl, IYh, IYl, SP, I, R, A', F', B', C', D', E',
+# H', L'
+REGS = struct.Struct('<12BH10B')
+
+RZX_TRACE_LINE = 'F:{frame:0{fnwidth}} C:{fetch_counter:05} I:{readings_left:05} ${pc:04X} {i}'
+
+def get_code(memory, pc):
+    if pc < 65533:
+        return bytes(memory[pc:pc + 4])
+    return bytes(memory[a % 65536] for a in range(pc, pc + 4))
+
+class TraceWriter:
+    def __init__(self, fname, flags=0, fnwidth=0):
+        self.registers = flags & REGISTERS > 0
+        self.f = open(fname, 'wb', buffering=BUFFER_SIZE)
+        self.f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, fnwidth))
+
+    def write(self, pc, code, tstates):
+        self.f.write(RECORD.pack(pc, code, tstates))
+
+    def write_registers(self, pc, code, tstates, registers):
+        self.f.write(RECORD.pack(pc, code, tstates) + REGS.pack(*registers[:13], *registers[14:24]))
+
+    def write_rzx(self, pc, code, frame, fetch_counter, readings_left):
+        self.f.write(RZX_RECORD.pack(pc, code, frame, fetch_counter, readings_left))
+
+    def close(self):
+        self.f.close()
+
+class TraceReader:
+    def __init__(self, fname):
+        self.fname = fname
+        with open(fname, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise SkoolKitError(f'{fname}: not a binary trace file')
+        version, self.flags, self.fnwidth = HEADER.unpack(header)[1:]
+        if version != FORMAT_VERSION:
+            raise SkoolKitError(f'{fname}: unsupported binary trace format version ({version})')
+        self.registers = self.flags & REGISTERS > 0
+        self.rzx = self.flags & RZX > 0
+        if self.rzx:
+            self.record_size = RZX_RECORD.size
+        else:
+            self.record_size = RECORD.size + REGS.size * self.registers
+        self.count = (os.path.getsize(fname) - HEADER.size) // self.record_size
+
+    def read(self, start=0, stop=None):
+        if stop is None or stop > self.count:
+            stop = self.count
+        with open(self.fname, 'rb') as f:
+            f.seek(HEADER.size + start * self.record_size)
+            data = f.read((stop - start) * self.record_size)
+        size = self.record_size
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+def decode(fname, start, stop, trace_line, prefix='$', byte_fmt='02X', word_fmt='04X'):
+    reader = TraceReader(fname)
+    lines = []
+    if reader.rzx:
+        fnwidth = reader.fnwidth
+        for record in reader.read(start, stop):
+            pc, code, frame, fetch_counter, readings_left = RZX_RECORD.unpack(record)
+            i = disassemble({(pc + n) % 65536: b for n, b in enumerate(code)}, pc)[0]
+            lines.append(RZX_TRACE_LINE.format(frame=frame, fnwidth=fnwidth, fetch_counter=fetch_counter,
+                                               readings_left=readings_left, pc=pc, i=i))
+        return lines
+    registers = [0] * 29
+    r = Registers(registers)
+    rsize = RECORD.size
+    for record in reader.read(start, stop):
+        pc, code, tstates = RECORD.unpack_from(record)
+        if reader.registers:
+            values = REGS.unpack_from(record, rsize)
+            registers[:13] = values[:13]
+            registers[14:24] = values[13:]
+            registers[24] = pc
+        i = disassemble({(pc + n) % 65536: b for n, b in enumerate(code)}, pc, prefix, byte_fmt, word_fmt)[0]
+        lines.append(trace_line.format(pc=pc, i=i, r=r, t=tstates))
+    return lines
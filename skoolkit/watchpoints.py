@@ -0,0 +1,209 @@
+# Copyright 2024 Richard Dymond (rjdymond@gmail.com)
+#
+# This file is part of SkoolKit.
+#
+# SkoolKit is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# SkoolKit is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# SkoolKit. If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import textwrap
+
+from skoolkit import SkoolKitError, get_int_param
+from skoolkit.pagingtracer import DirtyMemory, Memory
+from skoolkit.simutils import REGISTERS, B, D, H, IXh, IYh, xB, xD, xH
+
+# Watchpoint types
+PC = 0
+READ = 1
+WRITE = 2
+IN = 3
+OUT = 4
+REG = 5
+
+KINDS = {'pc': PC, 'read': READ, 'write': WRITE, 'in': IN, 'out': OUT}
+
+# Register predicate operators
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=')
+
+COMPARE = (
+    lambda v, w: v == w,
+    lambda v, w: v != w,
+    lambda v, w: v < w,
+    lambda v, w: v <= w,
+    lambda v, w: v > w,
+    lambda v, w: v >= w
+)
+
+# Register names mapped to register indexes and sizes
+WATCH_REGISTERS = {k.upper(): (v, 1) for k, v in REGISTERS.items()}
+WATCH_REGISTERS.update({
+    'BC': (B, 2),
+    'DE': (D, 2),
+    'HL': (H, 2),
+    'IX': (IXh, 2),
+    'IY': (IYh, 2),
+    '^BC': (xB, 2),
+    '^DE': (xD, 2),
+    '^HL': (xH, 2)
+})
+
+def _parse_int(param, spec):
+    try:
+        return get_int_param(param, True)
+    except ValueError:
+        raise SkoolKitError(f'Invalid watchpoint: {spec}')
+
+def parse_watchpoint(spec):
+    """Parse a watchpoint specification.
+
+    :param spec: The specification: `kind:a[-b][,N]` (where `kind` is one of
+                 'pc', 'read', 'write', 'in' or 'out'), or `reg OP v[,N]`
+                 (where `OP` is one of '=', '!=', '<', '<=', '>' or '>=').
+    :return: A tuple of the form `(kind, a, b, op, value, count)`.
+    """
+    cond, sep, count = spec.partition(',')
+    count = _parse_int(count, spec) if sep else 1
+    if count < 1:
+        raise SkoolKitError(f'Invalid watchpoint: {spec}')
+    kind, sep, addresses = cond.partition(':')
+    if sep:
+        if kind.lower() not in KINDS:
+            raise SkoolKitError(f'Invalid watchpoint: {spec}')
+        a, sep, b = addresses.partition('-')
+        a = _parse_int(a, spec)
+        b = _parse_int(b, spec) if sep else a
+        if not 0 <= a <= b < 65536:
+            raise SkoolKitError(f'Invalid watchpoint: {spec}')
+        return (KINDS[kind.lower()], a, b, 0, 0, count)
+    match = re.fullmatch(r'(\^?[A-Za-z]+)(!=|<=|>=|=|<|>)(.+)', cond)
+    if match:
+        reg, op, value = match.groups()
+        if reg.upper() in WATCH_REGISTERS:
+            index, size = WATCH_REGISTERS[reg.upper()]
+            return (REG, index, size, OPERATORS.index(op), _parse_int(value, spec), count)
+    raise SkoolKitError(f'Invalid watchpoint: {spec}')
+
+def print_watch_help():
+    reg_names = ', '.join(sorted(WATCH_REGISTERS))
+    print("""
+Usage: --watch SPEC
+
+Stop execution when a watchpoint fires. SPEC is one of:
+
+  pc:a[-b][,N]     PC reaches an address in the range a-b
+  read:a[-b][,N]   an address in the range a-b is read
+  write:a[-b][,N]  an address in the range a-b is written
+  in:a[-b][,N]     a port in the range a-b is read
+  out:a[-b][,N]    a port in the range a-b is written
+  reg OP v[,N]     the value of register 'reg' satisfies 'OP v', where OP is
+                   one of =, !=, <, <=, > or >=
+
+If ',N' is given, the watchpoint fires only after its condition has been met
+by N instructions. For example:
+
+  --watch write:16384-23295
+  --watch pc:32768,3
+  --watch hl>=49152
+
+Recognised register names are:
+
+  {}
+""".format('\n  '.join(textwrap.wrap(reg_names, 70))).strip())
+
+class Watchpoints:
+    def __init__(self, watchpoints):
+        self.watchpoints = [tuple(w) for w in watchpoints]
+        self.hits = [0] * len(self.watchpoints)
+        self.triggered = set()
+        self.kinds = {w[0] for w in self.watchpoints}
+        self.hit = -1
+
+    def access(self, kind, index):
+        if kind in self.kinds:
+            if isinstance(index, slice):
+                addresses = range(*index.indices(65536))
+            else:
+                addresses = (index,)
+            for i, (k, a, b, op, value, count) in enumerate(self.watchpoints):
+                if k == kind and any(a <= addr <= b for addr in addresses):
+                    self.triggered.add(i)
+
+    def clear(self):
+        # Discard any memory or port accesses made outside an instruction
+        self.triggered.clear()
+
+    def check(self, registers):
+        # Return the index of the first watchpoint that fires after the
+        # current instruction (or -1 if none fires)
+        triggered = self.triggered
+        pc = registers[24]
+        for i, (kind, a, b, op, value, count) in enumerate(self.watchpoints):
+            if kind == PC:
+                if a <= pc <= b:
+                    triggered.add(i)
+            elif kind == REG:
+                if b == 1:
+                    v = registers[a]
+                else:
+                    v = registers[a] * 256 + registers[a + 1]
+                if COMPARE[op](v, value):
+                    triggered.add(i)
+        hit = -1
+        if triggered:
+            hits = self.hits
+            for i in sorted(triggered):
+                hits[i] += 1
+                if hit < 0 and hits[i] >= self.watchpoints[i][5]:
+                    hit = i
+            triggered.clear()
+        self.hit = hit
+        return hit
+
+class WatchedMemory:
+    def __init__(self, memory, watchpoints):
+        self.memory = memory
+        self.watchpoints = watchpoints
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __getitem__(self, index):
+        self.watchpoints.access(READ, index)
+        return self.memory[index]
+
+    def __setitem__(self, index, value):
+        self.watchpoints.access(WRITE, index)
+        self.memory[index] = value
+
+class WatchedPagedMemory(Memory):
+    def __getitem__(self, index):
+        self.watchpoints.access(READ, index)
+        return super().__getitem__(index)
+
+    def __setitem__(self, index, value):
+        self.watchpoints.access(WRITE, index)
+        super().__setitem__(index, value)
+
+class WatchedDirtyMemory(WatchedPagedMemory, DirtyMemory):
+    pass
+
+def watch_memory(memory, watchpoints):
+    if isinstance(memory, Memory):
+        # Convert the 128K memory object in place, so that it is still a
+        # Memory object to everything that has a reference to it
+        if isinstance(memory, DirtyMemory):
+            memory.__class__ = WatchedDirtyMemory
+        else:
+            memory.__class__ = WatchedPagedMemory
+        memory.watchpoints = watchpoints
+        return memory
+    return WatchedMemory(memory, watchpoints)
@@ -179,6 +179,51 @@ class SimLoadTest(SkoolKitTestCase):
         ]
         self._test_sim_load(f'-c accelerator=rom {tapfile} out.z80', exp_data, exp_reg, exp_output)
 
+    @patch.object(tap2sna, '_write_snapshot', mock_write_snapshot)
+    def test_custom_loader_with_learned_accelerator(self):
+        code2 = list(range(256))
+        code2_start = 49152
+        code2_end = code2_start + len(code2)
+        code = [
+            221, 33, 0, 192,  # LD IX,49152
+            17, 0, 1,         # LD DE,256
+            55,               # SCF
+            159,              # SBC A,A
+        ]
+        loader_start = 32768
+        code_start = loader_start - len(code)
+        loader = get_loader(loader_start)
+        loader[0x05F0 - 0x0556] = 0x7E # LD A,$7E (in LD-SAMPLE)
+        code += loader
+        basic_data = self._get_basic_data(code_start)
+        blocks = [
+            create_tap_header_block("simloadbas", 10, len(basic_data), 0),
+            create_tap_data_block(basic_data),
+            create_tap_header_block("simloadbyt", code_start, len(code)),
+            create_tap_data_block(code),
+            create_tap_data_block(code2)
+        ]
+        tapfile = self._write_tap(blocks)
+
+        exp_data = (
+            (basic_data, 23755),
+            (code, code_start),
+            (code2, code2_start)
+        )
+        exp_reg = set(('SP=65340', f'IX={code2_end}', 'IY=23610', 'PC=32925'))
+        exp_output = [
+            'Program: simloadbas',
+            'Fast loading data block: 23755,20',
+            'Bytes: simloadbyt',
+            'Fast loading data block: 32759,184',
+            'Data (258 bytes)',
+            'Tape finished',
+            'Simulation stopped (end of tape): PC=32925',
+            'Accelerators: learned-3b65d6b0: 5964; misses: 37/99; dec-a: 5964/0/443',
+            'Learned accelerators: learned-3b65d6b0'
+        ]
+        self._test_sim_load(f'-c accelerator=list -c learn=1 {tapfile} out.z80', exp_data, exp_reg, exp_output)
+
     @patch.object(tap2sna, '_write_snapshot', mock_write_snapshot)
     def test_turbo_loader(self):
         code2 = [1, 2, 4, 8, 16, 32, 64, 128, 0, 255]
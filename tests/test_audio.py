@@ -1,7 +1,9 @@
 from io import BytesIO
+from unittest.mock import patch
 
 from skoolkittest import SkoolKitTestCase
-from skoolkit.audio import AudioWriter
+from skoolkit import audio
+from skoolkit.audio import AudioStream, AudioWriter
 
 def _int32(num):
     return bytes((num & 255, (num >> 8) & 255, (num >> 16) & 255, num >> 24))
@@ -60,6 +62,12 @@ class AudioWriterTest(SkoolKitTestCase):
         samples = self._check_header(audio_bytes)
         self.assertEqual(samples, b'\xff\x7f\xff\x7f\x00\x80\xff\x7f\x00\x80')
 
+    def test_samples_long_delays(self):
+        audio_writer = AudioWriter()
+        audio_bytes = self._get_audio_data(audio_writer, [100000, 50000, 1000])
+        samples = self._check_header(audio_bytes)
+        self.assertEqual(samples, b'\xff\x7f' * 1261 + b'\x00\x80' * 630 + b'\xff\x7f' * 12)
+
     def test_ma_filter_48k(self):
         audio_writer = AudioWriter()
         audio_bytes = self._get_audio_data(audio_writer, [50, 150, 50, 150], True)
@@ -72,6 +80,12 @@ class AudioWriterTest(SkoolKitTestCase):
         samples = self._check_header(audio_bytes)
         self.assertEqual(samples, b'\xf9\xe1\xff\x7f\x41\xfb\x65\x66')
 
+    def test_ma_filter_long_delays(self):
+        audio_writer = AudioWriter()
+        audio_bytes = self._get_audio_data(audio_writer, [100000, 50000, 1000], True)
+        samples = self._check_header(audio_bytes)
+        self.assertEqual(samples, b'\x00\x80' * 1260 + b'\xff\x7f' * 630 + b'\x00\x80' * 12)
+
     def test_contention_48k(self):
         audio_writer = TestAudioWriter()
         delays_in = _flatten([13000, [1000] * 31, 500])
@@ -183,3 +197,19 @@ class AudioWriterTest(SkoolKitTestCase):
         audio_writer.write_audio(None, delays_in, False, True, offset)
         exp_delays_out = [10000, 10942, 10000]
         self.assertEqual(exp_delays_out, audio_writer.delays)
+
+    @patch.object(audio, 'EDGE_BUFFER_SIZE', 3)
+    def test_stream(self):
+        audio_writer = AudioWriter()
+        delays = [100, 50, 300, 0, 1000, 79, 80, 5000, 20]
+        for is128k in (False, True):
+            exp_audio_bytes = self._get_audio_data(audio_writer, list(delays), is128k=is128k)
+            audio_stream = BytesIO()
+            stream = AudioStream(audio_writer, audio_stream, is128k)
+            t = 1000
+            stream.append(t)
+            for d in delays:
+                t += d
+                stream.append(t)
+            stream.close()
+            self.assertEqual(exp_audio_bytes, audio_stream.getvalue())
@@ -0,0 +1,102 @@
+from io import BytesIO
+from itertools import groupby
+
+from skoolkittest import SkoolKitTestCase
+from skoolkit.ay import VOLUMES, AYLog, ay_samples, write_psg
+
+def _runs(samples):
+    return [(k, len(list(g))) for k, g in groupby(samples)]
+
+class AYTest(SkoolKitTestCase):
+    def _ay_log(self, start=0, end=0, **registers):
+        regs = [0] * 16
+        regs[7] = 0b00111111
+        for r, v in registers.items():
+            regs[int(r[1:])] = v
+        ay_log = AYLog(regs, start)
+        ay_log.end = end
+        return ay_log
+
+    def test_ay_log(self):
+        ay_log = AYLog(range(16), 100)
+        ay_log.write(150, 7, 0x38)
+        ay_log.write(200, 13, 14)
+        self.assertEqual(ay_log.registers, list(range(16)))
+        self.assertEqual(ay_log.start, 100)
+        self.assertEqual(ay_log.end, 100)
+        self.assertEqual(list(ay_log.times), [150, 200])
+        self.assertEqual(list(ay_log.writes), [0x0738, 0x0D0E])
+
+    def test_tone(self):
+        ay_log = self._ay_log(end=69888 * 2, R0=100, R7=0b00111110, R8=15)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        self.assertEqual(len(samples), 1761)
+        exp_runs = [(0, 21), (10922, 20), (0, 20), (10922, 20), (0, 20), (10922, 20), (0, 21), (10922, 20)]
+        self.assertEqual(exp_runs, _runs(samples)[:8])
+
+    def test_tone_above_nyquist_frequency(self):
+        ay_log = self._ay_log(end=35000, R0=1, R7=0b00111110, R8=15)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        self.assertEqual([(10922, 441)], _runs(samples))
+
+    def test_channels_without_tone_or_noise(self):
+        ay_log = self._ay_log(end=35000, R8=15, R9=10, R10=5)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        self.assertEqual([(VOLUMES[15] + VOLUMES[10] + VOLUMES[5], 441)], _runs(samples))
+
+    def test_noise(self):
+        ay_log = self._ay_log(end=350000, R6=31, R7=0b00110111, R8=15)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        self.assertEqual(len(samples), 4410)
+        self.assertEqual({0, 10922}, set(samples))
+
+    def test_envelope(self):
+        ay_log = self._ay_log(end=3500, R8=16, R11=1, R13=13)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        exp_samples = [VOLUMES[v] for v in (0, 2, 4, 7, 9, 12, 14)] + [VOLUMES[15]] * 37
+        self.assertEqual(exp_samples, list(samples))
+
+    def test_repeating_envelope(self):
+        ay_log = self._ay_log(end=3500, R8=16, R11=1, R13=12)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        exp_samples = [VOLUMES[v] for v in (0, 2, 4, 7, 9, 12, 14, 1, 3, 6, 8, 11, 13, 0, 2)]
+        self.assertEqual(exp_samples, list(samples[:15]))
+
+    def test_register_writes(self):
+        ay_log = self._ay_log(end=7000)
+        ay_log.write(3500, 8, 15)
+        ay_log.write(5250, 9, 15)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        exp_runs = [(0, 44), (VOLUMES[15], 22), (2 * VOLUMES[15], 22)]
+        self.assertEqual(exp_runs, _runs(samples))
+
+    def test_envelope_restarts_when_shape_is_written(self):
+        ay_log = self._ay_log(end=3500, R8=16, R11=1, R13=13)
+        ay_log.write(1750, 13, 13)
+        samples = ay_samples(ay_log, 3500000, 44100)
+        exp_samples = [VOLUMES[v] for v in (0, 2, 4, 7, 9, 12, 14)] + [VOLUMES[15]] * 15
+        self.assertEqual(exp_samples * 2, list(samples))
+
+    def test_write_psg(self):
+        ay_log = self._ay_log(69888, 69888 * 12, R0=100, R8=15)
+        ay_log.write(69888 + 100, 0, 200)
+        ay_log.write(69888 + 200, 1, 1)
+        ay_log.write(69888 * 2, 7, 0x3E)
+        ay_log.write(69888 * 8, 8, 0)
+        psgfile = BytesIO()
+        write_psg(psgfile, ay_log, 69888)
+        exp_data = (
+            b'PSG\x1a' + bytes(12)
+            + bytes((0, 100, 1, 0, 2, 0, 3, 0, 4, 0, 5, 0, 6, 0, 7, 0x3F, 8, 15, 9, 0, 10, 0, 11, 0, 12, 0, 13, 0))
+            + bytes((0, 200, 1, 1))
+            + b'\xff' + bytes((7, 0x3E))
+            + b'\xfe\x01\xff\xff' + bytes((8, 0))
+            + b'\xfe\x01'
+        )
+        self.assertEqual(exp_data, psgfile.getvalue())
+
+    def test_write_psg_with_long_pause(self):
+        ay_log = self._ay_log(end=1030 * 100)
+        psgfile = BytesIO()
+        write_psg(psgfile, ay_log, 100)
+        self.assertEqual(b'\xfe\xff\xfe\x02\xff\xff', psgfile.getvalue()[44:])
@@ -1,10 +1,13 @@
+import json
 import os
+import shutil
 from textwrap import dedent
 from unittest.mock import patch
 import zlib
 
 from skoolkittest import SkoolKitTestCase, RZX
 from skoolkit import VERSION, SkoolKitError, rzxplay
+from skoolkit.tracefile import decode
 
 class MockSimulator:
     def __init__(self, *args, **kwargs):
@@ -87,14 +90,21 @@ class RzxplayTest(SkoolKitTestCase):
         rzxplay.main(['test.rzx'])
         rzxfile, options = run_args
         self.assertEqual(rzxfile, 'test.rzx')
+        self.assertIsNone(options.binary_trace)
+        self.assertIsNone(options.dump_frames)
+        self.assertEqual(options.dump_interval, 1)
         self.assertFalse(options.force)
+        self.assertEqual(options.jobs, 0)
+        self.assertEqual(options.keyframes, 0)
         self.assertEqual(options.fps, 50)
         self.assertTrue(options.screen)
         self.assertFalse(options.python)
         self.assertFalse(options.quiet)
         self.assertEqual(options.scale, 2)
+        self.assertIsNone(options.seek)
         self.assertIsNone(options.stop)
         self.assertIsNone(options.trace)
+        self.assertFalse(options.verify)
 
     def test_sna(self):
         ram = [0] * 0xC000
@@ -1296,6 +1306,14 @@ class RzxplayTest(SkoolKitTestCase):
             self.run_rzxplay(f'--no-screen {rzxfile}')
         self.assertEqual(cm.exception.args[0], 'Failed to decompress input recording block: Error -3 while decompressing data: unknown compression method')
 
+    def test_truncated_input_recording_block(self):
+        rzx = RZX()
+        rzx.add_snapshot(frames=[(1, 2, [0])], io_flags=0)
+        rzxfile = self.write_rzx_file(rzx)
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_rzxplay(f'--no-screen {rzxfile}')
+        self.assertEqual(cm.exception.args[0], 'Input recording block is truncated (frame 0 of 1 is incomplete)')
+
     def test_invalid_rzx_file(self):
         data = [0, 1, 2, 4]
         rzxfile = self.write_bin_file(data, suffix='.rzx')
@@ -1344,6 +1362,208 @@ class RzxplayTest(SkoolKitTestCase):
             self.run_rzxplay(f'--quiet --no-screen {rzxfile}')
         self.assertEqual(cm.exception.args[0], 'Unsupported snapshot type')
 
+    def _write_keyframes_test_rzx(self):
+        pc = 0xC000
+        code = [0x3C] * 8 # INC A
+        ram = [0] * 0xC000
+        ram[pc - 0x4000:pc - 0x4000 + len(code)] = code
+        registers = {'PC': pc}
+        z80data = self.write_z80_file(None, ram, registers=registers, ret_data=True)
+        rzx = RZX()
+        rzx.add_snapshot(z80data, 'z80', [(1, 0, [])] * 8)
+        return self.write_rzx_file(rzx)
+
+    def test_option_keyframes(self):
+        rzxfile = self._write_keyframes_test_rzx()
+        output, error = self.run_rzxplay(f'--quiet --no-screen --keyframes 3 {rzxfile}')
+        self.assertEqual(error, '')
+        kf_dir = f'{rzxfile}.keyframes'
+        self.assertEqual(['00000003.szx', '00000006.szx', 'index.json'], sorted(os.listdir(kf_dir)))
+        with open(f'{kf_dir}/00000006.szx', 'rb') as f:
+            szx = f.read()
+        self.assertEqual(szx[:4], b'ZXST')
+
+    def test_option_seek(self):
+        rzxfile = self._write_keyframes_test_rzx()
+        exp_trace = """
+            F:7 C:00001 I:00000 $C007 INC A
+        """
+        self._test_rzx(rzxfile, 'Wrote out1.szx\n', '--seek 7 --quiet --no-screen', exp_trace, 'out1.szx')
+        with open('out1.szx', 'rb') as f:
+            exp_szx = f.read()
+
+        output, error = self.run_rzxplay(f'--quiet --no-screen --keyframes 3 {rzxfile}')
+        self.assertEqual(error, '')
+        with patch.object(rzxplay.Keyframes, 'load', autospec=True, side_effect=rzxplay.Keyframes.load) as mock_load:
+            self._test_rzx(rzxfile, 'Wrote out2.szx\n', '--seek 7 --quiet --no-screen', exp_trace, 'out2.szx')
+        self.assertEqual(mock_load.call_args[0][1], 6)
+        with open('out2.szx', 'rb') as f:
+            self.assertEqual(exp_szx, f.read())
+
+    def test_option_seek_ignores_keyframes_saved_with_different_flags(self):
+        rzxfile = self._write_keyframes_test_rzx()
+        output, error = self.run_rzxplay(f'--quiet --no-screen --keyframes 3 {rzxfile}')
+        self.assertEqual(error, '')
+        with patch.object(rzxplay.Keyframes, 'load', autospec=True) as mock_load:
+            output, error = self.run_rzxplay(f'--quiet --no-screen --flags 1 --seek 7 {rzxfile}')
+        self.assertEqual(error, '')
+        mock_load.assert_not_called()
+
+    def test_option_seek_ignores_missing_keyframe(self):
+        rzxfile = self._write_keyframes_test_rzx()
+        output, error = self.run_rzxplay(f'--quiet --no-screen --keyframes 3 {rzxfile}')
+        self.assertEqual(error, '')
+        os.remove(f'{rzxfile}.keyframes/00000006.szx')
+        with patch.object(rzxplay.Keyframes, 'load', autospec=True, side_effect=rzxplay.Keyframes.load) as mock_load:
+            output, error = self.run_rzxplay(f'--quiet --no-screen --seek 7 {rzxfile}')
+        self.assertEqual(error, '')
+        self.assertEqual(mock_load.call_args[0][1], 3)
+
+    def test_option_seek_ignores_keyframe_beyond_last_frame(self):
+        rzxfile = self._write_keyframes_test_rzx()
+        output, error = self.run_rzxplay(f'--quiet --no-screen --keyframes 3 {rzxfile}')
+        self.assertEqual(error, '')
+        kf_dir = f'{rzxfile}.keyframes'
+        shutil.copy(f'{kf_dir}/00000006.szx', f'{kf_dir}/00000012.szx')
+        with open(f'{kf_dir}/index.json') as f:
+            index = json.load(f)
+        index['frames'].append(12)
+        with open(f'{kf_dir}/index.json', 'w') as f:
+            json.dump(index, f)
+        with patch.object(rzxplay.Keyframes, 'load', autospec=True) as mock_load:
+            output, error = self.run_rzxplay(f'--quiet --no-screen --seek 12 {rzxfile}')
+        self.assertEqual(error, '')
+        mock_load.assert_not_called()
+
+    def _write_verify_test_rzx(self, *segments):
+        pc = 0xC000
+        rzx = RZX()
+        for code, frames in segments:
+            ram = [0] * 0xC000
+            ram[pc - 0x4000:pc - 0x4000 + len(code)] = code
+            registers = {'PC': pc}
+            z80data = self.write_z80_file(None, ram, registers=registers, ret_data=True)
+            rzx.add_snapshot(z80data, 'z80', frames)
+        return self.write_rzx_file(rzx)
+
+    def test_option_verify(self):
+        rzxfile = self._write_verify_test_rzx(
+            ([0x3C] * 3, [(1, 0, [])] * 3),             # INC A
+            ([0xDB, 0xFE] * 2, [(1, 1, [191])] * 2),    # IN A,($FE)
+            ([0x3D] * 4, [(1, 0, [])] * 4)              # DEC A
+        )
+        exp_output = """
+            Segment 1 (frames 0-2): OK
+            Segment 2 (frames 3-4): OK
+            Segment 3 (frames 5-8): OK
+        """
+        self._test_rzx(rzxfile, exp_output, '--verify')
+
+    def test_option_verify_with_failures(self):
+        rzxfile = self._write_verify_test_rzx(
+            ([0x3C] * 3, [(1, 0, [])] * 3),                         # INC A
+            ([0xDB, 0xFE] * 2, [(1, 1, [191]), (1, 0, [])]),        # IN A,($FE)
+            ([0x3D] * 4, [(1, 0, [])] * 4),                         # DEC A
+            ([0xDB, 0xFE] * 2, [(1, 1, [191]), (2, 2, [191, 191])]) # IN A,($FE)
+        )
+        for option in ('--verify', '--verify -j 1'):
+            with self.assertRaises(SkoolKitError) as cm:
+                self.run_rzxplay(f'{option} {rzxfile}')
+            self.assertEqual(cm.exception.args[0], '2 of 4 segment(s) failed verification')
+            exp_output = """
+                Segment 1 (frames 0-2): OK
+                Segment 2 (frames 3-4): FAILED at frame 4: Port readings exhausted for frame 4
+                Segment 3 (frames 5-8): OK
+                Segment 4 (frames 9-10): FAILED at frame 10: 1 port reading(s) left for frame 10
+            """
+            self.assertEqual(dedent(exp_output).lstrip(), self.out.getvalue())
+            self.assertEqual(self.err.getvalue(), '')
+            self.clear_streams()
+
+    def test_option_verify_with_corrupted_fetch_count(self):
+        rzxfile = self._write_verify_test_rzx(
+            ([0x3C] * 3, [(1, 0, [])] * 3),                     # INC A
+            ([0xDD, 0x7E, 0x00] * 2, [(2, 0, []), (1, 0, [])]), # LD A,(IX+0)
+            ([0x3C] * 3, [(1, 0, []), (3, 0, []), (1, 0, [])])  # INC A
+        )
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_rzxplay(f'--verify -j 1 {rzxfile}')
+        self.assertEqual(cm.exception.args[0], '1 of 3 segment(s) failed verification')
+        exp_output = """
+            Segment 1 (frames 0-2): OK
+            Segment 2 (frames 3-4): FAILED at frame 4: Fetch counter is -1 at end of frame 4
+            Segment 3 (frames 5-7): OK
+        """
+        self.assertEqual(dedent(exp_output).lstrip(), self.out.getvalue())
+        self.assertEqual(self.err.getvalue(), '')
+
+    def _write_dump_frames_test_rzx(self, num_frames, attr=0x47):
+        pc = 0xC000
+        code = [0x34] * num_frames # INC (HL)
+        ram = [0] * 0xC000
+        ram[pc - 0x4000:pc - 0x4000 + len(code)] = code
+        ram[0x1800:0x1B00] = [attr] * 768
+        registers = {'PC': pc, 'H': 0x40}
+        z80data = self.write_z80_file(None, ram, registers=registers, ret_data=True)
+        rzx = RZX()
+        rzx.add_snapshot(z80data, 'z80', [(1, 0, [])] * num_frames)
+        return self.write_rzx_file(rzx)
+
+    def _pixel_row(self, value, ink, paper):
+        return [ink if value & b else paper for b in (128, 64, 32, 16, 8, 4, 2, 1)]
+
+    def test_option_dump_frames_rgb(self):
+        rzxfile = self._write_dump_frames_test_rzx(8)
+        output, error = self.run_rzxplay(f'--quiet --no-screen --dump-frames frames.rgb {rzxfile}')
+        self.assertEqual(error, '')
+        with open('frames.rgb', 'rb') as f:
+            data = f.read()
+        self.assertEqual(len(data), 8 * 147456)
+        white, black = (255, 255, 255), (0, 0, 0)
+        for n in range(8):
+            screen = data[n * 147456:(n + 1) * 147456]
+            exp_row = [c for p in self._pixel_row(n + 1, white, black) for c in p]
+            self.assertEqual(exp_row, list(screen[:24]))
+            self.assertEqual(set(screen[24:]), {0})
+
+    def test_option_dump_frames_idx_with_interval(self):
+        rzxfile = self._write_dump_frames_test_rzx(8)
+        output, error = self.run_rzxplay(f'--quiet --no-screen --dump-frames frames.idx --dump-interval 3 {rzxfile}')
+        self.assertEqual(error, '')
+        with open('frames.idx', 'rb') as f:
+            data = f.read()
+        self.assertEqual(len(data), 3 * 49152)
+        for i, n in enumerate((0, 3, 6)):
+            screen = data[i * 49152:(i + 1) * 49152]
+            self.assertEqual(self._pixel_row(n + 1, 15, 8), list(screen[:8]))
+            self.assertEqual(set(screen[8:]), {8})
+
+    def test_option_dump_frames_with_flash(self):
+        rzxfile = self._write_dump_frames_test_rzx(17, 0x8A) # FLASH 1: PAPER 1: INK 2
+        output, error = self.run_rzxplay(f'--quiet --no-screen --dump-frames frames.idx --dump-interval 16 {rzxfile}')
+        self.assertEqual(error, '')
+        with open('frames.idx', 'rb') as f:
+            data = f.read()
+        self.assertEqual(len(data), 2 * 49152)
+        self.assertEqual(self._pixel_row(1, 2, 1), list(data[:8]))
+        self.assertEqual(self._pixel_row(17, 1, 2), list(data[49152:49160]))
+        self.assertEqual(set(data[49160:]), {2})
+
+    def test_option_dump_frames_png(self):
+        rzxfile = self._write_dump_frames_test_rzx(8)
+        output, error = self.run_rzxplay(f'--quiet --no-screen --dump-frames frames.png --dump-interval 4 {rzxfile}')
+        self.assertEqual(error, '')
+        for n in (0, 4):
+            with open(f'frames.{n}.png', 'rb') as f:
+                self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+        self.assertFalse(os.path.isfile('frames.1.png'))
+
+    def test_option_dump_frames_with_unknown_file_type(self):
+        rzxfile = self._write_dump_frames_test_rzx(1)
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_rzxplay(f'--quiet --no-screen --dump-frames frames.gif {rzxfile}')
+        self.assertEqual(cm.exception.args[0], 'Unknown file type: gif')
+
     def test_invalid_option(self):
         output, error = self.run_rzxplay('-x test.rzx', catch_exit=2)
         self.assertEqual(output, '')
@@ -1522,6 +1742,37 @@ class RzxplayTest(SkoolKitTestCase):
         """
         self._test_rzx(rzx, exp_output, '--stop 1 --quiet --no-screen', exp_trace)
 
+    def test_option_binary_trace(self):
+        ram = [0] * 0xC000
+        pc = 0xF000
+        code = (
+            0x06, 0x00, # LD B,$00
+            0x06, 0x01, # LD B,$01
+            0x06, 0x02, # LD B,$02
+            0xDB, 0xFE, # IN A,($FE)
+        )
+        ram[pc - 0x4000:pc - 0x4000 + len(code)] = code
+        registers = {'PC': pc}
+        z80data = self.write_z80_file(None, ram, registers=registers, ret_data=True)
+        rzx = RZX()
+        rzx.add_snapshot(z80data, 'z80', [(2, 0, []), (2, 1, [191])])
+        rzxfile = self.write_rzx_file(rzx)
+        output, error = self.run_rzxplay(f'--quiet --no-screen --binary-trace trace.bin {rzxfile}')
+        self.assertEqual(error, '')
+        exp_trace = [
+            'F:0 C:00002 I:00000 $F000 LD B,$00',
+            'F:0 C:00001 I:00000 $F002 LD B,$01',
+            'F:1 C:00002 I:00001 $F004 LD B,$02',
+            'F:1 C:00001 I:00001 $F006 IN A,($FE)'
+        ]
+        self.assertEqual(exp_trace, decode('trace.bin', 0, None, None))
+
+    def test_option_binary_trace_with_option_trace(self):
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_rzxplay('--binary-trace trace.bin --trace trace.log in.rzx')
+        self.assertEqual(cm.exception.args[0], '--trace and --binary-trace cannot be used together')
+        self.assertFalse(os.path.exists('trace.log'))
+
     def test_option_trace_uses_minimal_width_for_frame_number_field(self):
         ram = [0] * 0xC000
         pc = 0xF000
@@ -0,0 +1,88 @@
+from unittest.mock import patch
+import zlib
+
+from skoolkittest import SkoolKitTestCase
+from skoolkit import SkoolKitError, rzxutils
+from skoolkit.rzxutils import InputRecording
+
+def _frames_data(frames):
+    data = bytearray()
+    for fc, ic, readings in frames:
+        data.extend((fc % 256, fc // 256, ic % 256, ic // 256))
+        data.extend(readings)
+    return bytes(data)
+
+def _frames(count):
+    frames = []
+    for n in range(count):
+        if n % 3 == 2:
+            frames.append((n + 1, 65535, ()))
+        else:
+            frames.append((n + 1, n % 5, [(n + k) % 256 for k in range(n % 5)]))
+    return frames
+
+def _expected(frames):
+    expected = []
+    readings = b''
+    for fc, ic, r in frames:
+        if ic < 65535:
+            readings = bytes(r)
+        expected.append((fc, ic, readings))
+    return expected
+
+class RzxutilsTest(SkoolKitTestCase):
+    def _test_frames(self, frames, compressed):
+        data = _frames_data(frames)
+        if compressed:
+            data = zlib.compress(data, 9)
+        input_rec = InputRecording(0, len(frames), data, 2 * compressed)
+        self.assertEqual(_expected(frames), list(input_rec.frames()))
+
+    def test_uncompressed_frames(self):
+        self._test_frames(_frames(20), False)
+
+    def test_compressed_frames(self):
+        self._test_frames(_frames(20), True)
+
+    @patch.object(rzxutils, 'CHUNK_SIZE', 7)
+    @patch.object(rzxutils, 'MAX_OUTPUT', 5)
+    def test_frames_spanning_chunks(self):
+        frames = _frames(200)
+        frames.append((1, 300, [1] * 300))
+        self._test_frames(frames, False)
+        self._test_frames(frames, True)
+
+    def test_frames_from_start_index(self):
+        frames = _frames(20)
+        input_rec = InputRecording(0, 20, zlib.compress(_frames_data(frames)), 2)
+        self.assertEqual(_expected(frames)[14:], list(input_rec.frames(14)))
+
+    def test_truncated_frames(self):
+        frames = _frames(5)
+        data = _frames_data(frames)[:-1]
+        input_rec = InputRecording(0, 5, data)
+        frames_iter = input_rec.frames()
+        self.assertEqual(_expected(frames)[:4], [next(frames_iter) for i in range(4)])
+        with self.assertRaises(SkoolKitError) as cm:
+            next(frames_iter)
+        self.assertEqual(cm.exception.args[0], 'Input recording block is truncated (frame 4 of 5 is incomplete)')
+
+    def test_truncated_compressed_frames(self):
+        data = zlib.compress(_frames_data(_frames(20)))[:-8]
+        input_rec = InputRecording(0, 20, data, 2)
+        with self.assertRaises(SkoolKitError) as cm:
+            list(input_rec.frames())
+        self.assertTrue(cm.exception.args[0].startswith('Input recording block is truncated (frame '))
+
+    def test_missing_frames(self):
+        data = _frames_data(_frames(3))
+        input_rec = InputRecording(0, 4, data)
+        with self.assertRaises(SkoolKitError) as cm:
+            list(input_rec.frames())
+        self.assertEqual(cm.exception.args[0], 'Input recording block is truncated (frame 3 of 4 is incomplete)')
+
+    def test_corrupted_frames(self):
+        input_rec = InputRecording(0, 1, bytes(20), 2)
+        with self.assertRaises(SkoolKitError) as cm:
+            list(input_rec.frames())
+        self.assertEqual(cm.exception.args[0], 'Failed to decompress input recording block: Error -3 while decompressing data: unknown compression method')
@@ -1,8 +1,13 @@
+from unittest import skipUnless
+
 from skoolkittest import SkoolKitTestCase
+from skoolkit import CSimulator
+from skoolkit.pagingtracer import Memory
 from skoolkit.simulator import Simulator
 from skoolkit.simutils import (REGISTERS as SIMULATOR_REGISTERS, A, F, B, C, D,
                                E, H, L, IXh, IXl, IYh, IYl, SP, I, R, xA, xF,
                                xB, xC, xD, xE, xH, xL, PC, T, IFF, IM)
+from skoolkit.watchpoints import parse_watchpoint
 
 REGISTER_NAMES = {v: r for r, v in SIMULATOR_REGISTERS.items()}
 
@@ -31,6 +36,14 @@ class PortTracer:
     def write_port(self, registers, port, value):
         self.out_ports.append((port, value))
 
+class PagingTestTracer:
+    def __init__(self, memory):
+        self.memory = memory
+
+    def write_port(self, registers, port, value):
+        if port == 0x7FFD:
+            self.memory.out7ffd(value)
+
 class SimulatorTest(SkoolKitTestCase):
     def _test_instruction(self, simulator, inst, data, timing, reg_out=None, sna_out=None,
                           start=None, end=None, state_out=None):
@@ -2931,3 +2944,484 @@ class SimulatorTest(SkoolKitTestCase):
         self.assertEqual(simulator.registers[SP], sp)
         self.assertEqual([0, 0], simulator.memory[sp - 2:sp])
         self.assertEqual(simulator.registers[IFF], 1)
+
+    def _compare_block_cache(self, code, start, stop, interrupts=False, state=None):
+        simulators = []
+        for block_cache in (False, True):
+            memory = [0] * 65536
+            memory[start:start + len(code)] = code
+            memory[56:58] = (0xFB, 0xC9) # EI; RET
+            registers = {'SP': 65534, 'IY': 23610}
+            simulator = Simulator(memory, registers, state, {'block_cache': block_cache})
+            simulator.run(start, stop, interrupts)
+            simulators.append(simulator)
+        sim1, sim2 = simulators
+        self.assertEqual(list(sim1.registers), list(sim2.registers))
+        self.assertEqual(list(sim1.memory), list(sim2.memory))
+        return sim2
+
+    def test_block_cache(self):
+        code = (
+            0x21, 0x00, 0x80, # 32768 LD HL,32768
+            0x11, 0x00, 0x00, # 32771 LD DE,0
+            0x06, 0x00,       # 32774 LD B,0
+            0x7E,             # 32776 LD A,(HL)
+            0xAB,             # 32777 XOR E
+            0x5F,             # 32778 LD E,A
+            0x7A,             # 32779 LD A,D
+            0x8E,             # 32780 ADC A,(HL)
+            0x57,             # 32781 LD D,A
+            0xCB, 0x13,       # 32782 RL E
+            0x23,             # 32784 INC HL
+            0x10, 0xF5,       # 32785 DJNZ 32776
+        )
+        simulator = self._compare_block_cache(code, 32768, 32787)
+        self.assertGreater(len(simulator.blocks.blocks), 1)
+
+    def test_block_cache_with_interrupts(self):
+        code = (
+            0xFB,             # 32768 EI
+            0x01, 0x00, 0x10, # 32769 LD BC,4096
+            0x21, 0x00, 0xC0, # 32772 LD HL,49152
+            0x34,             # 32775 INC (HL)
+            0x2C,             # 32776 INC L
+            0x0B,             # 32777 DEC BC
+            0x78,             # 32778 LD A,B
+            0xB1,             # 32779 OR C
+            0x20, 0xF9,       # 32780 JR NZ,32775
+        )
+        self._compare_block_cache(code, 32768, 32782, True, {'im': 1, 'tstates': 69000})
+
+    def test_block_cache_with_self_modifying_code(self):
+        code = (
+            0x06, 0x0A,       # 32768 LD B,10
+            0x3E, 0x00,       # 32770 LD A,0
+            0xC6, 0x01,       # 32772 ADD A,1
+            0x32, 0x05, 0x80, # 32774 LD (32773),A
+            0x00,             # 32777 NOP
+            0x3C,             # 32778 INC A
+            0x10, 0xF7,       # 32779 DJNZ 32772
+        )
+        simulator = self._compare_block_cache(code, 32768, 32781)
+        self.assertEqual(simulator.memory[32773], 255)
+
+    def test_block_cache_with_write_to_current_block(self):
+        code = (
+            0x21, 0x06, 0x80, # 32768 LD HL,32774
+            0x36, 0x3C,       # 32771 LD (HL),60
+            0x00,             # 32773 NOP
+            0x00,             # 32774 NOP (overwritten by INC A)
+            0x00,             # 32775 NOP
+            0xC9,             # 32776 RET
+        )
+        simulator = self._compare_block_cache(code, 32768, 32776)
+        self.assertEqual(simulator.registers[A], 1)
+
+    def test_block_cache_with_stop_address_inside_block(self):
+        code = (
+            0x3E, 0x01, # 32768 LD A,1
+            0x06, 0x02, # 32770 LD B,2
+            0x0E, 0x03, # 32772 LD C,3
+            0x16, 0x04, # 32774 LD D,4
+        )
+        simulator = self._compare_block_cache(code, 32768, 32772)
+        self.assertEqual(simulator.registers[PC], 32772)
+        self.assertEqual(simulator.registers[C], 0)
+
+    def test_block_cache_with_conditional_branch_inside_block(self):
+        code = (
+            0x06, 0x00,       # 32768 LD B,0
+            0x21, 0x00, 0x00, # 32770 LD HL,0
+            0x23,             # 32773 INC HL
+            0x7C,             # 32774 LD A,H
+            0xFE, 0x02,       # 32775 CP 2
+            0x28, 0x03,       # 32777 JR Z,32782
+            0x04,             # 32779 INC B
+            0x18, 0xF7,       # 32780 JR 32773
+            0x00,             # 32782 NOP
+        )
+        for interrupts in (False, True):
+            simulator = self._compare_block_cache(code, 32768, 32783, interrupts, {'iff': 1, 'im': 1})
+            self.assertEqual(simulator.registers[L], 0)
+            self.assertEqual(simulator.registers[H], 2)
+            self.assertEqual(simulator.blocks.blocks[32773][0], 32782)
+
+    def test_block_cache_with_code_modified_between_runs(self):
+        code = (
+            0x3E, 0x01, # 32768 LD A,1
+            0x3C,       # 32770 INC A
+            0x47,       # 32771 LD B,A
+            0x00,       # 32772 NOP
+        )
+        simulators = []
+        for block_cache in (False, True):
+            memory = [0] * 65536
+            memory[32768:32768 + len(code)] = code
+            simulator = Simulator(memory, config={'block_cache': block_cache})
+            simulator.run(32768, 32773)
+            simulator.memory[32769] = 5
+            simulator.run(32768, 32773)
+            simulators.append(simulator)
+        sim1, sim2 = simulators
+        self.assertEqual(sim1.registers, sim2.registers)
+        self.assertEqual(sim1.memory, sim2.memory)
+        self.assertEqual(sim2.registers[B], 6)
+
+    def test_block_cache_reconsiders_uncached_address(self):
+        code = (
+            0xC3, 0x03, 0x80, # 32768 JP 32771
+            0x3C,             # 32771 INC A
+            0x00,             # 32772 NOP
+        )
+        memory = [0] * 65536
+        memory[32768:32768 + len(code)] = code
+        simulator = Simulator(memory, config={'block_cache': True})
+        simulator.run(32768, 32773)
+        self.assertEqual(simulator.blocks.blocks[32768], ())
+        simulator.memory[32768:32771] = (0, 0, 0)
+        self.assertNotIn(32768, simulator.blocks.blocks)
+        simulator.run(32768, 32773)
+        self.assertEqual(simulator.blocks.blocks[32768][0], 32773)
+        self.assertEqual(simulator.registers[A], 2)
+
+    def _compare_block_cache_128k(self, code, banks):
+        simulators = []
+        for block_cache in (False, True):
+            memory = Memory()
+            memory.banks[2][:len(code)] = code
+            for bank, data in banks.items():
+                memory.banks[bank][:len(data)] = data
+            simulator = Simulator(memory, config={'block_cache': block_cache})
+            simulator.set_tracer(PagingTestTracer(memory))
+            simulator.run(32768, 32768 + len(code), True)
+            simulators.append(simulator)
+        sim1, sim2 = simulators
+        self.assertEqual(sim1.registers, sim2.registers)
+        self.assertEqual(sim1.memory.banks, sim2.memory.banks)
+        self.assertIs(sim2.memory, memory)
+        return sim2
+
+    def test_block_cache_with_128k_bank_switching(self):
+        code = (
+            0x01, 0xFD, 0x7F, # 32768 LD BC,32765
+            0x3E, 0x01,       # 32771 LD A,1
+            0xED, 0x79,       # 32773 OUT (C),A
+            0xCD, 0x00, 0xC0, # 32775 CALL 49152
+            0x57,             # 32778 LD D,A
+            0x3E, 0x03,       # 32779 LD A,3
+            0xED, 0x79,       # 32781 OUT (C),A
+            0xCD, 0x00, 0xC0, # 32783 CALL 49152
+            0x5F,             # 32786 LD E,A
+        )
+        banks = {
+            1: (0x3E, 0x0B, 0x3C, 0xC9), # 49152 LD A,11; INC A; RET
+            3: (0x3E, 0x21, 0x3C, 0xC9), # 49152 LD A,33; INC A; RET
+        }
+        simulator = self._compare_block_cache_128k(code, banks)
+        self.assertEqual(simulator.registers[D], 12)
+        self.assertEqual(simulator.registers[E], 34)
+
+    def test_block_cache_with_128k_bank_paged_in_twice(self):
+        code = (
+            0x01, 0xFD, 0x7F, # 32768 LD BC,32765
+            0x3E, 0x05,       # 32771 LD A,5
+            0xED, 0x79,       # 32773 OUT (C),A
+            0xCD, 0x00, 0xC0, # 32775 CALL 49152
+            0x57,             # 32778 LD D,A
+            0x3E, 0x07,       # 32779 LD A,7
+            0x32, 0x01, 0x40, # 32781 LD (16385),A
+            0xCD, 0x00, 0xC0, # 32784 CALL 49152
+            0x5F,             # 32787 LD E,A
+        )
+        banks = {
+            5: (0x3E, 0x01, 0x3C, 0xC9), # 16384 LD A,1; INC A; RET
+        }
+        simulator = self._compare_block_cache_128k(code, banks)
+        self.assertEqual(simulator.registers[D], 2)
+        self.assertEqual(simulator.registers[E], 8)
+
+    def _compare_fast_idle(self, code, start, stop, interrupts=False, state=None, max_time=0, data=None, simulator_cls=Simulator):
+        simulators = []
+        for fast_idle in (False, True):
+            memory = [0] * 65536
+            memory[start:start + len(code)] = code
+            memory[56:58] = (0xFB, 0xC9) # EI; RET
+            if data:
+                for addr, values in data.items():
+                    memory[addr:addr + len(values)] = values
+            registers = {'SP': 65534, 'IY': 23610}
+            simulator = simulator_cls(memory, registers, state, {'fast_idle': fast_idle})
+            if max_time:
+                simulator.max_time = max_time
+                simulator.stop = stop
+                simulator.registers[PC] = start
+                while simulator.registers[T] < max_time:
+                    simulator.opcodes[memory[simulator.registers[PC]]]()
+            else:
+                simulator.run(start, stop, interrupts)
+            simulators.append(simulator)
+        sim1, sim2 = simulators
+        self.assertEqual(sim1.registers, sim2.registers)
+        self.assertEqual(sim1.memory, sim2.memory)
+        return sim2
+
+    def test_fast_idle_halt(self):
+        code = (
+            0xFB, # 32768 EI
+            0x76, # 32769 HALT
+            0x00, # 32770 NOP
+        )
+        simulator = self._compare_fast_idle(code, 32768, 32771, True, {'im': 1, 'tstates': 100})
+        self.assertEqual(simulator.registers[T], 69946)
+
+    def test_fast_idle_halt_without_interrupts(self):
+        code = (
+            0xFB, # 32768 EI
+            0x76, # 32769 HALT
+        )
+        simulator = self._compare_fast_idle(code, 32768, 32770, False, {'tstates': 1000})
+        self.assertEqual(simulator.registers[PC], 32770)
+
+    def test_fast_idle_halt_with_max_time(self):
+        code = (
+            0xF3, # 32768 DI
+            0x76, # 32769 HALT
+        )
+        simulator = self._compare_fast_idle(code, 32768, None, max_time=100001)
+        self.assertEqual(simulator.registers[T], 100004)
+
+    def test_fast_idle_jr(self):
+        code = (
+            0xFB,       # 32768 EI
+            0x18, 0xFE, # 32769 JR 32769
+        )
+        simulator = self._compare_fast_idle(code, 32768, 57, True, {'im': 1, 'tstates': 20000})
+        self.assertEqual(simulator.registers[PC], 57)
+
+    def test_fast_idle_jp(self):
+        code = (
+            0xFB,             # 32768 EI
+            0xC3, 0x01, 0x80, # 32769 JP 32769
+        )
+        self._compare_fast_idle(code, 32768, 57, True, {'im': 1, 'tstates': 30000})
+
+    def test_fast_idle_djnz(self):
+        code = (
+            0xFB,       # 32768 EI
+            0x06, 0x00, # 32769 LD B,0
+            0x10, 0xFE, # 32771 DJNZ 32771
+            0x10, 0xFE, # 32773 DJNZ 32773
+        )
+        self._compare_fast_idle(code, 32768, 32775, True, {'im': 1, 'tstates': 69000})
+
+    def test_fast_idle_stop_at_idle_loop(self):
+        code = (
+            0x18, 0xFE, # 32768 JR 32768
+        )
+        simulator = self._compare_fast_idle(code, 32768, 32768, True, {'iff': 1, 'im': 1, 'tstates': 100})
+        self.assertEqual(simulator.registers[T], 112)
+
+    def _test_fast_idle_polling_loops(self, simulator_cls):
+        handler = (
+            0x21, 0x20, 0x80, # 56 LD HL,32800
+            0x35,             # 59 DEC (HL)
+            0xFB,             # 60 EI
+            0xC9,             # 61 RET
+        )
+        loops = (
+            (
+                0x3A, 0x20, 0x80, # 32769 LD A,(32800)
+                0xA7,             # 32772 AND A
+                0x20, 0xFA,       # 32773 JR NZ,32769
+            ),
+            (
+                0x3A, 0x20, 0x80, # 32769 LD A,(32800)
+                0xB7,             # 32772 OR A
+                0xC2, 0x01, 0x80, # 32773 JP NZ,32769
+            ),
+            (
+                0x21, 0x20, 0x80, # 32769 LD HL,32800
+                0x7E,             # 32772 LD A,(HL)
+                0xFE, 0x00,       # 32773 CP 0
+                0x20, 0xF8,       # 32775 JR NZ,32769
+            ),
+            (
+                0x21, 0x20, 0x80, # 32769 LD HL,32800
+                0xCB, 0x46,       # 32772 BIT 0,(HL)
+                0x20, 0xF9,       # 32774 JR NZ,32769
+            ),
+            (
+                0x06, 0x01,       # 32769 LD B,1
+                0x80,             # 32771 ADD A,B
+                0x20, 0xFB,       # 32772 JR NZ,32769
+            ),
+        )
+        for loop in loops:
+            with self.subTest(loop=loop):
+                code = (0xFB, *loop) # 32768 EI
+                stop = 32768 + len(code)
+                data = {56: handler, 32800: (3,)}
+                state = {'im': 1, 'tstates': 100}
+                simulator = self._compare_fast_idle(code, 32768, stop, True, state, data=data, simulator_cls=simulator_cls)
+                self.assertEqual(simulator.registers[PC], stop)
+
+    def test_fast_idle_polling_loops(self):
+        self._test_fast_idle_polling_loops(Simulator)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_fast_idle_polling_loops(self):
+        self._test_fast_idle_polling_loops(CSimulator)
+
+    def test_fast_idle_polling_loop_with_max_time(self):
+        code = (
+            0xF3,             # 32768 DI
+            0x3A, 0x00, 0x90, # 32769 LD A,(36864)
+            0xE6, 0x01,       # 32772 AND 1
+            0x28, 0xF9,       # 32774 JR Z,32769
+        )
+        simulator = self._compare_fast_idle(code, 32768, None, max_time=100001)
+        self.assertEqual(simulator.registers[T], 100004)
+
+    def test_fast_idle_stop_in_polling_loop(self):
+        code = (
+            0xFB,             # 32768 EI
+            0x3A, 0x20, 0x80, # 32769 LD A,(32800)
+            0xA7,             # 32772 AND A
+            0x20, 0xFA,       # 32773 JR NZ,32769
+        )
+        data = {32800: (1,)}
+        state = {'im': 1, 'tstates': 100}
+        simulator = self._compare_fast_idle(code, 32768, 32772, True, state, data=data)
+        self.assertEqual(simulator.registers[T], 104 + 13)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_dirty_blocks(self):
+        memory = [0] * 65536
+        memory[0x8000:0x8006] = (
+            0x32, 0xFF, 0xC0, # 32768 LD (49407),A
+            0x22, 0x00, 0x60, # 32771 LD (24576),HL
+        )
+        simulator = CSimulator(memory, {'A': 1, 'HL': 0x0201}, config={'dirty': True})
+        self.assertEqual(simulator.dirty, bytes(256))
+        simulator.run(0x8000, 0x8006)
+        self.assertEqual([b for b, d in enumerate(simulator.dirty) if d], [0x60, 0xC0])
+        self.assertEqual(list(simulator.memory[0x6000:0x6002]), [1, 2])
+        self.assertEqual(simulator.memory[0xC0FF], 1)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_dirty_blocks_not_tracked_by_default(self):
+        self.assertIsNone(CSimulator([0] * 65536).dirty)
+        self.assertIsNone(CSimulator(Memory()).dirty)
+
+    def _test_dirty_banks(self, simulator_cls, config=None):
+        memory = Memory(dirty=True)
+        memory.banks[2][:10] = (
+            0x32, 0x00, 0x40, # 32768 LD (16384),A
+            0x01, 0xFD, 0x7F, # 32771 LD BC,32765
+            0xED, 0x59,       # 32774 OUT (C),E
+            0x72,             # 32776 LD (HL),D
+            0x00,             # 32777 NOP
+        )
+        registers = {'A': 1, 'DE': 0x0203, 'HL': 0xC1FF}
+        simulator = simulator_cls(memory, registers, config=config)
+        simulator.set_tracer(PagingTestTracer(simulator.memory))
+        self.assertEqual(memory.dirty_banks(), [])
+        simulator.run(0x8000, 0x8009)
+        self.assertEqual(memory.dirty_banks(), [3, 5])
+        self.assertEqual(memory.dirty_blocks(3), [0x0100])
+        self.assertEqual(memory.dirty_blocks(5), [0x0000])
+        self.assertEqual(memory.banks[3][0x01FF], 2)
+        memory.clear_dirty()
+        self.assertEqual(memory.dirty_banks(), [])
+        return simulator
+
+    def test_dirty_banks(self):
+        self._test_dirty_banks(Simulator)
+
+    def test_dirty_banks_with_block_cache(self):
+        self._test_dirty_banks(Simulator, {'block_cache': True})
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_dirty_banks(self):
+        simulator = self._test_dirty_banks(CSimulator)
+        self.assertIs(simulator.dirty, simulator.memory.dirty)
+
+    def test_dirty_banks_not_tracked(self):
+        memory = Memory()
+        self.assertIsNone(memory.dirty)
+        memory[0x8000] = 1
+        self.assertEqual(memory.dirty_banks(), list(range(8)))
+        self.assertEqual(memory.dirty_blocks(0), list(range(0, 0x4000, 256)))
+
+    def test_prefixed_opcode_tables_created_on_first_use(self):
+        memory = [0] * 65536
+        memory[0:4] = (0xDD, 0xCB, 0x00, 0x06) # RLC (IX+0)
+        memory[0x8000] = 0x81
+        simulator = Simulator(memory, {'IX': 0x8000})
+        for name in ('after_CB', 'after_DD', 'after_ED', 'after_FD', 'after_DDCB', 'after_FDCB'):
+            self.assertNotIn(name, vars(simulator))
+        simulator.run(0)
+        self.assertEqual(memory[0x8000], 0x03)
+        self.assertEqual(simulator.registers[PC], 4)
+        self.assertEqual(simulator.registers[T], 23)
+        self.assertIn('after_DD', vars(simulator))
+        self.assertIn('after_DDCB', vars(simulator))
+        for name in ('after_CB', 'after_ED', 'after_FD', 'after_FDCB'):
+            self.assertNotIn(name, vars(simulator))
+        self.assertEqual(simulator.opcodes[0xDD].func, simulator.prefix)
+        self.assertEqual(simulator.after_DD[0xCB].func, simulator.prefix2)
+
+    def test_fast_ldir_in_prefixed_opcode_table(self):
+        simulator = Simulator([0] * 65536, config={'fast_ldir': True})
+        self.assertEqual(simulator.after_ED[0xB0].func, simulator.ldir_fast)
+        self.assertEqual(simulator.after_ED[0xB8].func, simulator.ldir_fast)
+
+    def _watch(self, simulator_cls, specs, memory=None):
+        code = (
+            0x21, 0x00, 0xC0, # 32768 LD HL,49152
+            0x06, 0x05,       # 32771 LD B,5
+            0x34,             # 32773 INC (HL)
+            0x23,             # 32774 INC HL
+            0x10, 0xFC,       # 32775 DJNZ 32773
+            0xD3, 0xFE,       # 32777 OUT (254),A
+            0xDB, 0xFE,       # 32779 IN A,(254)
+        )
+        if memory is None:
+            memory = [0] * 65536
+        for a, b in enumerate(code, 32768):
+            memory[a] = b
+        watchpoints = [parse_watchpoint(spec) for spec in specs]
+        simulator = simulator_cls(memory, {'PC': 32768}, config={'watchpoints': watchpoints})
+        simulator.set_tracer(PortTracer())
+        hit = simulator.run(32768, 32781)
+        self.assertEqual(simulator.watch_hit, -1 if hit is None else hit)
+        return hit, simulator.registers[PC], simulator.registers[T]
+
+    def test_watchpoints(self):
+        for specs, exp_result in (
+                (('write:49154',), (0, 32774, 88)),
+                (('read:49155',), (0, 32774, 118)),
+                (('pc:32775,3',), (0, 32775, 94)),
+                (('b=2',), (0, 32773, 107)),
+                (('hl>=49155',), (0, 32775, 94)),
+                (('out:254',), (0, 32779, 173)),
+                (('in:0-65535',), (0, 32781, 184)),
+                (('write:49152,2',), (None, 32781, 184)),
+                (('pc:32779', 'write:49152-49153'), (1, 32774, 28)),
+        ):
+            for simulator_cls in (Simulator, CSimulator):
+                if simulator_cls:
+                    with self.subTest(specs=specs, simulator=simulator_cls.__name__):
+                        self.assertEqual(self._watch(simulator_cls, specs), exp_result)
+
+    def test_watchpoints_with_128k_memory(self):
+        memory = Memory()
+        self.assertEqual(self._watch(Simulator, ['write:49152-65535,5'], memory), (0, 32774, 148))
+        self.assertIsInstance(memory, Memory)
+        self.assertEqual(memory[49152:49157], [1] * 5)
+
+    def test_watchpoints_disable_fast_modes(self):
+        config = {'watchpoints': [parse_watchpoint('pc:0')], 'fast_djnz': True, 'fast_ldir': True}
+        simulator = Simulator([0] * 65536, config=config)
+        self.assertEqual(simulator.opcodes[0x10].func, simulator.djnz)
+        self.assertNotEqual(simulator.after_ED[0xB0].func, simulator.ldir_fast)
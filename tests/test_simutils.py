@@ -0,0 +1,215 @@
+from itertools import permutations
+from unittest import skipUnless
+
+from skoolkittest import SkoolKitTestCase
+from skoolkit import CSimulator
+from skoolkit.pagingtracer import Memory, PagingTracer
+from skoolkit.simulator import Simulator
+from skoolkit.simutils import A, PC, T, restore_state, save_state
+
+CODE = (
+    0x3E, 0x01,       # $8000 LD A,$01
+    0x32, 0x00, 0x40, # $8002 LD ($4000),A
+    0x01, 0xFD, 0x7F, # $8005 LD BC,$7FFD
+    0x3E, 0x03,       # $8008 LD A,$03
+    0xED, 0x79,       # $800A OUT (C),A
+    0x32, 0x00, 0xC0, # $800C LD ($C000),A
+    0x3E, 0x11,       # $800F LD A,$11
+    0xED, 0x79,       # $8011 OUT (C),A
+    0x32, 0xFF, 0xC1, # $8013 LD ($C1FF),A
+    0x32, 0x00, 0x81, # $8016 LD ($8100),A
+    0x01, 0xFD, 0xFF, # $8019 LD BC,$FFFD
+    0x3E, 0x07,       # $801C LD A,$07
+    0xED, 0x79,       # $801E OUT (C),A
+    0x06, 0xBF,       # $8020 LD B,$BF
+    0xED, 0x79,       # $8022 OUT (C),A
+)
+
+# The addresses at which checkpoints are saved
+STOPS = (0x8005, 0x800F, 0x8019, 0x8024)
+
+class Tracer(PagingTracer):
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.border = 7
+        self.outfe = 0
+        self.out7ffd = 0
+        self.outfffd = 0
+        self.ay = [0] * 16
+        self.count = 0
+
+class SimutilsTest(SkoolKitTestCase):
+    def _get_simulator(self, simulator_cls, memory, config=None):
+        simulator = simulator_cls(memory, {'PC': 0x8000}, config=config)
+        tracer = Tracer(simulator)
+        simulator.set_tracer(tracer)
+        return simulator, tracer
+
+    def _get_128k_simulator(self, simulator_cls, dirty=True, config=None):
+        memory = Memory(dirty=dirty)
+        memory.banks[2][:len(CODE)] = CODE
+        return self._get_simulator(simulator_cls, memory, config)
+
+    def _get_machine_state(self, simulator, tracer):
+        memory = simulator.memory
+        return (
+            simulator.registers[:],
+            [bytes(bank) for bank in memory.banks],
+            memory.o7ffd,
+            memory[0xC000],
+            memory[0xC1FF],
+            tracer.out7ffd,
+            tracer.outfffd,
+            tracer.ay[:],
+            tracer.count
+        )
+
+    def _save_checkpoints(self, simulator, tracer):
+        states = [save_state(simulator)]
+        expected = [self._get_machine_state(simulator, tracer)]
+        for stop in STOPS:
+            simulator.run(stop=stop)
+            tracer.count += 1
+            states.append(save_state(simulator, states[-1]))
+            expected.append(self._get_machine_state(simulator, tracer))
+        return states, expected
+
+    def _test_restore_checkpoints_in_any_order(self, simulator_cls, dirty=True, config=None):
+        simulator, tracer = self._get_128k_simulator(simulator_cls, dirty, config)
+        states, expected = self._save_checkpoints(simulator, tracer)
+        # Restore every checkpoint after every other checkpoint
+        for order in permutations(range(len(states)), 2):
+            for i in order:
+                restore_state(simulator, states[i])
+                self.assertEqual(self._get_machine_state(simulator, tracer), expected[i], f'Order: {order}')
+
+    def _test_save_after_restoring_earlier_checkpoint(self, simulator_cls, config=None):
+        simulator, tracer = self._get_128k_simulator(simulator_cls, config=config)
+        states, expected = self._save_checkpoints(simulator, tracer)
+
+        # Restore an earlier checkpoint, run some code from it, and then save
+        # a new checkpoint relative to a later (stale) checkpoint
+        restore_state(simulator, states[1])
+        simulator.run(stop=STOPS[1])
+        exp_state = self._get_machine_state(simulator, tracer)
+        self.assertEqual(exp_state[1][5][0], 1)
+        self.assertEqual(exp_state[1][3][0], 3)
+        self.assertEqual(exp_state[1][2][0x0100], 0)
+        state = save_state(simulator, states[-1])
+        self.assertEqual(state.pages, tuple(exp_state[1]))
+
+        restore_state(simulator, states[-1])
+        self.assertEqual(self._get_machine_state(simulator, tracer), expected[-1])
+        restore_state(simulator, state)
+        self.assertEqual(self._get_machine_state(simulator, tracer), exp_state)
+        restore_state(simulator, states[0])
+        self.assertEqual(self._get_machine_state(simulator, tracer), expected[0])
+
+        # Saving relative to the checkpoint just restored shares its pages
+        state2 = save_state(simulator, states[0])
+        self.assertTrue(all(p is q for p, q in zip(state2.pages, states[0].pages)))
+
+    def _test_save_state_shares_unchanged_pages(self, simulator_cls, config=None):
+        simulator, tracer = self._get_128k_simulator(simulator_cls, config=config)
+        states = self._save_checkpoints(simulator, tracer)[0]
+        changed = [[], [5], [3], [1, 2], []]
+        for i, state in enumerate(states[1:], 1):
+            for b in range(8):
+                if b in changed[i]:
+                    self.assertIsNot(state.pages[b], states[i - 1].pages[b])
+                else:
+                    self.assertIs(state.pages[b], states[i - 1].pages[b])
+
+    def test_save_and_restore_state_48k(self):
+        code = (
+            0x21, 0x00, 0xC0, # $8000 LD HL,$C000
+            0x36, 0x01,       # $8003 LD (HL),$01
+            0x3E, 0x03,       # $8005 LD A,$03
+            0xD3, 0xFE,       # $8007 OUT ($FE),A
+        )
+        memory = [0] * 65536
+        memory[0x8000:0x8000 + len(code)] = code
+        simulator, tracer = self._get_simulator(Simulator, memory)
+        state = save_state(simulator)
+        registers = simulator.registers[:]
+        simulator.run(0x8000, 0x8009)
+        tracer.count = 5
+        self.assertEqual(memory[0xC000], 1)
+        self.assertEqual(tracer.border, 3)
+
+        restore_state(simulator, state)
+        self.assertEqual(simulator.registers, registers)
+        self.assertEqual(memory[0xC000], 0)
+        self.assertEqual(memory[0x8000:0x8000 + len(code)], list(code))
+        self.assertEqual(tracer.border, 7)
+        self.assertEqual(tracer.count, 0)
+
+    def test_save_state_48k_shares_unchanged_pages(self):
+        memory = [0] * 65536
+        memory[0x8000] = 0x32 # LD ($C000),A
+        memory[0x8001:0x8003] = (0x00, 0xC0)
+        simulator = Simulator(memory, {'A': 1})
+        state1 = save_state(simulator)
+        simulator.run(0x8000)
+        state2 = save_state(simulator, state1)
+        self.assertIs(state1.pages[0], state2.pages[0])
+        self.assertIs(state1.pages[1], state2.pages[1])
+        self.assertIsNot(state1.pages[2], state2.pages[2])
+        self.assertEqual(state2.pages[2][0], 1)
+
+    def test_save_and_restore_state_128k(self):
+        simulator, tracer = self._get_128k_simulator(Simulator)
+        memory = simulator.memory
+        state = save_state(simulator)
+        simulator.run(0x8000, 0x8024)
+        self.assertEqual(memory.o7ffd, 0x11)
+        self.assertEqual(memory.banks[3][0], 3)
+        self.assertEqual(memory.banks[1][0x01FF], 0x11)
+        self.assertEqual(tracer.outfffd, 7)
+        self.assertEqual(tracer.ay[7], 7)
+
+        restore_state(simulator, state)
+        self.assertEqual(simulator.registers[PC], 0x8000)
+        self.assertEqual(simulator.registers[T], 0)
+        self.assertEqual(simulator.registers[A], 0)
+        self.assertEqual(memory.o7ffd, 0)
+        self.assertEqual(memory.banks[3][0], 0)
+        self.assertEqual(memory.banks[1][0x01FF], 0)
+        self.assertEqual(memory[0xC000], 0)
+        self.assertEqual(tracer.out7ffd, 0)
+        self.assertEqual(tracer.outfffd, 0)
+        self.assertEqual(tracer.ay, [0] * 16)
+
+    def test_restore_checkpoints_in_any_order(self):
+        self._test_restore_checkpoints_in_any_order(Simulator)
+
+    def test_restore_checkpoints_in_any_order_with_block_cache(self):
+        self._test_restore_checkpoints_in_any_order(Simulator, config={'block_cache': True})
+
+    def test_restore_checkpoints_in_any_order_without_dirty_map(self):
+        self._test_restore_checkpoints_in_any_order(Simulator, False)
+
+    def test_save_after_restoring_earlier_checkpoint(self):
+        self._test_save_after_restoring_earlier_checkpoint(Simulator)
+
+    def test_save_after_restoring_earlier_checkpoint_with_block_cache(self):
+        self._test_save_after_restoring_earlier_checkpoint(Simulator, {'block_cache': True})
+
+    def test_save_state_shares_unchanged_pages(self):
+        self._test_save_state_shares_unchanged_pages(Simulator)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_restore_checkpoints_in_any_order(self):
+        self._test_restore_checkpoints_in_any_order(CSimulator)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_restore_checkpoints_in_any_order_without_dirty_map(self):
+        self._test_restore_checkpoints_in_any_order(CSimulator, False)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_save_after_restoring_earlier_checkpoint(self):
+        self._test_save_after_restoring_earlier_checkpoint(CSimulator)
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    def test_csimulator_save_state_shares_unchanged_pages(self):
+        self._test_save_state_shares_unchanged_pages(CSimulator)
@@ -279,6 +279,10 @@ class TestAudioWriter(AudioWriter):
         self.ma_filter = bool(ma_filter)
         self.is128k = is128k
 
+    def write_ay_audio(self, audio_file, ay_log, is128k=False):
+        self.delays = ay_log
+        self.is128k = is128k
+
 class HtmlWriterTestCase(SkoolKitTestCase):
     def setUp(self):
         super().setUp()
@@ -1709,6 +1713,43 @@ class SkoolMacroTest(HtmlWriterTestCase, CommonSkoolMacroTest):
         exp_delays = [203, 215, 215, 218, 215]
         self._test_audio_macro(writer, macro, exp_src, exp_path, exp_delays, offset=offset, is128k=True)
 
+    def test_macro_audio_with_code_simulation_and_ay_sound(self):
+        skool = """
+            @bank=5
+            ; Play a note on channel A
+            c60000 LD BC,65533
+             60003 LD A,8
+             60005 OUT (C),A
+             60007 LD B,191
+             60009 LD A,15
+             60011 OUT (C),A
+             60013 RET
+        """
+        writer = self._get_writer(skool=skool, mock_file_info=True)
+        fname = 'sound.wav'
+        macro = f'#AUDIO20({fname})(60000,60013)'
+        exp_src = f'../audio/{fname}'
+        output = writer.expand(macro, ASMDIR)
+        self.assertIn(f'src="{exp_src}"', output)
+        self.assertEqual(writer.file_info.fname, f'audio/{fname}')
+        ay_log = writer.audio_writer.delays
+        self.assertTrue(writer.audio_writer.is128k)
+        self.assertEqual(ay_log.start, 0)
+        self.assertEqual(ay_log.end, 55)
+        self.assertEqual(list(ay_log.times), [43])
+        self.assertEqual(list(ay_log.writes), [0x080F])
+
+    def test_macro_audio_with_ay_sound_on_48k(self):
+        skool = """
+            c32768 RET
+        """
+        writer = self._get_writer(skool=skool, mock_file_info=True)
+        self._assert_error(writer, '#AUDIO20(sound.wav)(32768,32768)', 'AY sound requires a 128K memory snapshot', 'Error while parsing #AUDIO macro')
+
+    def test_macro_audio_with_ay_sound_without_execution(self):
+        writer = self._get_writer(skool='', mock_file_info=True)
+        self._assert_error(writer, '#AUDIO16(sound.wav)(100,200,300)', 'AY sound requires bit 2 of flags to be set', 'Error while parsing #AUDIO macro')
+
     def test_macro_audio_with_contention(self):
         writer = self._get_writer(skool='', mock_file_info=True)
         fname = 'sound.wav'
@@ -3,7 +3,7 @@ import zlib
 
 from skoolkittest import SkoolKitTestCase, Z80 as Z80Reader
 from skoolkit import SkoolKitError, get_dword
-from skoolkit.snapshot import Snapshot, Z80, get_snapshot, write_snapshot, SnapshotError
+from skoolkit.snapshot import Memory, Snapshot, Z80, get_snapshot, write_snapshot, SnapshotError
 
 class SnapshotTest(SkoolKitTestCase):
     def _check_ram(self, ram, exp_ram, model, out_7ffd, pages, page):
@@ -219,6 +219,23 @@ class Z80Test(SnapshotTest):
         with self.assertRaisesRegex(SnapshotError, 'Found ED ED 00 0B'):
             get_snapshot(z80_file)
 
+class MemoryTest(SkoolKitTestCase):
+    def test_dirty_blocks(self):
+        memory = Memory([0] * 0x10000, dirty=True)
+        self.assertEqual(memory.dirty_blocks(), [])
+        memory[0x8000] = 1
+        memory[0xC0FF:0xC102] = (2, 3, 4)
+        self.assertEqual(memory.dirty_blocks(), [0x8000, 0xC000, 0xC100])
+        memory.clear_dirty()
+        self.assertEqual(memory.dirty_blocks(), [])
+        self.assertEqual(memory[0xC0FF:0xC102], [2, 3, 4])
+
+    def test_dirty_blocks_not_tracked(self):
+        memory = Memory([0] * 0x10000)
+        self.assertIsNone(memory.dirty)
+        memory[0x8000] = 1
+        self.assertEqual(memory.dirty_blocks(), list(range(0x4000, 0x10000, 256)))
+
 class Z80CompressionTest(SkoolKitTestCase):
     def test_single_ED_followed_by_five_identical_values(self):
         data = [237, 1, 1, 1, 1, 1]
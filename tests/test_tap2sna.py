@@ -1,9 +1,12 @@
 import hashlib
+import json
 import os
 from textwrap import dedent
 import urllib
+import zlib
 from zipfile import ZipFile
 from io import BytesIO
+from unittest import skipUnless
 from unittest.mock import patch, Mock
 
 from skoolkittest import (SkoolKitTestCase, create_data_block,
@@ -13,8 +16,10 @@ from skoolkittest import (SkoolKitTestCase, create_data_block,
 from skoolkit import tap2sna, VERSION, SkoolKitError, CSimulator, CCMIOSimulator
 from skoolkit.cmiosimulator import CMIOSimulator
 from skoolkit.config import COMMANDS
-from skoolkit.loadtracer import LoadTracer
+from skoolkit.loadsample import ACCELERATORS, fingerprint
+from skoolkit.loadtracer import LoadTracer, TapeEdges, get_edges
 from skoolkit.simulator import Simulator
+from skoolkit.snapshot import get_snapshot
 
 mock_memory = None
 
@@ -101,7 +106,8 @@ class MockKeyboardTracer:
 
 class MockLoadTracer:
     def __init__(self, simulator, blocks, accelerators, pause, first_edge, polarity,
-                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe):
+                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe,
+                 learn=False, timeline=False, turbo=False):
         global load_tracer
         self.simulator = simulator
         self.accelerators_in = accelerators
@@ -117,6 +123,10 @@ class MockLoadTracer:
         self.outfffd = outfffd
         self.ay = ay
         self.outfe = outfe
+        self.learn = learn
+        self.learned = []
+        self.timeline = timeline
+        self.turbo = turbo
         self.accelerators = {'speedlock': 1, 'bleepload': 2}
         self.inc_b_misses = 3
         self.dec_b_misses = 4
@@ -137,12 +147,15 @@ class MockLoadTracer:
 
 class TestLoadTracer(LoadTracer):
     def __init__(self, simulator, blocks, accelerators, pause, first_edge, polarity,
-                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe):
+                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe,
+                 learn=False, timeline=False, turbo=False):
         # Ensure that accelerators are in a predictable order when testing the
         # {dec,inc}_b_auto() methods on LoadTracer
         acc_sorted = sorted(accelerators, key=lambda a: a.name)
         super().__init__(simulator, blocks, acc_sorted, pause, first_edge, polarity,
-                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe)
+                 in_min_addr, accel_dec_a, list_accelerators, border, out7ffd, outfffd, ay, outfe, learn, timeline, turbo)
+        global load_tracer
+        load_tracer = self
 
 class InterruptedTracer:
     def __init__(self, *args):
@@ -179,6 +192,42 @@ class Tap2SnaTest(SkoolKitTestCase):
             tzx_data.extend(block)
         return self.write_bin_file(tzx_data, suffix='.tzx')
 
+    def _write_pzx(self, blocks):
+        pzx_data = [*b'PZXT', 2, 0, 0, 0, 1, 0]
+        for tag, body in blocks:
+            pzx_data.extend(tag.encode())
+            pzx_data.extend(len(body).to_bytes(4, 'little'))
+            pzx_data.extend(body)
+        return self.write_bin_file(pzx_data, suffix='.pzx')
+
+    def _write_csw(self, version, rate, compression, flags, data):
+        csw_data = list(b'Compressed Square Wave\x1a')
+        if version == 1:
+            csw_data.extend((1, 1, rate % 256, rate // 256, compression, flags, 0, 0, 0))
+        else:
+            csw_data.extend((2, 0, *rate.to_bytes(4, 'little'), 0, 0, 0, 0, compression, flags, 2))
+            csw_data.extend(b'test'.ljust(16, b'\x00'))
+            csw_data.extend((0, 0)) # Header extension
+        csw_data.extend(data)
+        return self.write_bin_file(csw_data, suffix='.csw')
+
+    def _write_wav(self, rate, channels, bits, samples, chunks=()):
+        block_align = channels * bits // 8
+        wav_data = [*b'WAVE']
+        for chunk_id, chunk in chunks:
+            wav_data.extend(chunk_id.encode())
+            wav_data.extend(len(chunk).to_bytes(4, 'little'))
+            wav_data.extend(chunk)
+            if len(chunk) % 2:
+                wav_data.append(0)
+        wav_data.extend(b'fmt \x10\x00\x00\x00\x01\x00')
+        wav_data.extend((channels, 0, *rate.to_bytes(4, 'little'), *(rate * block_align).to_bytes(4, 'little')))
+        wav_data.extend((block_align, 0, bits, 0))
+        wav_data.extend(b'data')
+        wav_data.extend(len(samples).to_bytes(4, 'little'))
+        wav_data.extend(samples)
+        return self.write_bin_file([*b'RIFF', *len(wav_data).to_bytes(4, 'little'), *wav_data], suffix='.wav')
+
     def _write_basic_loader(self, start, data, write=True, program='simloadbas', code='simloadbyt'):
         start_str = [ord(c) for c in str(start)]
         basic_data = [
@@ -245,9 +294,11 @@ class Tap2SnaTest(SkoolKitTestCase):
     def test_default_option_values(self):
         self.run_tap2sna('in.tap out.z80')
         options = make_snapshot_args[1]
+        self.assertTrue(options.cache)
         self.assertIsNone(options.output_dir)
         self.assertIsNone(options.stack)
         self.assertEqual([], options.ram_ops)
+        self.assertFalse(options.refresh_cache)
         self.assertEqual([], options.reg)
         self.assertIsNone(options.start)
         self.assertEqual([], options.sim_load_config)
@@ -425,6 +476,8 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(error, '')
         exp_output = r"""
             [tap2sna]
+            CacheDir=
+            CacheSize=100
             DefaultSnapshotFormat=z80
             TraceLine=${pc:04X} {i}
             TraceOperand=$,02X,04X
@@ -441,6 +494,8 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(error, '')
         exp_output = """
             [tap2sna]
+            CacheDir=
+            CacheSize=100
             DefaultSnapshotFormat=z80
             TraceLine={pc:05} {i}
             TraceOperand=$,02X,04X
@@ -1306,6 +1361,216 @@ class Tap2SnaTest(SkoolKitTestCase):
         exp_reg = set(('^F=129', 'SP=65344', 'IX=32770', 'IY=23610', 'PC=32768'))
         self.assertLessEqual(exp_reg, set(s_reg))
 
+    def _test_sim_load_cache(self, tapfile, args, outfile):
+        output, error = self.run_tap2sna(f'-I CacheDir=cache {args} {tapfile} {outfile}')
+        self.assertEqual(error, '')
+        return output.strip().split('\n')
+
+    def test_sim_load_cache(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        out_lines = self._test_sim_load_cache(tapfile, '', 'out1.z80')
+        self.assertEqual(out_lines[-2:], ['Simulation stopped (PC in RAM): PC=32768', 'Writing out1.z80'])
+        self.assertEqual(len(os.listdir('cache')), 1)
+        out_lines = self._test_sim_load_cache(tapfile, '', 'out2.z80')
+        self.assertEqual(out_lines, ['Using cached snapshot', 'Writing out2.z80'])
+        with open('out1.z80', 'rb') as f1, open('out2.z80', 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_sim_load_cache_key(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        self._test_sim_load_cache(tapfile, '', 'out.z80')
+        for args, outfile in (
+                ('', 'out.szx'),
+                ('--reg a=1', 'out.z80'),
+                ('--state im=2', 'out.z80'),
+                ('--ram poke=32768,1', 'out.z80'),
+                ('-c fast-load=0', 'out.z80'),
+                ('--tape-stop 5', 'out.z80'),
+                ('--start 32768', 'out.z80'),
+        ):
+            out_lines = self._test_sim_load_cache(tapfile, args, outfile)
+            self.assertNotEqual(out_lines[0], 'Using cached snapshot', args)
+        self.assertEqual(len(os.listdir('cache')), 8)
+
+    def test_sim_load_cache_not_used_with_trace(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        self._test_sim_load_cache(tapfile, '-c trace=load.log', 'out.z80')
+        self.assertFalse(os.path.isdir('cache'))
+
+    def test_sim_load_cache_eviction(self):
+        os.mkdir('cache')
+        old_file = os.path.join('cache', 'old.z80')
+        with open(old_file, 'wb') as f:
+            f.write(bytes(2097152))
+        os.utime(old_file, (0, 0))
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        self._test_sim_load_cache(tapfile, '-I CacheSize=1', 'out.z80')
+        cached = os.listdir('cache')
+        self.assertEqual(len(cached), 1)
+        self.assertNotEqual(cached[0], 'old.z80')
+
+    def test_sim_load_cache_eviction_by_another_process(self):
+        os.mkdir('cache')
+        old_file = os.path.join('cache', 'old.z80')
+        with open(old_file, 'wb') as f:
+            f.write(bytes(2097152))
+        os.utime(old_file, (0, 0))
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        with patch.object(tap2sna.os, 'remove', side_effect=FileNotFoundError):
+            out_lines = self._test_sim_load_cache(tapfile, '-I CacheSize=1', 'out.z80')
+        self.assertEqual(out_lines[-1], 'Writing out.z80')
+        self.assertEqual(len(os.listdir('cache')), 2)
+
+    def test_sim_load_cache_key_includes_accelerator_file_contents(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        accfile = self.write_text_file('{"accelerators": []}', suffix='.json')
+        args = f'-c accelerator-file={accfile}'
+        self._test_sim_load_cache(tapfile, args, 'out.z80')
+        out_lines = self._test_sim_load_cache(tapfile, args, 'out.z80')
+        self.assertEqual(out_lines[0], 'Using cached snapshot')
+        with open(accfile, 'w') as f:
+            f.write('{"accelerators": [ ]}')
+        out_lines = self._test_sim_load_cache(tapfile, args, 'out.z80')
+        self.assertNotEqual(out_lines[0], 'Using cached snapshot')
+        self.assertEqual(len(os.listdir('cache')), 2)
+
+    def test_option_no_cache(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        out_lines = self._test_sim_load_cache(tapfile, '--no-cache', 'out.z80')
+        self.assertEqual(out_lines[-1], 'Writing out.z80')
+        self.assertFalse(os.path.isdir('cache'))
+
+    def test_option_refresh_cache(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        self._test_sim_load_cache(tapfile, '', 'out.z80')
+        out_lines = self._test_sim_load_cache(tapfile, '--refresh-cache', 'out.z80')
+        self.assertEqual(out_lines[0], 'Program: simloadbas')
+        self.assertEqual(out_lines[-1], 'Writing out.z80')
+        self.assertEqual(len(os.listdir('cache')), 1)
+
+    def _test_batch(self, source, options, exp_results):
+        output, error = self.run_tap2sna(f'--batch --ram load=1,32768 {options} {source}')
+        self.assertEqual(error, '')
+        results = [json.loads(line) for line in output.rstrip().split('\n')]
+        self.assertEqual(exp_results, results)
+        for result in results:
+            if 'error' not in result:
+                self.assertEqual(get_snapshot(result['snapshot'])[32768:32770], [1, 2])
+                with open(result['log']) as f:
+                    self.assertEqual(f.read().rstrip().split('\n')[-1], f"Writing {result['snapshot']}")
+
+    def test_option_batch_with_directory(self):
+        tapedir = self.make_directory()
+        subdir = os.path.join(tapedir, 'sub')
+        self.make_directory(subdir)
+        self.write_bin_file(create_tap_data_block([1, 2]), os.path.join(tapedir, 'game1.tap'))
+        self.write_bin_file(create_tap_data_block([1, 2]), os.path.join(subdir, 'game2.TAP'))
+        self.write_text_file('Not a tape', os.path.join(tapedir, 'readme.txt'))
+        exp_results = [
+            {
+                'tape': os.path.join(tapedir, 'game1.tap'),
+                'snapshot': os.path.join(tapedir, 'game1.z80'),
+                'log': os.path.join(tapedir, 'game1.log')
+            },
+            {
+                'tape': os.path.join(subdir, 'game2.TAP'),
+                'snapshot': os.path.join(subdir, 'game2.z80'),
+                'log': os.path.join(subdir, 'game2.log')
+            }
+        ]
+        self._test_batch(tapedir, '-j 2', exp_results)
+
+    def test_option_batch_with_zip_archive(self):
+        zipdir = self.make_directory()
+        zipfile = os.path.join(zipdir, 'tapes.zip')
+        with ZipFile(zipfile, 'w') as archive:
+            archive.writestr('tapes/game1.tap', bytearray(create_tap_data_block([1, 2])))
+            archive.writestr('tapes/notes.txt', 'Not a tape')
+            archive.writestr('game2.tzx', 'Not a tape')
+        exp_results = [
+            {
+                'tape': zipfile,
+                'member': 'tapes/game1.tap',
+                'snapshot': os.path.join(zipdir, 'tapes', 'game1.z80'),
+                'log': os.path.join(zipdir, 'tapes', 'game1.log')
+            },
+            {
+                'tape': zipfile,
+                'member': 'game2.tzx',
+                'snapshot': os.path.join(zipdir, 'game2.z80'),
+                'log': os.path.join(zipdir, 'game2.log'),
+                'error': 'Not a TZX file'
+            }
+        ]
+        self._test_batch(zipfile, '', exp_results)
+        with open(exp_results[1]['log']) as f:
+            self.assertEqual(f.read(), 'Extracting game2.tzx\nERROR: Not a TZX file\n')
+
+    def test_option_batch_with_list_file(self):
+        tapfile = self._write_tap([create_tap_data_block([1, 2])])
+        zipfile = self._write_tap([create_tap_data_block([1, 2])], True)
+        tapes = f"""
+            # Tapes to convert
+            {tapfile}
+
+            {zipfile}
+            nonexistent.tap
+        """
+        listfile = self.write_text_file(dedent(tapes).strip())
+        exp_results = [
+            {'tape': tapfile, 'snapshot': tapfile[:-4] + '.z80', 'log': tapfile[:-4] + '.log'},
+            {'tape': zipfile, 'snapshot': zipfile[:-4] + '.z80', 'log': zipfile[:-4] + '.log'},
+            {'tape': 'nonexistent.tap', 'snapshot': 'nonexistent.z80', 'log': 'nonexistent.log', 'error': 'nonexistent.tap: file not found'}
+        ]
+        self._test_batch(listfile, '', exp_results)
+
+    def test_option_batch_with_same_name_in_zip_subdirectories(self):
+        zipdir = self.make_directory()
+        zipfile = os.path.join(zipdir, 'tapes.zip')
+        with ZipFile(zipfile, 'w') as archive:
+            archive.writestr('a/game.tap', bytearray(create_tap_data_block([1, 2])))
+            archive.writestr('b/game.tap', bytearray(create_tap_data_block([1, 2])))
+        exp_results = [
+            {
+                'tape': zipfile,
+                'member': f'{d}/game.tap',
+                'snapshot': os.path.join(zipdir, d, 'game.z80'),
+                'log': os.path.join(zipdir, d, 'game.log')
+            } for d in 'ab'
+        ]
+        self._test_batch(zipfile, '', exp_results)
+
+    def test_option_batch_with_duplicate_output_names(self):
+        tapedir = self.make_directory()
+        tapfile = self.write_bin_file(create_tap_data_block([1, 2]), os.path.join(tapedir, 'game.tap'))
+        tzxfile = self.write_bin_file(create_tap_data_block([1, 2]), os.path.join(tapedir, 'game.tzx'))
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_tap2sna(f'--batch {tapedir}')
+        self.assertEqual(cm.exception.args[0], f"{tapfile} and {tzxfile} would both be converted to {os.path.join(tapedir, 'game.z80')}")
+        self.assertEqual(sorted(os.listdir(tapedir)), ['game.tap', 'game.tzx'])
+
+    def test_option_batch_with_tape_analysis(self):
+        tapfile = self._write_tap([create_tap_data_block([1, 2])])
+        listfile = self.write_text_file(tapfile)
+        exp_error = 'Exited with status 0 before writing a snapshot'
+        output, error = self.run_tap2sna(f'--batch --tape-analysis {listfile}')
+        self.assertEqual(error, '')
+        exp_result = {'tape': tapfile, 'snapshot': tapfile[:-4] + '.z80', 'log': tapfile[:-4] + '.log', 'error': exp_error}
+        self.assertEqual(exp_result, json.loads(output))
+        self.assertFalse(os.path.exists(exp_result['snapshot']))
+        with open(exp_result['log']) as f:
+            self.assertEqual(f.read().rstrip().split('\n')[-1], f'ERROR: {exp_error}')
+
+    def test_option_batch_with_nonexistent_source(self):
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_tap2sna('--batch nonexistent.txt')
+        self.assertEqual(cm.exception.args[0], 'nonexistent.txt: file not found')
+
+    def test_option_batch_with_outfile(self):
+        output, error = self.run_tap2sna('--batch tapes.txt out.z80', catch_exit=2)
+        self.assertEqual(output, '')
+        self.assertTrue(error.startswith('usage:'))
+
     @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
     def test_sim_load_with_initial_code_block(self):
         code_start = 65360 # Overwrite return address on stack with...
@@ -2186,6 +2451,178 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(error, '')
         self.assertEqual(len(load_tracer.blocks), 1)
 
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_csw_v1_rle(self):
+        rle_data = (
+            2,             # 2 samples
+            3,             # 3 samples
+            0, 44, 1, 0, 0, # 300 samples
+            1              # 1 sample
+        )
+        cswfile = self._write_csw(1, 35000, 1, 0, rle_data)
+        output, error = self.run_tap2sna(cswfile)
+        self.assertEqual(error, '')
+        self.assertEqual(len(load_tracer.blocks), 1)
+        block_id, timings, data = load_tracer.blocks[0]
+        self.assertEqual([], data)
+        self.assertEqual([200, 300, 30000, 100], list(timings.pulses))
+
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_csw_v2_z_rle_starting_high(self):
+        rle_data = zlib.compress(bytes((
+            10,            # 10 samples
+            20,            # 20 samples
+            0, 16, 39, 0, 0 # 10000 samples
+        )))
+        cswfile = self._write_csw(2, 44100, 2, 1, rle_data)
+        output, error = self.run_tap2sna(cswfile)
+        self.assertEqual(error, '')
+        self.assertEqual(len(load_tracer.blocks), 1)
+        block_id, timings, data = load_tracer.blocks[0]
+        self.assertEqual([], data)
+        self.assertEqual([0, 793, 1587, 793651], list(timings.pulses))
+
+    def test_sim_load_with_invalid_csw_file(self):
+        cswfile = self._write_csw(1, 35000, 2, 0, b'Not zlib data')
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_tap2sna(f'{cswfile} out.z80')
+        self.assertTrue(cm.exception.args[0].startswith(f'Error while converting {cswfile}: Invalid Z-RLE data: '))
+
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_wav_8_bit_mono(self):
+        samples = (128, 128, 16, 16, 16, 255, 127)
+        wavfile = self._write_wav(35000, 1, 8, samples)
+        output, error = self.run_tap2sna(wavfile)
+        self.assertEqual(error, '')
+        self.assertEqual(len(load_tracer.blocks), 1)
+        block_id, timings, data = load_tracer.blocks[0]
+        self.assertEqual([], data)
+        self.assertEqual([0, 200, 300, 100, 100], list(timings.pulses))
+
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_wav_16_bit_stereo(self):
+        samples = []
+        for v in (-1000, -1000, 1000, 1000, 1000, -5):
+            samples.extend(v.to_bytes(2, 'little', signed=True))  # Left channel
+            samples.extend((-v).to_bytes(2, 'little', signed=True)) # Right channel
+        wavfile = self._write_wav(35000, 2, 16, samples, [('LIST', b'abc')])
+        output, error = self.run_tap2sna(wavfile)
+        self.assertEqual(error, '')
+        self.assertEqual(len(load_tracer.blocks), 1)
+        block_id, timings, data = load_tracer.blocks[0]
+        self.assertEqual([], data)
+        self.assertEqual([200, 300, 100], list(timings.pulses))
+
+    def test_ram_load_with_wav_file(self):
+        wavfile = self._write_wav(35000, 1, 8, (0, 255))
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_tap2sna(f'--ram load=1,32768 {wavfile} out.z80')
+        self.assertEqual(cm.exception.args[0], f'Error while converting {wavfile}: Cannot read data blocks from a WAV file (a simulated LOAD is required)')
+
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_pzx_file(self):
+        pzxfile = self._write_pzx((
+            ('PULS', (
+                3, 128, 120, 8,      # 3 x 2168 T-states
+                155, 2, 223, 2,      # 667, 735 T-states
+                1, 128, 1, 128, 69, 35 # 74565 T-states
+            )),
+            ('DATA', (
+                12, 0, 0, 128,       # 12 bits, initial level high
+                177, 3,              # Tail pulse: 945 T-states
+                2, 2,                # 2 pulses per bit
+                87, 3, 87, 3,        # 0-bit: 855, 855
+                174, 6, 174, 6,      # 1-bit: 1710, 1710
+                255, 160             # Data
+            )),
+            ('DATA', (
+                3, 0, 0, 0,          # 3 bits, initial level low
+                0, 0,                # No tail pulse
+                1, 2,                # 1 pulse per 0-bit, 2 pulses per 1-bit
+                244, 1,              # 0-bit: 500
+                88, 2, 188, 2,       # 1-bit: 600, 700
+                160                  # Data: 101
+            )),
+            ('PAUS', (172, 13, 0, 128)), # 3500 T-states, level high
+            ('PAUS', (88, 27, 0, 0)),    # 7000 T-states, level low
+            ('BRWS', b'Level 1'),
+            ('STOP', (1, 0)),            # Stop the tape if in 48K mode
+            ('DATA', (8, 0, 0, 0, 0, 0, 2, 2, 87, 3, 87, 3, 174, 6, 174, 6, 0))
+        ))
+        output, error = self.run_tap2sna(pzxfile)
+        self.assertEqual(error, '')
+        blocks = load_tracer.blocks
+        self.assertEqual(len(blocks), 5)
+        exp_timings = (
+            (0x13, 3, 2168, [667, 735, 74565], 0, 0, 0, (), []),
+            (0x14, 0, 0, [0], 855, 1710, 0, (), [255, 160]),
+            (0x13, 0, 0, (945,), 0, 0, 0, (), []),
+            (0x14, 0, 0, (), 0, 0, 3500, [600, 700, 500, 600, 700], []),
+            (0x20, 0, 0, (0,), 0, 0, 7000, (), [])
+        )
+        for (block_id, t, data), exp in zip(blocks, exp_timings):
+            self.assertEqual(exp, (block_id, t.pilot_len, t.pilot, t.sync, t.zero, t.one, t.pause, t.pulses, list(data)))
+        self.assertEqual(blocks[1][1].used_bits, 4)
+
+    @patch.object(tap2sna, 'KeyboardTracer', MockKeyboardTracer)
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_pzx_tape_does_not_stop_at_stop_block_in_128k_mode(self):
+        pzxfile = self._write_pzx((
+            ('STOP', (1, 0)),
+            ('PAUS', (1, 0, 0, 0))
+        ))
+        output, error = self.run_tap2sna(f'-c machine=128 {pzxfile}')
+        self.assertEqual(error, '')
+        self.assertEqual(len(load_tracer.blocks), 1)
+
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_pzx_file_converted_from_tap_file(self):
+        code_start = 32768
+        code = [4, 5]
+        blocks, basic_data = self._write_basic_loader(code_start, code, False)
+        pzx_blocks = []
+        for block in blocks:
+            data = block[2:]
+            pilot_len = 8063 if data[0] == 0 else 3223
+            pzx_blocks.append(('PULS', (pilot_len % 256, 128 + pilot_len // 256, 120, 8, 155, 2, 223, 2)))
+            num_bits = (8 * len(data)).to_bytes(4, 'little')
+            pzx_blocks.append(('DATA', (*num_bits[:3], 128, 177, 3, 2, 2, 87, 3, 87, 3, 174, 6, 174, 6, *data)))
+            pzx_blocks.append(('PAUS', (224, 103, 53, 0)))
+        pzxfile = self._write_pzx(pzx_blocks)
+        output, error = self.run_tap2sna(f'{pzxfile} out.z80')
+        out_lines = output.strip().split('\n')
+        exp_out_lines = [
+            'Program: simloadbas',
+            'Fast loading data block: 23755,20',
+            'Bytes: simloadbyt',
+            'Fast loading data block: 32768,2',
+            'Tape finished',
+            'Simulation stopped (PC in RAM): PC=32768',
+            'Writing out.z80'
+        ]
+        self.assertEqual(exp_out_lines, out_lines)
+        self.assertEqual(error, '')
+        self.assertEqual(basic_data, snapshot[23755:23755 + len(basic_data)])
+        self.assertEqual(code, snapshot[code_start:code_start + len(code)])
+
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_ram_load_with_pzx_file(self):
+        data = [1, 2, 3]
+        pzxfile = self._write_pzx((
+            ('PULS', (1, 0)),
+            ('DATA', (40, 0, 0, 128, 0, 0, 2, 2, 87, 3, 87, 3, 174, 6, 174, 6, *create_data_block(data))),
+            ('PAUS', (1, 0, 0, 0))
+        ))
+        output, error = self.run_tap2sna(f'--ram load=1,32768 {pzxfile} out.z80')
+        self.assertEqual(error, '')
+        self.assertEqual(data, snapshot[32768:32771])
+
     @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
     def test_sim_load_with_trace(self):
         basic_data = [
@@ -2242,6 +2679,43 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(trace_lines[19499], '$8038 JR NC,$8037')
         self.assertEqual(trace_lines[19500], '$8037 SCF')
 
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_timeline(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        timeline = 'timeline.json'
+        output, error = self.run_tap2sna(f'-c python=1 -c timeline={timeline} {tapfile} out.z80')
+        self.assertEqual(error, '')
+        with open(timeline) as f:
+            blocks = json.load(f)['blocks']
+        for block in blocks:
+            self.assertIsInstance(block.pop('seconds'), float)
+        exp_blocks = [
+            {'block': 1, 'length': 19, 'start': 0, 'end': 17869212, 'tstates': 17869212, 'instructions': 6716, 'fast_load': True,
+             'acc_hits': 0, 'acc_misses': 0, 'rom_tstates': 0, 'ram_tstates': 0, 'complete': True},
+            {'block': 2, 'length': 22, 'start': 17869212, 'end': 28753125, 'tstates': 10883913, 'instructions': 1379, 'fast_load': True,
+             'acc_hits': 0, 'acc_misses': 0, 'rom_tstates': 0, 'ram_tstates': 0, 'complete': True},
+            {'block': 3, 'length': 19, 'start': 28753125, 'end': 50103903, 'tstates': 21350778, 'instructions': 4064, 'fast_load': True,
+             'acc_hits': 0, 'acc_misses': 0, 'rom_tstates': 0, 'ram_tstates': 0, 'complete': True},
+            {'block': 4, 'length': 4, 'start': 50103903, 'end': 50103903, 'tstates': 0, 'instructions': 0, 'fast_load': True,
+             'acc_hits': 0, 'acc_misses': 0, 'rom_tstates': 0, 'ram_tstates': 0, 'complete': True}
+        ]
+        self.assertEqual(exp_blocks, blocks)
+
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_timeline_in_csv_format(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        timeline = 'timeline.csv'
+        output, error = self.run_tap2sna(f'-c python=1 -c fast-load=0 -c timeout=5 -c timeline={timeline} {tapfile} out.z80')
+        self.assertEqual(error, '')
+        self.assertIn('Simulation stopped (timed out): PC=1525', output)
+        with open(timeline) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0], 'block,length,start,end,tstates,seconds,instructions,fast_load,acc_hits,acc_misses,rom_tstates,ram_tstates,complete')
+        fields = lines[1].split(',')
+        self.assertEqual(fields[:5], ['1', '19', '0', '17500004', '17500004'])
+        self.assertEqual(fields[6:], ['174719', 'False', '6474', '0', '17499984', '0', 'False'])
+
     @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
     def test_sim_load_with_trace_and_interrupts_and_timestamps(self):
         basic_data = [
@@ -2279,6 +2753,70 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(trace_lines[11185], '17891327 $1F3D HALT')
         self.assertEqual(trace_lines[11186], '17891344 $0038 PUSH AF')
 
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_turbo(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        timeline = 'timeline.json'
+        output, error = self.run_tap2sna(f'-c python=1 -c fast-load=0 -c turbo=1 -c timeline={timeline} {tapfile} out.z80')
+        self.assertEqual(error, '')
+        self.assertEqual([4, 5], snapshot[32768:32770])
+        with open(timeline) as f:
+            blocks = json.load(f)['blocks']
+        exp_times = [(21329618, 42818), (32242552, 38725), (53573350, 40087), (60645576, 29829)]
+        self.assertEqual(exp_times, [(b['end'], b['instructions']) for b in blocks])
+
+    @patch.object(tap2sna, 'LoadTracer', TestLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_counts_instructions_only_with_timeline(self):
+        tapfile = self._write_basic_loader(32768, [4, 5])[0]
+        for timeline, counted in (('', False), ('-c timeline=timeline.json', True)):
+            output, error = self.run_tap2sna(f'-c python=1 -c fast-load=0 -c turbo=1 {timeline} {tapfile} out.z80')
+            self.assertEqual(error, '')
+            self.assertEqual([4, 5], snapshot[32768:32770])
+            self.assertEqual(load_tracer.state[10] > 0, counted)
+
+    def _test_sim_load_with_turbo_and_memory_writes(self, options):
+        code = [
+            0xF3,             # 32768 DI
+            0x21, 0x00, 0x90, # 32769 LD HL,36864
+            0x34,             # 32772 INC (HL)
+            0x18, 0xFD        # 32773 JR 32772
+        ]
+        blocks = self._write_basic_loader(32768, code, False)[0]
+        blocks.append(create_tap_data_block([0]))
+        tapfile = self._write_tap(blocks)
+        counts = []
+        for turbo in (0, 1):
+            output, error = self.run_tap2sna(f'{options} -c timeout=20 -c turbo={turbo} {tapfile} out.z80')
+            self.assertEqual(error, '')
+            counts.append(snapshot[36864])
+        self.assertEqual([173, 173], counts)
+
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_turbo_and_memory_writes(self):
+        self._test_sim_load_with_turbo_and_memory_writes('-c python=1')
+
+    @skipUnless(CSimulator, 'CSimulator is not available')
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_with_turbo_and_memory_writes_csimulator(self):
+        self._test_sim_load_with_turbo_and_memory_writes('')
+
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_config_turbo(self):
+        tapfile = self._write_tap([create_tap_data_block([0])])
+        output, error = self.run_tap2sna(f'-c turbo=1 {tapfile} out.z80')
+        self.assertEqual(error, '')
+        self.assertTrue(load_tracer.turbo)
+
+    @patch.object(tap2sna, 'LoadTracer', MockLoadTracer)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def test_sim_load_config_turbo_is_disabled_when_tracing(self):
+        tapfile = self._write_tap([create_tap_data_block([0])])
+        output, error = self.run_tap2sna(f'-c turbo=1 -c trace=trace.log {tapfile} out.z80')
+        self.assertEqual(error, '')
+        self.assertFalse(load_tracer.turbo)
+
     def test_sim_load_config_help(self):
         for option in ('-c', '--sim-load-config'):
             output, error = self.run_tap2sna(f'{option} help')
@@ -2386,6 +2924,9 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(load_tracer.in_min_addr, 0x8000)
         self.assertEqual(load_tracer.accel_dec_a, 1)
         self.assertFalse(load_tracer.list_accelerators)
+        self.assertFalse(load_tracer.learn)
+        self.assertFalse(load_tracer.timeline)
+        self.assertFalse(load_tracer.turbo)
         self.assertEqual(load_tracer.border, 7)
         self.assertEqual(load_tracer.out7ffd, 0)
         self.assertEqual(load_tracer.outfffd, 0)
@@ -2415,6 +2956,7 @@ class Tap2SnaTest(SkoolKitTestCase):
             'finish-tape=1',
             'first-edge=1234',
             'in-flags=0',
+            'learn=1',
             'load=RUN',
             'machine=128',
             'pause=0',
@@ -2444,6 +2986,7 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(load_tracer.in_min_addr, 0x8000)
         self.assertEqual(load_tracer.accel_dec_a, 2)
         self.assertFalse(load_tracer.list_accelerators)
+        self.assertTrue(load_tracer.learn)
         self.assertEqual(load_tracer.border, kbtracer.border)
         self.assertEqual(load_tracer.out7ffd, kbtracer.out7ffd)
         self.assertEqual(load_tracer.outfffd, kbtracer.outfffd)
@@ -2606,6 +3149,67 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(error, '')
         self.assertIs(load_tracer.simulator.__class__, MockSimulator)
 
+    def test_tape_edges(self):
+        edges = TapeEdges(100)
+        edges.add_tone(3, 2000)
+        edges.add_pulses((600, 700))
+        edges.add_data((0x81, 0xC0), 2, 500, 1000)
+        edges.add_pause(10000)
+        edges.add_pulses((50,))
+        exp_edges = [
+            100,                                  # First edge
+            2100, 4100, 6100,                     # Tone
+            6700, 7400,                           # Pulses
+            8400, 9400,                           # 0x81: bit 7 (1)
+            9900, 10400, 10900, 11400, 11900,     # 0x81: bits 6-2 (0)
+            12400, 12900, 13400, 13900, 14400,
+            14900, 15400,
+            16400, 17400,                         # 0x81: bit 0 (1)
+            18400, 19400, 20400, 21400,           # 0xC0: bits 7-6 (1)
+            31450                                 # Pulse after pause
+        ]
+        self.assertEqual(len(edges), len(exp_edges))
+        self.assertEqual(list(edges), exp_edges)
+        self.assertEqual(edges[-1], 31450)
+        self.assertEqual([edges[i] for i in range(len(exp_edges) - 1, -1, -1)], exp_edges[::-1])
+        with self.assertRaises(IndexError):
+            edges[len(exp_edges)]
+
+    def test_tape_edges_find(self):
+        edges = TapeEdges(0)
+        edges.add_tone(1000, 2168)
+        edges.add_data(bytes(range(256)) * 3, 8, 855, 1710)
+        exp_edges = list(edges)
+        for tstates, index in ((0, 0), (1, 0), (2168, 0), (2169, 1), (5000000, 0), (5000000, 3000), (exp_edges[-1] + 1, 0)):
+            exp_index = index
+            while exp_index < len(exp_edges) - 1 and exp_edges[exp_index + 1] < tstates:
+                exp_index += 1
+            self.assertEqual(edges.find(tstates, index), exp_index)
+
+    def test_tape_edges_find_across_chunks(self):
+        edges = TapeEdges(0)
+        edges.add_tone(10000, 2168)
+        edges.add_pause(100000)
+        edges.add_pulses([500 + i % 7 for i in range(9000)])
+        edges.add_data(bytes(range(256)) * 5, 5, 855, 1710)
+        exp_edges = list(edges)
+        for index in (0, 4095, 4096, 9999, 10000, 15000, 19000, 30000):
+            for tstates in (exp_edges[index] + 1, exp_edges[index] + 100001, exp_edges[min(index + 5000, len(exp_edges) - 1)], exp_edges[-1] + 1):
+                exp_index = index
+                while exp_index < len(exp_edges) - 1 and exp_edges[exp_index + 1] < tstates:
+                    exp_index += 1
+                self.assertEqual(edges.find(tstates, index), exp_index)
+
+    def test_tape_edges_memory_is_proportional_to_blocks(self):
+        data = bytes(range(256)) * 256
+        timings = tap2sna.get_tape_block_timings(255)
+        edges, indexes, data_blocks = get_edges([(0x10, timings, data)], 0, 0)
+        self.assertEqual(len(edges), 1 + 3223 + 2 + 16 * len(data))
+        self.assertEqual(len(edges.segments), 4)
+        self.assertEqual(len(edges.times), 3)
+        self.assertEqual(len(edges.checkpoints), 256)
+        self.assertEqual(indexes, [(3225, len(edges) - 1)])
+
     @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
     def test_empty_tape(self):
         tapfile = self._write_tap([])
@@ -3164,3 +3768,113 @@ class Tap2SnaTest(SkoolKitTestCase):
         self.assertEqual(error, '')
         self.assertEqual(simulator.registers[0], 255)
         self.assertEqual(simulator.registers[2], 156)
+
+    def test_fingerprint(self):
+        # These built-in accelerators contain instructions that are not
+        # recognised by fingerprint() (or an incomplete JP operand)
+        unsupported = {'d-and-h', 'digital-integration', 'software-projects'}
+        for name, acc in ACCELERATORS.items():
+            if name in unsupported:
+                continue
+            code = [b or 0 for b in acc.full_code()]
+            memory = [0] * 65536
+            memory[0x8000:0x8000 + len(code)] = code
+            in_addr = 0x8000 + bytes(code).index(b'\xDB\xFE')
+            counter, learned = fingerprint(memory, in_addr)
+            self.assertEqual(counter, 0x8000 + acc.offset(), name)
+            exp_params = (acc.opcode, acc.offset(), acc.in_time, acc.loop_time, acc.loop_r_inc, acc.ear_mask, acc.polarity)
+            params = (learned.opcode, learned.offset(), learned.in_time, learned.loop_time, learned.loop_r_inc, learned.ear_mask, learned.polarity)
+            self.assertEqual(exp_params, params, name)
+            self.assertEqual(code, learned.full_code(), name)
+
+    def test_fingerprint_no_loop(self):
+        memory = [0] * 65536
+        memory[0x8000:0x8007] = (
+            0x04,       # $8000 INC B
+            0xC8,       # $8001 RET Z
+            0xDB, 0xFE, # $8002 IN A,($FE)
+            0xA9,       # $8004 XOR C
+            0xE6, 0x40, # $8005 AND $40
+        )
+        self.assertIsNone(fingerprint(memory, 0x8002))
+        memory[0x8007:0x8009] = (0x18, 0xF7) # $8007 JR $8000
+        self.assertIsNone(fingerprint(memory, 0x8002))
+        memory[0x8007:0x8009] = (0x28, 0xF7) # $8007 JR Z,$8000
+        memory[0x8001] = 0x78                # $8001 LD A,B
+        self.assertIsNone(fingerprint(memory, 0x8002))
+        memory[0x8001] = 0xC8                # $8001 RET Z
+        self.assertIsNotNone(fingerprint(memory, 0x8002))
+
+    @patch.object(tap2sna, 'CSimulator', MockSimulator)
+    @patch.object(tap2sna, 'Simulator', MockSimulator)
+    @patch.object(tap2sna, 'write_snapshot', mock_write_snapshot)
+    def _test_learn_accelerator(self, options, learned):
+        global mock_memory
+        mock_memory = [0] * 65536
+        code = (
+            0x04,       # $C000 INC B
+            0xC8,       # $C001 RET Z
+            0x00,       # $C002 NOP
+            0xDB, 0xFE, # $C003 IN A,($FE)
+            0xA9,       # $C005 XOR C
+            0xE6, 0x40, # $C006 AND $40
+            0x28, 0xF6  # $C008 JR Z,$C000
+        )
+        mock_memory[0xC000:0xC000 + len(code)] = code
+        tapfile = self._write_tap([create_tap_header_block('bytes', 32768, 1)])
+        output, error = self.run_tap2sna(f'{options} {tapfile} out.z80')
+        exp_out_lines = [
+            'Data (19 bytes)',
+            'Tape finished',
+            'Simulation stopped (end of tape): PC=49165'
+        ]
+        if learned:
+            exp_out_lines.append(f'Learned accelerators: {learned}')
+        exp_out_lines.append('Writing out.z80')
+        self.assertEqual(exp_out_lines, self._format_output(output))
+        self.assertEqual(error, '')
+        return simulator.tracer
+
+    def test_learn_accelerator(self):
+        tracer = self._test_learn_accelerator('-c accelerator=none -c learn=1', 'learned-9818d1ca')
+        acc = tracer.learned[0]
+        self.assertEqual(acc.opcode, 0x04)
+        self.assertEqual(acc.in_time, 13)
+        self.assertEqual(acc.loop_time, 47)
+        self.assertEqual(acc.loop_r_inc, 7)
+        self.assertEqual(acc.ear_mask, 0x40)
+        self.assertEqual(acc.polarity, 0)
+        self.assertEqual(simulator.opcodes[0x04].func, tracer.inc_b)
+        self.assertIs(simulator.opcodes[0x04].args[2], acc)
+
+    def test_learn_accelerator_with_accelerator_file(self):
+        accfile = 'accelerators.json'
+        self._test_learn_accelerator(f'-c accelerator=none -c learn=1 -c accelerator-file={accfile}', 'learned-9818d1ca')
+        exp_accelerators = {
+            "accelerators": [
+                {
+                    "name": "learned-9818d1ca",
+                    "code": "04 C8 00 DB FE A9 E6 40 28 F6",
+                    "offset": 0,
+                    "in_time": 13,
+                    "loop_time": 47,
+                    "loop_r_inc": 7,
+                    "ear_mask": 64,
+                    "polarity": 0
+                }
+            ]
+        }
+        with open(accfile) as f:
+            self.assertEqual(exp_accelerators, json.load(f))
+
+        tracer = self._test_learn_accelerator(f'-c accelerator=learned-9818d1ca -c learn=1 -c accelerator-file={accfile}', None)
+        self.assertEqual(tracer.learned, [])
+        self.assertEqual(simulator.opcodes[0x04].func, tracer.inc_b)
+        self.assertEqual(simulator.opcodes[0x04].args[2].name, 'learned-9818d1ca')
+
+    def test_accelerator_file_invalid(self):
+        accfile = self.write_text_file('{"accelerators": [{"name": "nope"}]}', suffix='.json')
+        tapfile = self._write_tap([create_tap_header_block('bytes', 32768, 1)])
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_tap2sna(f'-c accelerator-file={accfile} {tapfile} out.z80')
+        self.assertEqual(cm.exception.args[0], f'Error while converting {tapfile}: {accfile}: invalid accelerator file')
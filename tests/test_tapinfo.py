@@ -1,10 +1,13 @@
+import json
 from textwrap import dedent
 from unittest.mock import patch
 
 from skoolkittest import (SkoolKitTestCase, create_data_block,
                           create_tap_header_block, create_tap_data_block,
-                          create_tzx_header_block, create_tzx_data_block)
+                          create_tzx_header_block, create_tzx_data_block,
+                          create_tzx_turbo_data_block)
 from skoolkit import SkoolKitError, tapinfo, get_word, VERSION
+from skoolkit.tapeindex import checksum, index_tap, index_tzx
 
 TZX_DATA_BLOCK = (16, 0, 0, 3, 0, 255, 0, 0)
 
@@ -739,3 +742,115 @@ class TapinfoTest(SkoolKitTestCase):
         for option in ('-V', '--version'):
             output, error = self.run_tapinfo(option, catch_exit=0)
             self.assertEqual(output, 'SkoolKit {}\n'.format(VERSION))
+
+    def test_option_batch(self):
+        tap_data = create_tap_header_block('program_01', 10, 5, 0)
+        tap_data.extend(create_tap_data_block([1, 2, 3]))
+        tap_data[-1] ^= 1 # Corrupt the parity byte
+        tapfile = self.write_bin_file(tap_data, suffix='.tap')
+        tzxfile = self._write_tzx([
+            create_tzx_header_block('test_tzx01', 32768, 3),
+            create_tzx_data_block([4, 5, 6]),
+            (0x20, 232, 3) # Pause 1000ms
+        ])
+        badfile = self._write_tzx([(0x99,)])
+        manifest = f"""
+            # Tapes to summarise
+            {tapfile}
+
+            {tzxfile}
+            {badfile}
+            nonexistent.tap
+        """
+        mfile = self.write_text_file(dedent(manifest).strip())
+        output, error = self.run_tapinfo(f'--batch -j 2 {mfile}')
+        self.assertEqual(error, '')
+        results = [json.loads(line) for line in output.rstrip().split('\n')]
+        self.assertEqual(len(results), 4)
+
+        exp_tap = {
+            'file': tapfile,
+            'format': 'tap',
+            'size': 28,
+            'blocks': [
+                {
+                    'number': 1, 'offset': 0, 'length': 21, 'data_length': 19, 'flag': 0, 'checksum_ok': True,
+                    'header': {'type': 'Program', 'name': 'program_01', 'length': 5, 'line': 10}
+                },
+                {'number': 2, 'offset': 21, 'length': 7, 'data_length': 5, 'flag': 255, 'checksum_ok': False}
+            ]
+        }
+        self.assertEqual(exp_tap, results[0])
+
+        exp_tzx = {
+            'file': tzxfile,
+            'format': 'tzx',
+            'size': 47,
+            'version': '1.20',
+            'blocks': [
+                {
+                    'number': 1, 'offset': 10, 'length': 24, 'id': 16, 'description': 'Standard speed data',
+                    'data_length': 19, 'flag': 0, 'checksum_ok': True,
+                    'header': {'type': 'Bytes', 'name': 'test_tzx01', 'length': 3, 'start': 32768}
+                },
+                {
+                    'number': 2, 'offset': 34, 'length': 10, 'id': 16, 'description': 'Standard speed data',
+                    'data_length': 5, 'flag': 255, 'checksum_ok': True
+                },
+                {'number': 3, 'offset': 44, 'length': 3, 'id': 32, 'description': 'Pause (silence)'}
+            ]
+        }
+        self.assertEqual(exp_tzx, results[1])
+
+        self.assertEqual({'file': badfile, 'error': 'Unknown block ID: 0x99'}, results[2])
+        self.assertEqual({'file': 'nonexistent.tap', 'error': 'nonexistent.tap: file not found'}, results[3])
+
+    def test_option_batch_with_nonexistent_manifest(self):
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_tapinfo('--batch nonexistent.txt')
+        self.assertEqual(cm.exception.args[0], 'nonexistent.txt: file not found')
+
+    def test_index_tap(self):
+        tap = bytes(create_tap_header_block('test', 32768, 2) + create_tap_data_block([1, 2]))
+        blocks = index_tap(memoryview(tap))
+        self.assertEqual([(1, None, 0, 21, 2, 19), (2, None, 21, 6, 23, 4)],
+                         [(b.number, b.block_id, b.offset, b.length, b.data_offset, b.data_length) for b in blocks])
+        self.assertEqual(bytes(blocks[1].data(memoryview(tap))), bytes(create_data_block([1, 2])))
+
+    def test_index_tap_with_missing_bytes(self):
+        tap = bytes(create_tap_data_block([1, 2])[:-1])
+        with self.assertRaises(SkoolKitError) as cm:
+            index_tap(tap)
+        self.assertEqual(cm.exception.args[0], 'Missing 1 data byte(s) at end of file')
+
+    def test_index_tzx(self):
+        tzx = b'ZXTape!\x1a\x01\x14' + bytes(
+            create_tzx_turbo_data_block([1, 2, 3])
+            + [0x12, 120, 8, 0, 1] # Pure tone
+            + [0x21, 2, 65, 66]    # Group start
+            + [0x22]               # Group end
+        )
+        blocks = index_tzx(memoryview(tzx))
+        exp_blocks = [
+            (1, 0x11, 10, 24, 29, 5),
+            (2, 0x12, 34, 5, None, 0),
+            (3, 0x21, 39, 4, None, 0),
+            (4, 0x22, 43, 1, None, 0)
+        ]
+        self.assertEqual(exp_blocks, [(b.number, b.block_id, b.offset, b.length, b.data_offset, b.data_length) for b in blocks])
+        self.assertEqual(bytes(blocks[0].data(tzx)), bytes(create_data_block([1, 2, 3])))
+
+    def test_index_tzx_with_truncated_block(self):
+        tzx = b'ZXTape!\x1a\x01\x14' + bytes(create_tzx_data_block([1, 2, 3])[:-1])
+        with self.assertRaises(SkoolKitError) as cm:
+            index_tzx(tzx)
+        self.assertEqual(cm.exception.args[0], 'Unexpected end of file')
+
+    def test_checksum(self):
+        for length in (0, 1, 2, 3, 7, 8, 255, 256, 257):
+            data = bytes((i * 37 + 11) % 256 for i in range(length))
+            exp_checksum = 0
+            for b in data:
+                exp_checksum ^= b
+            self.assertEqual(checksum(data), exp_checksum, length)
+            self.assertEqual(checksum(memoryview(data)), exp_checksum, length)
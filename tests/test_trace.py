@@ -1,11 +1,13 @@
 from functools import partial
 import hashlib
+import json
 import os
 from textwrap import dedent
 from unittest.mock import patch
 
 from skoolkittest import SkoolKitTestCase
-from skoolkit import trace, SkoolKitError, VERSION, CSimulator
+from skoolkit import trace, audio, SkoolKitError, VERSION, CSimulator
+from skoolkit.audio import AudioWriter
 from skoolkit.config import COMMANDS
 from skoolkit.simulator import Simulator
 from skoolkit.simutils import PC, IFF, IM, T
@@ -27,6 +29,7 @@ class MockSimulator:
         self.pc = kwargs.get('pc', 0)
         self.t1 = kwargs.get('t1', 0)
         self.out_times = kwargs.get('out_times', ())
+        self.watchpoints = None
 
     def set_tracer(self, tracer, *args, **kwargs):
         tracer.out_times = self.out_times
@@ -83,20 +86,29 @@ class TraceTest(SkoolKitTestCase):
         self.assertIsNone(options.start)
         self.assertIsNone(options.stop)
         self.assertFalse(options.audio)
+        self.assertIsNone(options.ay)
+        self.assertFalse(options.batch)
+        self.assertIsNone(options.binary_trace)
         self.assertFalse(options.cmio)
+        self.assertFalse(options.decode)
         self.assertEqual(options.depth, 2)
         self.assertIsNone(options.dump)
+        self.assertIsNone(options.entries)
         self.assertTrue(options.interrupts)
+        self.assertEqual(options.jobs, 0)
         self.assertEqual(options.max_operations, 0)
         self.assertEqual(options.max_tstates, 0)
         self.assertIsNone(options.org)
         self.assertEqual(options.params, [])
         self.assertEqual(options.pokes, [])
+        self.assertIsNone(options.profile)
         self.assertFalse(options.python)
         self.assertEqual(options.reg, [])
         self.assertIsNone(options.rom)
         self.assertFalse(options.stats)
         self.assertEqual(options.verbose, 0)
+        self.assertIsNone(options.wav)
+        self.assertEqual(options.watch, [])
         self.assertEqual(config['TraceLine'], '${pc:04X} {i}')
         self.assertEqual(
             config['TraceLine2'],
@@ -1051,6 +1063,38 @@ class TraceTest(SkoolKitTestCase):
         """
         self.assertEqual(dedent(exp_output).strip(), output.rstrip())
 
+    @patch.object(audio, 'EDGE_BUFFER_SIZE', 8)
+    def test_option_wav(self):
+        data = (
+            22, 16,   # 32768 LD D,16
+            66,       # 32770 LD B,D
+            211, 254, # 32771 OUT (254),A
+            238, 16,  # 32773 XOR 16
+            16, 250,  # 32775 DJNZ 32771
+            21,       # 32777 DEC D
+            32, 246,  # 32778 JR NZ,32770
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        start, stop = 32768, 32780
+        wavfile = 'out.wav'
+        output, error = self.run_trace(f'-o {start} -S {stop} --wav {wavfile} {binfile}')
+        self.assertEqual(error, '')
+        exp_output = f"""
+            Stopped at $800C
+            Wrote {wavfile}
+        """
+        self.assertEqual(dedent(exp_output).strip(), output.rstrip())
+        delays = []
+        for d in range(16, 0, -1):
+            delays.extend([31] * (d - 1) + [46])
+        delays.pop()
+        with open('exp.wav', 'wb') as f:
+            AudioWriter().write_audio(f, delays)
+        with open('exp.wav', 'rb') as f:
+            exp_wav = f.read()
+        with open(wavfile, 'rb') as f:
+            self.assertEqual(exp_wav, f.read())
+
     @patch.object(trace, 'CSimulator', partial(MockSimulator, pc=0x8001, out_times=(0, 500000, 1000000)))
     @patch.object(trace, 'Simulator', partial(MockSimulator, pc=0x8001, out_times=(0, 500000, 1000000)))
     def test_option_audio_128k(self):
@@ -1064,6 +1108,286 @@ class TraceTest(SkoolKitTestCase):
         """
         self.assertEqual(dedent(exp_output).strip(), output.rstrip())
 
+    def _write_ay_test_bin(self):
+        data = (
+            1, 253, 255, # 32768 LD BC,65533
+            62, 7,       # 32771 LD A,7
+            237, 121,    # 32773 OUT (C),A
+            6, 191,      # 32775 LD B,191
+            62, 63,      # 32777 LD A,63
+            237, 121,    # 32779 OUT (C),A
+            6, 255,      # 32781 LD B,255
+            62, 8,       # 32783 LD A,8
+            237, 121,    # 32785 OUT (C),A
+            6, 191,      # 32787 LD B,191
+            62, 15,      # 32789 LD A,15
+            237, 121,    # 32791 OUT (C),A
+            24, 254,     # 32793 JR 32793
+        )
+        return self.write_bin_file(data, suffix='.bin')
+
+    def test_option_ay_psg(self):
+        binfile = self._write_ay_test_bin()
+        psgfile = 'out.psg'
+        exp_output = f"""
+            Stopped at $8019: 140003 T-states
+            Wrote {psgfile}
+        """
+        self._test_trace(f'-o 32768 -M 140000 -n --ay {psgfile} {binfile}', exp_output)
+        exp_data = (
+            b'PSG\x1a' + bytes(12)
+            + bytes((0 if r % 2 else r // 2) for r in range(28))
+            + bytes((7, 63, 8, 15))
+            + b'\xff\xff'
+        )
+        with open(psgfile, 'rb') as f:
+            self.assertEqual(exp_data, f.read())
+
+    def test_option_ay_wav(self):
+        binfile = self._write_ay_test_bin()
+        wavfile = 'out.wav'
+        exp_output = f"""
+            Stopped at $8019: 35003 T-states
+            Wrote {wavfile}
+        """
+        self._test_trace(f'-o 32768 -M 35000 -n --ay {wavfile} {binfile}', exp_output)
+        with open(wavfile, 'rb') as f:
+            wav = f.read()
+        self.assertEqual(wav[:4], b'RIFF')
+        self.assertEqual(wav[40:44], bytes((0x72, 0x03, 0, 0)))
+        self.assertEqual(wav[44:46], bytes(2))
+        self.assertEqual(wav[-2:], bytes((0xAA, 0x2A)))
+
+    def test_option_ay_with_unknown_file_type(self):
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_trace('--ay out.ay 48')
+        self.assertEqual(cm.exception.args[0], 'Unknown AY file type: out.ay')
+
+    def test_option_batch(self):
+        data = (
+            0x3E, 0x05, # $8000 LD A,$05
+            0x3D,       # $8002 DEC A
+            0x20, 0xFD, # $8003 JR NZ,$8002
+            0xC9,       # $8005 RET
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        manifest = f"""
+            # Run to the RET instruction
+            -n -o 32768 -S 32773 {binfile}
+
+            -n -o 32768 -m 3 {binfile}
+            -n -o 32768 -M 11 {binfile}
+            nonexistent.z80
+        """
+        mfile = self.write_text_file(dedent(manifest).strip())
+        output, error = self.run_trace(f'--batch -j 2 {mfile}')
+        self.assertEqual(error, '')
+        results = [json.loads(line) for line in output.rstrip().split('\n')]
+        self.assertEqual(len(results), 4)
+
+        self.assertEqual(results[0]['job'], 2)
+        self.assertEqual(results[0]['file'], binfile)
+        self.assertEqual(results[0]['stop'], 'stop')
+        self.assertEqual(results[0]['pc'], 32773)
+        self.assertEqual(results[0]['operations'], 11)
+        self.assertEqual(results[0]['tstates'], 82)
+        self.assertEqual(results[0]['registers']['A'], 0)
+        self.assertEqual(results[0]['registers']['PC'], 32773)
+        self.assertEqual(results[0]['state']['iff'], 1)
+        self.assertEqual(results[0]['output'], 'Stopped at $8005\n')
+
+        self.assertEqual(results[1]['job'], 4)
+        self.assertEqual(results[1]['stop'], 'max-operations')
+        self.assertEqual(results[1]['pc'], 32770)
+        self.assertEqual(results[1]['operations'], 3)
+        self.assertEqual(results[1]['registers']['A'], 4)
+        self.assertEqual(results[1]['output'], 'Stopped at $8002: 3 operations\n')
+
+        self.assertEqual(results[2]['job'], 5)
+        self.assertEqual(results[2]['stop'], 'max-tstates')
+        self.assertEqual(results[2]['pc'], 32771)
+        self.assertEqual(results[2]['operations'], 2)
+        self.assertEqual(results[2]['tstates'], 11)
+
+        self.assertEqual(results[3], {'job': 6, 'file': 'nonexistent.z80', 'error': 'nonexistent.z80: file not found'})
+
+    def test_option_batch_with_invalid_jobs(self):
+        manifest = """
+            -n --foo 48
+            -m x 48
+            --batch 48
+            -n
+            -V 48
+            -n -M 10 48
+        """
+        mfile = self.write_text_file(dedent(manifest).strip())
+        output, error = self.run_trace(f'--batch -j 1 {mfile}')
+        self.assertEqual(error, '')
+        results = [json.loads(line) for line in output.rstrip().split('\n')]
+        self.assertEqual(len(results), 6)
+        exp_errors = [
+            'Invalid job: -n --foo 48',
+            "Invalid job: -m x 48 (argument -m/--max-operations: invalid int value: 'x')",
+            'Invalid job: --batch 48',
+            'Invalid job: -n',
+            'Invalid job: -V 48'
+        ]
+        for num, (exp_error, result) in enumerate(zip(exp_errors, results), 1):
+            self.assertEqual({'job': num, 'file': None, 'error': exp_error}, result)
+        self.assertEqual(results[5]['job'], 6)
+        self.assertEqual(results[5]['stop'], 'max-tstates')
+
+    def test_option_batch_with_nonexistent_manifest(self):
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_trace('--batch nonexistent.txt')
+        self.assertEqual(cm.exception.args[0], 'nonexistent.txt: file not found')
+
+    def test_option_binary_trace(self):
+        data = (
+            0xF3,       # $8000 DI
+            0x06, 0x02, # $8001 LD B,2
+            0x10, 0xFE, # $8003 DJNZ $8003
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        output, error = self.run_trace(f'-o 32768 -S 0x8005 --binary-trace trace.bin {binfile}')
+        self.assertEqual(error, '')
+        self.assertEqual(output, 'Stopped at $8005\n')
+        self.assertEqual(os.path.getsize('trace.bin'), 8 + 4 * 14)
+
+        output, error = self.run_trace('--decode trace.bin')
+        self.assertEqual(error, '')
+        exp_output = """
+            $8000 DI
+            $8001 LD B,$02
+            $8003 DJNZ $8003
+            $8003 DJNZ $8003
+        """
+        self.assertEqual(dedent(exp_output).strip(), output.rstrip())
+
+    def test_option_binary_trace_with_registers(self):
+        data = [
+            0xAF, # XOR A
+            0x3C  # INC A
+        ]
+        binfile = self.write_bin_file(data, suffix='.bin')
+        output, error = self.run_trace(f'-n -o 32768 -S 32770 -vv --binary-trace trace.bin {binfile}')
+        self.assertEqual(error, '')
+        self.assertEqual(output, 'Stopped at $8002\n')
+
+        output, error = self.run_trace('--decode trace.bin')
+        self.assertEqual(error, '')
+        exp_output = """
+            $8000 XOR A            A=00  F=01000100  BC=0000  DE=0000  HL=0000  IX=0000 IY=5C3A
+                                   A'=00 F'=00000000 BC'=0000 DE'=0000 HL'=0000 SP=5C00 IR=3F01
+            $8001 INC A            A=01  F=00000000  BC=0000  DE=0000  HL=0000  IX=0000 IY=5C3A
+                                   A'=00 F'=00000000 BC'=0000 DE'=0000 HL'=0000 SP=5C00 IR=3F02
+        """
+        self.assertEqual(dedent(exp_output).strip(), output.rstrip())
+
+    def test_option_decode_with_invalid_file(self):
+        tracefile = self.write_bin_file([1, 2, 3, 4, 5, 6, 7, 8])
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_trace(f'--decode {tracefile}')
+        self.assertEqual(cm.exception.args[0], f'{tracefile}: not a binary trace file')
+
+    def test_option_profile(self):
+        data = (
+            0xF3,       # $8000 DI
+            0x06, 0x03, # $8001 LD B,3
+            0x10, 0xFE, # $8003 DJNZ $8003
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        output, error = self.run_trace(f'-o 32768 -S 0x8005 --profile profile.json {binfile}')
+        self.assertEqual(error, '')
+        exp_output = """
+            Stopped at $8005
+            Hot spots (by T-states):
+            Address  Instructions     T-states       %
+            $8003               3           34   75.56
+            $8001               1            7   15.56
+            $8000               1            4    8.89
+            Wrote profile.json
+        """
+        self.assertEqual(dedent(exp_output).strip(), output.rstrip())
+        with open('profile.json') as f:
+            profile = json.load(f)
+        exp_profile = {
+            'tstates': 45,
+            'addresses': [
+                {'address': 32768, 'count': 1, 'tstates': 4},
+                {'address': 32769, 'count': 1, 'tstates': 7},
+                {'address': 32771, 'count': 3, 'tstates': 34}
+            ]
+        }
+        self.assertEqual(profile, exp_profile)
+
+    def test_option_profile_with_entries_from_ctl_file(self):
+        data = (
+            0xCD, 0x06, 0x80, # $8000 CALL $8006
+            0xC3, 0x09, 0x80, # $8003 JP $8009
+            0x06, 0x02,       # $8006 LD B,2
+            0xC9,             # $8008 RET
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        ctl = """
+            c $8000 Main routine
+            c $8006 Subroutine
+            i $8009
+        """
+        ctlfile = self.write_text_file(dedent(ctl).strip(), suffix='.ctl')
+        output, error = self.run_trace(f'-n -o 32768 -S 0x8009 --profile profile.json --entries {ctlfile} {binfile}')
+        self.assertEqual(error, '')
+        with open('profile.json') as f:
+            profile = json.load(f)
+        exp_routines = [
+            {'address': 32768, 'title': 'Main routine', 'count': 2, 'tstates': 27},
+            {'address': 32774, 'title': 'Subroutine', 'count': 2, 'tstates': 17}
+        ]
+        self.assertEqual(profile['routines'], exp_routines)
+        exp_report = """
+            Routines (by T-states):
+            Address  Instructions     T-states       %  Title
+            $8000               2           27   61.36  Main routine
+            $8006               2           17   38.64  Subroutine
+            Wrote profile.json
+        """
+        self.assertTrue(output.rstrip().endswith(dedent(exp_report).strip()))
+
+    def test_option_profile_with_entries_from_skool_file(self):
+        data = (
+            0xCD, 0x05, 0x80, # $8000 CALL $8005
+            0x18, 0x01,       # $8003 JR $8006
+            0xC9,             # $8005 RET
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        skool = """
+            ; Main routine
+            c32768 CALL 32773
+             32771 JR 32774
+
+            ; Subroutine
+            ;
+            ; Does nothing.
+            c32773 RET
+        """
+        skoolfile = self.write_text_file(dedent(skool).strip(), suffix='.skool')
+        output, error = self.run_trace(f'-n -o 32768 -S 0x8006 --profile profile.json --entries {skoolfile} {binfile}')
+        self.assertEqual(error, '')
+        with open('profile.json') as f:
+            profile = json.load(f)
+        exp_routines = [
+            {'address': 32768, 'title': 'Main routine', 'count': 2, 'tstates': 29},
+            {'address': 32773, 'title': 'Subroutine', 'count': 1, 'tstates': 10}
+        ]
+        self.assertEqual(profile['routines'], exp_routines)
+
+    def test_option_entries_with_no_entries(self):
+        binfile = self.write_bin_file([0], suffix='.bin')
+        ctlfile = self.write_text_file('; Nothing here', suffix='.ctl')
+        with self.assertRaises(SkoolKitError) as cm:
+            self.run_trace(f'-o 32768 -S 32769 --profile profile.json --entries {ctlfile} {binfile}')
+        self.assertEqual(cm.exception.args[0], f'{ctlfile}: no entries found')
+
     def test_option_cmio(self):
         data = (
             0xAF,             # $6000 XOR A        ;  4T -> 10T [ 4T ->  10T]
@@ -1828,6 +2152,90 @@ class TraceTest(SkoolKitTestCase):
             output, error = self.run_trace(option, catch_exit=0)
             self.assertEqual(output, 'SkoolKit {}\n'.format(VERSION))
 
+    def test_option_watch(self):
+        data = (
+            0x21, 0x00, 0xC0, # $8000 LD HL,$C000
+            0x06, 0x05,       # $8003 LD B,5
+            0x34,             # $8005 INC (HL)
+            0x23,             # $8006 INC HL
+            0x10, 0xFC,       # $8007 DJNZ $8005
+            0xD3, 0xFE,       # $8009 OUT ($FE),A
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        for option in ('--watch', '-w'):
+            output, error = self.run_trace(f'-n -o 32768 -S 32779 -v {option} write:49154 {binfile}')
+            self.assertEqual(error, '')
+            exp_output = """
+                $8000 LD HL,$C000
+                $8003 LD B,$05
+                $8005 INC (HL)
+                $8006 INC HL
+                $8007 DJNZ $8005
+                $8005 INC (HL)
+                $8006 INC HL
+                $8007 DJNZ $8005
+                $8005 INC (HL)
+                Stopped at $8006: write:49154
+            """
+            self.assertEqual(dedent(exp_output).strip(), output.rstrip())
+
+    def test_option_watch_multiple(self):
+        data = (
+            0x21, 0x00, 0xC0, # $8000 LD HL,$C000
+            0x06, 0x05,       # $8003 LD B,5
+            0x34,             # $8005 INC (HL)
+            0x23,             # $8006 INC HL
+            0x10, 0xFC,       # $8007 DJNZ $8005
+            0xD3, 0xFE,       # $8009 OUT ($FE),A
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        for specs, exp_output in (
+                ('--watch out:254 --watch pc:$8007,4', 'Stopped at $8007: pc:$8007,4'),
+                ('--watch out:254 --watch hl>=49155', 'Stopped at $8007: hl>=49155'),
+                ('--watch read:32777 --watch b=0,2', 'Stopped at $8009: b=0,2'),
+                ('--watch out:0-255 --watch a!=0', 'Stopped at $800B: out:0-255'),
+        ):
+            output, error = self.run_trace(f'-n -o 32768 -S 32779 {specs} {binfile}')
+            self.assertEqual(error, '')
+            self.assertEqual(output, exp_output + '\n')
+
+    def test_option_watch_with_python_simulator(self):
+        data = (
+            0x21, 0x00, 0xC0, # $8000 LD HL,$C000
+            0x06, 0x05,       # $8003 LD B,5
+            0x34,             # $8005 INC (HL)
+            0x23,             # $8006 INC HL
+            0x10, 0xFC,       # $8007 DJNZ $8005
+        )
+        binfile = self.write_bin_file(data, suffix='.bin')
+        output, error = self.run_trace(f'--python -n -o 32768 -S 32777 -v --watch read:49153-49154,2 {binfile}')
+        self.assertEqual(error, '')
+        exp_output = """
+            $8000 LD HL,$C000
+            $8003 LD B,$05
+            $8005 INC (HL)
+            $8006 INC HL
+            $8007 DJNZ $8005
+            $8005 INC (HL)
+            $8006 INC HL
+            $8007 DJNZ $8005
+            $8005 INC (HL)
+            Stopped at $8006: read:49153-49154,2
+        """
+        self.assertEqual(dedent(exp_output).strip(), output.rstrip())
+
+    def test_option_watch_invalid(self):
+        binfile = self.write_bin_file([0], suffix='.bin')
+        for spec in ('x:1', 'pc:2-1', 'write:65536', 'read:1,0', 'out:$FE,x', 'q=1', 'a~1', 'hl>=x'):
+            with self.assertRaises(SkoolKitError) as cm:
+                self.run_trace(f'-o 32768 --watch {spec} {binfile}')
+            self.assertEqual(cm.exception.args[0], f'Invalid watchpoint: {spec}')
+
+    def test_option_watch_help(self):
+        output, error = self.run_trace('--watch help')
+        self.assertTrue(output.startswith('Usage: --watch SPEC\n'))
+        self.assertEqual(error, '')
+
     def test_config_TraceLine_read_from_file(self):
         ini = """
             [trace]
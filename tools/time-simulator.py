@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+SKOOLKIT_HOME = os.environ.get('SKOOLKIT_HOME')
+if not SKOOLKIT_HOME:
+    sys.stderr.write('SKOOLKIT_HOME is not set; aborting\n')
+    sys.exit(1)
+if not os.path.isdir(SKOOLKIT_HOME):
+    sys.stderr.write('SKOOLKIT_HOME={}; directory not found\n'.format(SKOOLKIT_HOME))
+    sys.exit(1)
+sys.path.insert(0, SKOOLKIT_HOME)
+
+from skoolkit import ROM48, integer, read_bin_file
+from skoolkit.cmiosimulator import CMIOSimulator
+from skoolkit.simulator import PREFIXES, Simulator
+from skoolkit.simutils import from_snapshot
+from skoolkit.snapshot import Snapshot
+
+def get_simulator(simulator_cls, snafile, block_cache):
+    config = {'block_cache': block_cache}
+    if snafile:
+        return from_snapshot(simulator_cls, Snapshot.get(snafile), config=config)
+    memory = [0] * 65536
+    rom = read_bin_file(ROM48)
+    memory[:len(rom)] = rom
+    return simulator_cls(memory, {}, {'iff': 0}, config)
+
+def clock(simulator_cls, snafile, block_cache, start, stop, interrupts, trials):
+    elapsed = []
+    for n in range(trials):
+        simulator = get_simulator(simulator_cls, snafile, block_cache)
+        gc.collect()
+        begin = time.time()
+        simulator.run(start, stop, interrupts)
+        elapsed.append(time.time() - begin)
+    return min(elapsed), simulator.registers[:], simulator.memory[:]
+
+def clock_construction(simulator_cls, all_tables, trials):
+    memory = [0] * 65536
+    elapsed = []
+    for n in range(trials):
+        gc.collect()
+        begin = time.time()
+        for i in range(1000):
+            simulator = simulator_cls(memory)
+            if all_tables:
+                for name in PREFIXES:
+                    getattr(simulator, name)
+        elapsed.append(time.time() - begin)
+    return min(elapsed)
+
+def time_construction(trials):
+    for simulator_cls in (Simulator, CMIOSimulator):
+        t1 = clock_construction(simulator_cls, False, trials)
+        t2 = clock_construction(simulator_cls, True, trials)
+        print(f'{simulator_cls.__name__}: {t1:.3f}ms per instance ({t2:.3f}ms with all prefixed opcode tables created)')
+
+def run(options):
+    if options.construction:
+        time_construction(options.trials)
+        return
+    if options.snafile:
+        start, stop = options.start, options.stop
+    else:
+        start, stop = 0, 0x12A9
+    args = (Simulator, options.snafile)
+    args2 = (start, stop, options.interrupts, options.trials)
+    t1, registers1, memory1 = clock(*args, False, *args2)
+    t2, registers2, memory2 = clock(*args, True, *args2)
+    print(f'Without block cache: {t1:.3f}s')
+    print(f'With block cache:    {t2:.3f}s (x{t1 / t2:.2f})')
+    if registers1 != registers2:
+        print('ERROR: Registers differ')
+    if memory1 != memory2:
+        print('ERROR: Memory contents differ')
+
+parser = argparse.ArgumentParser(
+    usage='{} [options] [SNAPSHOT]'.format(os.path.basename(sys.argv[0])),
+    description="Time the execution of code by the pure Python Z80 simulator with and without its block cache, "
+                "and check that the results are identical. If no snapshot is given, the 48K ROM's start-up "
+                "routine is run. Alternatively, time the construction of the pure Python Z80 simulators.",
+    add_help=False
+)
+parser.add_argument('snafile', help=argparse.SUPPRESS, nargs='?')
+group = parser.add_argument_group('Options')
+group.add_argument('-c', '--construction', action='store_true',
+                   help='Time the construction of simulator instances instead.')
+group.add_argument('-n', '--no-interrupts', dest='interrupts', action='store_false',
+                   help="Don't execute interrupt routines.")
+group.add_argument('-s', '--start', metavar='ADDR', type=integer,
+                   help='Start execution at this address.')
+group.add_argument('-S', '--stop', metavar='ADDR', type=integer,
+                   help='Stop execution at this address.')
+group.add_argument('-t', '--trials', metavar='N', type=int, default=3,
+                   help='Run each simulator this many times (default: 3).')
+namespace, unknown_args = parser.parse_known_args()
+if unknown_args or (namespace.snafile and namespace.stop is None):
+    parser.exit(2, parser.format_help())
+run(namespace)